@@ -21,6 +21,7 @@ from app.db.session import get_async_session
 from app.db.models.user import User
 from app.api.deps.auth import get_current_verified_user
 from app.services.billing.subscription_tier_enforcement import subscription_enforcement
+from app.services.dashboard.rollup_service import analytics_rollup_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -235,25 +236,28 @@ async def get_detailed_metrics(
         else:
             start_date = end_date - timedelta(days=30)
         
-        # Mock detailed breakdown data
-        daily_breakdown = []
-        days = (end_date - start_date).days
-        for i in range(days):
-            day = start_date + timedelta(days=i)
-            daily_breakdown.append({
-                "date": day.date().isoformat(),
-                "scans": 35 + (i % 10) * 3,
-                "infringements": 2 + (i % 5),
-                "dmca_sent": 1 + (i % 3),
-                "removals": 1 if i % 4 == 0 else 0
-            })
+        # Daily and platform breakdowns come from the daily rollups
+        start_day, end_day = start_date.date(), end_date.date()
+        scans = await analytics_rollup_service.get_daily_scan_counts(db, current_user.id, start_day, end_day)
+        daily_breakdown = [
+            {
+                "date": day["date"],
+                "scans": scans.get(date.fromisoformat(day["date"]), 0),
+                "infringements": day["infringements"],
+                "dmca_sent": day["takedowns"],
+                "removals": day["removals"]
+            }
+            for day in await analytics_rollup_service.get_daily_series(db, current_user.id, start_day, end_day)
+        ]
         
+        platforms = await analytics_rollup_service.get_platform_breakdown(db, current_user.id, start_day, end_day)
         platform_breakdown = [
-            {"platform": "OnlyFans Leaks", "infringements": 34, "success_rate": 82.4},
-            {"platform": "File Sharing Sites", "infringements": 22, "success_rate": 68.2},
-            {"platform": "Forums", "infringements": 15, "success_rate": 73.3},
-            {"platform": "Social Media", "infringements": 12, "success_rate": 91.7},
-            {"platform": "Image Boards", "infringements": 6, "success_rate": 50.0}
+            {
+                "platform": row["platform"].title(),
+                "infringements": row["infringements"],
+                "success_rate": round(row["success_rate"], 1)
+            }
+            for row in platforms
         ]
         
         site_breakdown = [
@@ -270,13 +274,14 @@ async def get_detailed_metrics(
             {"type": "Profile Content", "count": 16, "success_rate": 87.5}
         ]
         
-        success_rates_by_platform = [
-            {"platform": "Social Media", "success_rate": 91.7},
-            {"platform": "OnlyFans Leaks", "success_rate": 82.4},
-            {"platform": "Forums", "success_rate": 73.3},
-            {"platform": "File Sharing", "success_rate": 68.2},
-            {"platform": "Image Boards", "success_rate": 50.0}
-        ]
+        success_rates_by_platform = sorted(
+            (
+                {"platform": row["platform"].title(), "success_rate": round(row["success_rate"], 1)}
+                for row in platforms if row["takedowns"] > 0
+            ),
+            key=lambda row: row["success_rate"],
+            reverse=True
+        )
         
         response_times_by_platform = [
             {"platform": "Social Media", "avg_hours": 6.2},
@@ -0,0 +1,108 @@
+"""
+Perceptual Hash Benchmark
+Compares per-function imagehash calls with the single-decode MultiHashEngine
+(one image at a time, batched, and with JPEG draft decoding), and checks that
+the exact modes produce identical hashes.
+
+Usage: python -m app.benchmarks.multi_hash_benchmark [--images 20] [--size 1600x1200]
+"""
+import argparse
+import io
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Tuple
+
+import imagehash
+import numpy as np
+from PIL import Image
+
+from app.services.ai.multi_hash import HASH_TYPES, MultiHashEngine, decode_image
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _make_jpegs(count: int, size: Tuple[int, int], seed: int = 0) -> List[bytes]:
+    """Smooth random photos-like JPEGs of the given size"""
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        small = (rng.random((size[1] // 8, size[0] // 8, 3)) * 255).astype(np.uint8)
+        image = Image.fromarray(small).resize(size, Image.BILINEAR)
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+
+def _imagehash_all(data: bytes) -> Dict[str, str]:
+    image = Image.open(io.BytesIO(data)).convert('RGB')
+    return {
+        'ahash': str(imagehash.average_hash(image)),
+        'phash': str(imagehash.phash(image)),
+        'dhash': str(imagehash.dhash(image)),
+        'whash': str(imagehash.whash(image)),
+        'colorhash': str(imagehash.colorhash(image)),
+    }
+
+
+def _time_per_image(run: Callable[[], List[Dict[str, str]]], count: int, repeat: int) -> Tuple[float, List]:
+    result = run()  # warm up (also builds the engine's lookup tables)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - start) * 1000 / count)
+    return min(timings), result
+
+
+def run_benchmark(count: int, size: Tuple[int, int], repeat: int = 3) -> Dict[str, object]:
+    """Run every mode over the same JPEGs and return ms/image plus speedups"""
+    jpegs = _make_jpegs(count, size)
+    engine = MultiHashEngine()
+    draft_size = (engine.hash_size * engine.highfreq_factor * 8,) * 2
+
+    modes = {
+        'imagehash': lambda: [_imagehash_all(data) for data in jpegs],
+        'engine_single': lambda: [engine.hash_image(decode_image(data).convert('RGB')) for data in jpegs],
+        'engine_batch': lambda: engine.hash_images([decode_image(data).convert('RGB') for data in jpegs]),
+        'engine_batch_draft': lambda: engine.hash_images(
+            [decode_image(data, draft_size).convert('RGB') for data in jpegs]
+        ),
+    }
+
+    timings, outputs = {}, {}
+    for name, run in modes.items():
+        timings[name], outputs[name] = _time_per_image(run, count, repeat)
+        logger.info(f"{name}: {timings[name]:.2f} ms/image")
+
+    baseline = timings['imagehash']
+    report = {
+        'images': count,
+        'size': f"{size[0]}x{size[1]}",
+        'hash_types': list(HASH_TYPES),
+        'ms_per_image': timings,
+        'speedup': {name: baseline / value for name, value in timings.items()},
+        'identical_to_imagehash': {
+            name: outputs[name] == outputs['imagehash']
+            for name in ('engine_single', 'engine_batch')
+        },
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=20)
+    parser.add_argument('--size', default='1600x1200', help='WIDTHxHEIGHT')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    width, height = (int(part) for part in args.size.lower().split('x'))
+    report = run_benchmark(args.images, (width, height), args.repeat)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
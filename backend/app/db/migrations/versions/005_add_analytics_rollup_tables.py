@@ -0,0 +1,263 @@
+"""Add daily analytics rollup tables
+
+Revision ID: 005_analytics_rollups
+Revises: 004_content_fingerprinting
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_analytics_rollups'
+down_revision = '004_content_fingerprinting'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Infringements per user, creation day, platform and current status
+    op.create_table('infringement_daily_rollups',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('platform', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('infringement_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'platform', 'status')
+    )
+
+    # Takedowns per user, day, platform and current status: sent_count is keyed
+    # by the sent day, resolved_count by the day a successful takedown was last updated
+    op.create_table('takedown_daily_rollups',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('platform', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('sent_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('resolved_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'platform', 'status')
+    )
+
+    # Incremental maintenance: undo the old row's contribution, apply the new one
+    op.execute("""
+        CREATE OR REPLACE FUNCTION rollup_infringement_change() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.created_at IS NOT NULL THEN
+                UPDATE infringement_daily_rollups
+                SET infringement_count = infringement_count - 1
+                WHERE user_id = OLD.user_id
+                AND day = CAST(date_trunc('day', OLD.created_at) AS date)
+                AND platform = COALESCE(LOWER(OLD.platform), 'unknown')
+                AND status = COALESCE(CAST(OLD.status AS text), 'unknown');
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.created_at IS NOT NULL THEN
+                INSERT INTO infringement_daily_rollups (user_id, day, platform, status, infringement_count)
+                VALUES (
+                    NEW.user_id,
+                    CAST(date_trunc('day', NEW.created_at) AS date),
+                    COALESCE(LOWER(NEW.platform), 'unknown'),
+                    COALESCE(CAST(NEW.status AS text), 'unknown'),
+                    1
+                )
+                ON CONFLICT (user_id, day, platform, status)
+                DO UPDATE SET infringement_count = infringement_daily_rollups.infringement_count + 1;
+            END IF;
+
+            -- Takedowns are counted under their infringement's platform
+            IF TG_OP = 'UPDATE'
+                AND COALESCE(LOWER(OLD.platform), 'unknown') <> COALESCE(LOWER(NEW.platform), 'unknown') THEN
+                PERFORM rollup_takedown_count(tr, COALESCE(LOWER(OLD.platform), 'unknown'), -1)
+                FROM takedown_requests tr WHERE tr.infringement_id = OLD.id;
+                PERFORM rollup_takedown_count(tr, COALESCE(LOWER(NEW.platform), 'unknown'), 1)
+                FROM takedown_requests tr WHERE tr.infringement_id = NEW.id;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Runs before the row goes so the takedowns' platform is still known; the
+    # takedown triggers then skip rows whose infringement no longer exists
+    op.execute("""
+        CREATE OR REPLACE FUNCTION rollup_infringement_delete() RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM rollup_takedown_count(tr, COALESCE(LOWER(OLD.platform), 'unknown'), -1)
+            FROM takedown_requests tr WHERE tr.infringement_id = OLD.id;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION rollup_takedown_count(
+            p_row takedown_requests, p_platform TEXT, p_delta INTEGER
+        ) RETURNS VOID AS $$
+        BEGIN
+            IF p_row.sent_at IS NOT NULL THEN
+                INSERT INTO takedown_daily_rollups (user_id, day, platform, status, sent_count, resolved_count)
+                VALUES (
+                    p_row.user_id,
+                    CAST(date_trunc('day', p_row.sent_at) AS date),
+                    p_platform,
+                    COALESCE(CAST(p_row.status AS text), 'unknown'),
+                    p_delta,
+                    0
+                )
+                ON CONFLICT (user_id, day, platform, status)
+                DO UPDATE SET sent_count = takedown_daily_rollups.sent_count + p_delta;
+            END IF;
+
+            IF CAST(p_row.status AS text) = 'successful' AND p_row.updated_at IS NOT NULL THEN
+                INSERT INTO takedown_daily_rollups (user_id, day, platform, status, sent_count, resolved_count)
+                VALUES (
+                    p_row.user_id,
+                    CAST(date_trunc('day', p_row.updated_at) AS date),
+                    p_platform,
+                    'successful',
+                    0,
+                    p_delta
+                )
+                ON CONFLICT (user_id, day, platform, status)
+                DO UPDATE SET resolved_count = takedown_daily_rollups.resolved_count + p_delta;
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION rollup_takedown_apply(
+            p_row takedown_requests, p_delta INTEGER
+        ) RETURNS VOID AS $$
+        DECLARE
+            v_platform TEXT := 'unknown';
+        BEGIN
+            IF p_row.infringement_id IS NOT NULL THEN
+                SELECT COALESCE(LOWER(platform), 'unknown') INTO v_platform
+                FROM infringements WHERE id = p_row.infringement_id;
+                IF NOT FOUND THEN
+                    -- The infringement is being deleted (cascade or SET NULL); its
+                    -- BEFORE DELETE trigger already removed this takedown's counts
+                    IF p_delta < 0 THEN
+                        RETURN;
+                    END IF;
+                    v_platform := 'unknown';
+                END IF;
+            END IF;
+
+            PERFORM rollup_takedown_count(p_row, v_platform, p_delta);
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION rollup_takedown_change() RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM rollup_takedown_apply(OLD, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM rollup_takedown_apply(NEW, 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Updates only touch the rollups when a counted column changes
+    op.execute("""
+        CREATE TRIGGER trigger_infringements_rollup
+            AFTER INSERT OR DELETE ON infringements
+            FOR EACH ROW EXECUTE FUNCTION rollup_infringement_change();
+
+        CREATE TRIGGER trigger_infringements_rollup_delete
+            BEFORE DELETE ON infringements
+            FOR EACH ROW EXECUTE FUNCTION rollup_infringement_delete();
+
+        CREATE TRIGGER trigger_infringements_rollup_update
+            AFTER UPDATE ON infringements
+            FOR EACH ROW
+            WHEN (
+                OLD.status IS DISTINCT FROM NEW.status
+                OR OLD.platform IS DISTINCT FROM NEW.platform
+                OR OLD.created_at IS DISTINCT FROM NEW.created_at
+                OR OLD.user_id IS DISTINCT FROM NEW.user_id
+            )
+            EXECUTE FUNCTION rollup_infringement_change();
+
+        CREATE TRIGGER trigger_takedown_requests_rollup
+            AFTER INSERT OR DELETE ON takedown_requests
+            FOR EACH ROW EXECUTE FUNCTION rollup_takedown_change();
+
+        CREATE TRIGGER trigger_takedown_requests_rollup_update
+            AFTER UPDATE ON takedown_requests
+            FOR EACH ROW
+            WHEN (
+                OLD.status IS DISTINCT FROM NEW.status
+                OR OLD.sent_at IS DISTINCT FROM NEW.sent_at
+                OR OLD.updated_at IS DISTINCT FROM NEW.updated_at
+                OR OLD.user_id IS DISTINCT FROM NEW.user_id
+                OR OLD.infringement_id IS DISTINCT FROM NEW.infringement_id
+            )
+            EXECUTE FUNCTION rollup_takedown_change();
+    """)
+
+    # Backfill existing history; later repairs use AnalyticsRollupService.rebuild
+    op.execute("""
+        INSERT INTO infringement_daily_rollups (user_id, day, platform, status, infringement_count)
+        SELECT
+            user_id,
+            CAST(date_trunc('day', created_at) AS date),
+            COALESCE(LOWER(platform), 'unknown'),
+            COALESCE(CAST(status AS text), 'unknown'),
+            COUNT(*)
+        FROM infringements
+        WHERE created_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4;
+    """)
+
+    op.execute("""
+        INSERT INTO takedown_daily_rollups (user_id, day, platform, status, sent_count, resolved_count)
+        SELECT user_id, day, platform, status, SUM(sent), SUM(resolved)
+        FROM (
+            SELECT
+                tr.user_id,
+                CAST(date_trunc('day', tr.sent_at) AS date) AS day,
+                COALESCE(LOWER(i.platform), 'unknown') AS platform,
+                COALESCE(CAST(tr.status AS text), 'unknown') AS status,
+                1 AS sent,
+                0 AS resolved
+            FROM takedown_requests tr
+            LEFT JOIN infringements i ON i.id = tr.infringement_id
+            WHERE tr.sent_at IS NOT NULL
+            UNION ALL
+            SELECT
+                tr.user_id,
+                CAST(date_trunc('day', tr.updated_at) AS date),
+                COALESCE(LOWER(i.platform), 'unknown'),
+                'successful',
+                0,
+                1
+            FROM takedown_requests tr
+            LEFT JOIN infringements i ON i.id = tr.infringement_id
+            WHERE CAST(tr.status AS text) = 'successful' AND tr.updated_at IS NOT NULL
+        ) t
+        GROUP BY user_id, day, platform, status;
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS trigger_takedown_requests_rollup_update ON takedown_requests')
+    op.execute('DROP TRIGGER IF EXISTS trigger_takedown_requests_rollup ON takedown_requests')
+    op.execute('DROP TRIGGER IF EXISTS trigger_infringements_rollup_update ON infringements')
+    op.execute('DROP TRIGGER IF EXISTS trigger_infringements_rollup_delete ON infringements')
+    op.execute('DROP TRIGGER IF EXISTS trigger_infringements_rollup ON infringements')
+    op.execute('DROP FUNCTION IF EXISTS rollup_takedown_change()')
+    op.execute('DROP FUNCTION IF EXISTS rollup_takedown_apply(takedown_requests, INTEGER)')
+    op.execute('DROP FUNCTION IF EXISTS rollup_takedown_count(takedown_requests, TEXT, INTEGER)')
+    op.execute('DROP FUNCTION IF EXISTS rollup_infringement_delete()')
+    op.execute('DROP FUNCTION IF EXISTS rollup_infringement_change()')
+
+    op.drop_table('takedown_daily_rollups')
+    op.drop_table('infringement_daily_rollups')
@@ -5,6 +5,7 @@ Database startup and management utilities.
 import asyncio
 import logging
 import sys
+from datetime import date
 from pathlib import Path
 from typing import Optional
 
@@ -14,7 +15,7 @@ from alembic.config import Config
 
 from app.core.config import settings
 from app.db.utils import initialize_database, get_database_health, wait_for_database
-from app.db.session import engine
+from app.db.session import engine, AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
 
@@ -186,6 +187,34 @@ async def create_migration(message: str) -> bool:
         return False
 
 
+async def rebuild_analytics_rollups(user_id: Optional[int] = None, since: Optional[str] = None) -> bool:
+    """
+    Rebuild the daily analytics rollups from the raw tables.
+    
+    Args:
+        user_id: Only rebuild this user's counters
+        since: Only rebuild days on or after this ISO date
+        
+    Returns:
+        True if the rebuild committed, False otherwise
+    """
+    from app.services.dashboard.rollup_service import analytics_rollup_service
+    
+    try:
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                await analytics_rollup_service.rebuild(
+                    db,
+                    user_id=user_id,
+                    since=date.fromisoformat(since) if since else None
+                )
+        return True
+        
+    except Exception as e:
+        logger.error(f"Analytics rollup rebuild failed: {e}")
+        return False
+
+
 if __name__ == "__main__":
     """Command line interface for database management."""
     import argparse
@@ -193,7 +222,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Database management utilities")
     parser.add_argument(
         "command",
-        choices=["check", "init", "migrate", "reset", "create-migration"],
+        choices=["check", "init", "migrate", "reset", "create-migration", "rebuild-rollups"],
         help="Command to execute"
     )
     parser.add_argument(
@@ -206,6 +235,15 @@ if __name__ == "__main__":
         default="upgrade",
         help="Migration direction (for migrate command)"
     )
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        help="Only rebuild this user's rollups (for rebuild-rollups command)"
+    )
+    parser.add_argument(
+        "--since",
+        help="Only rebuild days from this ISO date on (for rebuild-rollups command)"
+    )
     
     args = parser.parse_args()
     
@@ -244,5 +282,9 @@ if __name__ == "__main__":
                 sys.exit(1)
             success = await create_migration(args.message)
             sys.exit(0 if success else 1)
+            
+        elif args.command == "rebuild-rollups":
+            success = await rebuild_analytics_rollups(args.user_id, args.since)
+            sys.exit(0 if success else 1)
     
     asyncio.run(main())
\ No newline at end of file
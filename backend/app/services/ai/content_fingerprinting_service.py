@@ -31,6 +31,8 @@ from sklearn.cluster import DBSCAN
 from sklearn.ensemble import IsolationForest
 import ffmpeg
 
+from .vector_index import VectorIndex, create_vector_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,6 +66,14 @@ class FingerprintMatch:
     match_metadata: Dict[str, Any] = None
 
 
+def _is_soundfile_format(data: bytes) -> bool:
+    """Sniff WAV/FLAC/OGG containers, which libsndfile can read from a buffer"""
+    return (
+        (data[:4] == b'RIFF' and data[8:12] == b'WAVE')
+        or data[:4] in (b'fLaC', b'OggS')
+    )
+
+
 class AudioFingerprinter:
     """Advanced audio fingerprinting using spectral analysis and MFCCs"""
     
@@ -87,14 +97,20 @@ class AudioFingerprinter:
         - Tonnetz (harmonic features)
         """
         try:
-            # Load audio from bytes
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-                tmp_file.write(audio_data)
-                tmp_path = tmp_file.name
+            # soundfile decodes WAV/FLAC/OGG straight from memory; other formats
+            # (MP3, AAC) go through audioread, which needs a file path
+            tmp_path = None
+            if _is_soundfile_format(audio_data):
+                audio_source = io.BytesIO(audio_data)
+            else:
+                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
+                    tmp_file.write(audio_data)
+                    tmp_path = tmp_file.name
+                audio_source = tmp_path
                 
             try:
                 # Load with librosa
-                y, sr = librosa.load(tmp_path, sr=self.sample_rate, duration=duration_limit)
+                y, sr = librosa.load(audio_source, sr=self.sample_rate, duration=duration_limit)
                 
                 # Extract comprehensive audio features
                 features = {}
@@ -177,10 +193,11 @@ class AudioFingerprinter:
                 
             finally:
                 # Cleanup temp file
-                try:
-                    os.unlink(tmp_path)
-                except:
-                    pass
+                if tmp_path:
+                    try:
+                        os.unlink(tmp_path)
+                    except:
+                        pass
                     
         except Exception as e:
             logger.error(f"Error extracting audio fingerprint: {e}")
@@ -267,6 +284,7 @@ class VideoFingerprinter:
         - Motion vectors
         """
         try:
+            # ffprobe and cv2.VideoCapture only read from a path
             with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp_file:
                 tmp_file.write(video_data)
                 tmp_path = tmp_file.name
@@ -866,7 +884,18 @@ class MLPatternRecognizer:
 class ContentFingerprintingService:
     """Main service orchestrating all fingerprinting capabilities"""
     
-    def __init__(self):
+    # Weight of the signature-vector cosine in each type's final similarity blend.
+    # The remaining weight is at most 1.0, which bounds the cosine a match needs.
+    SIGNATURE_COSINE_WEIGHTS = {
+        FingerprintType.AUDIO: 0.6,
+        FingerprintType.VIDEO: 0.7,
+    }
+    
+    def __init__(
+        self,
+        vector_index_backend: str = "exact",
+        vector_index_options: Optional[Dict[str, Any]] = None
+    ):
         self.audio_fingerprinter = AudioFingerprinter()
         self.video_fingerprinter = VideoFingerprinter()
         self.enhanced_hasher = EnhancedPerceptualHasher()
@@ -875,6 +904,15 @@ class ContentFingerprintingService:
         # In-memory cache for fingerprints (in production, use Redis or database)
         self.fingerprint_cache = {}
         
+        # Signature-vector indexes per fingerprint type ("exact" or "ivf")
+        self.vector_index_backend = vector_index_backend
+        self.vector_index_options = vector_index_options or {}
+        self.vector_indexes: Dict[FingerprintType, VectorIndex] = {}
+        # Fingerprints whose vectors can't go in their type's index (missing or other dimension)
+        self._unindexed_fingerprints: Dict[FingerprintType, set] = {
+            fingerprint_type: set() for fingerprint_type in FingerprintType
+        }
+        
     async def create_content_fingerprint(
         self,
         content_data: bytes,
@@ -929,6 +967,7 @@ class ContentFingerprintingService:
             
             # Cache the fingerprint
             self.fingerprint_cache[content_hash] = fingerprint
+            self._index_fingerprint(fingerprint)
             
             return fingerprint
             
@@ -936,18 +975,164 @@ class ContentFingerprintingService:
             logger.error(f"Error creating content fingerprint: {e}")
             raise
     
+    @staticmethod
+    def _signature_vector(fingerprint: ContentFingerprint) -> Optional[np.ndarray]:
+        """Return the fingerprint's signature vector as a flat float array, if any"""
+        vector = (fingerprint.fingerprint_data or {}).get('signature_vector')
+        if vector is None or len(vector) == 0:
+            return None
+        return np.asarray(vector, dtype=np.float32).ravel()
+    
+    def _index_fingerprint(self, fingerprint: ContentFingerprint):
+        """Add a cached fingerprint's signature vector to its type's vector index"""
+        fingerprint_type = fingerprint.fingerprint_type
+        content_hash = fingerprint.content_hash
+        vector = self._signature_vector(fingerprint)
+        
+        if fingerprint_type not in self.SIGNATURE_COSINE_WEIGHTS or vector is None:
+            self._unindexed_fingerprints[fingerprint_type].add(content_hash)
+            return
+        
+        index = self.vector_indexes.get(fingerprint_type)
+        if index is None:
+            index = create_vector_index(
+                self.vector_index_backend, vector.shape[0], **self.vector_index_options
+            )
+            self.vector_indexes[fingerprint_type] = index
+        
+        if vector.shape[0] != index.dim:
+            index.remove([content_hash])
+            self._unindexed_fingerprints[fingerprint_type].add(content_hash)
+            return
+        
+        self._unindexed_fingerprints[fingerprint_type].discard(content_hash)
+        index.add([content_hash], vector.reshape(1, -1))
+    
+    def remove_fingerprint(self, content_hash: str) -> bool:
+        """Remove a fingerprint from the cache and its vector index"""
+        fingerprint = self.fingerprint_cache.pop(content_hash, None)
+        if fingerprint is None:
+            return False
+        
+        self._unindexed_fingerprints[fingerprint.fingerprint_type].discard(content_hash)
+        index = self.vector_indexes.get(fingerprint.fingerprint_type)
+        if index is not None:
+            index.remove([content_hash])
+        return True
+    
+    def save_vector_indexes(self, directory: str):
+        """Persist every fingerprint type's vector index under a directory"""
+        for fingerprint_type, index in self.vector_indexes.items():
+            index.save(os.path.join(directory, f"{fingerprint_type.value}.npz"))
+    
+    def load_vector_indexes(self, directory: str):
+        """Load vector indexes previously written by save_vector_indexes
+        
+        Call once the fingerprint cache is populated: loaded indexes are
+        reconciled with it, dropping entries for fingerprints that are no longer
+        cached and indexing cached fingerprints the saved index lacks.
+        """
+        for fingerprint_type in self.SIGNATURE_COSINE_WEIGHTS:
+            path = os.path.join(directory, f"{fingerprint_type.value}.npz")
+            if not os.path.exists(path):
+                continue
+            
+            index = VectorIndex.load(path)
+            cached = {
+                content_hash: fingerprint
+                for content_hash, fingerprint in self.fingerprint_cache.items()
+                if fingerprint.fingerprint_type == fingerprint_type
+            }
+            index.remove([content_hash for content_hash in index.keys() if content_hash not in cached])
+            
+            self.vector_indexes[fingerprint_type] = index
+            self._unindexed_fingerprints[fingerprint_type].clear()
+            for content_hash, fingerprint in cached.items():
+                if content_hash not in index:
+                    self._index_fingerprint(fingerprint)
+    
+    def _min_signature_similarity(
+        self,
+        fingerprint_type: FingerprintType,
+        similarity_threshold: float
+    ) -> float:
+        """Lowest signature cosine that can still reach the similarity threshold"""
+        weight = self.SIGNATURE_COSINE_WEIGHTS[fingerprint_type]
+        # Small slack for float32 index scores vs. float64 reranking
+        return (similarity_threshold - (1.0 - weight)) / weight - 1e-4
+    
+    def _candidate_hashes(
+        self,
+        query_fingerprints: List[ContentFingerprint],
+        similarity_threshold: float
+    ) -> List[List[str]]:
+        """Shortlist cached fingerprints per query, using the vector index where possible"""
+        candidates: List[Optional[List[str]]] = [None] * len(query_fingerprints)
+        
+        # Group vector queries by type so each index answers one batched search
+        batches: Dict[FingerprintType, List[Tuple[int, np.ndarray]]] = {}
+        for i, query in enumerate(query_fingerprints):
+            index = self.vector_indexes.get(query.fingerprint_type)
+            vector = self._signature_vector(query)
+            if index is not None and vector is not None and vector.shape[0] == index.dim:
+                batches.setdefault(query.fingerprint_type, []).append((i, vector))
+        
+        for fingerprint_type, batch in batches.items():
+            index = self.vector_indexes[fingerprint_type]
+            # Range search: every fingerprint that can still reach the threshold is reranked
+            results = index.range_search(
+                np.stack([vector for _, vector in batch]),
+                min_score=self._min_signature_similarity(fingerprint_type, similarity_threshold)
+            )
+            unindexed = list(self._unindexed_fingerprints[fingerprint_type])
+            for (i, _), hits in zip(batch, results):
+                candidates[i] = [content_hash for content_hash, _ in hits] + unindexed
+        
+        for i, query in enumerate(query_fingerprints):
+            if candidates[i] is None:
+                candidates[i] = [
+                    content_hash
+                    for content_hash, cached in self.fingerprint_cache.items()
+                    if cached.fingerprint_type == query.fingerprint_type
+                ]
+        
+        return candidates
+    
     async def find_matching_fingerprints(
         self,
         query_fingerprint: ContentFingerprint,
         similarity_threshold: float = 0.8
     ) -> List[FingerprintMatch]:
         """Find matching fingerprints in the database/cache"""
-        matches = []
+        results = await self.find_matching_fingerprints_batch(
+            [query_fingerprint], similarity_threshold
+        )
+        return results[0]
+    
+    async def find_matching_fingerprints_batch(
+        self,
+        query_fingerprints: List[ContentFingerprint],
+        similarity_threshold: float = 0.8
+    ) -> List[List[FingerprintMatch]]:
+        """Find matching fingerprints for several queries with one index search per type"""
+        all_matches: List[List[FingerprintMatch]] = [[] for _ in query_fingerprints]
         
         try:
-            for cached_hash, cached_fingerprint in self.fingerprint_cache.items():
-                if (cached_fingerprint.fingerprint_type == query_fingerprint.fingerprint_type and
-                    cached_hash != query_fingerprint.content_hash):
+            candidates = self._candidate_hashes(query_fingerprints, similarity_threshold)
+        except Exception as e:
+            logger.error(f"Error finding matching fingerprints: {e}")
+            return all_matches
+        
+        for query_fingerprint, candidate_hashes, matches in zip(
+            query_fingerprints, candidates, all_matches
+        ):
+            try:
+                for cached_hash in candidate_hashes:
+                    cached_fingerprint = self.fingerprint_cache.get(cached_hash)
+                    if (cached_fingerprint is None or
+                        cached_fingerprint.fingerprint_type != query_fingerprint.fingerprint_type or
+                        cached_hash == query_fingerprint.content_hash):
+                        continue
                     
                     similarity_score = await self._calculate_fingerprint_similarity(
                         query_fingerprint, cached_fingerprint
@@ -970,14 +1155,14 @@ class ContentFingerprintingService:
                             }
                         )
                         matches.append(match)
-            
-            # Sort by confidence
-            matches.sort(key=lambda x: x.match_confidence, reverse=True)
-            
-        except Exception as e:
-            logger.error(f"Error finding matching fingerprints: {e}")
+                
+                # Sort by confidence
+                matches.sort(key=lambda x: x.match_confidence, reverse=True)
+                
+            except Exception as e:
+                logger.error(f"Error finding matching fingerprints: {e}")
         
-        return matches
+        return all_matches
     
     async def _calculate_fingerprint_similarity(
         self,
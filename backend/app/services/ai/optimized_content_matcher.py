@@ -30,6 +30,7 @@ from PIL import Image
 import redis.asyncio as redis
 
 from app.core.config import settings
+from app.services.ai.multi_hash import MultiHashEngine
 
 logger = logging.getLogger(__name__)
 
@@ -135,6 +136,82 @@ class ModelCache:
         raise ValueError(f"Unknown model: {model_name}")
 
 
+class ReferenceFeatureMatrix:
+    """Pre-normalised, contiguous float32 reference features for one profile
+    
+    Rows are L2-normalised once when references are added, so scoring a batch
+    of candidates is a single matrix product against the whole reference set.
+    """
+    
+    def __init__(self):
+        self.matrix: Optional[np.ndarray] = None
+        self.content_ids: List[Optional[str]] = []
+        # Version, or list identity and content ids, of the profile_data features this was built from
+        self.source_key: Optional[Tuple] = None
+        # The features list itself, pinned so its id() is not reused while it keys this matrix
+        self.source: Optional[List[np.ndarray]] = None
+    
+    def __len__(self) -> int:
+        return len(self.content_ids)
+    
+    @staticmethod
+    def normalize(features: np.ndarray) -> np.ndarray:
+        """L2-normalise rows into a contiguous float32 array"""
+        features = np.asarray(features, dtype=np.float32)
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(features / norms)
+    
+    def add(self, features: List[np.ndarray], content_ids: Optional[List[Optional[str]]] = None):
+        """Append reference features"""
+        if not len(features):
+            return
+        
+        rows = self.normalize(np.vstack([np.asarray(f).ravel() for f in features]))
+        if self.matrix is not None and rows.shape[1] != self.matrix.shape[1]:
+            raise ValueError(
+                f"Feature dimension {rows.shape[1]} does not match references ({self.matrix.shape[1]})"
+            )
+        
+        self.matrix = rows if self.matrix is None else np.ascontiguousarray(np.vstack([self.matrix, rows]))
+        self.content_ids.extend(content_ids if content_ids is not None else [None] * rows.shape[0])
+    
+    def remove(self, content_ids: List[str]) -> int:
+        """Drop reference rows by content id"""
+        to_remove = set(content_ids)
+        keep = [i for i, cid in enumerate(self.content_ids) if cid is None or cid not in to_remove]
+        removed = len(self.content_ids) - len(keep)
+        
+        if removed:
+            self.content_ids = [self.content_ids[i] for i in keep]
+            self.matrix = np.ascontiguousarray(self.matrix[keep]) if keep else None
+        return removed
+    
+    def top_k(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Score a batch of queries against all references with one GEMM
+        
+        Returns ``(indices, scores)``, each of shape ``(n_queries, k)``, best first.
+        """
+        queries = self.normalize(queries)
+        if self.matrix is None:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        
+        scores = queries @ self.matrix.T
+        k = min(k, scores.shape[1])
+        
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
 class OptimizedContentMatcher:
     """
     High-performance AI content matching with advanced optimizations
@@ -145,6 +222,14 @@ class OptimizedContentMatcher:
     - Memory management and resource cleanup
     """
     
+    # Engine hash type -> key used in stored content hashes
+    HASH_NAMES = {
+        'ahash': 'average',
+        'phash': 'perceptual',
+        'dhash': 'difference',
+        'whash': 'wavelet'
+    }
+    
     def __init__(self):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model_cache = ModelCache()
@@ -161,6 +246,13 @@ class OptimizedContentMatcher:
         self._image_feature_cache = {}
         self._hash_cache = {}
         
+        # Pre-normalised reference feature matrices per profile
+        self._reference_matrices: Dict[str, ReferenceFeatureMatrix] = {}
+        
+        # All perceptual hashes from one grayscale conversion per image
+        self.hash_engine = MultiHashEngine()
+        self.feature_top_k = getattr(settings, 'AI_FEATURE_TOP_K', 5)
+        
         # Cache size limits
         self._max_cache_items = 1000
         
@@ -344,16 +436,23 @@ class OptimizedContentMatcher:
         features_batch = await self._extract_features_batch(images)
         metrics.model_inference_time_ms += (time.time() - inference_start) * 1000
         
+        # Score every image against its profile's references in one pass
+        feature_matches = self._match_features_batch(
+            features_batch,
+            [image_items[i][1] for i in valid_indices],
+            [image_items[i][3] for i in valid_indices]
+        )
+        
         # Process each image with extracted features
+        feature_positions = {idx: pos for pos, idx in enumerate(valid_indices)}
         results = []
         for idx, (orig_idx, url, image_data, profile_data) in enumerate(image_items):
-            if idx in valid_indices:
-                feature_idx = valid_indices.index(idx)
+            if idx in feature_positions:
+                feature_idx = feature_positions[idx]
                 image = images[feature_idx]
-                features = features_batch[feature_idx] if features_batch else None
                 
                 matches = await self._analyze_single_image_with_features(
-                    url, image, image_data, profile_data, features, metrics
+                    url, image, image_data, profile_data, feature_matches[feature_idx], metrics
                 )
                 results.append(matches)
             else:
@@ -418,10 +517,10 @@ class OptimizedContentMatcher:
         image: Image.Image,
         image_data: bytes,
         profile_data: Dict[str, Any],
-        features: Optional[np.ndarray],
+        feature_match: Optional[ContentMatch],
         metrics: ProcessingMetrics
     ) -> List[ContentMatch]:
-        """Analyze single image with pre-extracted features"""
+        """Analyze single image with a pre-computed deep feature match"""
         matches = []
         
         try:
@@ -456,11 +555,9 @@ class OptimizedContentMatcher:
                         matches.append(hash_match)
                     metrics.cache_misses += 1
             
-            # 3. Deep Learning Features (use pre-extracted)
-            if features is not None and profile_data.get('image_features'):
-                feature_match = await self._check_feature_match_optimized(features, profile_data['image_features'], url)
-                if feature_match:
-                    matches.append(feature_match)
+            # 3. Deep Learning Features (scored for the whole batch)
+            if feature_match:
+                matches.append(feature_match)
             
             # 4. Watermark Detection
             if profile_data.get('watermarks'):
@@ -578,12 +675,144 @@ class OptimizedContentMatcher:
     
     def _generate_all_hashes(self, image: Image.Image) -> Dict[str, str]:
         """Generate all hash types for an image"""
-        return {
-            'average': str(imagehash.average_hash(image)),
-            'perceptual': str(imagehash.phash(image)),
-            'difference': str(imagehash.dhash(image)),
-            'wavelet': str(imagehash.whash(image))
-        }
+        return self._generate_all_hashes_batch([image])[0]
+    
+    def _generate_all_hashes_batch(self, images: List[Image.Image]) -> List[Dict[str, str]]:
+        """Generate all hash types for a batch of images (same values as imagehash)"""
+        return [
+            {name: hashes[hash_type] for hash_type, name in self.HASH_NAMES.items()}
+            for hashes in self.hash_engine.hash_images(images, tuple(self.HASH_NAMES))
+        ]
+    
+    def set_profile_features(
+        self,
+        profile_id: str,
+        features: List[np.ndarray],
+        content_ids: Optional[List[Optional[str]]] = None
+    ):
+        """Replace a profile's reference features"""
+        matrix = ReferenceFeatureMatrix()
+        matrix.add(features, content_ids)
+        self._reference_matrices[profile_id] = matrix
+    
+    def add_profile_features(
+        self,
+        profile_id: str,
+        features: List[np.ndarray],
+        content_ids: Optional[List[Optional[str]]] = None
+    ):
+        """Append reference features to a profile"""
+        matrix = self._reference_matrices.setdefault(profile_id, ReferenceFeatureMatrix())
+        matrix.add(features, content_ids)
+    
+    def remove_profile_features(self, profile_id: str, content_ids: Optional[List[str]] = None) -> int:
+        """Remove some (by content id) or all of a profile's reference features"""
+        matrix = self._reference_matrices.get(profile_id)
+        if matrix is None:
+            return 0
+        
+        if content_ids is None:
+            del self._reference_matrices[profile_id]
+            return len(matrix)
+        return matrix.remove(content_ids)
+    
+    @staticmethod
+    def _feature_source_key(profile_data: Dict[str, Any], known_features: List[np.ndarray]) -> Tuple:
+        """Cache key for the features carried in ``profile_data``
+        
+        An explicit ``image_features_version`` is trusted as is; otherwise the
+        key is the list's identity, length and content ids, so a rebuilt list
+        gets a new matrix without hashing every vector. Callers that mutate a
+        features list in place must set or bump ``image_features_version``.
+        """
+        version = profile_data.get('image_features_version')
+        if version is not None:
+            return ('version', version)
+        
+        content_ids = profile_data.get('image_feature_ids')
+        return (
+            'list', id(known_features), len(known_features),
+            tuple(content_ids) if content_ids is not None else None
+        )
+    
+    def _get_reference_matrix(self, profile_data: Dict[str, Any]) -> Optional[ReferenceFeatureMatrix]:
+        """Reference matrix for a profile, rebuilt only when its features change
+        
+        Features carried in ``profile_data`` take precedence over ones registered
+        with ``set_profile_features``.
+        """
+        profile_id = profile_data.get('profile_id') or profile_data.get('username')
+        known_features = profile_data.get('image_features')
+        
+        if not known_features:
+            return self._reference_matrices.get(profile_id) if profile_id else None
+        
+        source_key = self._feature_source_key(profile_data, known_features)
+        matrix = self._reference_matrices.get(profile_id) if profile_id else None
+        if matrix is None or matrix.source_key != source_key:
+            matrix = ReferenceFeatureMatrix()
+            matrix.add(known_features, profile_data.get('image_feature_ids'))
+            matrix.source_key = source_key
+            matrix.source = known_features
+            if profile_id:
+                self._reference_matrices[profile_id] = matrix
+        
+        return matrix
+    
+    def _match_features_batch(
+        self,
+        features_batch: Optional[np.ndarray],
+        urls: List[str],
+        profiles: List[Dict[str, Any]]
+    ) -> List[Optional[ContentMatch]]:
+        """Score a batch of candidate features against reference matrices
+        
+        Candidates sharing a profile are scored together with one matrix product
+        and each gets its top-k references.
+        """
+        results: List[Optional[ContentMatch]] = [None] * len(urls)
+        if features_batch is None or len(features_batch) != len(urls):
+            return results
+        
+        groups: Dict[int, List[int]] = {}
+        for i, profile_data in enumerate(profiles):
+            groups.setdefault(id(profile_data), []).append(i)
+        
+        for rows in groups.values():
+            try:
+                matrix = self._get_reference_matrix(profiles[rows[0]])
+                if matrix is None or not len(matrix):
+                    continue
+                
+                top_indices, top_scores = matrix.top_k(features_batch[rows], self.feature_top_k)
+                
+                for row, indices, scores in zip(rows, top_indices, top_scores):
+                    if not len(scores):
+                        continue
+                    
+                    max_similarity = float(scores[0])
+                    if max_similarity > settings.CONTENT_SIMILARITY_THRESHOLD:
+                        results[row] = ContentMatch(
+                            match_type=MatchType.SIMILAR_IMAGE,
+                            confidence=max_similarity,
+                            source_url=urls[row],
+                            matched_content_id=matrix.content_ids[indices[0]],
+                            metadata={
+                                "similarity": max_similarity,
+                                "method": "optimized_deep_features",
+                                "feature_dim": int(features_batch.shape[1]),
+                                "top_matches": [
+                                    {"content_id": matrix.content_ids[i], "similarity": float(score)}
+                                    for i, score in zip(indices, scores)
+                                ]
+                            },
+                            timestamp=datetime.utcnow()
+                        )
+            
+            except Exception as e:
+                logger.error(f"Optimized feature matching error: {e}")
+        
+        return results
     
     async def _check_feature_match_optimized(
         self,
@@ -591,36 +820,10 @@ class OptimizedContentMatcher:
         known_features: List[np.ndarray],
         url: str
     ) -> Optional[ContentMatch]:
-        """Optimized feature matching using vectorized operations"""
-        try:
-            # Vectorized similarity computation
-            similarities = []
-            for known_feature in known_features:
-                similarity = np.dot(features, known_feature) / (
-                    np.linalg.norm(features) * np.linalg.norm(known_feature)
-                )
-                similarities.append(similarity)
-            
-            max_similarity = max(similarities) if similarities else 0.0
-            
-            if max_similarity > settings.CONTENT_SIMILARITY_THRESHOLD:
-                return ContentMatch(
-                    match_type=MatchType.SIMILAR_IMAGE,
-                    confidence=float(max_similarity),
-                    source_url=url,
-                    matched_content_id=None,
-                    metadata={
-                        "similarity": float(max_similarity),
-                        "method": "optimized_deep_features",
-                        "feature_dim": len(features)
-                    },
-                    timestamp=datetime.utcnow()
-                )
-        
-        except Exception as e:
-            logger.error(f"Optimized feature matching error: {e}")
-        
-        return None
+        """Single-image feature matching; prefer _match_features_batch for batches"""
+        return self._match_features_batch(
+            np.asarray(features).reshape(1, -1), [url], [{'image_features': known_features}]
+        )[0]
     
     async def _check_watermark_optimized(
         self,
@@ -0,0 +1,375 @@
+"""
+Vector Indexes for Fingerprint Similarity Search
+Exact (brute-force NumPy) and approximate (IVF) cosine-similarity indexes over
+fixed-dimension signature vectors, with batched top-k search, incremental
+inserts/deletes and on-disk persistence.
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """Base class for cosine-similarity indexes keyed by string ids"""
+
+    backend = "base"
+
+    def __init__(self, dim: int, initial_capacity: int = 1024):
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+
+        self.dim = dim
+        # Rows are L2-normalised on insert so a dot product is the cosine similarity
+        self._vectors = np.zeros((max(initial_capacity, 1), dim), dtype=np.float32)
+        self._valid = np.zeros(self._vectors.shape[0], dtype=bool)
+        self._row_keys: List[Optional[str]] = [None] * self._vectors.shape[0]
+        self._key_rows: Dict[str, int] = {}
+        self._free_rows: List[int] = []
+        self._next_row = 0
+
+    def __len__(self) -> int:
+        return len(self._key_rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_rows
+
+    def keys(self) -> List[str]:
+        return list(self._key_rows.keys())
+
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _grow(self, min_capacity: int):
+        capacity = self._vectors.shape[0]
+        if min_capacity <= capacity:
+            return
+
+        new_capacity = max(min_capacity, capacity * 2)
+        vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        vectors[:capacity] = self._vectors
+        valid = np.zeros(new_capacity, dtype=bool)
+        valid[:capacity] = self._valid
+
+        self._vectors = vectors
+        self._valid = valid
+        self._row_keys.extend([None] * (new_capacity - capacity))
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        self._grow(self._next_row + 1)
+        row = self._next_row
+        self._next_row += 1
+        return row
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray):
+        """Insert or replace vectors for the given keys"""
+        normalized = self._normalize(vectors)
+        if len(keys) != normalized.shape[0]:
+            raise ValueError("keys and vectors must have the same length")
+
+        rows = []
+        for key in keys:
+            row = self._key_rows.get(key)
+            if row is None:
+                row = self._allocate_row()
+                self._key_rows[key] = row
+                self._row_keys[row] = key
+            rows.append(row)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        self._vectors[rows] = normalized
+        self._valid[rows] = True
+        self._on_rows_added(rows)
+
+    def remove(self, keys: Iterable[str]) -> int:
+        """Delete vectors by key; returns the number removed"""
+        removed = 0
+        for key in keys:
+            row = self._key_rows.pop(key, None)
+            if row is None:
+                continue
+
+            self._valid[row] = False
+            self._vectors[row] = 0.0
+            self._row_keys[row] = None
+            self._free_rows.append(row)
+            self._on_row_removed(row)
+            removed += 1
+        return removed
+
+    def _on_rows_added(self, rows: np.ndarray):
+        pass
+
+    def _on_row_removed(self, row: int):
+        pass
+
+    def _candidate_rows(self, query: np.ndarray) -> Optional[np.ndarray]:
+        """Rows to score for one normalised query; None means every row"""
+        return None
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: Optional[int] = 10,
+        min_score: Optional[float] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """Batched top-k search returning ``(key, cosine_similarity)`` per query, best first
+
+        With ``k=None`` every hit scoring at least ``min_score`` is returned.
+        """
+        normalized = self._normalize(queries)
+        if not self._key_rows or (k is not None and k <= 0):
+            return [[] for _ in range(normalized.shape[0])]
+
+        results = []
+        full_scores = None
+
+        for i, query in enumerate(normalized):
+            rows = self._candidate_rows(query)
+
+            if rows is None:
+                if full_scores is None:
+                    # One GEMM for every query that needs an exhaustive scan
+                    active = self._vectors[:self._next_row]
+                    full_scores = normalized @ active.T
+                    full_scores[:, ~self._valid[:self._next_row]] = -np.inf
+                rows = np.arange(self._next_row)
+                scores = full_scores[i]
+            else:
+                rows = rows[self._valid[rows]]
+                scores = self._vectors[rows] @ query
+
+            results.append(self._top_k(rows, scores, k, min_score))
+
+        return results
+
+    def range_search(self, queries: np.ndarray, min_score: float) -> List[List[Tuple[str, float]]]:
+        """Batched search returning every hit with cosine similarity >= ``min_score``, best first"""
+        return self.search(queries, k=None, min_score=min_score)
+
+    def _top_k(
+        self,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        k: Optional[int],
+        min_score: Optional[float]
+    ) -> List[Tuple[str, float]]:
+        if scores.size == 0:
+            return []
+
+        if k is None:
+            top = np.flatnonzero(scores >= (-np.inf if min_score is None else min_score))
+        elif scores.size > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(scores.size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        hits = []
+        for idx in top:
+            score = float(scores[idx])
+            if score == -np.inf or (min_score is not None and score < min_score):
+                break
+            hits.append((self._row_keys[rows[idx]], score))
+        return hits
+
+    def _extra_state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def _load_extra_state(self, state: Dict[str, np.ndarray]):
+        pass
+
+    def save(self, path: str):
+        """Persist the index to a ``.npz`` file"""
+        rows = np.flatnonzero(self._valid[:self._next_row])
+        keys = np.array([self._row_keys[row] for row in rows], dtype=str)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                backend=np.array(self.backend),
+                dim=np.array(self.dim),
+                keys=keys,
+                vectors=self._vectors[rows],
+                **self._extra_state()
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "VectorIndex":
+        """Load an index previously written with ``save``"""
+        with np.load(path, allow_pickle=False) as data:
+            backend = str(data["backend"])
+            index_cls = VECTOR_INDEX_BACKENDS.get(backend)
+            if index_cls is None:
+                raise ValueError(f"Unknown vector index backend: {backend}")
+
+            keys = [str(key) for key in data["keys"]]
+            index = index_cls(dim=int(data["dim"]), initial_capacity=max(len(keys), 1))
+            index._load_extra_state({name: data[name] for name in data.files})
+            if keys:
+                index.add(keys, data["vectors"])
+
+        return index
+
+
+class BruteForceVectorIndex(VectorIndex):
+    """Exact search: one matrix product against every stored vector"""
+
+    backend = "exact"
+
+
+class IVFVectorIndex(VectorIndex):
+    """Approximate search over an inverted file of k-means clusters
+
+    Vectors are bucketed by their nearest centroid; a query only scores the
+    vectors in its ``nprobe`` closest buckets. Until enough vectors have been
+    added to train the centroids, queries fall back to exact search.
+    """
+
+    backend = "ivf"
+
+    def __init__(
+        self,
+        dim: int,
+        initial_capacity: int = 1024,
+        nlist: int = 256,
+        nprobe: int = 8,
+        train_size_factor: int = 39,
+        kmeans_iterations: int = 10
+    ):
+        super().__init__(dim, initial_capacity)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size_factor = train_size_factor
+        self.kmeans_iterations = kmeans_iterations
+
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.full(self._vectors.shape[0], -1, dtype=np.int32)
+        self._lists: List[List[int]] = []
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def _grow(self, min_capacity: int):
+        capacity = self._vectors.shape[0]
+        super()._grow(min_capacity)
+        if self._vectors.shape[0] > capacity:
+            assignments = np.full(self._vectors.shape[0], -1, dtype=np.int32)
+            assignments[:capacity] = self._assignments
+            self._assignments = assignments
+
+    def train(self, seed: int = 0):
+        """Fit the coarse quantizer with spherical k-means over the stored vectors"""
+        rows = np.flatnonzero(self._valid[:self._next_row])
+        if rows.size == 0:
+            return
+
+        rng = np.random.default_rng(seed)
+        nlist = min(self.nlist, rows.size)
+        sample_rows = rows
+        if rows.size > nlist * 256:
+            sample_rows = rng.choice(rows, nlist * 256, replace=False)
+        sample = self._vectors[sample_rows]
+
+        centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if members.shape[0]:
+                    centroids[c] = members.sum(axis=0)
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids /= norms
+
+        self._centroids = centroids.astype(np.float32)
+        self._lists = [[] for _ in range(nlist)]
+        self._assign(rows)
+
+        logger.info(f"Trained IVF index: {rows.size} vectors in {nlist} lists")
+
+    def _assign(self, rows: np.ndarray):
+        labels = np.argmax(self._vectors[rows] @ self._centroids.T, axis=1)
+        for row, label in zip(rows.tolist(), labels.tolist()):
+            self._assignments[row] = label
+            self._lists[label].append(row)
+
+    def _on_rows_added(self, rows: np.ndarray):
+        if self.is_trained:
+            # Replaced keys keep a stale entry in their old list; it is filtered on search
+            self._assign(rows)
+        elif len(self) >= self.nlist * self.train_size_factor:
+            self.train()
+
+    def _on_row_removed(self, row: int):
+        self._assignments[row] = -1
+
+    def _candidate_rows(self, query: np.ndarray) -> Optional[np.ndarray]:
+        if not self.is_trained:
+            return None
+
+        nprobe = min(self.nprobe, len(self._lists))
+        probes = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+
+        rows = []
+        for probe in probes.tolist():
+            bucket = np.asarray(self._lists[probe], dtype=np.int64)
+            # Drop rows that were deleted or reassigned since they were listed
+            bucket = bucket[self._assignments[bucket] == probe]
+            self._lists[probe] = bucket.tolist()
+            rows.append(bucket)
+
+        return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+    def _extra_state(self) -> Dict[str, np.ndarray]:
+        state = {
+            "nlist": np.array(self.nlist),
+            "nprobe": np.array(self.nprobe),
+        }
+        if self._centroids is not None:
+            state["centroids"] = self._centroids
+        return state
+
+    def _load_extra_state(self, state: Dict[str, np.ndarray]):
+        if "nlist" in state:
+            self.nlist = int(state["nlist"])
+            self.nprobe = int(state["nprobe"])
+        if "centroids" in state:
+            self._centroids = state["centroids"].astype(np.float32)
+            self._lists = [[] for _ in range(self._centroids.shape[0])]
+
+
+VECTOR_INDEX_BACKENDS = {
+    BruteForceVectorIndex.backend: BruteForceVectorIndex,
+    IVFVectorIndex.backend: IVFVectorIndex,
+}
+
+
+def create_vector_index(backend: str, dim: int, **kwargs) -> VectorIndex:
+    """Instantiate a vector index by backend name ("exact" or "ivf")"""
+    index_cls = VECTOR_INDEX_BACKENDS.get(backend)
+    if index_cls is None:
+        raise ValueError(f"Unknown vector index backend: {backend}")
+    return index_cls(dim=dim, **kwargs)
@@ -5,10 +5,13 @@ Implements L1 (in-memory) -> L2 (Redis) -> L3 (Database) caching strategy
 import asyncio
 import json
 import pickle
+import sys
 import time
 import hashlib
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union, Callable
+import uuid
+from collections import OrderedDict, defaultdict
+from itertools import islice
+from typing import Any, Dict, List, Optional, Set, Tuple, Union, Callable
 from dataclasses import dataclass
 from enum import Enum
 import logging
@@ -22,6 +25,23 @@ from app.db.session import get_db
 logger = logging.getLogger(__name__)
 
 
+# Delete a lock only if we still hold it (it may have expired and been re-acquired)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+# Number invalidation batches so subscribers can tell when they missed one
+_PUBLISH_INVALIDATION_SCRIPT = """
+local generation = redis.call('incr', KEYS[1])
+redis.call('publish', ARGV[1], generation .. '|' .. ARGV[2])
+return generation
+"""
+
+
 class CacheLevel(str, Enum):
     L1_MEMORY = "l1_memory"
     L2_REDIS = "l2_redis"
@@ -34,10 +54,12 @@ class CacheEntry:
     key: str
     value: Any
     ttl: int
-    created_at: datetime
+    expires_at: float = 0.0  # time.monotonic() deadline, 0 = never
+    stale_until: float = 0.0  # may still be served stale (while refreshing) until then
     access_count: int = 0
-    last_accessed: Optional[datetime] = None
     size_bytes: int = 0
+    cache_type: str = "default"
+    tags: Tuple[str, ...] = ()
 
 
 @dataclass
@@ -46,77 +68,169 @@ class CacheStats:
     hits: int = 0
     misses: int = 0
     evictions: int = 0
+    stale_hits: int = 0
     memory_usage_mb: float = 0.0
     redis_connections: int = 0
     avg_response_time_ms: float = 0.0
 
 
+# Sizes of fixed-size scalars, so estimating them never calls sys.getsizeof
+_SCALAR_SIZES = {type(None): 16, bool: 28, int: 28, float: 24}
+_CONTAINER_SAMPLE = 8
+_MAX_ESTIMATE_DEPTH = 3
+
+
+def estimate_size(value: Any, depth: int = 0) -> int:
+    """Cheap approximate memory size of a cached value.
+
+    Byte strings, text and arrays are measured exactly; containers are
+    estimated from a small sample of their items, so the cost does not grow
+    with the size of the value.
+    """
+    scalar = _SCALAR_SIZES.get(type(value))
+    if scalar is not None:
+        return scalar
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return 33 + len(value)
+    if isinstance(value, str):
+        return 49 + len(value)
+
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):  # numpy arrays and similar buffers
+        return 112 + nbytes
+
+    if depth >= _MAX_ESTIMATE_DEPTH:
+        return sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        if not value:
+            return 64
+        sample = list(islice(value.items(), _CONTAINER_SAMPLE))
+        per_item = sum(
+            estimate_size(k, depth + 1) + estimate_size(v, depth + 1) for k, v in sample
+        ) / len(sample)
+        return sys.getsizeof(value) + int(per_item * len(value))
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if not value:
+            return 56
+        sample = list(islice(value, _CONTAINER_SAMPLE))
+        per_item = sum(estimate_size(item, depth + 1) for item in sample) / len(sample)
+        return sys.getsizeof(value) + int(per_item * len(value))
+
+    attributes = getattr(value, '__dict__', None)
+    if isinstance(attributes, dict):
+        return 48 + estimate_size(attributes, depth + 1)
+
+    return sys.getsizeof(value)
+
+
 class LRUCache:
-    """High-performance in-memory LRU cache"""
+    """High-performance in-memory LRU cache
+
+    Entries live in an OrderedDict kept in recency order, so lookups,
+    promotion and eviction are all O(1). TTLs are checked lazily on access
+    against a monotonic clock.
+    """
     
     def __init__(self, max_size: int = 1000, max_memory_mb: int = 100):
         self.max_size = max_size
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
-        self.cache: Dict[str, CacheEntry] = {}
-        self.access_order: List[str] = []
+        self.cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
         self.total_size_bytes = 0
         self.stats = CacheStats()
+        self.type_stats: Dict[str, CacheStats] = defaultdict(CacheStats)
+        self._tag_index: Dict[str, Set[str]] = defaultdict(set)  # tag -> keys
     
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: str, cache_type: str = "default") -> Optional[Any]:
         """Get item from cache with LRU update"""
-        if key in self.cache:
-            entry = self.cache[key]
-            
-            # Check TTL
-            if entry.ttl > 0:
-                age = (datetime.utcnow() - entry.created_at).total_seconds()
-                if age > entry.ttl:
+        value, _ = self.lookup(key, cache_type, allow_stale=False)
+        return value
+    
+    def lookup(
+        self,
+        key: str,
+        cache_type: str = "default",
+        allow_stale: bool = True
+    ) -> Tuple[Optional[Any], bool]:
+        """Get item and whether it is stale (past its TTL, inside its stale window)"""
+        entry = self.cache.get(key)
+        if entry is None:
+            self._record_miss(cache_type)
+            return None, False
+        
+        # Lazy TTL expiry
+        stale = False
+        if entry.expires_at:
+            now = time.monotonic()
+            if now >= entry.expires_at:
+                if now >= entry.stale_until:
                     self._remove(key)
-                    self.stats.misses += 1
-                    return None
-            
-            # Update access info
-            entry.access_count += 1
-            entry.last_accessed = datetime.utcnow()
-            
-            # Move to end (most recently used)
-            self.access_order.remove(key)
-            self.access_order.append(key)
-            
-            self.stats.hits += 1
-            return entry.value
+                    self._record_miss(entry.cache_type)
+                    return None, False
+                if not allow_stale:
+                    self._record_miss(entry.cache_type)
+                    return None, False
+                stale = True
         
-        self.stats.misses += 1
-        return None
+        entry.access_count += 1
+        self.cache.move_to_end(key)
+        
+        if stale:
+            self.stats.stale_hits += 1
+            self.type_stats[entry.cache_type].stale_hits += 1
+        else:
+            self.stats.hits += 1
+            self.type_stats[entry.cache_type].hits += 1
+        return entry.value, stale
     
-    def set(self, key: str, value: Any, ttl: int = 0) -> bool:
-        """Set item in cache with automatic eviction"""
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 0,
+        size_bytes: Optional[int] = None,
+        cache_type: str = "default",
+        stale_ttl: int = 0,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """Set item in cache with automatic eviction
+
+        Args:
+            size_bytes: Known size of the value (e.g. its serialized length);
+                estimated when omitted
+            stale_ttl: Seconds past ``ttl`` the value may still be served stale
+            tags: Labels that ``invalidate_tags`` can drop this entry by
+        """
         try:
-            # Estimate size
-            size = self._estimate_size(value)
+            size = size_bytes if size_bytes is not None else estimate_size(value)
+            if size > self.max_memory_bytes:
+                self._remove(key)
+                return False
             
-            # Check if we need to evict
-            while (len(self.cache) >= self.max_size or 
-                   self.total_size_bytes + size > self.max_memory_bytes):
-                if not self._evict_lru():
-                    break
+            # Replace any existing entry before deciding what to evict
+            self._remove(key)
             
-            # Remove existing entry if present
-            if key in self.cache:
-                self._remove(key)
+            while self.cache and (
+                len(self.cache) >= self.max_size or
+                self.total_size_bytes + size > self.max_memory_bytes
+            ):
+                self._evict_lru()
             
-            # Add new entry
-            entry = CacheEntry(
+            expires_at = time.monotonic() + ttl if ttl > 0 else 0.0
+            self.cache[key] = CacheEntry(
                 key=key,
                 value=value,
                 ttl=ttl,
-                created_at=datetime.utcnow(),
-                size_bytes=size
+                expires_at=expires_at,
+                stale_until=expires_at + max(stale_ttl, 0) if expires_at else 0.0,
+                size_bytes=size,
+                cache_type=cache_type,
+                tags=tuple(tags) if tags else ()
             )
-            
-            self.cache[key] = entry
-            self.access_order.append(key)
             self.total_size_bytes += size
+            for tag in tags or ():
+                self._tag_index[tag].add(key)
             
             return True
             
@@ -126,42 +240,63 @@ class LRUCache:
     
     def delete(self, key: str) -> bool:
         """Delete item from cache"""
-        if key in self.cache:
-            self._remove(key)
-            return True
-        return False
+        return self._remove(key) is not None
     
-    def clear(self):
+    def clear(self, reset_stats: bool = True):
         """Clear all cache entries"""
         self.cache.clear()
-        self.access_order.clear()
+        self._tag_index.clear()
         self.total_size_bytes = 0
-        self.stats = CacheStats()
+        if reset_stats:
+            self.stats = CacheStats()
+            self.type_stats.clear()
+    
+    def invalidate_matching(self, predicate: Callable[[str], bool]) -> int:
+        """Delete every key for which ``predicate`` is true; returns the count"""
+        keys = [key for key in self.cache if predicate(key)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+    
+    def invalidate_tags(self, tags: List[str]) -> int:
+        """Delete every entry carrying any of ``tags``; returns the count"""
+        removed = 0
+        for tag in tags:
+            for key in list(self._tag_index.get(tag, ())):
+                if self._remove(key) is not None:
+                    removed += 1
+        return removed
+    
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        """Remove entry and update size accounting"""
+        entry = self.cache.pop(key, None)
+        if entry is not None:
+            self._forget(entry)
+        return entry
     
-    def _remove(self, key: str):
-        """Remove entry and update stats"""
-        if key in self.cache:
-            entry = self.cache[key]
-            self.total_size_bytes -= entry.size_bytes
-            del self.cache[key]
-            self.access_order.remove(key)
+    def _forget(self, entry: CacheEntry):
+        self.total_size_bytes -= entry.size_bytes
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(entry.key)
+                if not keys:
+                    del self._tag_index[tag]
     
     def _evict_lru(self) -> bool:
         """Evict least recently used item"""
-        if not self.access_order:
+        if not self.cache:
             return False
         
-        lru_key = self.access_order[0]
-        self._remove(lru_key)
+        _, entry = self.cache.popitem(last=False)
+        self._forget(entry)
         self.stats.evictions += 1
+        self.type_stats[entry.cache_type].evictions += 1
         return True
     
-    def _estimate_size(self, value: Any) -> int:
-        """Estimate memory size of value"""
-        try:
-            return len(pickle.dumps(value))
-        except:
-            return 1024  # Default estimate
+    def _record_miss(self, cache_type: str):
+        self.stats.misses += 1
+        self.type_stats[cache_type].misses += 1
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
@@ -170,6 +305,17 @@ class LRUCache:
         if total_requests > 0:
             hit_rate = self.stats.hits / total_requests
         
+        by_type = {}
+        for cache_type, type_stats in self.type_stats.items():
+            type_requests = type_stats.hits + type_stats.misses
+            by_type[cache_type] = {
+                'hits': type_stats.hits,
+                'misses': type_stats.misses,
+                'evictions': type_stats.evictions,
+                'stale_hits': type_stats.stale_hits,
+                'hit_rate': type_stats.hits / type_requests if type_requests else 0.0
+            }
+        
         return {
             'hit_rate': hit_rate,
             'entries': len(self.cache),
@@ -177,7 +323,9 @@ class LRUCache:
             'memory_usage_mb': self.total_size_bytes / 1024 / 1024,
             'max_memory_mb': self.max_memory_bytes / 1024 / 1024,
             'evictions': self.stats.evictions,
-            'total_requests': total_requests
+            'stale_hits': self.stats.stale_hits,
+            'total_requests': total_requests,
+            'by_type': by_type
         }
 
 
@@ -207,12 +355,48 @@ class MultiLevelCache:
         self.redis_ttl = getattr(settings, 'REDIS_CACHE_TTL', 7200)
         self.enable_l3_cache = getattr(settings, 'ENABLE_L3_CACHE', True)
         
+        # Request coalescing
+        self.distributed_lock = getattr(settings, 'CACHE_DISTRIBUTED_LOCK', False)
+        self.lock_timeout = getattr(settings, 'CACHE_LOCK_TIMEOUT', 30)
+        self.lock_wait = getattr(settings, 'CACHE_LOCK_WAIT', 10)
+        self.lock_poll_interval = getattr(settings, 'CACHE_LOCK_POLL_INTERVAL', 0.05)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        
+        # Cross-process L1 invalidation
+        self.invalidation_enabled = getattr(settings, 'CACHE_INVALIDATION_ENABLED', True)
+        self.invalidation_channel = getattr(settings, 'CACHE_INVALIDATION_CHANNEL', 'cache:invalidations')
+        self.invalidation_generation_key = f"{self.invalidation_channel}:generation"
+        self.invalidation_batch_interval = getattr(settings, 'CACHE_INVALIDATION_BATCH_MS', 5) / 1000
+        self.invalidation_batch_size = getattr(settings, 'CACHE_INVALIDATION_BATCH_SIZE', 500)
+        self.invalidation_check_interval = getattr(settings, 'CACHE_INVALIDATION_CHECK_INTERVAL', 5)
+        self.node_id = uuid.uuid4().hex
+        self._pending_invalidations: Dict[str, Set[str]] = {'keys': set(), 'patterns': set(), 'tags': set()}
+        self._invalidation_flush_task: Optional[asyncio.Task] = None
+        self._invalidation_listener_task: Optional[asyncio.Task] = None
+        self._invalidation_generation = 0  # last generation seen on the channel
+        self._suspected_generation = 0
+        self.invalidation_stats = {
+            'published_batches': 0,
+            'published_items': 0,
+            'received_batches': 0,
+            'applied_entries': 0,
+            'gaps_detected': 0
+        }
+        
         # Performance tracking
         self.global_stats = {
             'l1_hits': 0, 'l1_misses': 0,
             'l2_hits': 0, 'l2_misses': 0,
             'l3_hits': 0, 'l3_misses': 0,
             'write_operations': 0,
+            'coalesced': 0,
+            'stale_served': 0,
+            'background_refreshes': 0,
+            'lock_acquired': 0,
+            'lock_waits': 0,
+            'lock_timeouts': 0,
             'average_response_time_ms': 0.0
         }
         
@@ -242,6 +426,10 @@ class MultiLevelCache:
             
             # Test connection
             await self.redis_client.ping()
+            
+            if self.invalidation_enabled and self._invalidation_listener_task is None:
+                self._invalidation_listener_task = asyncio.create_task(self._listen_for_invalidations())
+            
             logger.info("Multi-level cache initialized successfully")
             
         except Exception as e:
@@ -252,65 +440,268 @@ class MultiLevelCache:
         self, 
         key: str, 
         cache_type: str = "default",
-        fallback_factory: Optional[Callable] = None
+        fallback_factory: Optional[Callable] = None,
+        ttl: Optional[int] = None,
+        stale_ttl: int = 0,
+        distributed_lock: Optional[bool] = None
     ) -> Optional[Any]:
         """
         Get value from cache with multi-level fallback
         
+        Concurrent misses for the same key share one ``fallback_factory`` call.
+        
         Args:
             key: Cache key
             cache_type: Type of cache for key prefixing
             fallback_factory: Async function to generate value if not in cache
+            ttl: TTL for a value produced by ``fallback_factory``
+            stale_ttl: Seconds past ``ttl`` an expired in-memory value is still
+                returned while one background task refreshes it
+            distributed_lock: Also coalesce factory calls across workers with a
+                Redis lock (defaults to ``CACHE_DISTRIBUTED_LOCK``)
         """
+        try:
+            return await self.get_or_load(
+                key,
+                fallback_factory,
+                cache_type=cache_type,
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                distributed_lock=distributed_lock
+            )
+        except Exception as e:
+            logger.error(f"Cache get error for key {self._build_key(key, cache_type)}: {e}")
+            return None
+    
+    async def get_or_load(
+        self,
+        key: str,
+        factory: Optional[Callable] = None,
+        cache_type: str = "default",
+        ttl: Optional[int] = None,
+        stale_ttl: int = 0,
+        distributed_lock: Optional[bool] = None
+    ) -> Optional[Any]:
+        """Like ``get``, but exceptions raised by ``factory`` propagate to every waiting caller"""
         start_time = time.time()
         full_key = self._build_key(key, cache_type)
         
         try:
-            # L1 Cache (in-memory)
-            value = self.l1_cache.get(full_key)
+            # L1 Cache (in-memory); stale entries are only usable when we can refresh them
+            value, stale = self.l1_cache.lookup(full_key, cache_type, allow_stale=factory is not None)
             if value is not None:
-                self.global_stats['l1_hits'] += 1
-                self._update_response_time(start_time)
+                if stale:
+                    self.global_stats['stale_served'] += 1
+                    self._schedule_refresh(key, full_key, cache_type, factory, ttl, stale_ttl, distributed_lock)
+                else:
+                    self.global_stats['l1_hits'] += 1
                 return value
             
             self.global_stats['l1_misses'] += 1
             
             # L2 Cache (Redis)
-            if self.redis_client:
-                try:
-                    cached_data = await self.redis_client.get(full_key)
-                    if cached_data:
-                        value = pickle.loads(cached_data)
-                        
-                        # Populate L1 cache
-                        self.l1_cache.set(full_key, value, ttl=self.default_ttl)
-                        
-                        self.global_stats['l2_hits'] += 1
-                        self._update_response_time(start_time)
-                        return value
-                except Exception as e:
-                    logger.warning(f"Redis cache error: {e}")
+            value = await self._get_l2(full_key, cache_type, ttl, stale_ttl)
+            if value is not None:
+                self.global_stats['l2_hits'] += 1
+                return value
             
             self.global_stats['l2_misses'] += 1
             
             # L3 Cache (Database) or Fallback Factory
-            if fallback_factory:
-                value = await fallback_factory()
+            if factory:
+                value = await self._load(key, full_key, cache_type, factory, ttl, stale_ttl, distributed_lock)
                 if value is not None:
-                    # Populate all cache levels
-                    await self.set(key, value, cache_type=cache_type)
                     self.global_stats['l3_hits'] += 1
-                    self._update_response_time(start_time)
                     return value
             
             self.global_stats['l3_misses'] += 1
-            self._update_response_time(start_time)
             return None
-            
-        except Exception as e:
-            logger.error(f"Cache get error for key {full_key}: {e}")
+        finally:
             self._update_response_time(start_time)
+    
+    async def _get_l2(
+        self,
+        full_key: str,
+        cache_type: str,
+        ttl: Optional[int] = None,
+        stale_ttl: int = 0
+    ) -> Optional[Any]:
+        """Read a key from Redis and populate L1 with it"""
+        if not self.redis_client:
             return None
+        
+        try:
+            cached_data = await self.redis_client.get(full_key)
+            if cached_data:
+                value = pickle.loads(cached_data)
+                
+                # Populate L1 cache
+                self.l1_cache.set(
+                    full_key, value, ttl=ttl if ttl is not None else self.default_ttl,
+                    size_bytes=len(cached_data), cache_type=cache_type, stale_ttl=stale_ttl
+                )
+                return value
+        except Exception as e:
+            logger.warning(f"Redis cache error: {e}")
+        return None
+    
+    async def _load(
+        self,
+        key: str,
+        full_key: str,
+        cache_type: str,
+        factory: Callable,
+        ttl: Optional[int],
+        stale_ttl: int,
+        distributed_lock: Optional[bool]
+    ) -> Optional[Any]:
+        """Single-flight factory call: concurrent loads of one key await the first
+        
+        If the leading caller is cancelled (e.g. its client disconnected), a
+        waiting caller takes over the load instead of seeing the cancellation.
+        """
+        inflight = self._inflight.get(full_key)
+        while inflight is not None:
+            self.global_stats['coalesced'] += 1
+            # wait() never cancels the shared future: a CancelledError here is this
+            # caller's own, and a cancelled leader just ends the wait
+            await asyncio.wait({inflight})
+            if not inflight.cancelled():
+                return inflight.result()
+            # The first follower to resume becomes the new leader; the rest follow it
+            inflight = self._inflight.get(full_key)
+        
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting; don't warn about an unretrieved exception
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[full_key] = future
+        try:
+            use_lock = self.distributed_lock if distributed_lock is None else distributed_lock
+            if use_lock and self.redis_client:
+                value = await self._load_with_lock(key, full_key, cache_type, factory, ttl, stale_ttl)
+            else:
+                value = await self._call_factory(key, cache_type, factory, ttl, stale_ttl)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(full_key, None)
+    
+    async def _call_factory(
+        self,
+        key: str,
+        cache_type: str,
+        factory: Callable,
+        ttl: Optional[int],
+        stale_ttl: int
+    ) -> Optional[Any]:
+        value = await factory()
+        if value is not None:
+            # Populate all cache levels
+            await self.set(key, value, ttl=ttl, cache_type=cache_type, stale_ttl=stale_ttl)
+        return value
+    
+    async def _load_with_lock(
+        self,
+        key: str,
+        full_key: str,
+        cache_type: str,
+        factory: Callable,
+        ttl: Optional[int],
+        stale_ttl: int
+    ) -> Optional[Any]:
+        """Cross-worker single-flight: one worker runs the factory, the others poll L2.
+        
+        Fails open: if Redis errors or the holder does not produce a value in
+        time, the caller runs the factory itself.
+        """
+        lock_key = f"lock:{full_key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis_client.set(
+                lock_key, token, nx=True, px=int(self.lock_timeout * 1000)
+            )
+        except Exception as e:
+            logger.warning(f"Redis lock error: {e}")
+            return await self._call_factory(key, cache_type, factory, ttl, stale_ttl)
+        
+        if acquired:
+            self.global_stats['lock_acquired'] += 1
+            try:
+                # The previous holder may have filled L2 just before we got the lock
+                value = await self._get_l2(full_key, cache_type, ttl, stale_ttl)
+                if value is None:
+                    value = await self._call_factory(key, cache_type, factory, ttl, stale_ttl)
+                return value
+            finally:
+                try:
+                    await self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    logger.warning(f"Redis lock release error: {e}")
+        
+        self.global_stats['lock_waits'] += 1
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            value = await self._get_l2(full_key, cache_type, ttl, stale_ttl)
+            if value is not None:
+                return value
+            try:
+                if not await self.redis_client.exists(lock_key):
+                    break  # released without a value (factory failed or returned None)
+            except Exception:
+                break
+        else:
+            self.global_stats['lock_timeouts'] += 1
+        
+        return await self._call_factory(key, cache_type, factory, ttl, stale_ttl)
+    
+    def _schedule_refresh(
+        self,
+        key: str,
+        full_key: str,
+        cache_type: str,
+        factory: Callable,
+        ttl: Optional[int],
+        stale_ttl: int,
+        distributed_lock: Optional[bool]
+    ):
+        """Refresh a stale key in the background, at most once at a time per key"""
+        if full_key in self._refreshing or full_key in self._inflight:
+            return
+        
+        self._refreshing.add(full_key)
+        self.global_stats['background_refreshes'] += 1
+        task = asyncio.create_task(
+            self._refresh(key, full_key, cache_type, factory, ttl, stale_ttl, distributed_lock)
+        )
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+    
+    async def _refresh(
+        self,
+        key: str,
+        full_key: str,
+        cache_type: str,
+        factory: Callable,
+        ttl: Optional[int],
+        stale_ttl: int,
+        distributed_lock: Optional[bool]
+    ):
+        try:
+            # Another worker may already have refreshed L2
+            if await self._get_l2(full_key, cache_type, ttl, stale_ttl) is None:
+                await self._load(key, full_key, cache_type, factory, ttl, stale_ttl, distributed_lock)
+        except Exception as e:
+            logger.warning(f"Background cache refresh failed for key {full_key}: {e}")
+        finally:
+            self._refreshing.discard(full_key)
     
     async def set(
         self, 
@@ -318,7 +709,9 @@ class MultiLevelCache:
         value: Any, 
         ttl: Optional[int] = None,
         cache_type: str = "default",
-        levels: List[CacheLevel] = None
+        levels: List[CacheLevel] = None,
+        stale_ttl: int = 0,
+        tags: Optional[List[str]] = None
     ) -> bool:
         """
         Set value in cache across multiple levels
@@ -329,6 +722,8 @@ class MultiLevelCache:
             ttl: Time to live in seconds
             cache_type: Type of cache for key prefixing
             levels: Specific cache levels to write to
+            stale_ttl: Seconds past ``ttl`` the in-memory copy may be served stale
+            tags: Labels for dropping related entries with ``invalidate_tags``
         """
         if ttl is None:
             ttl = self.default_ttl
@@ -340,22 +735,45 @@ class MultiLevelCache:
         success = True
         
         try:
+            # Serialize once for L2; the payload length doubles as the L1 size
+            payload = None
+            if CacheLevel.L2_REDIS in levels and self.redis_client:
+                payload = pickle.dumps(value)
+            
             # L1 Cache
             if CacheLevel.L1_MEMORY in levels:
-                self.l1_cache.set(full_key, value, ttl=ttl)
+                self.l1_cache.set(
+                    full_key, value, ttl=ttl,
+                    size_bytes=len(payload) if payload is not None else None,
+                    cache_type=cache_type,
+                    stale_ttl=stale_ttl,
+                    tags=tags
+                )
             
             # L2 Cache (Redis)
-            if CacheLevel.L2_REDIS in levels and self.redis_client:
+            if payload is not None:
                 try:
                     redis_ttl = min(ttl, self.redis_ttl) if ttl > 0 else self.redis_ttl
-                    await self.redis_client.setex(
-                        full_key, 
-                        redis_ttl, 
-                        pickle.dumps(value)
-                    )
+                    if tags:
+                        # Tag sets let any process resolve a tag to the keys it covers
+                        pipe = self.redis_client.pipeline(transaction=False)
+                        pipe.setex(full_key, redis_ttl, payload)
+                        for tag in tags:
+                            pipe.sadd(self._tag_key(tag), full_key)
+                            pipe.expire(self._tag_key(tag), redis_ttl)
+                        await pipe.execute()
+                    else:
+                        await self.redis_client.setex(
+                            full_key, 
+                            redis_ttl, 
+                            payload
+                        )
                 except Exception as e:
                     logger.warning(f"Redis set error: {e}")
                     success = False
+                
+                # Peers drop their L1 copy and re-read the new value from L2
+                await self._queue_invalidation('keys', [full_key])
             
             self.global_stats['write_operations'] += 1
             return success
@@ -370,7 +788,7 @@ class MultiLevelCache:
         success = True
         
         try:
-            # L1 Cache
+            # L1 Cache (this process now, the others via the invalidation channel)
             self.l1_cache.delete(full_key)
             
             # L2 Cache
@@ -381,6 +799,7 @@ class MultiLevelCache:
                     logger.warning(f"Redis delete error: {e}")
                     success = False
             
+            await self._queue_invalidation('keys', [full_key])
             return success
             
         except Exception as e:
@@ -393,9 +812,7 @@ class MultiLevelCache:
         
         try:
             # L1 Cache - manual iteration
-            keys_to_delete = [k for k in self.l1_cache.cache.keys() if self._matches_pattern(k, full_pattern)]
-            for key in keys_to_delete:
-                self.l1_cache.delete(key)
+            self.l1_cache.invalidate_matching(lambda k: self._matches_pattern(k, full_pattern))
             
             # L2 Cache - Redis pattern deletion
             if self.redis_client:
@@ -405,9 +822,168 @@ class MultiLevelCache:
                 except Exception as e:
                     logger.warning(f"Redis pattern delete error: {e}")
             
+            await self._queue_invalidation('patterns', [full_pattern])
+            
         except Exception as e:
             logger.error(f"Pattern invalidation error: {e}")
     
+    async def invalidate_tags(self, tags: List[str]):
+        """Invalidate every entry stored with any of ``tags``, in all processes"""
+        try:
+            self.l1_cache.invalidate_tags(tags)
+            
+            # Resolve tags to keys in Redis so peers also drop entries they
+            # populated from L2 (those carry no tags in their L1)
+            keys: List[str] = []
+            if self.redis_client:
+                try:
+                    tag_keys = [self._tag_key(tag) for tag in tags]
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    for tag_key in tag_keys:
+                        pipe.smembers(tag_key)
+                    members = await pipe.execute()
+                    keys = sorted({
+                        key.decode() if isinstance(key, bytes) else key
+                        for tag_members in members for key in tag_members
+                    })
+                    if tag_keys:
+                        await self.redis_client.delete(*keys, *tag_keys)
+                except Exception as e:
+                    logger.warning(f"Redis tag invalidation error: {e}")
+            
+            for key in keys:
+                self.l1_cache.delete(key)
+            await self._queue_invalidation('keys', keys)
+            await self._queue_invalidation('tags', tags)
+            
+        except Exception as e:
+            logger.error(f"Tag invalidation error: {e}")
+    
+    def _tag_key(self, tag: str) -> str:
+        return f"tag:{tag}"
+    
+    async def _queue_invalidation(self, kind: str, values: List[str]):
+        """Add L1 invalidations to the next batch published to other processes"""
+        if not values or not self.invalidation_enabled or not self.redis_client:
+            return
+        
+        self._pending_invalidations[kind].update(values)
+        pending = sum(len(items) for items in self._pending_invalidations.values())
+        if pending >= self.invalidation_batch_size:
+            await self.flush_invalidations()
+        elif self._invalidation_flush_task is None or self._invalidation_flush_task.done():
+            self._invalidation_flush_task = asyncio.create_task(self._flush_invalidations_later())
+    
+    async def _flush_invalidations_later(self):
+        await asyncio.sleep(self.invalidation_batch_interval)
+        await self.flush_invalidations()
+    
+    async def flush_invalidations(self):
+        """Publish queued invalidations as one message"""
+        pending = self._pending_invalidations
+        if not self.redis_client or not any(pending.values()):
+            return
+        self._pending_invalidations = {'keys': set(), 'patterns': set(), 'tags': set()}
+        
+        message = {'origin': self.node_id}
+        message.update({kind: sorted(items) for kind, items in pending.items() if items})
+        try:
+            await self.redis_client.eval(
+                _PUBLISH_INVALIDATION_SCRIPT,
+                1,
+                self.invalidation_generation_key,
+                self.invalidation_channel,
+                json.dumps(message)
+            )
+            self.invalidation_stats['published_batches'] += 1
+            self.invalidation_stats['published_items'] += sum(len(items) for items in pending.values())
+        except Exception as e:
+            # Peers fall back to their TTLs (or a generation-gap flush) for these keys
+            logger.warning(f"Cache invalidation publish error: {e}")
+    
+    async def _listen_for_invalidations(self):
+        """Apply invalidations published by other processes to this process's L1"""
+        subscribed_before = False
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+                current = await self._read_invalidation_generation()
+                if subscribed_before and current > self._invalidation_generation:
+                    # Batches were published while we were disconnected
+                    self._handle_invalidation_gap(current)
+                self._invalidation_generation = max(self._invalidation_generation, current)
+                subscribed_before = True
+                
+                next_check = time.monotonic() + self.invalidation_check_interval
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=self.invalidation_check_interval
+                    )
+                    if message is not None and message.get('type') == 'message':
+                        self._apply_invalidation_message(message['data'])
+                    if time.monotonic() >= next_check:
+                        await self._check_invalidation_generation()
+                        next_check = time.monotonic() + self.invalidation_check_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+    
+    async def _read_invalidation_generation(self) -> int:
+        return int(await self.redis_client.get(self.invalidation_generation_key) or 0)
+    
+    async def _check_invalidation_generation(self):
+        """Detect lost pub/sub messages from the shared generation counter.
+        
+        A generation ahead of what we have seen may just be a message still
+        in flight, so only a gap that persists until the next check counts.
+        """
+        current = await self._read_invalidation_generation()
+        if self._suspected_generation and self._invalidation_generation < self._suspected_generation:
+            self._handle_invalidation_gap(self._suspected_generation)
+        self._suspected_generation = current if current > self._invalidation_generation else 0
+    
+    def _apply_invalidation_message(self, data: Union[bytes, str]):
+        if isinstance(data, bytes):
+            data = data.decode()
+        generation_text, _, body = data.partition('|')
+        generation = int(generation_text)
+        
+        if self._invalidation_generation and generation > self._invalidation_generation + 1:
+            self._handle_invalidation_gap(generation - 1)
+        self._invalidation_generation = max(self._invalidation_generation, generation)
+        
+        message = json.loads(body)
+        if message.get('origin') == self.node_id:
+            return  # already applied locally
+        
+        self.invalidation_stats['received_batches'] += 1
+        applied = 0
+        for key in message.get('keys', ()):
+            applied += self.l1_cache.delete(key)
+        for pattern in message.get('patterns', ()):
+            applied += self.l1_cache.invalidate_matching(lambda k: self._matches_pattern(k, pattern))
+        applied += self.l1_cache.invalidate_tags(message.get('tags', []))
+        self.invalidation_stats['applied_entries'] += applied
+    
+    def _handle_invalidation_gap(self, generation: int):
+        """We cannot know what a missed batch covered, so drop all of L1"""
+        logger.warning(
+            f"Missed cache invalidations (seen {self._invalidation_generation}, "
+            f"published {generation}); clearing L1 cache"
+        )
+        self.invalidation_stats['gaps_detected'] += 1
+        self.l1_cache.clear(reset_stats=False)
+        self._invalidation_generation = max(self._invalidation_generation, generation)
+    
     def _build_key(self, key: str, cache_type: str) -> str:
         """Build full cache key with prefix"""
         prefix = self.key_prefixes.get(cache_type, "default:")
@@ -453,6 +1029,26 @@ class MultiLevelCache:
                 'average_response_time_ms': self.global_stats['average_response_time_ms'],
                 'write_operations': self.global_stats['write_operations']
             },
+            'coalescing': {
+                'coalesced': self.global_stats['coalesced'],
+                'in_flight': len(self._inflight),
+                'stale_served': self.global_stats['stale_served'],
+                'background_refreshes': self.global_stats['background_refreshes'],
+                'distributed_lock': self.distributed_lock,
+                'lock_acquired': self.global_stats['lock_acquired'],
+                'lock_waits': self.global_stats['lock_waits'],
+                'lock_timeouts': self.global_stats['lock_timeouts']
+            },
+            'invalidation': {
+                'enabled': self.invalidation_enabled,
+                'listening': (
+                    self._invalidation_listener_task is not None
+                    and not self._invalidation_listener_task.done()
+                ),
+                'generation': self._invalidation_generation,
+                'pending': sum(len(items) for items in self._pending_invalidations.values()),
+                **self.invalidation_stats
+            },
             'l1_memory': {
                 'hit_rate': l1_hit_rate,
                 'hits': self.global_stats['l1_hits'],
@@ -503,6 +1099,11 @@ class MultiLevelCache:
     
     async def cleanup(self):
         """Cleanup resources"""
+        await self.flush_invalidations()
+        for task in [*self._refresh_tasks, self._invalidation_flush_task, self._invalidation_listener_task]:
+            if task is not None:
+                task.cancel()
+        self._invalidation_listener_task = None
         if self.redis_client:
             await self.redis_client.close()
 
@@ -515,15 +1116,20 @@ cache_manager = MultiLevelCache()
 def cached(
     ttl: int = 3600,
     cache_type: str = "default",
-    key_generator: Optional[Callable] = None
+    key_generator: Optional[Callable] = None,
+    stale_ttl: int = 0
 ):
     """
     Decorator for automatic function result caching
     
+    Concurrent calls that miss the cache share one call of the function.
+    
     Args:
         ttl: Time to live in seconds
         cache_type: Cache type for key prefixing
         key_generator: Custom function to generate cache key
+        stale_ttl: Seconds an expired result may still be returned while it
+            is refreshed in the background
     """
     def decorator(func):
         async def wrapper(*args, **kwargs):
@@ -537,16 +1143,14 @@ def cached(
                 key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
                 cache_key = hashlib.md5(":".join(key_parts).encode()).hexdigest()
             
-            # Try to get from cache
-            result = await cache_manager.get(cache_key, cache_type=cache_type)
-            if result is not None:
-                return result
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await cache_manager.set(cache_key, result, ttl=ttl, cache_type=cache_type)
-            
-            return result
+            # Get from cache, or execute function (once per key) and cache result
+            return await cache_manager.get_or_load(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                cache_type=cache_type,
+                ttl=ttl,
+                stale_ttl=stale_ttl
+            )
         
         return wrapper
     return decorator
@@ -9,8 +9,11 @@ This package contains services related to dashboard functionality:
 """
 
 from .dashboard_service import DashboardService, dashboard_service
+from .rollup_service import AnalyticsRollupService, analytics_rollup_service
 
 __all__ = [
     'DashboardService',
-    'dashboard_service'
+    'dashboard_service',
+    'AnalyticsRollupService',
+    'analytics_rollup_service'
 ]
\ No newline at end of file
@@ -12,6 +12,7 @@ This service provides real-time dashboard data by integrating:
 Replaces mock API with actual data from the system.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
@@ -24,6 +25,7 @@ from app.core.database_service import database_service
 from app.services.monitoring.health_monitor import health_monitor
 from app.services.monitoring.performance_monitor import PerformanceMonitor
 from app.services.notifications.alert_system import alert_system
+from app.services.dashboard.rollup_service import analytics_rollup_service
 
 logger = logging.getLogger(__name__)
 
@@ -51,15 +53,17 @@ class DashboardService:
         logger.info(f"Getting dashboard overview for user {user_id}")
         
         try:
-            # Get all dashboard components in parallel
-            async with database_service.get_session() as db:
-                stats = await self.get_dashboard_stats(user_id, db)
-                analytics = await self.get_analytics_data(user_id, db)
-                activity = await self.get_recent_activity(user_id, db)
-                alerts = await self.get_alert_summary(user_id)
-                protection_metrics = await self.get_protection_metrics(user_id, db)
-                platform_distribution = await self.get_platform_distribution(user_id, db)
-                
+            # Independent widgets run concurrently, each on its own pooled session
+            stats_task = asyncio.create_task(self._run_with_session(self.get_dashboard_stats, user_id))
+            stats, analytics, activity, alerts, protection_metrics, platform_distribution = await asyncio.gather(
+                stats_task,
+                self._run_with_session(self.get_analytics_data, user_id),
+                self._run_with_session(self.get_recent_activity, user_id),
+                self.get_alert_summary(user_id),
+                self._get_protection_metrics_after(user_id, stats_task),
+                self._run_with_session(self.get_platform_distribution, user_id),
+            )
+            
             return {
                 "stats": stats,
                 "analytics": analytics,
@@ -75,6 +79,17 @@ class DashboardService:
             logger.error(f"Failed to get dashboard overview for user {user_id}: {e}")
             raise
     
+    async def _run_with_session(self, widget, user_id: int) -> Dict[str, Any]:
+        """Run a widget query on a dedicated session from the pool"""
+        async with database_service.get_session() as db:
+            return await widget(user_id, db)
+    
+    async def _get_protection_metrics_after(self, user_id: int, stats_task: "asyncio.Task") -> Dict[str, Any]:
+        """Compute protection metrics from the stats widget's result instead of re-querying it"""
+        stats = await stats_task
+        async with database_service.get_session() as db:
+            return await self.get_protection_metrics(user_id, db, stats=stats)
+    
     async def get_dashboard_stats(self, user_id: int, db: AsyncSession) -> Dict[str, Any]:
         """Get real-time dashboard statistics"""
         cache_key = f"dashboard_stats_{user_id}"
@@ -87,96 +102,53 @@ class DashboardService:
             # Current period (last 30 days)
             end_date = datetime.utcnow()
             start_date = end_date - timedelta(days=30)
-            previous_start = start_date - timedelta(days=30)
             
-            # Get profile count
-            # Note: Using text() for complex queries that may not map directly to models
+            # One pass per table; FILTER splits the counts by period and state
             profile_result = await db.execute(
-                text("SELECT COUNT(*) FROM profiles WHERE user_id = :user_id AND created_at >= :start_date"),
-                {"user_id": user_id, "start_date": start_date}
-            )
-            total_profiles = profile_result.scalar() or 0
-            
-            # Get active scans
-            scan_result = await db.execute(
                 text("""
-                SELECT COUNT(*) FROM scanning_jobs 
-                WHERE user_id = :user_id AND status IN ('running', 'pending') 
-                AND created_at >= :start_date
+                SELECT
+                    COUNT(*) FILTER (WHERE created_at >= :start_date),
+                    COUNT(*)
+                FROM profiles WHERE user_id = :user_id
                 """),
                 {"user_id": user_id, "start_date": start_date}
             )
-            active_scans = scan_result.scalar() or 0
+            total_profiles, total_user_profiles = profile_result.fetchone()
             
-            # Get infringements found
-            infringement_result = await db.execute(
+            scan_result = await db.execute(
                 text("""
-                SELECT COUNT(*) FROM infringements 
+                SELECT
+                    COUNT(*) FILTER (WHERE status IN ('running', 'pending')),
+                    COUNT(DISTINCT profile_id)
+                FROM scanning_jobs
                 WHERE user_id = :user_id AND created_at >= :start_date
                 """),
                 {"user_id": user_id, "start_date": start_date}
             )
-            infringements_found = infringement_result.scalar() or 0
+            active_scans, scanned_profiles = scan_result.fetchone()
             
-            # Get takedowns sent
-            takedown_result = await db.execute(
-                text("""
-                SELECT COUNT(*) FROM takedown_requests 
-                WHERE user_id = :user_id AND sent_at >= :start_date
-                """),
-                {"user_id": user_id, "start_date": start_date}
+            # Infringement and takedown counts come from the daily rollups
+            end_day = end_date.date()
+            current = await analytics_rollup_service.get_period_totals(
+                db, user_id, end_day - timedelta(days=29), end_day
             )
-            takedowns_sent = takedown_result.scalar() or 0
-            
-            # Get success rate (successful takedowns / total takedowns)
-            success_result = await db.execute(
-                text("""
-                SELECT COUNT(*) FROM takedown_requests 
-                WHERE user_id = :user_id AND sent_at >= :start_date 
-                AND status = 'successful'
-                """),
-                {"user_id": user_id, "start_date": start_date}
+            previous = await analytics_rollup_service.get_period_totals(
+                db, user_id, end_day - timedelta(days=59), end_day - timedelta(days=30)
             )
-            successful_takedowns = success_result.scalar() or 0
-            success_rate = (successful_takedowns / takedowns_sent * 100) if takedowns_sent > 0 else 0.0
+            infringements_found = current["infringements"]
+            takedowns_sent = current["takedowns"]
+            successful_takedowns = current["successful"]
+            prev_infringements = previous["infringements"]
+            prev_takedowns = previous["takedowns"]
             
-            # Get scan coverage (profiles with recent scans / total profiles)
-            coverage_result = await db.execute(
-                text("""
-                SELECT COUNT(DISTINCT profile_id) FROM scanning_jobs 
-                WHERE user_id = :user_id AND created_at >= :start_date
-                """),
-                {"user_id": user_id, "start_date": start_date}
-            )
-            scanned_profiles = coverage_result.scalar() or 0
+            # Success rate (successful takedowns / total takedowns)
+            success_rate = (successful_takedowns / takedowns_sent * 100) if takedowns_sent > 0 else 0.0
             
-            total_user_profiles = await db.execute(
-                text("SELECT COUNT(*) FROM profiles WHERE user_id = :user_id"),
-                {"user_id": user_id}
-            )
-            total_user_profiles = total_user_profiles.scalar() or 1
+            # Scan coverage (profiles with recent scans / total profiles)
             scan_coverage = (scanned_profiles / total_user_profiles * 100) if total_user_profiles > 0 else 0.0
             
-            # Calculate change percentages (compare with previous period)
-            prev_infringement_result = await db.execute(
-                text("""
-                SELECT COUNT(*) FROM infringements 
-                WHERE user_id = :user_id AND created_at >= :prev_start AND created_at < :start_date
-                """),
-                {"user_id": user_id, "prev_start": previous_start, "start_date": start_date}
-            )
-            prev_infringements = prev_infringement_result.scalar() or 0
-            
+            # Change percentages compared with the previous period
             infringements_change = self._calculate_percentage_change(prev_infringements, infringements_found)
-            
-            prev_takedown_result = await db.execute(
-                text("""
-                SELECT COUNT(*) FROM takedown_requests 
-                WHERE user_id = :user_id AND sent_at >= :prev_start AND sent_at < :start_date
-                """),
-                {"user_id": user_id, "prev_start": previous_start, "start_date": start_date}
-            )
-            prev_takedowns = prev_takedown_result.scalar() or 0
             takedowns_change = self._calculate_percentage_change(prev_takedowns, takedowns_sent)
             
             stats = {
@@ -232,80 +204,22 @@ class DashboardService:
             return self._cached_data[cache_key]
         
         try:
-            # Get data for the last 30 days
-            end_date = datetime.utcnow()
-            start_date = end_date - timedelta(days=30)
+            # Last 30 days including today, read from the daily rollups
+            end_day = datetime.utcnow().date()
+            start_day = end_day - timedelta(days=29)
+            
+            daily_data = await analytics_rollup_service.get_daily_series(db, user_id, start_day, end_day)
+            date_labels = [day["date"] for day in daily_data]
+            infringement_data = [day["infringements"] for day in daily_data]
+            takedown_data = [day["takedowns"] for day in daily_data]
+            removal_data = [day["removals"] for day in daily_data]
+            
+            # Platform distribution and success rates from the same breakdown
+            platform_rows = [
+                row for row in await analytics_rollup_service.get_platform_breakdown(db, user_id, start_day, end_day)
+                if row["infringements"] > 0
+            ]
             
-            # Get daily aggregated data
-            daily_data = []
-            date_labels = []
-            infringement_data = []
-            takedown_data = []
-            removal_data = []
-            
-            for i in range(30):
-                day = start_date + timedelta(days=i)
-                day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-                day_end = day_start + timedelta(days=1)
-                
-                # Count infringements for this day
-                inf_result = await db.execute(
-                    text("""
-                    SELECT COUNT(*) FROM infringements 
-                    WHERE user_id = :user_id AND created_at >= :day_start AND created_at < :day_end
-                    """),
-                    {"user_id": user_id, "day_start": day_start, "day_end": day_end}
-                )
-                infringements = inf_result.scalar() or 0
-                
-                # Count takedowns for this day
-                takedown_result = await db.execute(
-                    text("""
-                    SELECT COUNT(*) FROM takedown_requests 
-                    WHERE user_id = :user_id AND sent_at >= :day_start AND sent_at < :day_end
-                    """),
-                    {"user_id": user_id, "day_start": day_start, "day_end": day_end}
-                )
-                takedowns = takedown_result.scalar() or 0
-                
-                # Count successful removals for this day
-                removal_result = await db.execute(
-                    text("""
-                    SELECT COUNT(*) FROM takedown_requests 
-                    WHERE user_id = :user_id AND updated_at >= :day_start AND updated_at < :day_end
-                    AND status = 'successful'
-                    """),
-                    {"user_id": user_id, "day_start": day_start, "day_end": day_end}
-                )
-                removals = removal_result.scalar() or 0
-                
-                date_labels.append(day.strftime("%Y-%m-%d"))
-                infringement_data.append(infringements)
-                takedown_data.append(takedowns)
-                removal_data.append(removals)
-                
-                daily_data.append({
-                    "date": day.strftime("%Y-%m-%d"),
-                    "infringements": infringements,
-                    "takedowns": takedowns,
-                    "removals": removals
-                })
-            
-            # Get platform distribution
-            platform_result = await db.execute(
-                text("""
-                SELECT platform, COUNT(*) as count 
-                FROM infringements 
-                WHERE user_id = :user_id AND created_at >= :start_date
-                GROUP BY platform
-                ORDER BY count DESC
-                """),
-                {"user_id": user_id, "start_date": start_date}
-            )
-            platform_rows = platform_result.fetchall()
-            
-            platform_labels = []
-            platform_data = []
             platform_colors = {
                 "instagram": "#E1306C",
                 "tiktok": "#000000",
@@ -317,40 +231,13 @@ class DashboardService:
                 "default": "#6B7280"
             }
             
-            for row in platform_rows:
-                platform, count = row
-                platform_labels.append(platform.title() if platform else "Unknown")
-                platform_data.append(count)
+            platform_labels = [row["platform"].title() for row in platform_rows]
+            platform_data = [row["infringements"] for row in platform_rows]
+            success_rates = [round(row["success_rate"], 1) for row in platform_rows]
             
             # Get colors for platforms
             colors = [platform_colors.get(label.lower(), platform_colors["default"]) for label in platform_labels]
             
-            # Calculate success rates by platform
-            success_rates = []
-            for platform_label in platform_labels:
-                platform_lower = platform_label.lower()
-                
-                success_result = await db.execute(
-                    text("""
-                    SELECT 
-                        COUNT(CASE WHEN tr.status = 'successful' THEN 1 END) as successful,
-                        COUNT(*) as total
-                    FROM takedown_requests tr
-                    JOIN infringements i ON tr.infringement_id = i.id
-                    WHERE tr.user_id = :user_id AND tr.sent_at >= :start_date
-                    AND LOWER(i.platform) = :platform
-                    """),
-                    {"user_id": user_id, "start_date": start_date, "platform": platform_lower}
-                )
-                success_row = success_result.fetchone()
-                
-                if success_row and success_row[1] > 0:
-                    success_rate = (success_row[0] / success_row[1]) * 100
-                else:
-                    success_rate = 0.0
-                
-                success_rates.append(round(success_rate, 1))
-            
             analytics = {
                 "granularity": granularity,
                 "data": daily_data,
@@ -527,7 +414,12 @@ class DashboardService:
                 "timestamp": datetime.utcnow().isoformat()
             }
     
-    async def get_protection_metrics(self, user_id: int, db: AsyncSession) -> Dict[str, Any]:
+    async def get_protection_metrics(
+        self,
+        user_id: int,
+        db: AsyncSession,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Get protection effectiveness metrics"""
         try:
             end_date = datetime.utcnow()
@@ -546,7 +438,8 @@ class DashboardService:
             avg_response_hours = response_time_result.scalar() or 24.0
             
             # Calculate protection score (based on success rate, response time, coverage)
-            stats = await self.get_dashboard_stats(user_id, db)
+            if stats is None:
+                stats = await self.get_dashboard_stats(user_id, db)
             success_rate = stats.get("successRate", 0.0)
             scan_coverage = stats.get("scanCoverage", 0.0)
             
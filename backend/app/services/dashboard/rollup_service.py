@@ -0,0 +1,280 @@
+"""
+Daily Analytics Rollups for AutoDMCA
+
+Dashboards and analytics read per-user/day/platform/status counters from two
+rollup tables instead of re-counting the raw ``infringements`` and
+``takedown_requests`` tables on every request:
+
+- ``infringement_daily_rollups``: infringements by creation day and current status
+- ``takedown_daily_rollups``: takedowns by sent day and current status
+  (``sent_count``), plus successful takedowns by the day they were last
+  updated (``resolved_count``)
+
+Database triggers (migration ``005_analytics_rollups``) keep the counters
+current on insert, delete and status change, and move an infringement's
+takedowns when its platform changes or it is deleted. ``rebuild`` recomputes
+them from the raw tables and is safe to run repeatedly, e.g. after a bulk
+import or a restore that bypassed the triggers.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsRollupService:
+    """Reads and rebuilds the daily analytics rollup tables"""
+
+    async def get_period_totals(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        start_day: date,
+        end_day: date
+    ) -> Dict[str, int]:
+        """Infringement and takedown totals for [start_day, end_day]"""
+        result = await db.execute(
+            text("""
+            SELECT
+                (
+                    SELECT COALESCE(SUM(infringement_count), 0)
+                    FROM infringement_daily_rollups
+                    WHERE user_id = :user_id AND day BETWEEN :start_day AND :end_day
+                ),
+                COALESCE(SUM(sent_count), 0),
+                COALESCE(SUM(sent_count) FILTER (WHERE status = 'successful'), 0),
+                COALESCE(SUM(resolved_count), 0)
+            FROM takedown_daily_rollups
+            WHERE user_id = :user_id AND day BETWEEN :start_day AND :end_day
+            """),
+            {"user_id": user_id, "start_day": start_day, "end_day": end_day}
+        )
+        infringements, takedowns, successful, removals = result.fetchone()
+
+        return {
+            "infringements": int(infringements),
+            "takedowns": int(takedowns),
+            "successful": int(successful),
+            "removals": int(removals)
+        }
+
+    async def get_daily_series(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        start_day: date,
+        end_day: date
+    ) -> List[Dict[str, Any]]:
+        """Daily infringement, takedown and removal counts for [start_day, end_day]"""
+        infringement_result = await db.execute(
+            text("""
+            SELECT day, SUM(infringement_count)
+            FROM infringement_daily_rollups
+            WHERE user_id = :user_id AND day BETWEEN :start_day AND :end_day
+            GROUP BY day
+            """),
+            {"user_id": user_id, "start_day": start_day, "end_day": end_day}
+        )
+        infringements = dict(infringement_result.fetchall())
+
+        takedown_result = await db.execute(
+            text("""
+            SELECT day, SUM(sent_count), SUM(resolved_count)
+            FROM takedown_daily_rollups
+            WHERE user_id = :user_id AND day BETWEEN :start_day AND :end_day
+            GROUP BY day
+            """),
+            {"user_id": user_id, "start_day": start_day, "end_day": end_day}
+        )
+        takedowns = {day: (sent, resolved) for day, sent, resolved in takedown_result.fetchall()}
+
+        series = []
+        day = start_day
+        while day <= end_day:
+            sent, resolved = takedowns.get(day, (0, 0))
+            series.append({
+                "date": day.strftime("%Y-%m-%d"),
+                "infringements": int(infringements.get(day, 0)),
+                "takedowns": int(sent),
+                "removals": int(resolved)
+            })
+            day += timedelta(days=1)
+
+        return series
+
+    async def get_daily_scan_counts(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        start_day: date,
+        end_day: date
+    ) -> Dict[date, int]:
+        """Scans started per day in [start_day, end_day]
+
+        Scans are few per user and day, so they are counted from
+        ``scanning_jobs`` directly rather than rolled up.
+        """
+        result = await db.execute(
+            text("""
+            SELECT CAST(date_trunc('day', created_at) AS date) AS day, COUNT(*)
+            FROM scanning_jobs
+            WHERE user_id = :user_id AND created_at >= :start_at AND created_at < :end_at
+            GROUP BY day
+            """),
+            {
+                "user_id": user_id,
+                "start_at": datetime.combine(start_day, time.min),
+                "end_at": datetime.combine(end_day + timedelta(days=1), time.min)
+            }
+        )
+        return {day: int(count) for day, count in result.fetchall()}
+
+    async def get_platform_breakdown(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        start_day: date,
+        end_day: date
+    ) -> List[Dict[str, Any]]:
+        """Per-platform infringement and takedown totals, busiest platform first"""
+        result = await db.execute(
+            text("""
+            SELECT
+                platform,
+                SUM(infringements) AS infringements,
+                SUM(takedowns) AS takedowns,
+                SUM(successful) AS successful
+            FROM (
+                SELECT platform, infringement_count AS infringements, 0 AS takedowns, 0 AS successful
+                FROM infringement_daily_rollups
+                WHERE user_id = :user_id AND day BETWEEN :start_day AND :end_day
+                UNION ALL
+                SELECT platform, 0, sent_count, CASE WHEN status = 'successful' THEN sent_count ELSE 0 END
+                FROM takedown_daily_rollups
+                WHERE user_id = :user_id AND day BETWEEN :start_day AND :end_day
+            ) counts
+            GROUP BY platform
+            ORDER BY infringements DESC, platform
+            """),
+            {"user_id": user_id, "start_day": start_day, "end_day": end_day}
+        )
+
+        breakdown = []
+        for platform, infringements, takedowns, successful in result.fetchall():
+            breakdown.append({
+                "platform": platform,
+                "infringements": int(infringements),
+                "takedowns": int(takedowns),
+                "successful": int(successful),
+                "success_rate": (successful / takedowns * 100) if takedowns else 0.0
+            })
+
+        return breakdown
+
+    async def rebuild(
+        self,
+        db: AsyncSession,
+        user_id: Optional[int] = None,
+        since: Optional[date] = None
+    ) -> Dict[str, int]:
+        """
+        Recompute rollups from the raw tables.
+
+        Idempotent: the selected rows are deleted and re-aggregated in the
+        caller's transaction. Writes to the raw tables are blocked until it
+        commits so triggers cannot race the re-aggregation.
+
+        Args:
+            db: Session whose transaction the rebuild runs in
+            user_id: Only rebuild this user's counters
+            since: Only rebuild days on or after this date
+
+        Returns:
+            Number of rollup rows written per table
+        """
+        filters = ""
+        params: Dict[str, Any] = {}
+        if user_id is not None:
+            filters += " AND user_id = :user_id"
+            params["user_id"] = user_id
+        if since is not None:
+            filters += " AND day >= :since"
+            params["since"] = since
+
+        await db.execute(text("LOCK TABLE infringements, takedown_requests IN SHARE MODE"))
+
+        await db.execute(text(f"DELETE FROM infringement_daily_rollups WHERE TRUE{filters}"), params)
+        infringement_rows = await db.execute(
+            text(f"""
+            INSERT INTO infringement_daily_rollups (user_id, day, platform, status, infringement_count)
+            SELECT user_id, day, platform, status, COUNT(*)
+            FROM (
+                SELECT
+                    user_id,
+                    CAST(date_trunc('day', created_at) AS date) AS day,
+                    COALESCE(LOWER(platform), 'unknown') AS platform,
+                    COALESCE(CAST(status AS text), 'unknown') AS status
+                FROM infringements
+                WHERE created_at IS NOT NULL
+            ) i
+            WHERE TRUE{filters}
+            GROUP BY user_id, day, platform, status
+            """),
+            params
+        )
+
+        await db.execute(text(f"DELETE FROM takedown_daily_rollups WHERE TRUE{filters}"), params)
+        takedown_rows = await db.execute(
+            text(f"""
+            INSERT INTO takedown_daily_rollups (user_id, day, platform, status, sent_count, resolved_count)
+            SELECT user_id, day, platform, status, SUM(sent), SUM(resolved)
+            FROM (
+                SELECT
+                    tr.user_id,
+                    CAST(date_trunc('day', tr.sent_at) AS date) AS day,
+                    COALESCE(LOWER(i.platform), 'unknown') AS platform,
+                    COALESCE(CAST(tr.status AS text), 'unknown') AS status,
+                    1 AS sent,
+                    0 AS resolved
+                FROM takedown_requests tr
+                LEFT JOIN infringements i ON i.id = tr.infringement_id
+                WHERE tr.sent_at IS NOT NULL
+                UNION ALL
+                SELECT
+                    tr.user_id,
+                    CAST(date_trunc('day', tr.updated_at) AS date),
+                    COALESCE(LOWER(i.platform), 'unknown'),
+                    'successful',
+                    0,
+                    1
+                FROM takedown_requests tr
+                LEFT JOIN infringements i ON i.id = tr.infringement_id
+                WHERE CAST(tr.status AS text) = 'successful' AND tr.updated_at IS NOT NULL
+            ) t
+            WHERE TRUE{filters}
+            GROUP BY user_id, day, platform, status
+            """),
+            params
+        )
+
+        counts = {
+            "infringement_daily_rollups": infringement_rows.rowcount,
+            "takedown_daily_rollups": takedown_rows.rowcount
+        }
+        logger.info(f"Rebuilt analytics rollups (user_id={user_id}, since={since}): {counts}")
+        return counts
+
+
+# Global rollup service instance
+analytics_rollup_service = AnalyticsRollupService()
+
+
+__all__ = [
+    'AnalyticsRollupService',
+    'analytics_rollup_service'
+]
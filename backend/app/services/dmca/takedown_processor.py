@@ -14,7 +14,6 @@ import json
 import aiohttp
 from enum import Enum
 from dataclasses import dataclass
-import whois
 from urllib.parse import urlparse
 import dns.resolver
 import re
@@ -22,6 +21,12 @@ import re
 from app.core.config import settings
 from app.db.session import get_db
 
+try:
+    # Async RDAP/WHOIS client from the autodmca package, when it is installed alongside
+    from src.autodmca.services.whois_client import AsyncWHOISClient
+except ImportError:
+    AsyncWHOISClient = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -70,6 +75,9 @@ class DMCATakedownProcessor:
         # Cache for host provider lookups
         self.provider_cache = {}
         
+        # Registry lookups; without the autodmca package hosts are identified by DNS only
+        self.whois_client = AsyncWHOISClient() if AsyncWHOISClient else None
+        
         # Known host provider abuse contacts
         self.known_providers = {
             'cloudflare.com': 'abuse@cloudflare.com',
@@ -183,41 +191,34 @@ class DMCATakedownProcessor:
                     self.provider_cache[domain] = result
                     return result
                     
-            # WHOIS lookup for hosting provider
+            # WHOIS/RDAP lookup for hosting provider
             try:
-                w = whois.whois(domain)
-                
-                # Look for abuse email in WHOIS
-                abuse_email = None
+                w = None
+                if self.whois_client:
+                    w = await self.whois_client.lookup(self.whois_client.registrable_domain(domain) or domain)
                 
-                # Check various WHOIS fields
-                if hasattr(w, 'emails'):
-                    if isinstance(w.emails, list):
-                        for email in w.emails:
-                            if 'abuse' in email.lower():
+                if w:
+                    # Look for abuse email in WHOIS
+                    abuse_email = w.get('abuse_email')
+                    if not abuse_email:
+                        abuse_email = next(
+                            (email for email in w.get('emails', []) if 'abuse' in email.lower()), None
+                        )
+                    
+                    # If no abuse email, try registrar
+                    if not abuse_email and w.get('registrar'):
+                        registrar = w['registrar'].lower()
+                        for provider, email in self.known_providers.items():
+                            if provider in registrar:
                                 abuse_email = email
                                 break
-                    elif isinstance(w.emails, str) and 'abuse' in w.emails.lower():
-                        abuse_email = w.emails
-                        
-                # If no abuse email, try registrar
-                if not abuse_email and hasattr(w, 'registrar'):
-                    registrar = w.registrar.lower() if w.registrar else ''
-                    for provider, email in self.known_providers.items():
-                        if provider in registrar:
-                            abuse_email = email
-                            break
-                            
-                # Extract hosting provider name
-                provider_name = 'unknown'
-                if hasattr(w, 'org'):
-                    provider_name = w.org or 'unknown'
-                elif hasattr(w, 'registrar'):
-                    provider_name = w.registrar or 'unknown'
                     
-                result = (provider_name, abuse_email or '')
-                self.provider_cache[domain] = result
-                return result
+                    # Extract hosting provider name
+                    provider_name = w.get('org') or w.get('registrar') or 'unknown'
+                    
+                    result = (provider_name, abuse_email or '')
+                    self.provider_cache[domain] = result
+                    return result
                 
             except Exception as e:
                 logger.error(f"WHOIS lookup failed for {domain}: {e}")
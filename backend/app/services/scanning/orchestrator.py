@@ -26,6 +26,93 @@ from app.api.websocket import notify_scan_progress, notify_infringement_found
 logger = logging.getLogger(__name__)
 
 
+# Scan queue keys. Claimed scans move from the pending sorted set to a lease
+# set scored by deadline (ms); expired leases are put back on the queue.
+SCAN_QUEUE_KEY = "scan_queue"
+SCAN_LEASES_KEY = "scan_queue:leases"
+SCAN_OWNERS_KEY = "scan_queue:owners"
+SCAN_SCORES_KEY = "scan_queue:scores"
+SCAN_ATTEMPTS_KEY = "scan_queue:attempts"
+SCAN_SIGNAL_KEY = "scan_queue:signal"
+SCAN_SIGNAL_MAX = 1024
+
+_SCAN_QUEUE_KEYS = [
+    SCAN_QUEUE_KEY, SCAN_LEASES_KEY, SCAN_OWNERS_KEY,
+    SCAN_SCORES_KEY, SCAN_ATTEMPTS_KEY, SCAN_SIGNAL_KEY
+]
+
+
+# Add a scan and wake one idle worker (blocked in BLPOP on the signal list)
+_ENQUEUE_SCAN_SCRIPT = """
+redis.call('zadd', KEYS[1], ARGV[2], ARGV[1])
+redis.call('lpush', KEYS[6], 1)
+redis.call('ltrim', KEYS[6], 0, tonumber(ARGV[3]) - 1)
+return 1
+"""
+
+
+# Requeue expired leases, then pop up to ARGV[3] scans and lease them to ARGV[1].
+# Returns a flat list of scan_id, attempt pairs.
+_CLAIM_SCANS_SCRIPT = """
+local t = redis.call('time')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local expired = redis.call('zrangebyscore', KEYS[2], '-inf', now, 'LIMIT', 0, tonumber(ARGV[4]))
+for _, id in ipairs(expired) do
+    redis.call('zadd', KEYS[1], redis.call('hget', KEYS[4], id) or 0, id)
+    redis.call('zrem', KEYS[2], id)
+    redis.call('hdel', KEYS[3], id)
+    redis.call('lpush', KEYS[6], 1)
+end
+if #expired > 0 then
+    redis.call('ltrim', KEYS[6], 0, tonumber(ARGV[5]) - 1)
+end
+local popped = redis.call('zpopmax', KEYS[1], tonumber(ARGV[3]))
+local claimed = {}
+for i = 1, #popped, 2 do
+    local id = popped[i]
+    redis.call('zadd', KEYS[2], now + tonumber(ARGV[2]), id)
+    redis.call('hset', KEYS[3], id, ARGV[1])
+    redis.call('hset', KEYS[4], id, popped[i + 1])
+    table.insert(claimed, id)
+    table.insert(claimed, redis.call('hincrby', KEYS[5], id, 1))
+end
+return claimed
+"""
+
+
+# Extend a lease if ARGV[2] still owns it
+_HEARTBEAT_SCAN_SCRIPT = """
+if redis.call('hget', KEYS[3], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+local t = redis.call('time')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('zadd', KEYS[2], 'XX', now + tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+
+# Finish a scan (ARGV[3] == '0') or hand it straight back to the queue
+# without counting the attempt (ARGV[3] == '1'); only the lease owner may do either
+_SETTLE_SCAN_SCRIPT = """
+if redis.call('hget', KEYS[3], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('zrem', KEYS[2], ARGV[1])
+redis.call('hdel', KEYS[3], ARGV[1])
+if ARGV[3] == '1' then
+    redis.call('zadd', KEYS[1], redis.call('hget', KEYS[4], ARGV[1]) or 0, ARGV[1])
+    redis.call('hincrby', KEYS[5], ARGV[1], -1)
+    redis.call('lpush', KEYS[6], 1)
+    redis.call('ltrim', KEYS[6], 0, tonumber(ARGV[4]) - 1)
+else
+    redis.call('hdel', KEYS[4], ARGV[1])
+    redis.call('hdel', KEYS[5], ARGV[1])
+end
+return 1
+"""
+
+
 class ScanPriority(str, Enum):
     """Scan priority levels"""
     LOW = "low"
@@ -114,6 +201,16 @@ class ScanningOrchestrator:
         self.max_scan_duration = timedelta(hours=4)
         self.new_user_scan_timeout = timedelta(hours=2)
         
+        # Scan queue leases: a claimed scan is requeued if its worker stops
+        # heartbeating (crash, OOM kill, deploy) for lease_seconds
+        self.scan_lease_seconds = getattr(settings, 'SCAN_QUEUE_LEASE_SECONDS', 120)
+        self.scan_heartbeat_seconds = getattr(settings, 'SCAN_QUEUE_HEARTBEAT_SECONDS', 30)
+        self.scan_idle_wait_seconds = getattr(settings, 'SCAN_QUEUE_IDLE_WAIT_SECONDS', 10)
+        self.scan_claim_batch_size = getattr(settings, 'SCAN_QUEUE_CLAIM_BATCH', 1)
+        self.scan_max_attempts = getattr(settings, 'SCAN_QUEUE_MAX_ATTEMPTS', 3)
+        self.scan_reap_limit = 100
+        self.node_id = uuid.uuid4().hex
+        
         # Thread pool for CPU-intensive tasks
         self.thread_pool = ThreadPoolExecutor(max_workers=10)
         
@@ -358,9 +455,9 @@ class ScanningOrchestrator:
             
             # Add to priority queue
             priority_score = self._calculate_priority_score(scan_request)
-            await self.redis_client.zadd(
-                "scan_queue",
-                {scan_request.scan_id: priority_score}
+            await self.redis_client.eval(
+                _ENQUEUE_SCAN_SCRIPT, len(_SCAN_QUEUE_KEYS), *_SCAN_QUEUE_KEYS,
+                scan_request.scan_id, priority_score, SCAN_SIGNAL_MAX
             )
             
             # Set expiration if specified
@@ -395,42 +492,84 @@ class ScanningOrchestrator:
         
         return score
     
+    async def claim_scans(self, owner: str, count: int = 1) -> List[tuple]:
+        """
+        Lease up to ``count`` of the highest priority scans to ``owner``.
+        Returns (scan_id, attempt) pairs; expired leases are requeued first.
+        """
+        claimed = await self.redis_client.eval(
+            _CLAIM_SCANS_SCRIPT, len(_SCAN_QUEUE_KEYS), *_SCAN_QUEUE_KEYS,
+            owner, int(self.scan_lease_seconds * 1000), count,
+            self.scan_reap_limit, SCAN_SIGNAL_MAX
+        )
+        return [(claimed[i], int(claimed[i + 1])) for i in range(0, len(claimed), 2)]
+    
+    async def _settle_scan(self, scan_id: str, owner: str, requeue: bool = False) -> bool:
+        """Acknowledge a finished scan, or requeue it (e.g. on shutdown)"""
+        settled = await self.redis_client.eval(
+            _SETTLE_SCAN_SCRIPT, len(_SCAN_QUEUE_KEYS), *_SCAN_QUEUE_KEYS,
+            scan_id, owner, "1" if requeue else "0", SCAN_SIGNAL_MAX
+        )
+        if not settled:
+            logger.warning(f"Lease for scan {scan_id} was lost before it was settled")
+        return bool(settled)
+    
+    async def _heartbeat_lease(self, scan_id: str, owner: str):
+        """Keep extending a scan's lease while it runs"""
+        while True:
+            await asyncio.sleep(self.scan_heartbeat_seconds)
+            try:
+                renewed = await self.redis_client.eval(
+                    _HEARTBEAT_SCAN_SCRIPT, len(_SCAN_QUEUE_KEYS), *_SCAN_QUEUE_KEYS,
+                    scan_id, owner, int(self.scan_lease_seconds * 1000)
+                )
+            except Exception as e:
+                logger.error(f"Lease heartbeat failed for scan {scan_id}: {e}")
+                continue
+            
+            if not renewed:
+                logger.warning(f"Lease for scan {scan_id} expired; it may be re-run by another worker")
+                return
+    
+    async def _fail_scan(self, scan_id: str, owner: str, error: str):
+        """Mark a scan failed and drop it from the queue without running it"""
+        await self.redis_client.hset(f"scan:{scan_id}", mapping={
+            "status": "failed",
+            "error": error
+        })
+        await self._settle_scan(scan_id, owner)
+    
+    def _load_scan_request(self, scan_data_raw: str) -> ScanRequest:
+        """Deserialize a queued scan request"""
+        scan_dict = json.loads(scan_data_raw)
+        scan_dict["priority"] = ScanPriority(scan_dict["priority"])
+        scan_dict["scope"] = ScanScope(scan_dict["scope"])
+        return ScanRequest(**scan_dict)
+    
     async def _scan_worker(self, worker_id: int):
         """Worker process to execute scan requests"""
         logger.info(f"Scan worker {worker_id} started")
+        owner = f"{self.node_id}:{worker_id}"
         
         while True:
             try:
-                # Get highest priority scan from queue
-                scan_data = await self.redis_client.zpopmax("scan_queue")
-                
-                if not scan_data:
-                    # No scans available, wait
-                    await asyncio.sleep(5)
-                    continue
-                
-                scan_id, priority_score = scan_data[0]
+                # Lease the highest priority scan(s) from the queue
+                claimed = await self.claim_scans(owner, self.scan_claim_batch_size)
                 
-                # Load scan request data
-                scan_data_raw = await self.redis_client.hget(f"scan:{scan_id}", "data")
-                if not scan_data_raw:
-                    logger.warning(f"Scan data not found for {scan_id}")
+                if not claimed:
+                    # Block until a scan is queued; the timeout bounds how long
+                    # expired leases wait to be requeued when every worker is idle
+                    await self.redis_client.blpop(SCAN_SIGNAL_KEY, timeout=self.scan_idle_wait_seconds)
                     continue
                 
-                # Deserialize scan request
-                scan_dict = json.loads(scan_data_raw)
-                scan_request = ScanRequest(**scan_dict)
+                results = await asyncio.gather(*[
+                    self._run_claimed_scan(scan_id, attempt, owner, worker_id)
+                    for scan_id, attempt in claimed
+                ], return_exceptions=True)
                 
-                # Check if scan has expired
-                if (scan_request.expires_at and 
-                    datetime.fromisoformat(scan_request.expires_at.replace('Z', '+00:00')) < datetime.utcnow()):
-                    logger.info(f"Scan {scan_id} expired, skipping")
-                    await self._cleanup_scan(scan_id)
-                    continue
-                
-                # Execute the scan
-                logger.info(f"Worker {worker_id} executing scan {scan_id}")
-                await self._execute_scan(scan_request, worker_id)
+                for (scan_id, _), result in zip(claimed, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Scan worker {worker_id} failed to run scan {scan_id}: {result}")
                 
             except asyncio.CancelledError:
                 break
@@ -438,6 +577,51 @@ class ScanningOrchestrator:
                 logger.error(f"Scan worker {worker_id} error: {e}")
                 await asyncio.sleep(1)
     
+    async def _run_claimed_scan(self, scan_id: str, attempt: int, owner: str, worker_id: int):
+        """Execute one leased scan and settle its lease"""
+        if attempt > self.scan_max_attempts:
+            logger.error(f"Scan {scan_id} abandoned after {attempt - 1} attempts")
+            await self._fail_scan(scan_id, owner, f"Scan did not complete after {attempt - 1} attempts")
+            return
+        
+        # Load scan request data
+        scan_data_raw = await self.redis_client.hget(f"scan:{scan_id}", "data")
+        if not scan_data_raw:
+            logger.warning(f"Scan data not found for {scan_id}")
+            await self._settle_scan(scan_id, owner)
+            return
+        
+        try:
+            scan_request = self._load_scan_request(scan_data_raw)
+        except (ValueError, TypeError, KeyError) as e:
+            # Retrying cannot fix a payload that does not decode
+            logger.error(f"Scan {scan_id} has an unreadable request: {e}")
+            await self._fail_scan(scan_id, owner, f"Unreadable scan request: {e}")
+            return
+        
+        # Check if scan has expired
+        if (scan_request.expires_at and 
+            datetime.fromisoformat(scan_request.expires_at.replace('Z', '+00:00')) < datetime.utcnow()):
+            logger.info(f"Scan {scan_id} expired, skipping")
+            await self._cleanup_scan(scan_id)
+            await self._settle_scan(scan_id, owner)
+            return
+        
+        # Execute the scan. _execute_scan records scan errors itself, so a failed scan is
+        # settled, not retried; only a crash before settling lets the lease expire and re-run it
+        logger.info(f"Worker {worker_id} executing scan {scan_id} (attempt {attempt})")
+        heartbeat = asyncio.create_task(self._heartbeat_lease(scan_id, owner))
+        try:
+            await self._execute_scan(scan_request, worker_id)
+        except asyncio.CancelledError:
+            # Shutting down: hand the scan back instead of waiting for the lease to expire
+            await self._settle_scan(scan_id, owner, requeue=True)
+            raise
+        finally:
+            heartbeat.cancel()
+        
+        await self._settle_scan(scan_id, owner)
+    
     async def _execute_scan(self, scan_request: ScanRequest, worker_id: int):
         """Execute comprehensive scan across platforms and regions"""
         scan_id = scan_request.scan_id
@@ -904,11 +1088,13 @@ class ScanningOrchestrator:
     async def get_orchestrator_stats(self) -> Dict[str, Any]:
         """Get orchestrator statistics"""
         try:
-            queue_size = await self.redis_client.zcard("scan_queue")
+            queue_size = await self.redis_client.zcard(SCAN_QUEUE_KEY)
+            leased_scans = await self.redis_client.zcard(SCAN_LEASES_KEY)
             
             return {
                 "active_scans": len(self.active_scans),
                 "queue_size": queue_size,
+                "leased_scans": leased_scans,
                 "total_regions": len(self.scan_regions),
                 "active_regions": len([r for r in self.scan_regions.values() if r.active]),
                 "total_platforms": len(self.platform_configs),
@@ -101,6 +101,7 @@ class SocialMediaSettings(BaseSettings):
     face_detection_model: str = "hog"  # or "cnn"
     max_faces_per_image: int = 10
     face_encoding_dimensions: int = 128
+    face_match_min_response_ms: int = 10  # timing-attack padding, applied once per response
     
     # Image Processing
     max_image_size_mb: int = 10
@@ -108,6 +109,7 @@ class SocialMediaSettings(BaseSettings):
         default_factory=lambda: {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".avif"}
     )
     image_similarity_threshold: float = 0.85
+    image_download_concurrency: int = 8
     
     # Profile Analysis
     profile_similarity_threshold: float = 0.75
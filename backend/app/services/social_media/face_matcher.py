@@ -3,11 +3,14 @@ Face matching and image similarity detection for social media profiles.
 """
 
 import asyncio
+import ctypes
+import ctypes.util
 import io
 import hashlib
 import json
 import base64
 import secrets
+import time
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple, Union, TYPE_CHECKING
 from cryptography.fernet import Fernet
@@ -43,9 +46,11 @@ except ImportError:
 from PIL import Image
 try:
     import imagehash as ImageHash
+    from app.services.ai.multi_hash import MultiHashEngine
     IMAGEHASH_AVAILABLE = True
 except ImportError:
     ImageHash = None
+    MultiHashEngine = None
     IMAGEHASH_AVAILABLE = False
 
 import structlog
@@ -95,6 +100,14 @@ class ImageMatch:
             self.metadata = {}
 
 
+@dataclass
+class PreparedImage:
+    """An image decoded once for batch comparison: its hashes and SSIM input."""
+    image_hash: str  # same combined format as ImageProcessor.compute_image_hash
+    hash_chars: "np.ndarray"  # (3, hash_length) uint8 hex digits of the three hashes
+    ssim_gray: Optional["np.ndarray"] = None  # grayscale thumbnail for SSIM
+
+
 class BiometricDataProtection:
     """GDPR-compliant biometric data protection with encryption."""
     
@@ -136,6 +149,25 @@ class BiometricDataProtection:
             logger.error("Face encoding decryption error", error=str(e))
             raise
     
+    def decrypt_reference_matrix(self, encrypted_encodings: List[str]) -> "DecryptedReferenceMatrix":
+        """Decrypt reference encodings once into a matrix for vectorized matching.
+        
+        References that fail to decrypt are skipped. Release the result (or
+        use it as a context manager) as soon as matching is done.
+        """
+        rows = []
+        kept = []
+        for encrypted_encoding in encrypted_encodings:
+            try:
+                rows.append(self.decrypt_face_encoding(encrypted_encoding))
+                kept.append(encrypted_encoding)
+            except Exception as e:
+                logger.warning("Skipping undecryptable reference encoding", error=str(e))
+        
+        matrix = DecryptedReferenceMatrix(rows, kept)
+        rows.clear()
+        return matrix
+    
     def check_retention_policy(self, retention_expires: datetime) -> bool:
         """Check if biometric data should be deleted per retention policy."""
         return datetime.utcnow() > retention_expires
@@ -154,6 +186,91 @@ class BiometricDataProtection:
         }
 
 
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        except (OSError, TypeError):
+            _libc = False
+    return _libc or None
+
+
+class DecryptedReferenceMatrix:
+    """Plaintext reference face encodings for one matching session.
+    
+    The encodings live in a single float64 matrix that is mlock()ed where the
+    platform allows it (so it is not swapped to disk) and overwritten with
+    zeros on release. Intermediate plaintext produced while decrypting
+    (JSON bytes and Python floats) cannot be wiped and is left to the
+    garbage collector.
+    """
+    
+    def __init__(self, encodings: List[List[float]], encrypted_encodings: List[str]):
+        self.encrypted_encodings = list(encrypted_encodings)
+        dimensions = len(encodings[0]) if encodings else 0
+        self._matrix = np.zeros((len(encodings), dimensions), dtype=np.float64)
+        self._released = False
+        self._locked = self._lock()
+        for row, encoding in enumerate(encodings):
+            self._matrix[row] = encoding
+    
+    def __len__(self) -> int:
+        return 0 if self._released else self._matrix.shape[0]
+    
+    def __enter__(self) -> "DecryptedReferenceMatrix":
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        self.release()
+    
+    def __del__(self):
+        self.release()
+    
+    @property
+    def matrix(self) -> "np.ndarray":
+        if self._released:
+            raise ValueError("Reference matrix has been released")
+        return self._matrix
+    
+    def _lock(self) -> bool:
+        libc = _get_libc()
+        if libc is None or not self._matrix.nbytes:
+            return False
+        address = ctypes.c_void_p(self._matrix.ctypes.data)
+        if libc.mlock(address, ctypes.c_size_t(self._matrix.nbytes)) != 0:
+            logger.debug("mlock failed for reference matrix", errno=ctypes.get_errno())
+            return False
+        return True
+    
+    def release(self):
+        """Zero the plaintext encodings and unlock their memory."""
+        if getattr(self, "_released", True):
+            return
+        self._matrix.fill(0.0)
+        if self._locked:
+            _get_libc().munlock(
+                ctypes.c_void_p(self._matrix.ctypes.data), ctypes.c_size_t(self._matrix.nbytes)
+            )
+            self._locked = False
+        self._released = True
+    
+    def best_matches(self, candidate_encodings: List["np.ndarray"]) -> List[Tuple[int, float]]:
+        """Closest reference ``(row, distance)`` for each candidate, in one vectorized pass."""
+        if not candidate_encodings or not len(self):
+            return []
+        
+        candidates = np.asarray(candidate_encodings, dtype=np.float64)
+        # Same Euclidean distance as face_recognition.face_distance, for every pair at once
+        distances = np.linalg.norm(candidates[:, None, :] - self.matrix[None, :, :], axis=2)
+        best_rows = np.argmin(distances, axis=1)
+        best_distances = distances[np.arange(len(candidates)), best_rows]
+        return [(int(row), float(distance)) for row, distance in zip(best_rows, best_distances)]
+
+
 class ImageProcessor:
     """Handles secure image processing operations with input validation."""
     
@@ -335,6 +452,58 @@ class ImageProcessor:
             logger.error("Image hashing error", error=str(e))
             return None
     
+    def prepare_image(self, image_data: bytes, hash_size: int = 8) -> Optional[PreparedImage]:
+        """Prepare an image once and derive everything batch comparison needs.
+        
+        Produces the same hashes as ``compute_image_hash`` and the same SSIM
+        input as ``compute_structural_similarity``.
+        """
+        try:
+            image = Image.open(io.BytesIO(image_data))
+            image.load()
+            
+            hashes = MultiHashEngine(hash_size=hash_size).hash_image(
+                image, ('ahash', 'phash', 'dhash')
+            )
+            parts = [hashes['ahash'], hashes['phash'], hashes['dhash']]
+            
+            # The SSIM thumbnail comes from a fresh, unloaded decode: thumbnailing
+            # that lets JPEG draft mode scale down while decoding, exactly as
+            # compute_structural_similarity does, and costs a fraction of a full decode
+            ssim_gray = None
+            try:
+                rgb = self.preprocess_image(image_data, (256, 256))
+                if rgb is not None:
+                    ssim_gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+            except Exception as e:
+                logger.warning("SSIM preprocessing error", error=str(e))
+            
+            return PreparedImage(
+                image_hash="_".join(parts),
+                hash_chars=np.frombuffer("".join(parts).encode(), dtype=np.uint8).reshape(3, -1),
+                ssim_gray=ssim_gray
+            )
+        except Exception as e:
+            logger.error("Image preparation error", error=str(e))
+            return None
+    
+    def structural_similarity_gray(self, img1_gray: "np.ndarray", img2_gray: "np.ndarray") -> Optional[float]:
+        """SSIM between two grayscale thumbnails (as built by ``prepare_image``)."""
+        try:
+            from skimage.metrics import structural_similarity as ssim
+            
+            # Resize to same dimensions if needed
+            if img1_gray.shape != img2_gray.shape:
+                min_height = min(img1_gray.shape[0], img2_gray.shape[0])
+                min_width = min(img1_gray.shape[1], img2_gray.shape[1])
+                img1_gray = cv2.resize(img1_gray, (min_width, min_height))
+                img2_gray = cv2.resize(img2_gray, (min_width, min_height))
+            
+            return float(ssim(img1_gray, img2_gray))
+        except Exception as e:
+            logger.error("SSIM computation error", error=str(e))
+            return None
+    
     def compute_structural_similarity(self, image1_data: bytes, image2_data: bytes) -> Optional[float]:
         """Compute structural similarity index (SSIM) between two images."""
         try:
@@ -376,6 +545,8 @@ class FaceMatcher:
         self.tolerance = settings.face_recognition_tolerance
         self.detection_model = settings.face_detection_model
         self.max_faces = settings.max_faces_per_image
+        self.min_response_time = settings.face_match_min_response_ms / 1000
+        self.download_concurrency = max(1, settings.image_download_concurrency)
         
         # Security: Track consent and data retention
         self.consent_records = {}
@@ -436,12 +607,17 @@ class FaceMatcher:
     
     async def compare_faces(
         self, 
-        reference_encodings: List[str],  # Now expects encrypted encodings
+        reference_encodings: Union[List[str], DecryptedReferenceMatrix],  # Encrypted encodings
         candidate_image_data: bytes,
         user_id: str,
         consent_purpose: str = "content_matching"
     ) -> List[FaceMatch]:
-        """Compare encrypted reference face encodings with faces in candidate image."""
+        """Compare encrypted reference face encodings with faces in candidate image.
+        
+        ``reference_encodings`` may be a list of encrypted encodings, which is
+        decrypted for this call only, or a matrix the caller decrypted once
+        for several comparisons.
+        """
         if not reference_encodings or not candidate_image_data:
             return []
         
@@ -451,53 +627,41 @@ class FaceMatcher:
         )
         self.consent_records[user_id] = consent_record
         
+        start_time = time.monotonic()
+        
         # Extract faces from candidate image
         candidate_faces = await self.extract_face_encodings(candidate_image_data)
         if not candidate_faces:
             return []
         
+        if isinstance(reference_encodings, DecryptedReferenceMatrix):
+            matches = self._match_candidate_faces(reference_encodings, candidate_faces)
+        else:
+            with self.biometric_protection.decrypt_reference_matrix(reference_encodings) as references:
+                matches = self._match_candidate_faces(references, candidate_faces)
+        
+        await self._pad_response_time(start_time)
+        return matches
+    
+    def _match_candidate_faces(
+        self,
+        references: DecryptedReferenceMatrix,
+        candidate_faces: List[Tuple["np.ndarray", Tuple[int, int, int, int]]]
+    ) -> List[FaceMatch]:
+        """Best reference match for every candidate face, above tolerance, best first."""
         matches = []
         
-        for candidate_encoding, bounding_box in candidate_faces:
-            best_match = None
-            best_similarity = 0.0
-            
-            for encrypted_ref_encoding in reference_encodings:
-                try:
-                    # Security: Decrypt reference encoding
-                    ref_encoding = self.biometric_protection.decrypt_face_encoding(
-                        encrypted_ref_encoding
-                    )
-                    
-                    # Convert to numpy arrays
-                    ref_array = np.array(ref_encoding)
-                    candidate_array = np.array(candidate_encoding)
-                    
-                    # Compute face distance (lower is better) with timing attack protection
-                    import time
-                    start_time = time.time()
-                    distance = face_recognition.face_distance([ref_array], candidate_array)[0]
-                    
-                    # Normalize timing to prevent timing attacks
-                    elapsed = time.time() - start_time
-                    if elapsed < 0.01:  # Minimum processing time
-                        await asyncio.sleep(0.01 - elapsed)
-                    
-                    # Convert distance to similarity score (0-1, higher is better)
-                    similarity = 1.0 - distance
-                    
-                    if similarity > best_similarity:
-                        best_similarity = similarity
-                        best_match = {
-                            'encrypted_reference_encoding': encrypted_ref_encoding,
-                            'distance': distance
-                        }
-                
-                except Exception as e:
-                    logger.warning("Face comparison error", error=str(e))
-                    continue
+        try:
+            best_matches = references.best_matches([encoding for encoding, _ in candidate_faces])
+        except Exception as e:
+            logger.warning("Face comparison error", error=str(e))
+            return []
+        
+        for (candidate_encoding, bounding_box), (row, distance) in zip(candidate_faces, best_matches):
+            # Convert distance to similarity score (0-1, higher is better)
+            best_similarity = 1.0 - distance
             
-            if best_match and best_similarity >= (1.0 - self.tolerance):
+            if best_similarity > 0.0 and best_similarity >= (1.0 - self.tolerance):
                 confidence_level = self._determine_confidence_level(best_similarity)
                 
                 # Security: Encrypt candidate face encoding before storing
@@ -510,7 +674,10 @@ class FaceMatcher:
                     confidence_level=confidence_level,
                     encrypted_face_encoding=encrypted_candidate,
                     bounding_box=bounding_box,
-                    metadata=best_match,
+                    metadata={
+                        'encrypted_reference_encoding': references.encrypted_encodings[row],
+                        'distance': distance
+                    },
                     consent_timestamp=datetime.utcnow(),
                     retention_expires=datetime.utcnow() + timedelta(days=self.retention_policy_days)
                 )
@@ -521,6 +688,13 @@ class FaceMatcher:
         
         return matches
     
+    async def _pad_response_time(self, start_time: float):
+        """Security: Pad a whole response to a minimum duration to blunt timing attacks."""
+        elapsed = time.monotonic() - start_time
+        minimum = self.min_response_time
+        if elapsed < minimum:
+            await asyncio.sleep(minimum - elapsed)
+    
     def _determine_confidence_level(self, similarity_score: float) -> str:
         """Determine confidence level based on similarity score."""
         if similarity_score >= 0.95:
@@ -544,49 +718,58 @@ class FaceMatcher:
         )
         self.consent_records[f"{user_id}_batch"] = consent_record
         
-        # Extract and encrypt reference face encodings
-        reference_encodings = []
+        start_time = time.monotonic()
+        download_slots = asyncio.Semaphore(self.download_concurrency)
         
-        for image_url in reference_profile_images:
-            image_data = await self.image_processor.download_image(image_url)
-            if image_data:
-                faces = await self.extract_face_encodings(image_data)
-                for encoding, _ in faces:
-                    # Security: Encrypt face encoding before storage
-                    encrypted_encoding = self.biometric_protection.encrypt_face_encoding(
-                        encoding.tolist()
-                    )
-                    reference_encodings.append(encrypted_encoding)
+        async def extract_faces(image_url: str) -> List[Tuple["np.ndarray", Tuple[int, int, int, int]]]:
+            async with download_slots:
+                image_data = await self.image_processor.download_image(image_url)
+            if not image_data:
+                return []
+            return await self.extract_face_encodings(image_data)
+        
+        # Extract reference face encodings (downloaded concurrently)
+        reference_rows = []
+        reference_encodings = []
+        for faces in await asyncio.gather(*[extract_faces(url) for url in reference_profile_images]):
+            for encoding, _ in faces:
+                # Security: Only the encrypted form leaves this method
+                reference_encodings.append(
+                    self.biometric_protection.encrypt_face_encoding(encoding.tolist())
+                )
+                reference_rows.append(encoding)
         
         if not reference_encodings:
             logger.warning("No reference face encodings found")
             return {}
         
-        # Compare against candidate profiles with rate limiting
+        references = DecryptedReferenceMatrix(reference_rows, reference_encodings)
+        reference_rows.clear()
+        
+        # Security: Limit batch processing
+        max_batch_size = 50
+        candidates = [c for c in candidate_profiles[:max_batch_size] if c.profile_image_url]
+        
+        self.consent_records[user_id] = self.biometric_protection.generate_consent_record(
+            user_id, consent_purpose
+        )
+        
+        # Download and extract candidates concurrently; downloads are capped by the semaphore
         results = {}
-        processed_count = 0
-        max_batch_size = 50  # Security: Limit batch processing
-        
-        for candidate in candidate_profiles[:max_batch_size]:
-            if not candidate.profile_image_url:
-                continue
-            
-            candidate_image_data = await self.image_processor.download_image(candidate.profile_image_url)
-            if candidate_image_data:
-                matches = await self.compare_faces(
-                    reference_encodings, 
-                    candidate_image_data,
-                    user_id,
-                    consent_purpose
-                )
+        try:
+            candidate_faces = await asyncio.gather(
+                *[extract_faces(candidate.profile_image_url) for candidate in candidates]
+            )
+            for candidate, faces in zip(candidates, candidate_faces):
+                if not faces:
+                    continue
+                matches = self._match_candidate_faces(references, faces)
                 if matches:
                     results[candidate.username] = matches
-            
-            processed_count += 1
-            # Security: Rate limiting between requests
-            if processed_count % 10 == 0:
-                await asyncio.sleep(0.1)
+        finally:
+            references.release()
         
+        await self._pad_response_time(start_time)
         return results
     
     def cleanup_expired_data(self) -> int:
@@ -704,31 +887,103 @@ class ImageSimilarityMatcher:
         else:
             return "low"
     
-    async def batch_compare_images(self, reference_urls: List[str], candidate_urls: List[str]) -> Dict[str, Dict[str, ImageMatch]]:
-        """Batch compare reference images against candidate images."""
-        results = {}
+    async def batch_compare_images(
+        self,
+        reference_urls: List[str],
+        candidate_urls: List[str],
+        min_hash_similarity: Optional[float] = None
+    ) -> Dict[str, Dict[str, ImageMatch]]:
+        """Batch compare reference images against candidate images.
+        
+        Each image is downloaded (concurrently, up to ``image_download_concurrency``
+        at a time), decoded and hashed once. Hash similarity for every pair comes
+        from one vectorized comparison, and SSIM only runs for pairs whose hash
+        similarity reaches ``min_hash_similarity``. By default that is the lowest
+        hash similarity that could still reach ``image_similarity_threshold``
+        with a perfect SSIM. Pairs below it are left out of the result rather
+        than reported with a hash-only score that ``compare_images`` would not
+        give them; pass ``min_hash_similarity=0`` to score every pair.
+        """
+        if min_hash_similarity is None:
+            # combined = 0.4 * hash + 0.6 * ssim, and ssim <= 1
+            min_hash_similarity = (self.similarity_threshold - 0.6) / 0.4
+        
+        download_slots = asyncio.Semaphore(max(1, self.settings.image_download_concurrency))
+        loop = asyncio.get_running_loop()
         
-        # Download all images
-        reference_images = {}
-        for url in reference_urls:
-            image_data = await self.image_processor.download_image(url)
-            if image_data:
-                reference_images[url] = image_data
-        
-        candidate_images = {}
-        for url in candidate_urls:
-            image_data = await self.image_processor.download_image(url)
-            if image_data:
-                candidate_images[url] = image_data
-        
-        # Compare all combinations
-        for ref_url, ref_data in reference_images.items():
-            results[ref_url] = {}
-            for cand_url, cand_data in candidate_images.items():
-                match = await self.compare_images(ref_data, cand_data)
-                results[ref_url][cand_url] = match
+        async def fetch_and_prepare(url: str) -> Optional[PreparedImage]:
+            async with download_slots:
+                image_data = await self.image_processor.download_image(url)
+            if not image_data:
+                return None
+            return await loop.run_in_executor(None, self.image_processor.prepare_image, image_data)
+        
+        reference_urls = list(dict.fromkeys(reference_urls))
+        candidate_urls = list(dict.fromkeys(candidate_urls))
+        prepared = await asyncio.gather(
+            *[fetch_and_prepare(url) for url in reference_urls + candidate_urls]
+        )
+        references = [
+            (url, image) for url, image in zip(reference_urls, prepared[:len(reference_urls)]) if image
+        ]
+        candidates = [
+            (url, image) for url, image in zip(candidate_urls, prepared[len(reference_urls):]) if image
+        ]
+        
+        results = {url: {} for url, _ in references}
+        if not references or not candidates:
+            return results
+        
+        hash_similarities = self._hash_similarity_matrix(
+            np.stack([image.hash_chars for _, image in references]),
+            np.stack([image.hash_chars for _, image in candidates])
+        )
+        
+        # SSIM for prefiltered pairs, off the event loop
+        kept_pairs = np.argwhere(hash_similarities >= min_hash_similarity).tolist()
+        ssim_pairs = [
+            (i, j) for i, j in kept_pairs
+            if references[i][1].ssim_gray is not None and candidates[j][1].ssim_gray is not None
+        ]
+        ssim_values = await loop.run_in_executor(None, lambda: [
+            self.image_processor.structural_similarity_gray(
+                references[i][1].ssim_gray, candidates[j][1].ssim_gray
+            )
+            for i, j in ssim_pairs
+        ])
+        structural = dict(zip(ssim_pairs, ssim_values))
+        
+        for i, j in kept_pairs:
+            ref_url, ref_image = references[i]
+            cand_url, cand_image = candidates[j]
+            hash_similarity = float(hash_similarities[i, j])
+            structural_similarity = structural.get((i, j))
+            combined_similarity = self._combine_similarity_scores(hash_similarity, structural_similarity)
+            
+            results[ref_url][cand_url] = ImageMatch(
+                similarity_score=combined_similarity,
+                hash_similarity=hash_similarity,
+                structural_similarity=structural_similarity,
+                confidence_level=self._determine_image_confidence(
+                    combined_similarity, hash_similarity, structural_similarity
+                ),
+                metadata={
+                    'hash1': ref_image.image_hash,
+                    'hash2': cand_image.image_hash,
+                    'methods_used': ['hash', 'ssim'] if structural_similarity else ['hash']
+                }
+            )
         
         return results
+    
+    def _hash_similarity_matrix(self, reference_chars: "np.ndarray", candidate_chars: "np.ndarray") -> "np.ndarray":
+        """``_compute_hash_similarity`` for every reference/candidate pair at once.
+        
+        Inputs are ``(n, 3, length)`` hex digit arrays; the result is ``(n, m)``.
+        """
+        differing = (reference_chars[:, None, :, :] != candidate_chars[None, :, :, :]).sum(axis=3)
+        part_similarities = 1.0 - differing / reference_chars.shape[2]
+        return part_similarities.mean(axis=2)
 
 
 class ProfileImageAnalyzer:
@@ -8,6 +8,7 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 import heapq
+import time
 import uuid
 import json
 
@@ -109,95 +110,206 @@ class TaskExecution:
         return None
 
 
+class _QueueEntry:
+    """A task's slot in the queue heaps; ``removed`` marks a tombstone."""
+    
+    __slots__ = ("task", "due", "seq", "removed")
+    
+    def __init__(self, task: ScheduledTask, due: float, seq: int):
+        self.task = task
+        self.due = due  # time.monotonic() at which the task becomes runnable
+        self.seq = seq
+        self.removed = False
+
+
 class TaskQueue:
-    """Priority queue for managing monitoring tasks."""
+    """Priority queue for managing monitoring tasks.
+    
+    Tasks wait in a heap ordered by due time and move to a priority heap once
+    due (emergency tasks go there directly). Removal and replacement leave
+    tombstones that are skipped when popped and compacted when they outnumber
+    live tasks, so put/remove/get are O(log n) and lookups by ID are O(1).
+    
+    Idle workers block in ``wait_for_task``: one of them holds a timer for the
+    earliest due task and the rest wait on a condition, so nothing polls and
+    one worker wakes per runnable task.
+    """
+    
+    COMPACT_MIN_TOMBSTONES = 64
     
     def __init__(self, max_size: int = 1000):
         self.max_size = max_size
-        self._queue = []
-        self._task_index = {}  # task_id -> heap_index for fast lookup
+        self._waiting: List[tuple] = []  # (due, seq, entry)
+        self._ready: List[tuple] = []  # (-priority, due, seq, entry)
+        self._entries: Dict[str, _QueueEntry] = {}  # task_id -> live entry
+        self._tombstones = 0
+        self._seq = 0
         self._lock = asyncio.Lock()
+        self._task_ready = asyncio.Condition(self._lock)
+        self._timer_changed = asyncio.Condition(self._lock)
+        self._timer_held = False
+        self._idle_workers = 0  # waiting on _task_ready (not holding the timer)
         
     async def put(self, task: ScheduledTask) -> bool:
-        """Add task to queue."""
+        """Add task to queue, replacing any queued task with the same ID."""
         async with self._lock:
-            if len(self._queue) >= self.max_size:
+            if task.task_id not in self._entries and len(self._entries) >= self.max_size:
                 logger.warning("Task queue is full", max_size=self.max_size)
                 return False
             
-            # Remove existing task with same ID if present
-            await self._remove_task_by_id(task.task_id)
+            # Replace existing task with same ID if present
+            self._remove_task_by_id(task.task_id)
             
-            # Add new task
-            heapq.heappush(self._queue, task)
-            self._task_index[task.task_id] = len(self._queue) - 1
+            now = time.monotonic()
+            self._seq += 1
+            entry = _QueueEntry(task, self._due_time(task, now), self._seq)
+            self._entries[task.task_id] = entry
+            
+            if entry.due <= now or task.task_type == "emergency":
+                heapq.heappush(self._ready, (-task.priority.value, entry.due, entry.seq, entry))
+                self._wake_one()
+            else:
+                heapq.heappush(self._waiting, (entry.due, entry.seq, entry))
+                if self._waiting[0][2] is entry:
+                    # New earliest deadline: re-arm the timer (or let a worker take it)
+                    if self._timer_held:
+                        self._timer_changed.notify(1)
+                    else:
+                        self._task_ready.notify(1)
             
             logger.debug("Task added to queue", task_id=task.task_id, priority=task.priority.name)
             return True
     
     async def get(self) -> Optional[ScheduledTask]:
-        """Get highest priority task from queue."""
+        """Get highest priority task that is due, or None without waiting."""
         async with self._lock:
-            while self._queue:
-                task = heapq.heappop(self._queue)
-                
-                # Update index
-                if task.task_id in self._task_index:
-                    del self._task_index[task.task_id]
-                
-                # Check if task should run now
-                if task.next_run and task.next_run <= datetime.now():
+            task = self._pop_ready(time.monotonic())
+            if task is not None:
+                logger.debug("Task retrieved from queue", task_id=task.task_id)
+            return task
+    
+    async def wait_for_task(self, timeout: Optional[float] = None) -> Optional[ScheduledTask]:
+        """Wait until a task is due (or an emergency task arrives) and return it.
+        
+        Returns None only if ``timeout`` seconds pass first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                task = self._pop_ready(now)
+                if task is not None:
+                    # Pass the baton: more runnable tasks, or nobody timing the next one
+                    if self._ready:
+                        self._wake_one()
+                    elif self._waiting and not self._timer_held:
+                        self._task_ready.notify(1)
                     logger.debug("Task retrieved from queue", task_id=task.task_id)
                     return task
-                elif task.task_type == "emergency":
-                    return task
-                else:
-                    # Put back if not ready to run
-                    heapq.heappush(self._queue, task)
-                    self._task_index[task.task_id] = len(self._queue) - 1
+                
+                if deadline is not None and now >= deadline:
                     return None
-            
-            return None
+                wait_seconds = None if deadline is None else deadline - now
+                
+                holds_timer = bool(self._waiting) and not self._timer_held
+                if holds_timer:
+                    until_due = max(0.0, self._waiting[0][0] - now)
+                    wait_seconds = until_due if wait_seconds is None else min(wait_seconds, until_due)
+                    self._timer_held = True
+                    condition = self._timer_changed
+                else:
+                    condition = self._task_ready
+                    self._idle_workers += 1
+                
+                try:
+                    if wait_seconds is None:
+                        await condition.wait()
+                    else:
+                        await asyncio.wait_for(condition.wait(), wait_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    if holds_timer:
+                        self._timer_held = False
+                    else:
+                        self._idle_workers -= 1
+    
+    def _wake_one(self):
+        """Wake one worker for a runnable task, preferring an idle one over the timer holder."""
+        if self._idle_workers:
+            self._task_ready.notify(1)
+        elif self._timer_held:
+            self._timer_changed.notify(1)
+    
+    def _due_time(self, task: ScheduledTask, now: float) -> float:
+        """Monotonic due time; tasks without ``next_run`` are due immediately."""
+        if task.next_run is None:
+            return now
+        return now + max(0.0, (task.next_run - datetime.now()).total_seconds())
+    
+    def _pop_ready(self, now: float) -> Optional[ScheduledTask]:
+        # Promote tasks that have become due
+        while self._waiting and self._waiting[0][0] <= now:
+            _, _, entry = heapq.heappop(self._waiting)
+            if entry.removed:
+                self._tombstones -= 1
+                continue
+            heapq.heappush(self._ready, (-entry.task.priority.value, entry.due, entry.seq, entry))
+        
+        while self._ready:
+            entry = heapq.heappop(self._ready)[3]
+            if entry.removed:
+                self._tombstones -= 1
+                continue
+            del self._entries[entry.task.task_id]
+            return entry.task
+        
+        return None
     
-    async def _remove_task_by_id(self, task_id: str) -> bool:
-        """Remove task by ID from queue."""
-        if task_id not in self._task_index:
+    def _remove_task_by_id(self, task_id: str) -> bool:
+        """Tombstone a queued task by ID."""
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
             return False
         
-        # Mark task as removed (lazy deletion)
-        for i, task in enumerate(self._queue):
-            if task.task_id == task_id:
-                task.status = TaskStatus.CANCELLED
-                break
-        
-        if task_id in self._task_index:
-            del self._task_index[task_id]
-        
+        entry.removed = True
+        self._tombstones += 1
+        if self._tombstones > max(self.COMPACT_MIN_TOMBSTONES, len(self._entries)):
+            self._compact()
         return True
     
+    def _compact(self):
+        """Drop tombstones from both heaps."""
+        self._waiting = [item for item in self._waiting if not item[2].removed]
+        self._ready = [item for item in self._ready if not item[3].removed]
+        heapq.heapify(self._waiting)
+        heapq.heapify(self._ready)
+        self._tombstones = 0
+    
     async def remove_task(self, task_id: str) -> bool:
         """Remove task from queue."""
         async with self._lock:
-            return await self._remove_task_by_id(task_id)
+            return self._remove_task_by_id(task_id)
     
     async def get_task(self, task_id: str) -> Optional[ScheduledTask]:
         """Get task by ID without removing from queue."""
         async with self._lock:
-            for task in self._queue:
-                if task.task_id == task_id:
-                    return task
-            return None
+            entry = self._entries.get(task_id)
+            return entry.task if entry else None
     
     async def size(self) -> int:
         """Get current queue size."""
         async with self._lock:
-            return len([t for t in self._queue if t.status != TaskStatus.CANCELLED])
+            return len(self._entries)
     
     async def clear(self) -> None:
         """Clear all tasks from queue."""
         async with self._lock:
-            self._queue.clear()
-            self._task_index.clear()
+            self._waiting.clear()
+            self._ready.clear()
+            self._entries.clear()
+            self._tombstones = 0
 
 
 class WorkerPool:
@@ -242,12 +354,8 @@ class WorkerPool:
         
         while not self.shutdown_event.is_set():
             try:
-                # Get next task
-                task = await task_queue.get()
-                
-                if not task:
-                    await asyncio.sleep(1)  # No tasks available
-                    continue
+                # Block until a task is due; no polling while idle
+                task = await task_queue.wait_for_task()
                 
                 # Execute task
                 await self._execute_task(worker_id, task)
@@ -398,7 +506,7 @@ class MonitoringScheduler:
         self.config = config
         self.monitoring_service = monitoring_service
         self.scheduler = AsyncIOScheduler()
-        self.task_queue = TaskQueue(max_size=5000)
+        self.task_queue = TaskQueue(max_size=100000)
         self.worker_pool = WorkerPool(pool_size=5, monitoring_service=monitoring_service)
         
         # Task registry
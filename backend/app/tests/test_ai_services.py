@@ -9,10 +9,17 @@ from unittest.mock import patch, MagicMock, AsyncMock
 from PIL import Image
 import io
 import base64
+from datetime import datetime
 
 from app.services.ai.content_matcher import ContentMatcher, MatchType, MatchResult
 from app.services.social_media.face_matcher import ProfileImageAnalyzer, FaceMatch
 from app.services.content.watermarking import WatermarkService
+from app.services.ai.vector_index import VectorIndex, create_vector_index
+from app.services.ai.content_fingerprinting_service import (
+    ContentFingerprint, ContentFingerprintingService, FingerprintType
+)
+from app.services.ai.optimized_content_matcher import OptimizedContentMatcher, ReferenceFeatureMatrix
+from app.services.ai.multi_hash import MultiHashEngine
 
 
 @pytest.mark.ai
@@ -687,4 +694,280 @@ class TestAIServicesSecurity:
             )
             
             # Should reject or handle safely
-            assert result is None or result.get("error") is not None
\ No newline at end of file
+            assert result is None or result.get("error") is not None
+
+
+@pytest.mark.ai
+@pytest.mark.unit
+class TestVectorIndex:
+    """Test fingerprint signature vector indexes."""
+
+    @pytest.fixture
+    def vectors(self):
+        """Random signature vectors with string keys."""
+        rng = np.random.default_rng(7)
+        return [f"fp_{i}" for i in range(2000)], rng.normal(size=(2000, 16)).astype(np.float32)
+
+    @pytest.mark.parametrize("backend,options", [("exact", {}), ("ivf", {"nlist": 16})])
+    def test_batched_top_k_finds_near_duplicates(self, vectors, backend, options):
+        """Test each query's nearest neighbour is its noisy source vector."""
+        keys, data = vectors
+        index = create_vector_index(backend, 16, **options)
+        index.add(keys, data)
+
+        queries = data[:50] + 0.01
+        results = index.search(queries, k=3)
+
+        assert len(results) == 50
+        assert all(hits[0][0] == keys[i] for i, hits in enumerate(results))
+        assert all(len(hits) == 3 for hits in results)
+
+    def test_remove_and_min_score(self, vectors):
+        """Test deleted keys are not returned and min_score filters hits."""
+        keys, data = vectors
+        index = create_vector_index("exact", 16)
+        index.add(keys, data)
+
+        index.remove(["fp_0"])
+        hits = index.search(data[0], k=5, min_score=0.99)[0]
+
+        assert "fp_0" not in index
+        assert all(key != "fp_0" and score >= 0.99 for key, score in hits)
+
+    def test_range_search_returns_every_hit_above_threshold(self, vectors):
+        """Test range search is not capped and matches a brute-force threshold scan."""
+        keys, data = vectors
+        index = create_vector_index("exact", 16)
+        index.add(keys, data)
+
+        hits = index.range_search(data[:3], min_score=0.2)
+        normalized = data / np.linalg.norm(data, axis=1, keepdims=True)
+        expected = (normalized[:3] @ normalized.T) >= 0.2
+
+        for row, query_hits in enumerate(hits):
+            assert len(query_hits) == int(expected[row].sum()) > 256
+            assert [score for _, score in query_hits] == sorted((score for _, score in query_hits), reverse=True)
+
+    @pytest.mark.parametrize("backend,options", [("exact", {}), ("ivf", {"nlist": 16})])
+    def test_save_and_load(self, vectors, backend, options, tmp_path):
+        """Test an index round-trips through disk."""
+        keys, data = vectors
+        index = create_vector_index(backend, 16, **options)
+        index.add(keys, data)
+
+        path = str(tmp_path / "index.npz")
+        index.save(path)
+        loaded = VectorIndex.load(path)
+
+        assert type(loaded) is type(index)
+        assert len(loaded) == len(index)
+        assert loaded.search(data[10], k=1)[0][0][0] == "fp_10"
+
+
+@pytest.mark.ai
+@pytest.mark.unit
+class TestFingerprintVectorSearch:
+    """Test vector-index shortlisting in the fingerprinting service."""
+
+    @staticmethod
+    def make_fingerprint(content_hash, vector, fingerprint_type=FingerprintType.AUDIO):
+        return ContentFingerprint(
+            fingerprint_type=fingerprint_type,
+            fingerprint_data={'signature_vector': list(vector)},
+            confidence=1.0,
+            source_url=f"https://example.com/{content_hash}",
+            content_hash=content_hash,
+            created_at=datetime.utcnow()
+        )
+
+    def add_fingerprints(self, service, vectors):
+        for i, vector in enumerate(vectors):
+            fingerprint = self.make_fingerprint(f"fp_{i}", vector)
+            service.fingerprint_cache[fingerprint.content_hash] = fingerprint
+            service._index_fingerprint(fingerprint)
+
+    @pytest.mark.asyncio
+    async def test_every_candidate_above_threshold_is_reranked(self):
+        """Test the shortlist is not capped when many fingerprints can match."""
+        service = ContentFingerprintingService()
+        rng = np.random.default_rng(5)
+        base = rng.normal(size=32)
+        self.add_fingerprints(service, [base + rng.normal(scale=0.01, size=32) for _ in range(400)])
+
+        with patch.object(service, '_calculate_fingerprint_similarity', new=AsyncMock(return_value=0.95)):
+            matches = await service.find_matching_fingerprints(self.make_fingerprint("query", base))
+
+        assert len(matches) == 400
+
+    def test_load_reconciles_with_fingerprint_cache(self, tmp_path):
+        """Test loaded indexes drop uncached entries and pick up unindexed fingerprints."""
+        rng = np.random.default_rng(9)
+        vectors = rng.normal(size=(3, 16))
+
+        saved = ContentFingerprintingService()
+        self.add_fingerprints(saved, vectors[:2])
+        saved.save_vector_indexes(str(tmp_path))
+
+        service = ContentFingerprintingService()
+        self.add_fingerprints(service, vectors)
+        service.remove_fingerprint("fp_0")
+        service.fingerprint_cache["fp_odd"] = self.make_fingerprint("fp_odd", rng.normal(size=8))
+        service.load_vector_indexes(str(tmp_path))
+
+        index = service.vector_indexes[FingerprintType.AUDIO]
+        assert sorted(index.keys()) == ["fp_1", "fp_2"]
+        assert service._unindexed_fingerprints[FingerprintType.AUDIO] == {"fp_odd"}
+
+
+@pytest.mark.ai
+@pytest.mark.unit
+class TestMultiHashEngine:
+    """Test the single-decode multi-hash engine against imagehash."""
+
+    @pytest.fixture
+    def images(self):
+        """Noise, flat, gradient, palette and grayscale images of assorted sizes."""
+        rng = np.random.default_rng(11)
+        gradient = np.tile(np.linspace(0, 255, 140, dtype=np.uint8), (90, 1))
+        return [
+            Image.fromarray((rng.random((120, 200, 3)) * 255).astype(np.uint8)),
+            Image.fromarray((rng.random((37, 301, 3)) * 255).astype(np.uint8)),
+            Image.new('RGB', (64, 64), color=(10, 200, 30)),
+            Image.fromarray(gradient).convert('RGB'),
+            Image.fromarray((rng.random((50, 70, 3)) * 255).astype(np.uint8)).convert('P'),
+            Image.fromarray(gradient),
+        ]
+
+    @pytest.mark.parametrize("hash_size", [8, 16])
+    def test_batch_matches_imagehash(self, images, hash_size):
+        """Test every hash in a batch is bit-identical to imagehash's."""
+        import imagehash
+
+        results = MultiHashEngine(hash_size=hash_size).hash_images(images)
+
+        for image, hashes in zip(images, results):
+            assert hashes == {
+                'ahash': str(imagehash.average_hash(image, hash_size)),
+                'phash': str(imagehash.phash(image, hash_size)),
+                'dhash': str(imagehash.dhash(image, hash_size)),
+                'whash': str(imagehash.whash(image, hash_size)),
+                'colorhash': str(imagehash.colorhash(image)),
+            }
+
+    def test_selected_hash_types(self, images):
+        """Test only the requested hash types are computed."""
+        hashes = MultiHashEngine().hash_image(images[0], ('phash', 'dhash'))
+
+        assert set(hashes) == {'phash', 'dhash'}
+
+
+@pytest.mark.ai
+@pytest.mark.unit
+class TestReferenceFeatureMatrix:
+    """Test pre-normalised reference feature matrices."""
+
+    @pytest.fixture
+    def features(self):
+        """Random reference features with content ids."""
+        rng = np.random.default_rng(3)
+        return list(rng.normal(size=(20, 32)).astype(np.float32)), [f"c_{i}" for i in range(20)]
+
+    def test_top_k_ranks_references(self, features):
+        """Test each query's best reference is its noisy source, best first."""
+        refs, ids = features
+        matrix = ReferenceFeatureMatrix()
+        matrix.add(refs, ids)
+
+        indices, scores = matrix.top_k(np.stack(refs[:5]) * 3.0 + 0.01, k=4)
+
+        assert indices.shape == scores.shape == (5, 4)
+        assert list(indices[:, 0]) == [0, 1, 2, 3, 4]
+        assert np.allclose(scores[:, 0], 1.0, atol=1e-3)
+        assert np.all(np.diff(scores, axis=1) <= 0)
+
+    def test_remove_and_dimension_check(self, features):
+        """Test rows are dropped by content id and mismatched dimensions are refused."""
+        refs, ids = features
+        matrix = ReferenceFeatureMatrix()
+        matrix.add(refs, ids)
+
+        assert matrix.remove(["c_0", "c_1", "missing"]) == 2
+        assert len(matrix) == 18 and matrix.matrix.shape == (18, 32)
+        assert "c_0" not in matrix.content_ids
+        with pytest.raises(ValueError):
+            matrix.add([np.ones(8)])
+
+    def test_empty_matrix_scores_nothing(self):
+        """Test an empty matrix returns empty results per query."""
+        indices, scores = ReferenceFeatureMatrix().top_k(np.ones((2, 4)), k=3)
+
+        assert indices.shape == scores.shape == (2, 0)
+
+
+@pytest.mark.ai
+@pytest.mark.unit
+class TestOptimizedFeatureMatching:
+    """Test batched deep-feature matching in OptimizedContentMatcher."""
+
+    @pytest.fixture
+    def matcher(self):
+        """Create an optimized matcher without async components."""
+        return OptimizedContentMatcher()
+
+    @pytest.fixture
+    def references(self):
+        """Orthogonal unit reference features."""
+        return [np.eye(16, dtype=np.float32)[i] for i in range(4)]
+
+    def test_batch_matches_each_candidate(self, matcher, references):
+        """Test one pass scores every candidate and reports its top references."""
+        profile = {'profile_id': 'p1', 'image_features': references, 'image_feature_ids': ['a', 'b', 'c', 'd']}
+        candidates = np.stack([references[2], references[0], -references[1]])
+
+        results = matcher._match_features_batch(candidates, ['u0', 'u1', 'u2'], [profile] * 3)
+
+        assert results[0].matched_content_id == 'c' and results[0].source_url == 'u0'
+        assert results[1].matched_content_id == 'a'
+        assert results[2] is None
+        assert results[0].metadata['top_matches'][0] == {'content_id': 'c', 'similarity': pytest.approx(1.0)}
+
+    def test_rebuilt_feature_list_is_not_served_stale(self, matcher, references):
+        """Test new lists, or mutated ones with a bumped version, rebuild a profile's matrix."""
+        candidate = references[3].reshape(1, -1)
+
+        first = {'profile_id': 'p1', 'image_features': references[:2]}
+        assert matcher._match_features_batch(candidate, ['u'], [first])[0] is None
+
+        # Same length, different content, possibly the same id() once the old list is freed
+        rebuilt = {'profile_id': 'p1', 'image_features': [references[0], references[3]]}
+        assert matcher._match_features_batch(candidate, ['u'], [rebuilt])[0] is not None
+
+        rebuilt['image_features'][1] = references[2]
+        rebuilt['image_features_version'] = 1
+        assert matcher._match_features_batch(candidate, ['u'], [rebuilt])[0] is None
+
+    def test_unchanged_features_reuse_matrix(self, matcher, references):
+        """Test the same features list, or an unchanged explicit version, reuse the cached matrix."""
+        features = list(references)
+        matrix = matcher._get_reference_matrix({'profile_id': 'p1', 'image_features': features})
+        with patch.object(ReferenceFeatureMatrix, 'normalize', side_effect=AssertionError("rebuilt")):
+            assert matcher._get_reference_matrix({'profile_id': 'p1', 'image_features': features}) is matrix
+        assert matcher._get_reference_matrix({'profile_id': 'p1', 'image_features': list(references)}) is not matrix
+
+        versioned = matcher._get_reference_matrix(
+            {'profile_id': 'p2', 'image_features': references, 'image_features_version': 7}
+        )
+        assert matcher._get_reference_matrix(
+            {'profile_id': 'p2', 'image_features': references[:1], 'image_features_version': 7}
+        ) is versioned
+
+    def test_registered_profile_features(self, matcher, references):
+        """Test features registered through set/add/remove_profile_features are used."""
+        matcher.set_profile_features('p1', references[:2], ['a', 'b'])
+        matcher.add_profile_features('p1', [references[3]], ['d'])
+        candidate = references[3].reshape(1, -1)
+
+        assert matcher._match_features_batch(candidate, ['u'], [{'profile_id': 'p1'}])[0].matched_content_id == 'd'
+
+        assert matcher.remove_profile_features('p1', ['d']) == 1
+        assert matcher._match_features_batch(candidate, ['u'], [{'profile_id': 'p1'}])[0] is None
@@ -0,0 +1,231 @@
+"""
+Tests for the daily analytics rollups: the read/rebuild service and the
+triggers from migration 005 that keep the counters current.
+"""
+
+import importlib.util
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, text
+
+from app.services.dashboard.rollup_service import AnalyticsRollupService
+
+
+MIGRATION_PATH = (
+    Path(__file__).resolve().parents[1] / "db" / "migrations" / "versions" / "005_add_analytics_rollup_tables.py"
+)
+
+
+def make_result(rows=(), row=None, rowcount=0):
+    result = MagicMock()
+    result.fetchall.return_value = list(rows)
+    result.fetchone.return_value = row
+    result.rowcount = rowcount
+    return result
+
+
+@pytest.mark.unit
+class TestAnalyticsRollupService:
+    """Test rollup reads and rebuild statements against a mocked session."""
+
+    @pytest.mark.asyncio
+    async def test_period_totals(self):
+        """Test period totals are read in one statement and returned as ints."""
+        db = AsyncMock()
+        db.execute.return_value = make_result(row=(12, 8, 5, 4))
+
+        totals = await AnalyticsRollupService().get_period_totals(db, 1, date(2026, 9, 1), date(2026, 9, 30))
+
+        assert totals == {"infringements": 12, "takedowns": 8, "successful": 5, "removals": 4}
+        assert db.execute.await_count == 1
+        assert db.execute.call_args.args[1] == {
+            "user_id": 1, "start_day": date(2026, 9, 1), "end_day": date(2026, 9, 30)
+        }
+
+    @pytest.mark.asyncio
+    async def test_daily_series_fills_empty_days(self):
+        """Test every day in the range is present, with zeros where no rollup row exists."""
+        db = AsyncMock()
+        db.execute.side_effect = [
+            make_result(rows=[(date(2026, 9, 2), 3)]),
+            make_result(rows=[(date(2026, 9, 2), 2, 0), (date(2026, 9, 4), 1, 1)]),
+        ]
+
+        series = await AnalyticsRollupService().get_daily_series(db, 1, date(2026, 9, 1), date(2026, 9, 4))
+
+        assert series == [
+            {"date": "2026-09-01", "infringements": 0, "takedowns": 0, "removals": 0},
+            {"date": "2026-09-02", "infringements": 3, "takedowns": 2, "removals": 0},
+            {"date": "2026-09-03", "infringements": 0, "takedowns": 0, "removals": 0},
+            {"date": "2026-09-04", "infringements": 0, "takedowns": 1, "removals": 1},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_daily_scan_counts_cover_whole_end_day(self):
+        """Test scans are counted per day up to the end of the last day."""
+        db = AsyncMock()
+        db.execute.return_value = make_result(rows=[(date(2026, 9, 2), 4)])
+
+        counts = await AnalyticsRollupService().get_daily_scan_counts(db, 1, date(2026, 9, 1), date(2026, 9, 4))
+
+        assert counts == {date(2026, 9, 2): 4}
+        assert db.execute.call_args.args[1] == {
+            "user_id": 1, "start_at": datetime(2026, 9, 1), "end_at": datetime(2026, 9, 5)
+        }
+
+    @pytest.mark.asyncio
+    async def test_platform_breakdown_success_rate(self):
+        """Test success rates are successful / sent takedowns, and zero without takedowns."""
+        db = AsyncMock()
+        db.execute.return_value = make_result(rows=[("instagram", 6, 4, 3), ("reddit", 2, 0, 0)])
+
+        breakdown = await AnalyticsRollupService().get_platform_breakdown(db, 1, date(2026, 9, 1), date(2026, 9, 30))
+
+        assert [row["platform"] for row in breakdown] == ["instagram", "reddit"]
+        assert breakdown[0]["success_rate"] == 75.0
+        assert breakdown[1]["success_rate"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_rebuild_scopes_deletes_and_inserts(self):
+        """Test a scoped rebuild locks the raw tables and filters every statement the same way."""
+        db = AsyncMock()
+        db.execute.side_effect = [
+            make_result(), make_result(), make_result(rowcount=3), make_result(), make_result(rowcount=2)
+        ]
+
+        counts = await AnalyticsRollupService().rebuild(db, user_id=7, since=date(2026, 9, 1))
+
+        assert counts == {"infringement_daily_rollups": 3, "takedown_daily_rollups": 2}
+        statements = [str(call.args[0]) for call in db.execute.call_args_list]
+        assert statements[0].startswith("LOCK TABLE infringements, takedown_requests")
+        for statement, call in zip(statements[1:], db.execute.call_args_list[1:]):
+            assert "AND user_id = :user_id AND day >= :since" in statement
+            assert call.args[1] == {"user_id": 7, "since": date(2026, 9, 1)}
+
+
+@pytest.mark.database
+@pytest.mark.integration
+@pytest.mark.requires_docker
+class TestAnalyticsRollupTriggers:
+    """Test the rollup triggers keep counters equal to what a rebuild would produce."""
+
+    @pytest.fixture
+    def conn(self, postgres_container):
+        engine = create_engine(postgres_container.get_connection_url())
+        connection = engine.connect()
+        transaction = connection.begin()
+        connection.execute(text("CREATE SCHEMA rollup_test"))
+        connection.execute(text("SET LOCAL search_path TO rollup_test"))
+        connection.execute(text("""
+            CREATE TABLE infringements (
+                id SERIAL PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                platform VARCHAR(100),
+                status VARCHAR(50),
+                created_at TIMESTAMP
+            );
+            CREATE TABLE takedown_requests (
+                id SERIAL PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                infringement_id INTEGER REFERENCES infringements (id) ON DELETE CASCADE,
+                status VARCHAR(50),
+                sent_at TIMESTAMP,
+                updated_at TIMESTAMP
+            );
+        """))
+
+        spec = importlib.util.spec_from_file_location("analytics_rollups_migration", MIGRATION_PATH)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+
+        yield connection
+
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
+
+    @pytest.fixture
+    def sent_at(self):
+        return datetime(2026, 9, 10, 12, 0)
+
+    def add_infringement(self, conn, platform, created_at):
+        return conn.execute(
+            text("""
+            INSERT INTO infringements (user_id, platform, status, created_at)
+            VALUES (1, :platform, 'confirmed', :created_at) RETURNING id
+            """),
+            {"platform": platform, "created_at": created_at}
+        ).scalar()
+
+    def add_takedown(self, conn, infringement_id, status, sent_at):
+        return conn.execute(
+            text("""
+            INSERT INTO takedown_requests (user_id, infringement_id, status, sent_at, updated_at)
+            VALUES (1, :infringement_id, :status, :sent_at, :sent_at) RETURNING id
+            """),
+            {"infringement_id": infringement_id, "status": status, "sent_at": sent_at}
+        ).scalar()
+
+    def takedown_counts(self, conn):
+        rows = conn.execute(text("""
+            SELECT platform, status, sent_count, resolved_count
+            FROM takedown_daily_rollups
+            WHERE sent_count <> 0 OR resolved_count <> 0
+            ORDER BY platform, status
+        """)).fetchall()
+        return [tuple(row) for row in rows]
+
+    def test_takedowns_counted_under_infringement_platform(self, conn, sent_at):
+        """Test a takedown is counted under its infringement's platform and moves with its status."""
+        infringement_id = self.add_infringement(conn, "Instagram", sent_at - timedelta(days=1))
+        takedown_id = self.add_takedown(conn, infringement_id, "sent", sent_at)
+
+        assert self.takedown_counts(conn) == [("instagram", "sent", 1, 0)]
+
+        conn.execute(text("UPDATE takedown_requests SET status = 'successful' WHERE id = :id"), {"id": takedown_id})
+
+        assert self.takedown_counts(conn) == [("instagram", "successful", 1, 1)]
+
+    def test_infringement_delete_removes_cascaded_takedowns(self, conn, sent_at):
+        """Test deleting an infringement also removes its cascaded takedowns from the counters."""
+        infringement_id = self.add_infringement(conn, "instagram", sent_at)
+        self.add_takedown(conn, infringement_id, "sent", sent_at)
+        self.add_takedown(conn, infringement_id, "successful", sent_at)
+        kept_id = self.add_infringement(conn, "reddit", sent_at)
+        self.add_takedown(conn, kept_id, "sent", sent_at)
+
+        conn.execute(text("DELETE FROM infringements WHERE id = :id"), {"id": infringement_id})
+
+        assert conn.execute(text("SELECT COUNT(*) FROM takedown_requests")).scalar() == 1
+        assert self.takedown_counts(conn) == [("reddit", "sent", 1, 0)]
+
+    def test_platform_change_moves_takedowns(self, conn, sent_at):
+        """Test changing an infringement's platform moves its takedowns' counters with it."""
+        infringement_id = self.add_infringement(conn, "instagram", sent_at)
+        self.add_takedown(conn, infringement_id, "successful", sent_at)
+
+        conn.execute(text("UPDATE infringements SET platform = 'TikTok' WHERE id = :id"), {"id": infringement_id})
+
+        assert self.takedown_counts(conn) == [("tiktok", "successful", 1, 1)]
+        infringement_rows = conn.execute(text("""
+            SELECT platform, infringement_count FROM infringement_daily_rollups
+            WHERE infringement_count <> 0
+        """)).fetchall()
+        assert [tuple(row) for row in infringement_rows] == [("tiktok", 1)]
+
+    def test_takedown_without_infringement(self, conn, sent_at):
+        """Test a takedown with no infringement is counted as unknown and removed on delete."""
+        takedown_id = self.add_takedown(conn, None, "sent", sent_at)
+
+        assert self.takedown_counts(conn) == [("unknown", "sent", 1, 0)]
+
+        conn.execute(text("DELETE FROM takedown_requests WHERE id = :id"), {"id": takedown_id})
+
+        assert self.takedown_counts(conn) == []
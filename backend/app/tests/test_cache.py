@@ -0,0 +1,286 @@
+"""
+Tests for the multi-level cache: in-memory LRU behaviour and statistics.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+import numpy as np
+
+from app.services.cache.multi_level_cache import CacheLevel, LRUCache, MultiLevelCache, estimate_size
+
+
+@pytest.mark.unit
+class TestLRUCache:
+    """Test L1 LRU ordering, TTL expiry and size accounting."""
+
+    def test_evicts_least_recently_used(self):
+        """Test a get promotes an entry so the oldest untouched one is evicted."""
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_ttl_expires_lazily(self, monkeypatch):
+        """Test expired entries are dropped on access using the monotonic clock."""
+        now = [1000.0]
+        monkeypatch.setattr("app.services.cache.multi_level_cache.time.monotonic", lambda: now[0])
+        cache = LRUCache()
+        cache.set("key", "value", ttl=10)
+
+        now[0] += 9
+        assert cache.get("key") == "value"
+        now[0] += 2
+        assert cache.get("key") is None
+        assert len(cache.cache) == 0
+        assert cache.total_size_bytes == 0
+
+    def test_size_accounting(self):
+        """Test memory limits use given or estimated sizes and replacement frees space."""
+        cache = LRUCache(max_size=100, max_memory_mb=1)
+        cache.set("a", b"x", size_bytes=600_000)
+        cache.set("a", b"y", size_bytes=1_000_000)
+        assert cache.total_size_bytes == 1_000_000
+        assert cache.get_stats()['evictions'] == 0
+
+        cache.set("b", np.zeros(100_000, dtype=np.uint8))
+        assert cache.get("a") is None
+        assert cache.total_size_bytes == estimate_size(np.zeros(100_000, dtype=np.uint8))
+        assert not cache.set("c", b"", size_bytes=2 * 1024 * 1024)
+
+    def test_per_type_counters(self):
+        """Test hits, misses and evictions are counted per cache type."""
+        cache = LRUCache(max_size=1)
+        cache.set("face:1", "enc", cache_type="face_encoding")
+        cache.get("face:1", "face_encoding")
+        cache.get("api:1", "api_response")
+        cache.set("api:1", "resp", cache_type="api_response")
+
+        by_type = cache.get_stats()['by_type']
+        assert by_type['face_encoding']['hits'] == 1
+        assert by_type['face_encoding']['evictions'] == 1
+        assert by_type['face_encoding']['hit_rate'] == 1.0
+        assert by_type['api_response']['misses'] == 1
+
+    def test_estimate_size_is_sampled(self):
+        """Test container estimates scale with length without visiting every item."""
+        small = estimate_size(list(range(100)))
+        large = estimate_size(list(range(10_000)))
+        assert 50 * small < large < 200 * small
+        assert estimate_size({"k": "v" * 1000}) > 1000
+
+
+@pytest.mark.unit
+class TestMultiLevelCacheCoalescing:
+    """Test single-flight loads and stale-while-revalidate (L1 only, no Redis)."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("app.services.cache.multi_level_cache.time.monotonic", lambda: now[0])
+        return now
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_factory_call(self):
+        """Test concurrent misses for one key await a single factory call."""
+        cache = MultiLevelCache()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        results = await asyncio.gather(*[
+            cache.get("popular", cache_type="api_response", fallback_factory=factory)
+            for _ in range(10)
+        ])
+
+        assert calls == 1
+        assert all(result == {"value": 42} for result in results)
+        stats = await cache.get_stats()
+        assert stats['coalescing']['coalesced'] == 9
+        assert stats['coalescing']['in_flight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_factory_error_reaches_every_waiter(self):
+        """Test get_or_load propagates a failed load to all coalesced callers."""
+        cache = MultiLevelCache()
+
+        async def factory():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        results = await asyncio.gather(
+            *[cache.get_or_load("key", factory) for _ in range(3)],
+            return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await cache.get("key", fallback_factory=factory) is None
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_load_to_follower(self):
+        """Test cancelling the leading caller does not cancel coalesced followers."""
+        cache = MultiLevelCache()
+        started = asyncio.Event()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            started.set()
+            await asyncio.sleep(0.01)
+            return "value"
+
+        leader = asyncio.create_task(cache.get("key", fallback_factory=factory))
+        await started.wait()
+        followers = [asyncio.create_task(cache.get("key", fallback_factory=factory)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await asyncio.gather(*followers) == ["value"] * 3
+        assert leader.cancelled()
+        assert calls == 2
+        assert not cache._inflight
+
+    @pytest.mark.asyncio
+    async def test_cancelled_follower_does_not_cancel_load(self):
+        """Test a follower's own cancellation propagates to it alone."""
+        cache = MultiLevelCache()
+
+        async def factory():
+            await asyncio.sleep(0.01)
+            return "value"
+
+        leader = asyncio.create_task(cache.get_or_load("key", factory))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_load("key", factory))
+        await asyncio.sleep(0)
+        follower.cancel()
+
+        assert await leader == "value"
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+
+    @pytest.mark.asyncio
+    async def test_follower_cancelled_with_leader_stays_cancelled(self):
+        """Test a follower cancelled together with the leader is cancelled, not promoted."""
+        cache = MultiLevelCache()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        leader = asyncio.create_task(cache.get_or_load("key", factory))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(cache.get_or_load("key", factory))
+        waiting = asyncio.create_task(cache.get_or_load("key", factory))
+        await asyncio.sleep(0)
+        leader.cancel()
+        cancelled.cancel()
+
+        assert await waiting == "value"
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self, clock):
+        """Test an expired value is returned at once and refreshed in the background."""
+        cache = MultiLevelCache()
+        versions = iter(["v1", "v2"])
+
+        async def factory():
+            return next(versions)
+
+        assert await cache.get("key", fallback_factory=factory, ttl=10, stale_ttl=60) == "v1"
+
+        clock[0] += 30
+        assert await cache.get("key") is None  # no factory: stale values are not served
+        assert await cache.get("key", fallback_factory=factory, ttl=10, stale_ttl=60) == "v1"
+        await asyncio.gather(*cache._refresh_tasks)
+        assert await cache.get("key", fallback_factory=factory, ttl=10, stale_ttl=60) == "v2"
+
+        stats = await cache.get_stats()
+        assert stats['coalescing']['stale_served'] == 1
+        assert stats['coalescing']['background_refreshes'] == 1
+
+
+@pytest.mark.unit
+class TestCacheInvalidationBus:
+    """Test applying invalidation batches published by other processes."""
+
+    def _message(self, generation, origin="peer", **items):
+        return f"{generation}|{json.dumps({'origin': origin, **items})}".encode()
+
+    def test_tagged_entries_invalidated(self):
+        """Test tag invalidation drops exactly the tagged L1 entries."""
+        cache = LRUCache()
+        cache.set("a", 1, tags=["user:1"])
+        cache.set("b", 2, tags=["user:1", "user:2"])
+        cache.set("c", 3, tags=["user:2"])
+
+        assert cache.invalidate_tags(["user:1"]) == 2
+        assert list(cache.cache) == ["c"]
+        cache._evict_lru()
+        assert not cache._tag_index
+
+    def test_peer_batch_applied(self):
+        """Test keys, patterns and tags from a peer's batch are dropped from L1."""
+        cache = MultiLevelCache()
+        for key in ("default:k1", "scan:p:1", "scan:p:2", "default:keep"):
+            cache.l1_cache.set(key, "value")
+        cache.l1_cache.set("default:t", "value", tags=["user:1"])
+
+        cache._apply_invalidation_message(
+            self._message(1, keys=["default:k1"], patterns=["scan:p:*"], tags=["user:1"])
+        )
+
+        assert list(cache.l1_cache.cache) == ["default:keep"]
+        assert cache.invalidation_stats['applied_entries'] == 4
+
+    @pytest.mark.asyncio
+    async def test_set_publishes_key_invalidation(self):
+        """Test overwriting a key in L2 tells peers to drop their L1 copy."""
+        cache = MultiLevelCache()
+        cache.redis_client = AsyncMock()
+        cache.invalidation_batch_size = 1
+
+        assert await cache.set("k1", "new", cache_type="api_response")
+
+        cache.redis_client.setex.assert_awaited_once()
+        args = cache.redis_client.eval.await_args.args
+        assert args[2:4] == (cache.invalidation_generation_key, cache.invalidation_channel)
+        assert json.loads(args[4]) == {'origin': cache.node_id, 'keys': ["api:k1"]}
+
+        # L1-only writes stay local
+        cache.redis_client.eval.reset_mock()
+        await cache.set("k2", "value", levels=[CacheLevel.L1_MEMORY])
+        cache.redis_client.eval.assert_not_awaited()
+
+    def test_generation_gap_clears_l1(self):
+        """Test a skipped generation (lost message) clears L1; own batches are not re-applied."""
+        cache = MultiLevelCache()
+        cache._apply_invalidation_message(self._message(1, origin=cache.node_id, keys=["default:x"]))
+        cache.l1_cache.set("default:x", "value")
+        cache._apply_invalidation_message(self._message(2, origin=cache.node_id, keys=["default:x"]))
+        assert "default:x" in cache.l1_cache.cache
+
+        cache._apply_invalidation_message(self._message(4, keys=["default:other"]))
+
+        assert not cache.l1_cache.cache
+        assert cache.invalidation_stats['gaps_detected'] == 1
+        assert cache._invalidation_generation == 4
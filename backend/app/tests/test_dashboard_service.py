@@ -0,0 +1,174 @@
+"""
+Tests for the dashboard service: stats periods, analytics series and the
+concurrent overview.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.dashboard.dashboard_service import DashboardService
+
+
+def make_result(row=None, scalar=None):
+    result = MagicMock()
+    result.fetchone.return_value = row
+    result.fetchall.return_value = []
+    result.scalar.return_value = scalar
+    return result
+
+
+@pytest.mark.unit
+class TestDashboardStats:
+    """Test the stats widget's period split and derived rates."""
+
+    @pytest.mark.asyncio
+    async def test_period_split_and_rates(self):
+        """Test current and previous 30-day windows meet without overlap and feed the changes."""
+        db = AsyncMock()
+        db.execute.side_effect = [make_result((3, 10)), make_result((2, 8))]
+        totals = AsyncMock(side_effect=[
+            {"infringements": 30, "takedowns": 20, "successful": 15, "removals": 12},
+            {"infringements": 20, "takedowns": 25, "successful": 10, "removals": 9},
+        ])
+
+        with patch("app.services.dashboard.dashboard_service.analytics_rollup_service.get_period_totals", totals):
+            stats = await DashboardService().get_dashboard_stats(1, db)
+
+        today = datetime.utcnow().date()
+        (_, _, current_start, current_end), _ = totals.call_args_list[0]
+        (_, _, previous_start, previous_end), _ = totals.call_args_list[1]
+        assert current_end == today
+        assert (current_end - current_start).days == 29
+        assert previous_end == current_start - timedelta(days=1)
+        assert (previous_end - previous_start).days == 29
+
+        assert stats["totalProfiles"] == 3
+        assert stats["activeScans"] == 2
+        assert stats["infringementsFound"] == 30
+        assert stats["takedownsSent"] == 20
+        assert stats["successRate"] == 75.0
+        assert stats["scanCoverage"] == 80.0
+        assert stats["infringementsChange"] == 50.0
+        assert stats["takedownsChange"] == -20.0
+
+    @pytest.mark.asyncio
+    async def test_empty_history_has_zero_rates(self):
+        """Test a user with no profiles or takedowns gets zero rates rather than an error."""
+        db = AsyncMock()
+        db.execute.side_effect = [make_result((0, 0)), make_result((0, 0))]
+        empty = {"infringements": 0, "takedowns": 0, "successful": 0, "removals": 0}
+
+        with patch("app.services.dashboard.dashboard_service.analytics_rollup_service.get_period_totals",
+                   AsyncMock(return_value=empty)):
+            stats = await DashboardService().get_dashboard_stats(1, db)
+
+        assert "error" not in stats
+        assert stats["successRate"] == 0.0
+        assert stats["scanCoverage"] == 0.0
+        assert stats["infringementsChange"] == 0.0
+
+
+@pytest.mark.unit
+class TestDashboardAnalytics:
+    """Test the analytics widget's daily series and platform charts."""
+
+    @pytest.mark.asyncio
+    async def test_series_covers_window_including_today(self):
+        """Test the chart spans 30 days ending today and fills days without rollup rows with zeros."""
+        today = datetime.utcnow().date()
+        infringement_rows = make_result()
+        infringement_rows.fetchall.return_value = [(today, 4), (today - timedelta(days=10), 1)]
+        takedown_rows = make_result()
+        takedown_rows.fetchall.return_value = [(today - timedelta(days=10), 2, 1)]
+        db = AsyncMock()
+        db.execute.side_effect = [infringement_rows, takedown_rows]
+
+        with patch("app.services.dashboard.dashboard_service.analytics_rollup_service.get_platform_breakdown",
+                   AsyncMock(return_value=[])):
+            analytics = await DashboardService().get_analytics_data(1, db)
+
+        params = db.execute.call_args_list[0].args[1]
+        assert params["end_day"] == today
+        assert (params["end_day"] - params["start_day"]).days == 29
+
+        trends = analytics["monthlyTrends"]
+        assert len(trends["labels"]) == 30
+        assert trends["labels"][-1] == today.strftime("%Y-%m-%d")
+        assert trends["datasets"][0]["data"] == [0] * 19 + [1] + [0] * 9 + [4]
+        assert trends["datasets"][1]["data"] == [0] * 19 + [2] + [0] * 10
+        assert trends["datasets"][2]["data"] == [0] * 19 + [1] + [0] * 10
+
+    @pytest.mark.asyncio
+    async def test_platform_success_rates(self):
+        """Test platform charts skip platforms without infringements and round success rates."""
+        breakdown = AsyncMock(return_value=[
+            {"platform": "instagram", "infringements": 6, "takedowns": 3, "successful": 2,
+             "success_rate": 200 / 3},
+            {"platform": "reddit", "infringements": 2, "takedowns": 0, "successful": 0, "success_rate": 0.0},
+            {"platform": "unknown", "infringements": 0, "takedowns": 1, "successful": 1, "success_rate": 100.0},
+        ])
+
+        with patch("app.services.dashboard.dashboard_service.analytics_rollup_service.get_daily_series",
+                   AsyncMock(return_value=[])), \
+                patch("app.services.dashboard.dashboard_service.analytics_rollup_service.get_platform_breakdown",
+                      breakdown):
+            analytics = await DashboardService().get_analytics_data(1, AsyncMock())
+
+        assert analytics["platformDistribution"]["labels"] == ["Instagram", "Reddit"]
+        assert analytics["platformDistribution"]["datasets"][0]["data"] == [6, 2]
+        assert analytics["platformDistribution"]["datasets"][0]["backgroundColor"] == ["#E1306C", "#FF4500"]
+        assert analytics["successRateByPlatform"]["datasets"][0]["data"] == [66.7, 0.0]
+
+
+@pytest.mark.unit
+class TestDashboardOverview:
+    """Test the overview runs widgets concurrently on separate sessions."""
+
+    @pytest.mark.asyncio
+    async def test_overview_gathers_widgets(self):
+        """Test widgets overlap, each gets its own session and protection metrics reuse the stats."""
+        service = DashboardService()
+        sessions = []
+        running = 0
+        peak = 0
+
+        @asynccontextmanager
+        async def get_session():
+            session = object()
+            sessions.append(session)
+            yield session
+
+        def widget(result):
+            async def run(user_id, db, **kwargs):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                return result(kwargs) if callable(result) else result
+            return AsyncMock(side_effect=run)
+
+        stats = {"successRate": 80.0, "scanCoverage": 90.0}
+        get_stats = widget(stats)
+        get_protection = widget(lambda kwargs: {"stats": kwargs["stats"]})
+
+        with patch("app.services.dashboard.dashboard_service.database_service.get_session", get_session), \
+                patch.object(service, "get_dashboard_stats", get_stats), \
+                patch.object(service, "get_analytics_data", widget({})), \
+                patch.object(service, "get_recent_activity", widget({})), \
+                patch.object(service, "get_platform_distribution", widget({})), \
+                patch.object(service, "get_protection_metrics", get_protection):
+            overview = await service.get_dashboard_overview(7)
+
+        assert overview["stats"] is stats
+        assert overview["protection_metrics"] == {"stats": stats}
+        assert overview["user_id"] == 7
+        get_stats.assert_awaited_once()
+        assert peak >= 4
+        assert len(sessions) == 5
+        used = [call.args[1] for mock in (get_stats, get_protection) for call in mock.call_args_list]
+        assert len(set(map(id, used))) == 2
@@ -0,0 +1,150 @@
+"""
+Tests for the leased scan queue in the scanning orchestrator.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fakeredis import aioredis as fake_aioredis
+
+from app.services.scanning.orchestrator import (
+    SCAN_ATTEMPTS_KEY, SCAN_LEASES_KEY, SCAN_OWNERS_KEY, SCAN_QUEUE_KEY,
+    ScanPriority, ScanRequest, ScanScope, ScanningOrchestrator
+)
+
+
+def make_scan_request(scan_id, priority=ScanPriority.NORMAL):
+    return ScanRequest(
+        scan_id=scan_id,
+        profile_id=1,
+        user_id=1,
+        profile_data={"username": "creator"},
+        priority=priority,
+        scope=ScanScope.QUICK,
+        platforms=["google"],
+        regions=["US-EAST"],
+        keywords=["creator"]
+    )
+
+
+@pytest.mark.unit
+class TestScanQueueLeases:
+    """Test claiming, heartbeating, requeueing and settling leased scans."""
+
+    @pytest.fixture
+    async def orchestrator(self):
+        with patch("app.services.scanning.orchestrator.ContentMatcher"), \
+                patch("app.services.scanning.orchestrator.DMCATakedownProcessor"), \
+                patch("app.services.scanning.orchestrator.ScanningScheduler"):
+            orchestrator = ScanningOrchestrator()
+        orchestrator.redis_client = fake_aioredis.FakeRedis(decode_responses=True)
+        yield orchestrator
+        orchestrator.thread_pool.shutdown(wait=False)
+        await orchestrator.redis_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_claim_leases_highest_priority_scan(self, orchestrator):
+        """Test a claim pops the highest priority scan and leases it to one owner."""
+        await orchestrator._queue_scan_request(make_scan_request("low", ScanPriority.LOW))
+        await orchestrator._queue_scan_request(make_scan_request("urgent", ScanPriority.URGENT))
+
+        assert await orchestrator.claim_scans("worker-a") == [("urgent", 1)]
+        assert await orchestrator.claim_scans("worker-b") == [("low", 1)]
+        assert await orchestrator.claim_scans("worker-c") == []
+
+        redis = orchestrator.redis_client
+        assert await redis.hget(SCAN_OWNERS_KEY, "urgent") == "worker-a"
+        assert await redis.zcard(SCAN_QUEUE_KEY) == 0
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_extends_only_owned_lease(self, orchestrator):
+        """Test a heartbeat pushes the deadline out for the owner and is refused for others."""
+        await orchestrator._queue_scan_request(make_scan_request("scan"))
+        orchestrator.scan_lease_seconds = 1
+        await orchestrator.claim_scans("worker-a")
+        deadline = await orchestrator.redis_client.zscore(SCAN_LEASES_KEY, "scan")
+
+        orchestrator.scan_lease_seconds = 60
+        orchestrator.scan_heartbeat_seconds = 0
+        await asyncio.wait_for(orchestrator._heartbeat_lease("scan", "worker-b"), timeout=1)
+        assert await orchestrator.redis_client.zscore(SCAN_LEASES_KEY, "scan") == deadline
+
+        heartbeat = asyncio.create_task(orchestrator._heartbeat_lease("scan", "worker-a"))
+        await asyncio.sleep(0.05)
+        heartbeat.cancel()
+        assert await orchestrator.redis_client.zscore(SCAN_LEASES_KEY, "scan") > deadline + 50000
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_requeued(self, orchestrator):
+        """Test an expired lease goes back at its priority and counts the attempt."""
+        await orchestrator._queue_scan_request(make_scan_request("scan", ScanPriority.HIGH))
+        priority = await orchestrator.redis_client.zscore(SCAN_QUEUE_KEY, "scan")
+        orchestrator.scan_lease_seconds = 0
+        await orchestrator.claim_scans("worker-a")
+        await asyncio.sleep(0.01)
+
+        assert await orchestrator.claim_scans("worker-b", count=0) == []
+        assert await orchestrator.redis_client.zscore(SCAN_QUEUE_KEY, "scan") == priority
+        assert await orchestrator.redis_client.hget(SCAN_OWNERS_KEY, "scan") is None
+
+        assert await orchestrator.claim_scans("worker-b") == [("scan", 2)]
+        assert not await orchestrator._settle_scan("scan", "worker-a")
+
+    @pytest.mark.asyncio
+    async def test_max_attempts_fails_without_loading(self, orchestrator):
+        """Test a scan past its attempt limit is failed and settled before it is deserialised."""
+        await orchestrator._queue_scan_request(make_scan_request("scan"))
+        await orchestrator.claim_scans("worker-a")
+
+        with patch.object(orchestrator, "_load_scan_request") as mock_load, \
+                patch.object(orchestrator, "_execute_scan", new_callable=AsyncMock) as mock_execute:
+            await orchestrator._run_claimed_scan("scan", orchestrator.scan_max_attempts + 1, "worker-a", 0)
+
+        mock_load.assert_not_called()
+        mock_execute.assert_not_called()
+        assert await orchestrator.redis_client.hget("scan:scan", "status") == "failed"
+        assert await orchestrator.redis_client.zcard(SCAN_LEASES_KEY) == 0
+        assert await orchestrator.claim_scans("worker-b") == []
+
+    @pytest.mark.asyncio
+    async def test_undecodable_request_is_failed(self, orchestrator):
+        """Test a payload that does not decode is dead-lettered instead of retried."""
+        await orchestrator._queue_scan_request(make_scan_request("scan"))
+        data = json.loads(await orchestrator.redis_client.hget("scan:scan", "data"))
+        data["priority"] = "unknown"
+        await orchestrator.redis_client.hset("scan:scan", "data", json.dumps(data))
+        await orchestrator.claim_scans("worker-a")
+
+        await orchestrator._run_claimed_scan("scan", 1, "worker-a", 0)
+
+        assert await orchestrator.redis_client.hget("scan:scan", "status") == "failed"
+        assert "Unreadable" in await orchestrator.redis_client.hget("scan:scan", "error")
+        assert await orchestrator.redis_client.zcard(SCAN_LEASES_KEY) == 0
+        assert await orchestrator.claim_scans("worker-b") == []
+
+    @pytest.mark.asyncio
+    async def test_cancelled_scan_is_requeued(self, orchestrator):
+        """Test cancelling a running scan hands it back without counting the attempt."""
+        await orchestrator._queue_scan_request(make_scan_request("scan"))
+        priority = await orchestrator.redis_client.zscore(SCAN_QUEUE_KEY, "scan")
+        [(scan_id, attempt)] = await orchestrator.claim_scans("worker-a")
+        started = asyncio.Event()
+
+        async def execute(scan_request, worker_id):
+            started.set()
+            await asyncio.sleep(60)
+
+        with patch.object(orchestrator, "_execute_scan", side_effect=execute):
+            run = asyncio.create_task(orchestrator._run_claimed_scan(scan_id, attempt, "worker-a", 0))
+            await started.wait()
+            run.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await run
+
+        redis = orchestrator.redis_client
+        assert await redis.zscore(SCAN_QUEUE_KEY, "scan") == priority
+        assert await redis.zcard(SCAN_LEASES_KEY) == 0
+        assert await redis.hget(SCAN_ATTEMPTS_KEY, "scan") == "0"
+        assert await orchestrator.claim_scans("worker-b") == [("scan", 1)]
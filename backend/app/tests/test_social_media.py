@@ -12,7 +12,10 @@ from app.services.social_media.config import MonitoringConfig, SocialMediaSettin
 from app.services.social_media.api_clients import ProfileData, SearchResult, create_api_client
 from app.services.social_media.scrapers import SocialMediaScraper
 from app.services.social_media.username_monitor import UsernameMonitor, UsernameGenerator, UsernameMatch
-from app.services.social_media.face_matcher import ProfileImageAnalyzer, FaceMatch, ImageMatch
+from app.services.social_media.face_matcher import (
+    ProfileImageAnalyzer, FaceMatch, ImageMatch, FaceMatcher, DecryptedReferenceMatrix,
+    ImageSimilarityMatcher
+)
 from app.services.social_media.fake_detection import FakeAccountDetector, FakeAccountScore
 from app.services.social_media.reporting import AutomatedReportingService, ReportSubmission
 from app.services.social_media.monitoring_service import SocialMediaMonitoringService, MonitoringResult
@@ -279,6 +282,108 @@ class TestFaceMatching:
             usernames = list(results.keys())
             similarities = [results[u]['overall_similarity'] for u in usernames]
             assert similarities == sorted(similarities, reverse=True)
+    
+    @pytest.mark.asyncio
+    async def test_compare_faces_decrypts_references_once(self, settings):
+        """Test every candidate face is matched against references decrypted once."""
+        import numpy as np
+        
+        matcher = FaceMatcher(settings)
+        rng = np.random.default_rng(0)
+        references = rng.normal(0, 0.1, (20, 128))
+        encrypted = [matcher.biometric_protection.encrypt_face_encoding(r.tolist()) for r in references]
+        candidate_faces = [
+            (references[3] + 0.001, (0, 0, 10, 10)),  # near reference 3
+            (rng.normal(0, 0.1, 128), (20, 20, 10, 10)),  # unrelated face
+        ]
+        
+        with patch.object(matcher, 'extract_face_encodings', AsyncMock(return_value=candidate_faces)), \
+                patch.object(matcher.biometric_protection, 'decrypt_face_encoding',
+                             wraps=matcher.biometric_protection.decrypt_face_encoding) as mock_decrypt:
+            matches = await matcher.compare_faces(encrypted, b"image", "user-1")
+        
+        assert mock_decrypt.call_count == len(encrypted)
+        assert len(matches) == 1
+        assert matches[0].metadata['encrypted_reference_encoding'] == encrypted[3]
+        assert matches[0].bounding_box == (0, 0, 10, 10)
+        assert matches[0].similarity_score == pytest.approx(1.0 - np.sqrt(128) * 0.001)
+    
+    def test_reference_matrix_zeroed_on_release(self):
+        """Test released reference matrices are wiped and unusable."""
+        with DecryptedReferenceMatrix([[0.5] * 128, [0.25] * 128], ["a", "b"]) as references:
+            matrix = references.matrix
+            assert len(references) == 2
+        
+        assert not matrix.any()
+        assert len(references) == 0
+        with pytest.raises(ValueError):
+            references.matrix
+    
+    @pytest.mark.asyncio
+    async def test_batch_compare_images_decodes_once(self, settings):
+        """Test batch comparison prepares each image once and matches pairwise results."""
+        import io
+        import numpy as np
+        from PIL import Image
+        
+        def jpeg(seed, size):
+            pixels = np.random.default_rng(seed).integers(0, 255, (30, 40, 3), dtype=np.uint8)
+            buffer = io.BytesIO()
+            Image.fromarray(pixels).resize(size, Image.BILINEAR).save(buffer, format='JPEG')
+            return buffer.getvalue()
+        
+        images = {
+            "ref": jpeg(1, (400, 300)),
+            "copy": jpeg(1, (320, 240)),  # same picture, rescaled
+            "other1": jpeg(2, (400, 300)),
+            "other2": jpeg(3, (400, 300)),
+        }
+        matcher = ImageSimilarityMatcher(settings)
+        
+        async def download(url):
+            return images[url]
+        
+        with patch.object(matcher.image_processor, 'download_image', side_effect=download), \
+                patch.object(matcher.image_processor, 'prepare_image',
+                             wraps=matcher.image_processor.prepare_image) as mock_prepare:
+            results = await matcher.batch_compare_images(["ref"], ["copy", "other1", "other2"])
+            unfiltered = await matcher.batch_compare_images(
+                ["ref"], ["copy", "other1", "other2"], min_hash_similarity=0
+            )
+        
+        assert mock_prepare.call_count == 8
+        assert "copy" in results["ref"]
+        for candidate in ("copy", "other1", "other2"):
+            expected = await matcher.compare_images(images["ref"], images[candidate])
+            for match in (results["ref"].get(candidate), unfiltered["ref"][candidate]):
+                if match is None:
+                    # Skipped pairs could not have reached the threshold
+                    assert expected.similarity_score < matcher.similarity_threshold
+                    continue
+                assert match.hash_similarity == pytest.approx(expected.hash_similarity)
+                assert match.similarity_score == pytest.approx(expected.similarity_score)
+                assert match.confidence_level == expected.confidence_level
+
+    def test_prepared_ssim_matches_pairwise_for_large_jpeg(self, settings):
+        """Test batch SSIM input equals the pairwise one where JPEG draft mode applies."""
+        import io
+        import numpy as np
+        from PIL import Image
+
+        def jpeg(seed):
+            pixels = np.random.default_rng(seed).integers(0, 255, (60, 80, 3), dtype=np.uint8)
+            buffer = io.BytesIO()
+            Image.fromarray(pixels).resize((1600, 1200), Image.BILINEAR).save(buffer, format='JPEG')
+            return buffer.getvalue()
+
+        processor = ImageSimilarityMatcher(settings).image_processor
+        first, second = jpeg(1), jpeg(2)
+        prepared = [processor.prepare_image(first), processor.prepare_image(second)]
+
+        assert prepared[0].ssim_gray.shape == (192, 256)
+        assert processor.structural_similarity_gray(
+            prepared[0].ssim_gray, prepared[1].ssim_gray
+        ) == processor.compute_structural_similarity(first, second)
 
 
 class TestFakeDetection:
@@ -541,6 +646,55 @@ class TestTaskQueue:
         assert await task_queue.put(task2) == True
         assert await task_queue.put(task3) == False  # Should fail due to capacity
 
+    @pytest.mark.asyncio
+    async def test_task_queue_remove_and_replace(self, task_queue):
+        """Test removed or replaced tasks are never returned and free capacity."""
+        from app.services.social_media.scheduler import ScheduledTask
+
+        task_queue.max_size = 2
+        task1 = ScheduledTask("task1", 1, [SocialMediaPlatform.INSTAGRAM], "test")
+        task2 = ScheduledTask("task2", 1, [SocialMediaPlatform.TWITTER], "test")
+        replacement = ScheduledTask("task2", 2, [SocialMediaPlatform.TWITTER], "test")
+
+        assert await task_queue.put(task1) == True
+        assert await task_queue.put(task2) == True
+        assert await task_queue.put(replacement) == True  # Same ID replaces in place
+        assert await task_queue.remove_task("task1") == True
+        assert await task_queue.get_task("task1") is None
+        assert await task_queue.size() == 1
+
+        next_task = await task_queue.get()
+        assert next_task is replacement
+        assert await task_queue.get() is None
+
+    @pytest.mark.asyncio
+    async def test_wait_for_task_wakes_when_due(self, task_queue):
+        """Test waiting workers wake for the earliest due task or an emergency task."""
+        from app.services.social_media.scheduler import ScheduledTask, TaskPriority
+
+        later = ScheduledTask(
+            "later", 1, [SocialMediaPlatform.INSTAGRAM], "periodic",
+            next_run=datetime.now() + timedelta(seconds=0.2)
+        )
+        await task_queue.put(later)
+        assert await task_queue.get() is None  # Not due yet
+
+        waiter = asyncio.ensure_future(task_queue.wait_for_task())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        emergency = ScheduledTask(
+            "emergency", 1, [SocialMediaPlatform.INSTAGRAM], "emergency",
+            priority=TaskPriority.EMERGENCY,
+            next_run=datetime.now() + timedelta(hours=1)
+        )
+        await task_queue.put(emergency)
+        assert (await asyncio.wait_for(waiter, 0.1)).task_id == "emergency"
+
+        next_task = await asyncio.wait_for(task_queue.wait_for_task(), 1)
+        assert next_task.task_id == "later"
+        assert await task_queue.wait_for_task(timeout=0.01) is None
+
 
 class TestMonitoringService:
     """Test main monitoring service."""
@@ -27,9 +27,30 @@ class ScannerSettings(BaseSettings):
     bing_api_key: Optional[str] = None
     
     # Rate limiting
-    requests_per_minute: int = 60
+    requests_per_minute: int = 60  # per domain
     requests_per_hour: int = 1000
     concurrent_requests: int = 10
+    domain_burst: int = 1  # requests a domain may send back to back before pacing applies
+    domain_min_requests_per_minute: float = 1.0  # floor when backing off after 429/503
+    max_retry_after_seconds: int = 600  # cap on honoured Retry-After pauses
+    
+    # Shared HTTP transport (one connector per process)
+    http_connection_limit: int = 100
+    http_connection_limit_per_host: int = 10
+    http_dns_cache_ttl: int = 300  # seconds
+    http_keepalive_timeout: float = 60.0
+    
+    # Image downloads (checked while streaming, before decoding)
+    max_image_bytes: int = 20 * 1024 * 1024
+    min_image_dimension: int = 64  # smaller images (icons, tiny thumbnails) are skipped
+    max_image_pixels: int = 50_000_000
+    
+    # DMCA queue processing
+    dmca_claim_lease_seconds: int = 600  # unsettled claims return to pending after this
+    dmca_heartbeat_seconds: int = 120  # claims being sent are renewed this often
+    dmca_provider_concurrency: int = 2  # notices in flight per hosting provider
+    dmca_consolidation_window_seconds: int = 300  # hold young requests so one notice covers a host's URLs
+    dmca_consolidation_max_urls: int = 50  # URLs per consolidated notice; a full group is sent at once
     
     # Proxy settings
     proxy_enabled: bool = False
@@ -44,10 +65,17 @@ class ScannerSettings(BaseSettings):
     # Image hashing
     hash_size: int = 8
     similarity_threshold: float = 0.85
+    hash_draft_decode_size: int = 0  # >0 decodes JPEGs at reduced size (faster, hashes differ slightly)
     supported_image_formats: Set[str] = field(
         default_factory=lambda: {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
     )
     
+    # CPU compute stage (image decoding, hashing, face encoding)
+    compute_workers: Optional[int] = None  # None = one per core, 0 = threads in-process
+    compute_queue_depth: int = 0  # tasks queued or running before submitters wait; 0 = 2 x workers
+    compute_start_method: Optional[str] = None  # multiprocessing start method, None = platform default
+    compute_shared_memory_min_bytes: int = 65536  # smaller payloads are pickled instead
+    
     # Scanning intervals
     scan_interval_hours: int = 24
     priority_scan_interval_hours: int = 6
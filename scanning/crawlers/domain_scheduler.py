@@ -0,0 +1,194 @@
+"""
+Per-domain request pacing for the crawlers.
+
+Each host gets a token bucket; a request waits for its host's token *before*
+taking one of the global connection slots, so a slow or throttled domain never
+holds a slot while idle and requests to other domains proceed at full
+concurrency.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+import structlog
+
+from ..config import ScannerSettings
+
+
+logger = structlog.get_logger(__name__)
+
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class DomainBucket:
+    """Token bucket for one host, kept as a theoretical next-slot time.
+
+    ``reserve`` hands out send times ``interval`` apart (after an initial
+    burst) and advances the schedule in the same step, so concurrent callers
+    never read the same "last request" time. The rate halves on throttling
+    responses and climbs back towards the configured rate on success.
+    """
+
+    __slots__ = ("base_rate", "min_rate", "rate", "burst", "next_slot", "blocked_until", "throttled")
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: Optional[float] = None):
+        self.base_rate = rate  # requests per second
+        self.min_rate = min(min_rate or rate, rate)
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.next_slot = 0.0
+        self.blocked_until = 0.0
+        self.throttled = 0
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate
+
+    def reserve(self, now: float) -> float:
+        """Claim the next send slot and return how long to wait for it."""
+        start = max(now, self.blocked_until, self.next_slot - (self.burst - 1) * self.interval)
+        self.next_slot = max(self.next_slot, start) + self.interval
+        return start - now
+
+    def on_throttled(self, now: float, retry_after: Optional[float] = None):
+        """Back off after a 429/503: halve the rate and pause the host."""
+        self.throttled += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        pause = retry_after if retry_after is not None else self.interval
+        self.blocked_until = max(self.blocked_until, now + pause)
+        # Slots handed out at the old rate are pushed behind the pause
+        self.next_slot = max(self.next_slot, self.blocked_until)
+
+    def on_success(self):
+        """Recover additively towards the configured rate."""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate / 20)
+
+
+class DomainScheduler:
+    """Admits requests per host rate, then bounds them by global concurrency.
+
+    Usage::
+
+        async with scheduler.slot(url):
+            response = await session.get(url)
+            scheduler.record_response(url, response.status, response.headers.get("Retry-After"))
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        concurrent_requests: int,
+        burst: int = 1,
+        min_requests_per_minute: Optional[float] = None,
+        max_retry_after: float = 600.0
+    ):
+        self.rate = requests_per_minute / 60.0
+        self.min_rate = (min_requests_per_minute or requests_per_minute) / 60.0
+        self.burst = burst
+        self.max_retry_after = max_retry_after
+        self.concurrent_requests = concurrent_requests
+        self._connections = asyncio.Semaphore(concurrent_requests)
+        self._buckets: Dict[str, DomainBucket] = {}
+
+        self._stats = {
+            'requests': 0,
+            'paced': 0,
+            'pacing_seconds': 0.0,
+            'throttled_responses': 0,
+        }
+
+    @classmethod
+    def from_settings(cls, settings: ScannerSettings) -> "DomainScheduler":
+        return cls(
+            requests_per_minute=settings.requests_per_minute,
+            concurrent_requests=settings.concurrent_requests,
+            burst=settings.domain_burst,
+            min_requests_per_minute=settings.domain_min_requests_per_minute,
+            max_retry_after=settings.max_retry_after_seconds
+        )
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def bucket(self, domain: str) -> DomainBucket:
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            bucket = DomainBucket(self.rate, self.burst, self.min_rate)
+            self._buckets[domain] = bucket
+        return bucket
+
+    async def wait_for_token(self, url: str):
+        """Wait (without holding a connection slot) until ``url``'s host may send."""
+        bucket = self.bucket(self.domain_of(url))
+        while True:
+            now = time.monotonic()
+            delay = bucket.reserve(now)
+            if delay <= 0:
+                return
+            self._stats['paced'] += 1
+            self._stats['pacing_seconds'] += delay
+            await asyncio.sleep(delay)
+            # A throttling response may have paused the host while we slept
+            if bucket.blocked_until <= time.monotonic():
+                return
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold a global connection slot for ``url`` once its host token is available."""
+        await self.wait_for_token(url)
+        async with self._connections:
+            self._stats['requests'] += 1
+            yield
+
+    def record_response(self, url: str, status: int, retry_after: Optional[str] = None):
+        """Adapt the host's rate to a response status and Retry-After header."""
+        domain = self.domain_of(url)
+        bucket = self.bucket(domain)
+        if status in THROTTLE_STATUSES:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                delay = min(delay, self.max_retry_after)
+            bucket.on_throttled(time.monotonic(), delay)
+            self._stats['throttled_responses'] += 1
+            logger.warning(
+                "Domain throttled, backing off",
+                domain=domain,
+                status=status,
+                retry_after=delay,
+                requests_per_minute=round(bucket.rate * 60, 2)
+            )
+        elif status < 400:
+            bucket.on_success()
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            'domains': len(self._buckets),
+            'throttled_domains': sum(1 for b in self._buckets.values() if b.rate < b.base_rate),
+            'concurrent_requests': self.concurrent_requests,
+            **self._stats
+        }
@@ -14,6 +14,7 @@ from bs4 import BeautifulSoup
 
 from .web_crawler import WebCrawler, CrawlResult
 from ..config import ScannerSettings, PiracySiteConfig
+from ..http_transport import HttpTransport
 
 
 logger = structlog.get_logger(__name__)
@@ -94,9 +95,9 @@ class CrawlSession:
 class PiracySiteCrawler:
     """Specialized crawler for piracy sites with site-specific parsing."""
     
-    def __init__(self, settings: ScannerSettings):
+    def __init__(self, settings: ScannerSettings, http_transport: Optional[HttpTransport] = None):
         self.settings = settings
-        self.web_crawler = WebCrawler(settings)
+        self.web_crawler = WebCrawler(settings, http_transport)
         self.site_parsers: Dict[str, callable] = {}
         self._register_parsers()
     
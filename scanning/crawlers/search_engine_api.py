@@ -17,6 +17,7 @@ from googleapiclient.errors import HttpError
 from aiohttp import ClientTimeout, ClientError
 
 from ..config import ScannerSettings
+from ..http_transport import HttpTransport, get_http_transport
 
 
 logger = structlog.get_logger(__name__)
@@ -49,18 +50,17 @@ class SearchResult:
 class SearchEngineAPI(ABC):
     """Abstract base class for search engine APIs."""
     
-    def __init__(self, settings: ScannerSettings):
+    def __init__(self, settings: ScannerSettings, http_transport: Optional[HttpTransport] = None):
         self.settings = settings
+        self.http_transport = http_transport or get_http_transport(settings)
         self.session: Optional[aiohttp.ClientSession] = None
         self.rate_limiter = asyncio.Semaphore(settings.concurrent_requests)
         
     async def __aenter__(self):
         """Async context manager entry."""
         timeout = ClientTimeout(total=30, connect=10)
-        connector = aiohttp.TCPConnector(limit=100, limit_per_host=20)
-        self.session = aiohttp.ClientSession(
+        self.session = self.http_transport.session(
             timeout=timeout,
-            connector=connector,
             headers={
                 'User-Agent': 'AutoDMCA Scanner/1.0 (Content Protection Service)'
             }
@@ -124,8 +124,8 @@ class SearchEngineAPI(ABC):
 class GoogleSearchAPI(SearchEngineAPI):
     """Google Custom Search API integration."""
     
-    def __init__(self, settings: ScannerSettings):
-        super().__init__(settings)
+    def __init__(self, settings: ScannerSettings, http_transport: Optional[HttpTransport] = None):
+        super().__init__(settings, http_transport)
         if not settings.google_api_key:
             raise ValueError("Google API key is required")
         if not settings.google_search_engine_id:
@@ -236,8 +236,8 @@ class GoogleSearchAPI(SearchEngineAPI):
 class BingSearchAPI(SearchEngineAPI):
     """Bing Search API integration."""
     
-    def __init__(self, settings: ScannerSettings):
-        super().__init__(settings)
+    def __init__(self, settings: ScannerSettings, http_transport: Optional[HttpTransport] = None):
+        super().__init__(settings, http_transport)
         if not settings.bing_api_key:
             raise ValueError("Bing API key is required")
         
@@ -433,16 +433,16 @@ class BingSearchAPI(SearchEngineAPI):
 class SearchEngineManager:
     """Manages multiple search engines and aggregates results."""
     
-    def __init__(self, settings: ScannerSettings):
+    def __init__(self, settings: ScannerSettings, http_transport: Optional[HttpTransport] = None):
         self.settings = settings
         self.engines = []
         
         # Initialize available search engines
         if settings.google_api_key and settings.google_search_engine_id:
-            self.engines.append(("google", GoogleSearchAPI(settings)))
+            self.engines.append(("google", GoogleSearchAPI(settings, http_transport)))
         
         if settings.bing_api_key:
-            self.engines.append(("bing", BingSearchAPI(settings)))
+            self.engines.append(("bing", BingSearchAPI(settings, http_transport)))
         
         if not self.engines:
             logger.warning("No search engines configured")
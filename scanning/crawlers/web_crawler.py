@@ -7,7 +7,7 @@ import random
 import time
 from typing import Dict, List, Optional, Set, Tuple, AsyncIterator
 from dataclasses import dataclass, field
-from urllib.parse import urljoin, urlparse, parse_qs
+from urllib.parse import urljoin, parse_qs
 from pathlib import Path
 import json
 
@@ -25,6 +25,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
 from ..config import ScannerSettings
+from ..http_transport import HttpTransport, get_http_transport
+from .domain_scheduler import DomainScheduler
 
 
 logger = structlog.get_logger(__name__)
@@ -278,44 +280,32 @@ class CrawlResult:
 class WebCrawler:
     """Advanced web crawler with anti-detection and proxy support."""
     
-    def __init__(self, settings: ScannerSettings):
+    def __init__(self, settings: ScannerSettings, http_transport: Optional[HttpTransport] = None):
         self.settings = settings
         self.proxy_manager = ProxyManager(settings)
         self.user_agent = UserAgent()
-        self.session_pool: List[aiohttp.ClientSession] = []
-        self.rate_limiter = asyncio.Semaphore(settings.concurrent_requests)
-        self.domain_delays: Dict[str, float] = {}
+        self.http_transport = http_transport or get_http_transport(settings)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.domain_scheduler = DomainScheduler.from_settings(settings)
         
     async def initialize(self):
         """Initialize the crawler."""
         await self.proxy_manager.initialize()
-        await self._create_session_pool()
+        await self._setup_http_session()
         
-    async def _create_session_pool(self):
-        """Create a pool of HTTP sessions for reuse."""
-        pool_size = min(self.settings.concurrent_requests, 10)
-        
-        for i in range(pool_size):
-            timeout = aiohttp.ClientTimeout(total=30, connect=10)
-            connector = aiohttp.TCPConnector(
-                limit=100,
-                limit_per_host=10,
-                keepalive_timeout=60
-            )
-            
-            session = aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout,
-                headers={'User-Agent': self.user_agent.random}
-            )
-            
-            self.session_pool.append(session)
+    async def _setup_http_session(self):
+        """Setup HTTP session on the shared transport."""
+        timeout = aiohttp.ClientTimeout(total=30, connect=10)
+        self.session = self.http_transport.session(
+            timeout=timeout,
+            headers={'User-Agent': self.user_agent.random}
+        )
     
     async def close(self):
         """Clean up resources."""
-        for session in self.session_pool:
-            await session.close()
-        self.session_pool.clear()
+        if self.session:
+            await self.session.close()
+            self.session = None
     
     async def crawl(
         self,
@@ -329,10 +319,8 @@ class WebCrawler:
         """Crawl a single URL."""
         start_time = time.time()
         
-        async with self.rate_limiter:
-            # Apply domain-specific rate limiting
-            await self._apply_domain_rate_limit(url)
-            
+        # Wait for the domain's token first; only then take a global slot
+        async with self.domain_scheduler.slot(url):
             try:
                 if render_js:
                     return await self._crawl_with_selenium(url, extract_images, extract_links)
@@ -350,21 +338,6 @@ class WebCrawler:
                     response_time=time.time() - start_time
                 )
     
-    async def _apply_domain_rate_limit(self, url: str):
-        """Apply rate limiting per domain."""
-        domain = urlparse(url).netloc.lower()
-        current_time = time.time()
-        
-        if domain in self.domain_delays:
-            time_since_last = current_time - self.domain_delays[domain]
-            min_delay = 60.0 / self.settings.requests_per_minute
-            
-            if time_since_last < min_delay:
-                sleep_time = min_delay - time_since_last
-                await asyncio.sleep(sleep_time)
-        
-        self.domain_delays[domain] = time.time()
-    
     async def _crawl_with_aiohttp(
         self,
         url: str,
@@ -383,10 +356,9 @@ class WebCrawler:
             if use_proxy:
                 proxy = await self.proxy_manager.get_proxy()
             
-            # Get session from pool
-            session = self.session_pool[0] if self.session_pool else None
-            if not session:
-                session = aiohttp.ClientSession()
+            if not self.session:
+                await self._setup_http_session()
+            session = self.session
             
             # Prepare request headers
             headers = {
@@ -413,6 +385,9 @@ class WebCrawler:
                 max_redirects=5
             ) as response:
                 
+                self.domain_scheduler.record_response(
+                    url, response.status, response.headers.get('Retry-After')
+                )
                 html = await response.text()
                 
                 result = CrawlResult(
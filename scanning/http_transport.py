@@ -0,0 +1,239 @@
+"""
+Shared HTTP transport for the scanning components.
+
+One connector per process holds the keep-alive pool, DNS cache and TLS
+sessions; each component gets its own lightweight ``ClientSession`` (for its
+headers and timeouts) on top of it.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+import structlog
+
+from .config import ScannerSettings
+
+
+logger = structlog.get_logger(__name__)
+
+
+class HostStats:
+    """Per-host request counters collected from aiohttp trace signals."""
+
+    __slots__ = (
+        "requests", "errors", "new_connections", "reused_connections",
+        "bytes_sent", "bytes_received", "latency_total"
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency_total = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        connections = self.new_connections + self.reused_connections
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'avg_latency_ms': round(self.latency_total * 1000 / self.requests, 2) if self.requests else 0.0,
+            'reuse_rate': self.reused_connections / connections if connections else 0.0,
+            'new_connections': self.new_connections,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+        }
+
+    def merge(self, other: "HostStats"):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+class HttpTransport:
+    """Process-wide aiohttp connector shared by crawlers, processors and senders.
+
+    ``session()`` returns a session that borrows the shared connector; closing
+    it leaves the pool open. Call ``close()`` once on shutdown. aiohttp speaks
+    HTTP/1.1 only, so connections are reused through keep-alive rather than
+    HTTP/2 multiplexing.
+
+    Per-host counters are kept for the ``max_tracked_hosts`` most recently
+    used hosts; older hosts are folded into one aggregate so totals stay
+    exact. ``get_stats()`` lists the ``stats_top_hosts`` busiest hosts and
+    sums the rest under ``other_hosts``.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 60.0,
+        max_tracked_hosts: int = 1000,
+        stats_top_hosts: int = 20
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.max_tracked_hosts = max(1, max_tracked_hosts)
+        self.stats_top_hosts = stats_top_hosts
+
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._connector_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._trace_config = self._create_trace_config()
+        self._host_stats: "OrderedDict[str, HostStats]" = OrderedDict()
+        self._evicted_stats = HostStats()
+        self._evicted_hosts = 0
+
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        loop = asyncio.get_running_loop()
+        if self._connector is None or self._connector.closed or self._connector_loop is not loop:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._connector_loop = loop
+            logger.info(
+                "HTTP transport started",
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                dns_cache_ttl=self.dns_cache_ttl
+            )
+        return self._connector
+
+    def session(
+        self,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs: Any
+    ) -> aiohttp.ClientSession:
+        """Create a session on the shared connector (call from a coroutine)."""
+        return aiohttp.ClientSession(
+            connector=self.connector,
+            connector_owner=False,
+            timeout=timeout or aiohttp.ClientTimeout(total=30),
+            headers=headers,
+            trace_configs=[self._trace_config],
+            **kwargs
+        )
+
+    def _stats_for(self, host: str) -> HostStats:
+        stats = self._host_stats.get(host)
+        if stats is None:
+            if len(self._host_stats) >= self.max_tracked_hosts:
+                _, evicted = self._host_stats.popitem(last=False)
+                self._evicted_stats.merge(evicted)
+                self._evicted_hosts += 1
+            stats = self._host_stats[host] = HostStats()
+        else:
+            self._host_stats.move_to_end(host)
+        return stats
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = params.url.host or ""
+            ctx.start = time.perf_counter()
+
+        async def on_request_end(session, ctx, params):
+            stats = self._stats_for(ctx.host)
+            stats.requests += 1
+            stats.latency_total += time.perf_counter() - ctx.start
+
+        async def on_request_exception(session, ctx, params):
+            stats = self._stats_for(ctx.host)
+            stats.requests += 1
+            stats.errors += 1
+            stats.latency_total += time.perf_counter() - ctx.start
+
+        async def on_connection_create_end(session, ctx, params):
+            self._stats_for(ctx.host).new_connections += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._stats_for(ctx.host).reused_connections += 1
+
+        async def on_request_chunk_sent(session, ctx, params):
+            self._stats_for(ctx.host).bytes_sent += len(params.chunk)
+
+        async def on_response_chunk_received(session, ctx, params):
+            self._stats_for(ctx.host).bytes_received += len(params.chunk)
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+        trace_config.on_response_chunk_received.append(on_response_chunk_received)
+        trace_config.freeze()
+        return trace_config
+
+    def get_stats(self) -> Dict[str, Any]:
+        ranked = sorted(self._host_stats.items(), key=lambda item: item[1].requests, reverse=True)
+        other = HostStats()
+        other.merge(self._evicted_stats)
+        for _, stats in ranked[self.stats_top_hosts:]:
+            other.merge(stats)
+        total = HostStats()
+        total.merge(other)
+        for _, stats in ranked[:self.stats_top_hosts]:
+            total.merge(stats)
+
+        connections = total.new_connections + total.reused_connections
+        return {
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'requests': total.requests,
+            'reuse_rate': total.reused_connections / connections if connections else 0.0,
+            'bytes_received': total.bytes_received,
+            'hosts': {host: stats.to_dict() for host, stats in ranked[:self.stats_top_hosts]},
+            'other_hosts': {
+                'hosts': max(0, len(ranked) - self.stats_top_hosts) + self._evicted_hosts,
+                **other.to_dict()
+            },
+        }
+
+    async def close(self):
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+
+_shared_transports: Dict[Tuple, HttpTransport] = {}
+
+
+def get_http_transport(settings: Optional[ScannerSettings] = None) -> HttpTransport:
+    """Return the process-wide HTTP transport for these settings (defaults if None)."""
+    if settings is None:
+        kwargs: Dict[str, Any] = {}
+    else:
+        kwargs = {
+            'limit': settings.http_connection_limit,
+            'limit_per_host': settings.http_connection_limit_per_host,
+            'dns_cache_ttl': settings.http_dns_cache_ttl,
+            'keepalive_timeout': settings.http_keepalive_timeout,
+        }
+    key = tuple(sorted(kwargs.items()))
+    transport = _shared_transports.get(key)
+    if transport is None:
+        transport = HttpTransport(**kwargs)
+        _shared_transports[key] = transport
+    return transport
+
+
+async def close_http_transports():
+    """Close every shared transport (call once on scanner shutdown)."""
+    for transport in _shared_transports.values():
+        await transport.close()
+    _shared_transports.clear()
@@ -0,0 +1,227 @@
+"""
+Streaming image downloads with early rejection.
+
+Bodies are read in chunks under a byte cap; the format is sniffed from the
+first bytes and the dimensions are parsed from the image header as soon as it
+arrives, so oversized downloads, non-images, tiny thumbnails and huge images
+are dropped before the rest of the body is transferred or anything is decoded.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+import structlog
+
+from .config import ScannerSettings
+
+
+logger = structlog.get_logger(__name__)
+
+
+# Start-of-frame markers carry the dimensions (DHT, JPG and DAC share the range)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def sniff_image_format(head: bytes) -> Optional[str]:
+    """Identify an image format from its magic bytes."""
+    if head[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    if head[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[:2] == b'BM':
+        return 'bmp'
+    if head[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'tiff'
+    if head[:4] == b'\x00\x00\x01\x00':
+        return 'ico'
+    return None
+
+
+def _jpeg_size(head: bytes) -> Optional[Tuple[int, int]]:
+    i, n = 2, len(head)
+    while i + 9 <= n:
+        if head[i] != 0xFF:
+            return None
+        marker = head[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # markers without a length
+            i += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = int.from_bytes(head[i + 5:i + 7], 'big')
+            width = int.from_bytes(head[i + 7:i + 9], 'big')
+            return width, height
+        i += 2 + int.from_bytes(head[i + 2:i + 4], 'big')
+    return None
+
+
+def _webp_size(head: bytes) -> Optional[Tuple[int, int]]:
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and len(head) >= 30 and head[23:26] == b'\x9d\x01\x2a':
+        width = int.from_bytes(head[26:28], 'little') & 0x3FFF
+        height = int.from_bytes(head[28:30], 'little') & 0x3FFF
+        return width, height
+    if chunk == b'VP8L' and len(head) >= 25 and head[20] == 0x2F:
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(head) >= 30:
+        return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    return None
+
+
+def _tiff_size(head: bytes) -> Optional[Tuple[int, int]]:
+    byteorder = 'little' if head[:2] == b'II' else 'big'
+    offset = int.from_bytes(head[4:8], byteorder)
+    if offset + 2 > len(head):
+        return None  # first IFD not received (or stored at the end of the file)
+    count = int.from_bytes(head[offset:offset + 2], byteorder)
+    if offset + 2 + count * 12 > len(head):
+        return None
+    size = {}
+    for entry in range(offset + 2, offset + 2 + count * 12, 12):
+        tag = int.from_bytes(head[entry:entry + 2], byteorder)
+        if tag not in (256, 257):  # ImageWidth, ImageLength
+            continue
+        field_type = int.from_bytes(head[entry + 2:entry + 4], byteorder)
+        width = 2 if field_type == 3 else 4  # SHORT or LONG, left-justified in the value
+        size[tag] = int.from_bytes(head[entry + 8:entry + 8 + width], byteorder)
+    if 256 in size and 257 in size:
+        return size[256], size[257]
+    return None
+
+
+def _ico_size(head: bytes) -> Optional[Tuple[int, int]]:
+    count = int.from_bytes(head[4:6], 'little')
+    if count == 0 or len(head) < 6 + count * 16:
+        return None
+    # Largest icon in the directory; a stored 0 means 256
+    return max(
+        (head[entry] or 256, head[entry + 1] or 256)
+        for entry in range(6, 6 + count * 16, 16)
+    )
+
+
+def read_image_size(head: bytes, image_format: str) -> Optional[Tuple[int, int]]:
+    """Parse (width, height) from an image header; None until enough bytes arrive."""
+    if image_format == 'jpeg':
+        return _jpeg_size(head)
+    if image_format == 'png' and len(head) >= 24:
+        return int.from_bytes(head[16:20], 'big'), int.from_bytes(head[20:24], 'big')
+    if image_format == 'gif' and len(head) >= 10:
+        return int.from_bytes(head[6:8], 'little'), int.from_bytes(head[8:10], 'little')
+    if image_format == 'webp':
+        return _webp_size(head)
+    if image_format == 'bmp' and len(head) >= 26:
+        width = int.from_bytes(head[18:22], 'little', signed=True)
+        height = int.from_bytes(head[22:26], 'little', signed=True)
+        return abs(width), abs(height)
+    if image_format == 'tiff':
+        return _tiff_size(head)
+    if image_format == 'ico':
+        return _ico_size(head)
+    return None
+
+
+class MediaFetcher:
+    """Downloads images into a ``bytearray`` under size and dimension limits.
+
+    The returned buffer can be decoded in place (``np.frombuffer``,
+    ``memoryview``) or handed to the compute pool's shared memory without
+    another copy. Images whose header does not show the dimensions within
+    ``probe_bytes`` are downloaded and left for the decoder to judge.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 20 * 1024 * 1024,
+        min_dimension: int = 64,
+        max_pixels: int = 50_000_000,
+        probe_bytes: int = 128 * 1024,
+        chunk_size: int = 64 * 1024
+    ):
+        self.max_bytes = max_bytes
+        self.min_dimension = min_dimension
+        self.max_pixels = max_pixels
+        self.probe_bytes = probe_bytes
+        self.chunk_size = chunk_size
+
+        self._stats = {
+            'fetched': 0,
+            'bytes_read': 0,
+            'rejected_status': 0,
+            'rejected_too_large': 0,
+            'rejected_format': 0,
+            'rejected_dimensions': 0,
+        }
+
+    @classmethod
+    def from_settings(cls, settings: ScannerSettings) -> "MediaFetcher":
+        return cls(
+            max_bytes=settings.max_image_bytes,
+            min_dimension=settings.min_image_dimension,
+            max_pixels=settings.max_image_pixels
+        )
+
+    def _reject(self, reason: str, url: str, **details):
+        self._stats[f'rejected_{reason}'] += 1
+        logger.debug("Image download rejected", url=url, reason=reason, **details)
+
+    def _size_acceptable(self, size: Tuple[int, int]) -> bool:
+        width, height = size
+        return min(width, height) >= self.min_dimension and width * height <= self.max_pixels
+
+    async def fetch_image(self, session: aiohttp.ClientSession, url: str) -> Optional[bytearray]:
+        """Stream an image body, or return None as soon as it is known to be unwanted."""
+        async with session.get(url) as response:
+            if response.status != 200:
+                self._reject('status', url, status=response.status)
+                return None
+
+            if response.content_length is not None and response.content_length > self.max_bytes:
+                self._reject('too_large', url, content_length=response.content_length)
+                return None
+
+            buffer = bytearray()
+            image_format = None
+            header_checked = False
+
+            # Leaving the context early drops the connection instead of draining the body
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                buffer += chunk
+                self._stats['bytes_read'] += len(chunk)
+                if len(buffer) > self.max_bytes:
+                    self._reject('too_large', url, bytes_read=len(buffer))
+                    return None
+
+                if header_checked:
+                    continue
+                if image_format is None and len(buffer) >= 16:
+                    image_format = sniff_image_format(buffer)
+                    if image_format is None:
+                        self._reject('format', url, content_type=response.content_type)
+                        return None
+                if image_format is not None:
+                    size = read_image_size(buffer, image_format)
+                    if size is not None:
+                        header_checked = True
+                        if not self._size_acceptable(size):
+                            self._reject('dimensions', url, width=size[0], height=size[1])
+                            return None
+                    elif len(buffer) >= self.probe_bytes:
+                        header_checked = True
+
+            if image_format is None and sniff_image_format(buffer) is None:
+                self._reject('format', url, content_type=response.content_type)
+                return None
+
+            self._stats['fetched'] += 1
+            return buffer
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self._stats)
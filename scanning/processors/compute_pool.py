@@ -0,0 +1,288 @@
+"""
+Process-pool compute stage for CPU-bound image work (decoding, hashing, face encoding).
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from ..config import ScannerSettings
+
+
+logger = structlog.get_logger(__name__)
+
+
+class SharedBuffer:
+    """Picklable handle to a payload copied into a shared memory block.
+
+    Only the block name and layout cross the process boundary; the worker maps
+    the block and sees the bytes (or array) without another copy.
+    """
+
+    __slots__ = ("name", "size", "shape", "dtype")
+
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        shape: Optional[Tuple[int, ...]] = None,
+        dtype: Optional[str] = None
+    ):
+        self.name = name
+        self.size = size
+        self.shape = shape  # None for raw bytes
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return (self.name, self.size, self.shape, self.dtype)
+
+    def __setstate__(self, state):
+        self.name, self.size, self.shape, self.dtype = state
+
+
+def _attach(buffer: SharedBuffer) -> shared_memory.SharedMemory:
+    """Map a block in a worker without registering it with a resource tracker.
+
+    The parent owns (and unlinks) every block; a worker-side registration
+    would make the worker's tracker unlink or warn about it on exit.
+    """
+    try:
+        return shared_memory.SharedMemory(name=buffer.name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+
+    # Older versions always register on attach; undo just this block's registration
+    block = shared_memory.SharedMemory(name=buffer.name)
+    if os.name == "posix":
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+def _call_with_shared_buffer(func: Callable, buffer: SharedBuffer, args: tuple) -> Any:
+    """Worker entry point: map the payload, run ``func`` on it, unmap."""
+    block = _attach(buffer)
+    try:
+        if buffer.shape is None:
+            payload = block.buf[:buffer.size]
+        else:
+            payload = np.ndarray(buffer.shape, dtype=np.dtype(buffer.dtype), buffer=block.buf)
+
+        try:
+            return func(payload, *args)
+        finally:
+            if isinstance(payload, memoryview):
+                payload.release()
+            del payload
+    finally:
+        try:
+            block.close()
+        except BufferError:
+            # A view leaked out of ``func``; the mapping goes away with it
+            pass
+
+
+class ComputePool:
+    """Bounded process pool shared by the scanning processors.
+
+    ``submit`` waits while ``queue_depth`` tasks are already queued or running,
+    so producers (downloads) slow down instead of buffering unbounded image
+    data. Large byte and array payloads are handed to workers through shared
+    memory; results come back pickled and should be compact (hash strings,
+    encodings). With ``max_workers=0`` work runs on the default thread pool
+    instead, which still keeps it off the event loop.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        queue_depth: Optional[int] = None,
+        start_method: Optional[str] = None,
+        shared_memory_min_bytes: int = 64 * 1024
+    ):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max(0, max_workers)
+        self.queue_depth = queue_depth or max(2 * self.max_workers, 4)
+        self.start_method = start_method
+        self.shared_memory_min_bytes = shared_memory_min_bytes
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'in_flight': 0,
+            'waited_for_slot': 0,
+            'shared_memory_bytes': 0,
+            'pool_restarts': 0,
+        }
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.max_workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            context = multiprocessing.get_context(self.start_method)
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            logger.info(
+                "Compute pool started",
+                workers=self.max_workers,
+                queue_depth=self.queue_depth,
+                start_method=context.get_start_method()
+            )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.queue_depth)
+            self._slots_loop = loop
+        return self._slots
+
+    def _share(self, payload: Any) -> Tuple[Any, Optional[shared_memory.SharedMemory]]:
+        """Copy a large payload into shared memory; small ones are pickled as is."""
+        if isinstance(payload, np.ndarray):
+            if payload.nbytes < self.shared_memory_min_bytes or payload.dtype.hasobject:
+                return payload, None
+            source = np.ascontiguousarray(payload)
+            shape, dtype = source.shape, source.dtype.str
+        elif isinstance(payload, (bytes, bytearray, memoryview)):
+            source = memoryview(payload).cast('B')
+            if source.nbytes < self.shared_memory_min_bytes:
+                return payload, None
+            shape, dtype = None, None
+        else:
+            return payload, None
+
+        size = source.nbytes
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        if shape is None:
+            block.buf[:size] = source
+        else:
+            np.ndarray(shape, dtype=source.dtype, buffer=block.buf)[...] = source
+
+        self._stats['shared_memory_bytes'] += size
+        return SharedBuffer(block.name, size, shape, dtype), block
+
+    async def submit(self, func: Callable, payload: Any, *args: Any) -> asyncio.Future:
+        """Queue ``func(payload, *args)`` and return a future for its result.
+
+        Waits for a free slot first; callers that want to keep producing while
+        work is in flight can await the slot here and the result later.
+        ``func`` must be a picklable module-level function.
+        """
+        slots = self._get_slots()
+        if slots.locked():
+            self._stats['waited_for_slot'] += 1
+        await slots.acquire()
+
+        loop = asyncio.get_running_loop()
+        block = None
+        try:
+            if self.uses_processes:
+                shared, block = self._share(payload)
+                if block is not None:
+                    concurrent_future = self._get_executor().submit(
+                        _call_with_shared_buffer, func, shared, args
+                    )
+                else:
+                    concurrent_future = self._get_executor().submit(func, payload, *args)
+                future = asyncio.wrap_future(concurrent_future, loop=loop)
+            else:
+                future = loop.run_in_executor(None, func, payload, *args)
+        except BaseException:
+            slots.release()
+            self._release_block(block)
+            raise
+
+        self._stats['submitted'] += 1
+        self._stats['in_flight'] += 1
+
+        def _done(done_future: asyncio.Future):
+            slots.release()
+            self._release_block(block)
+            self._stats['in_flight'] -= 1
+            error = None if done_future.cancelled() else done_future.exception()
+            if done_future.cancelled() or error is not None:
+                self._stats['failed'] += 1
+                if isinstance(error, BrokenProcessPool):
+                    self._reset_executor()
+            else:
+                self._stats['completed'] += 1
+
+        future.add_done_callback(_done)
+        return future
+
+    async def run(self, func: Callable, payload: Any, *args: Any) -> Any:
+        """Run ``func(payload, *args)`` in the pool and return its result."""
+        return await (await self.submit(func, payload, *args))
+
+    def _release_block(self, block: Optional[shared_memory.SharedMemory]):
+        if block is None:
+            return
+        try:
+            block.close()
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _reset_executor(self):
+        """Drop a broken pool (e.g. a worker was OOM-killed); the next submit starts a new one."""
+        if self._executor is not None:
+            logger.warning("Compute pool broken, restarting")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._stats['pool_restarts'] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'workers': self.max_workers,
+            'queue_depth': self.queue_depth,
+            **self._stats
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+_shared_pools: Dict[Tuple, ComputePool] = {}
+
+
+def get_compute_pool(settings: ScannerSettings) -> ComputePool:
+    """Return the process-wide compute pool for these settings."""
+    key = (
+        settings.compute_workers,
+        settings.compute_queue_depth,
+        settings.compute_start_method,
+        settings.compute_shared_memory_min_bytes
+    )
+    pool = _shared_pools.get(key)
+    if pool is None:
+        pool = ComputePool(
+            max_workers=settings.compute_workers,
+            queue_depth=settings.compute_queue_depth,
+            start_method=settings.compute_start_method,
+            shared_memory_min_bytes=settings.compute_shared_memory_min_bytes
+        )
+        _shared_pools[key] = pool
+    return pool
+
+
+def shutdown_compute_pools(wait: bool = True):
+    """Stop every shared compute pool (call once on scanner shutdown)."""
+    for pool in _shared_pools.values():
+        pool.shutdown(wait=wait)
+    _shared_pools.clear()
@@ -14,6 +14,7 @@ import structlog
 from .face_recognition_processor import FaceRecognitionProcessor, FaceProcessingResult
 from .image_hash_processor import ImageHashProcessor, ImageMatch as HashImageMatch
 from ..config import ScannerSettings
+from ..http_transport import HttpTransport
 from ..crawlers.piracy_crawler import InfringingContent
 
 
@@ -66,10 +67,10 @@ class ContentMatch:
 class ContentMatcher:
     """Comprehensive content matcher using multiple AI techniques."""
     
-    def __init__(self, settings: ScannerSettings):
+    def __init__(self, settings: ScannerSettings, http_transport: Optional[HttpTransport] = None):
         self.settings = settings
-        self.face_processor = FaceRecognitionProcessor(settings)
-        self.image_processor = ImageHashProcessor(settings)
+        self.face_processor = FaceRecognitionProcessor(settings, http_transport=http_transport)
+        self.image_processor = ImageHashProcessor(settings, http_transport=http_transport)
         self._initialized = False
         
     async def initialize(self):
@@ -0,0 +1,338 @@
+"""
+Columnar on-disk store for face encodings, loadable with ``np.memmap``.
+
+A store is a directory of raw little-endian column files plus a JSON manifest:
+
+    manifest.json      format name, version, dim, committed row/url-byte counts, person ids
+    encodings.f32      16-byte header (magic, version, dim) + N x dim float32
+    person_codes.i32   N int32 indexes into the manifest's person list
+    bboxes.i32         N x 4 int32 (top, right, bottom, left); -1 rows mean no bbox
+    created_at.f64     N float64
+    confidence.f32     N float32
+    url_spans.i64      N x 2 int64 (offset, length) into urls.bin; length -1 means no url
+    urls.bin           concatenated UTF-8 urls
+
+Every worker that opens the same store maps the same pages, so the roster is
+shared across processes on a host instead of being unpickled into each one.
+Appends write to the end of each column and then rewrite the manifest; rows
+past the manifest's count are an interrupted append and are ignored (and
+truncated by the next append).
+"""
+
+import json
+import os
+import shutil
+import struct
+from collections.abc import MutableSequence
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+FORMAT_NAME = "autodmca-face-encodings"
+FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+ENCODINGS_FILE = "encodings.f32"
+ENCODINGS_MAGIC = b"AFENCv1\0"
+ENCODINGS_HEADER = struct.Struct("<8sII")  # magic, version, dim
+
+_COLUMNS = {
+    "person_codes.i32": (np.dtype("<i4"), ()),
+    "bboxes.i32": (np.dtype("<i4"), (4,)),
+    "created_at.f64": (np.dtype("<f8"), ()),
+    "confidence.f32": (np.dtype("<f4"), ()),
+    "url_spans.i64": (np.dtype("<i8"), (2,)),
+}
+URLS_FILE = "urls.bin"
+
+
+class FaceEncodingRows:
+    """Column data for a batch of encodings to write or append."""
+
+    def __init__(
+        self,
+        encodings: np.ndarray,
+        person_ids: Sequence[str],
+        image_urls: Optional[Sequence[Optional[str]]] = None,
+        bboxes: Optional[Sequence[Optional[Tuple[int, int, int, int]]]] = None,
+        created_at: Optional[Sequence[float]] = None,
+        confidences: Optional[Sequence[float]] = None
+    ):
+        self.encodings = np.ascontiguousarray(encodings, dtype="<f4")
+        if self.encodings.ndim != 2:
+            raise ValueError("encodings must be a 2-d array")
+
+        n = self.encodings.shape[0]
+        self.person_ids = list(person_ids)
+        self.image_urls = list(image_urls) if image_urls is not None else [None] * n
+        self.bboxes = list(bboxes) if bboxes is not None else [None] * n
+        self.created_at = list(created_at) if created_at is not None else [0.0] * n
+        self.confidences = list(confidences) if confidences is not None else [1.0] * n
+
+        for column in (self.person_ids, self.image_urls, self.bboxes, self.created_at, self.confidences):
+            if len(column) != n:
+                raise ValueError("all columns must have one entry per encoding")
+
+    def __len__(self) -> int:
+        return self.encodings.shape[0]
+
+
+class FaceEncodingStore:
+    """Read-only, memory-mapped view of a face encoding store."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("format") != FORMAT_NAME:
+            raise ValueError(f"Not a face encoding store: {path}")
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported face encoding store version: {manifest.get('version')}")
+
+        self.dim = int(manifest["dim"])
+        self.count = int(manifest["count"])
+        self.urls_bytes = int(manifest.get("urls_bytes", 0))
+        self.person_ids: List[str] = list(manifest["persons"])
+
+        _check_encodings_header(os.path.join(path, ENCODINGS_FILE), self.dim)
+
+        self.encodings = self._map(ENCODINGS_FILE, np.dtype("<f4"), (self.dim,), ENCODINGS_HEADER.size)
+        self.person_codes = self._map("person_codes.i32", *_COLUMNS["person_codes.i32"])
+        self.bboxes = self._map("bboxes.i32", *_COLUMNS["bboxes.i32"])
+        self.created_at = self._map("created_at.f64", *_COLUMNS["created_at.f64"])
+        self.confidences = self._map("confidence.f32", *_COLUMNS["confidence.f32"])
+        self.url_spans = self._map("url_spans.i64", *_COLUMNS["url_spans.i64"])
+        # Mapped up front so a later rewrite of the store at this path can't change what we read
+        self._urls = (
+            np.memmap(os.path.join(path, URLS_FILE), dtype=np.uint8, mode="r", shape=(self.urls_bytes,))
+            if self.urls_bytes else np.empty(0, dtype=np.uint8)
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _map(self, name: str, dtype: np.dtype, row_shape: tuple, offset: int = 0) -> np.ndarray:
+        if self.count == 0:
+            return np.empty((0,) + row_shape, dtype=dtype)
+        return np.memmap(
+            os.path.join(self.path, name),
+            dtype=dtype,
+            mode="r",
+            offset=offset,
+            shape=(self.count,) + row_shape
+        )
+
+    def person_id(self, row: int) -> str:
+        return self.person_ids[int(self.person_codes[row])]
+
+    def image_url(self, row: int) -> Optional[str]:
+        start, length = (int(v) for v in self.url_spans[row])
+        if length < 0:
+            return None
+        if length == 0:
+            return ""
+        return bytes(self._urls[start:start + length]).decode("utf-8")
+
+    def bbox(self, row: int) -> Optional[Tuple[int, int, int, int]]:
+        box = self.bboxes[row]
+        if box[0] < 0:
+            return None
+        return tuple(int(v) for v in box)
+
+    def row_fields(self, row: int) -> Dict[str, Any]:
+        """Metadata and encoding view for one row."""
+        return {
+            "encoding": self.encodings[row],
+            "person_id": self.person_id(row),
+            "image_url": self.image_url(row),
+            "confidence": float(self.confidences[row]),
+            "bbox": self.bbox(row),
+            "created_at": float(self.created_at[row]),
+        }
+
+    def is_grouped_by_person(self) -> bool:
+        """Whether each person's rows form one contiguous run."""
+        if self.count == 0:
+            return True
+        runs = np.count_nonzero(np.diff(self.person_codes)) + 1
+        return runs == len(np.unique(self.person_codes))
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+    @staticmethod
+    def write(path: str, rows: FaceEncodingRows):
+        """Write a complete store, atomically replacing any existing one at ``path``."""
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        old_path = f"{path}.old-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        dim = rows.encodings.shape[1] if len(rows) else 128
+        with open(os.path.join(tmp_path, ENCODINGS_FILE), "wb") as f:
+            f.write(ENCODINGS_HEADER.pack(ENCODINGS_MAGIC, FORMAT_VERSION, dim))
+        for name in _COLUMNS:
+            open(os.path.join(tmp_path, name), "wb").close()
+        open(os.path.join(tmp_path, URLS_FILE), "wb").close()
+        _write_manifest(tmp_path, dim, 0, 0, [])
+
+        FaceEncodingStore.append(tmp_path, rows)
+
+        # Swap directories; readers holding maps of the old files keep them
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    @staticmethod
+    def append(path: str, rows: FaceEncodingRows):
+        """Append rows to an existing store (creating it if missing)."""
+        if not FaceEncodingStore.exists(path):
+            FaceEncodingStore.write(path, rows)
+            return
+
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FORMAT_NAME or manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Cannot append to incompatible store: {path}")
+
+        dim = int(manifest["dim"])
+        count = int(manifest["count"])
+        urls_bytes = int(manifest.get("urls_bytes", 0))
+        persons: List[str] = list(manifest["persons"])
+
+        if len(rows) and rows.encodings.shape[1] != dim:
+            raise ValueError(f"expected {dim}-d encodings, got {rows.encodings.shape[1]}")
+
+        # Drop anything past the committed count left by an interrupted append
+        _truncate(os.path.join(path, ENCODINGS_FILE), ENCODINGS_HEADER.size + count * dim * 4)
+        for name, (dtype, row_shape) in _COLUMNS.items():
+            _truncate(os.path.join(path, name), count * dtype.itemsize * int(np.prod(row_shape, dtype=int)))
+
+        urls_path = os.path.join(path, URLS_FILE)
+        _truncate(urls_path, urls_bytes)
+
+        if not len(rows):
+            return
+
+        person_codes_by_id = {person_id: code for code, person_id in enumerate(persons)}
+        codes = np.empty(len(rows), dtype="<i4")
+        for i, person_id in enumerate(rows.person_ids):
+            code = person_codes_by_id.get(person_id)
+            if code is None:
+                code = len(persons)
+                persons.append(person_id)
+                person_codes_by_id[person_id] = code
+            codes[i] = code
+
+        bboxes = np.array(
+            [bbox if bbox is not None else (-1, -1, -1, -1) for bbox in rows.bboxes],
+            dtype="<i4"
+        ).reshape(len(rows), 4)
+
+        url_bytes = bytearray()
+        url_spans = np.empty((len(rows), 2), dtype="<i8")
+        for i, url in enumerate(rows.image_urls):
+            if url is None:
+                url_spans[i] = (0, -1)
+            else:
+                encoded = url.encode("utf-8")
+                url_spans[i] = (urls_bytes + len(url_bytes), len(encoded))
+                url_bytes += encoded
+
+        columns = {
+            "person_codes.i32": codes,
+            "bboxes.i32": bboxes,
+            "created_at.f64": np.asarray(rows.created_at, dtype="<f8"),
+            "confidence.f32": np.asarray(rows.confidences, dtype="<f4"),
+            "url_spans.i64": url_spans,
+        }
+
+        with open(os.path.join(path, ENCODINGS_FILE), "ab") as f:
+            f.write(rows.encodings.tobytes())
+        for name, values in columns.items():
+            with open(os.path.join(path, name), "ab") as f:
+                f.write(values.tobytes())
+        with open(urls_path, "ab") as f:
+            f.write(bytes(url_bytes))
+
+        # Committing the manifest last makes the new rows visible
+        _write_manifest(path, dim, count + len(rows), urls_bytes + len(url_bytes), persons)
+
+
+class StoredFaceEncodings(MutableSequence):
+    """List-like view over one person's rows in a store.
+
+    Items are built on access, so loading a large roster doesn't construct an
+    object per encoding up front.
+    """
+
+    def __init__(self, rows: Sequence[Any], factory: Callable[[int], Any]):
+        self._rows = rows  # store row ints, or already-built objects after inserts
+        self._factory = factory
+
+    def _resolve(self, item: Any) -> Any:
+        return self._factory(item) if isinstance(item, (int, np.integer)) else item
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._resolve(item) for item in self._rows[index]]
+        return self._resolve(self._rows[index])
+
+    def _mutable_rows(self) -> list:
+        if not isinstance(self._rows, list):
+            self._rows = list(self._rows)
+        return self._rows
+
+    def __setitem__(self, index, value):
+        self._mutable_rows()[index] = value
+
+    def __delitem__(self, index):
+        del self._mutable_rows()[index]
+
+    def insert(self, index, value):
+        self._mutable_rows().insert(index, value)
+
+
+def _check_encodings_header(path: str, dim: int):
+    with open(path, "rb") as f:
+        header = f.read(ENCODINGS_HEADER.size)
+    if len(header) != ENCODINGS_HEADER.size:
+        raise ValueError(f"Truncated encodings header: {path}")
+
+    magic, version, header_dim = ENCODINGS_HEADER.unpack(header)
+    if magic != ENCODINGS_MAGIC or version != FORMAT_VERSION or header_dim != dim:
+        raise ValueError(f"Encodings header does not match manifest: {path}")
+
+
+def _truncate(path: str, size: int):
+    if os.path.getsize(path) > size:
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+
+def _write_manifest(path: str, dim: int, count: int, urls_bytes: int, persons: List[str]):
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format": FORMAT_NAME,
+                "version": FORMAT_VERSION,
+                "dim": dim,
+                "count": count,
+                "urls_bytes": urls_bytes,
+                "persons": persons,
+            },
+            f
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, manifest_path)
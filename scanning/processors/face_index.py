@@ -0,0 +1,282 @@
+"""
+Stacked face-encoding matrix for vectorized nearest-reference lookups.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+_DEAD = -1  # person code of a removed (tombstoned) row
+_MIN_CAPACITY = 16
+
+
+def _grown(buffer: np.ndarray, used: int, needed: int) -> np.ndarray:
+    """``buffer`` with room for ``needed`` rows, doubling its capacity if it is short."""
+    if needed <= len(buffer):
+        return buffer
+    grown = np.empty((max(needed, 2 * len(buffer), _MIN_CAPACITY),) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:used] = buffer[:used]
+    return grown
+
+
+class FaceEncodingIndex:
+    """All known face encodings stacked into ``(N, dim)`` float32 rows.
+
+    One matrix product scores every face against every reference and a segmented
+    reduction yields the closest reference per person.
+
+    Rows are never moved on a roster change: adds go to an append buffer that
+    doubles its capacity, and removals only tombstone the person's rows. An
+    adopted matrix (e.g. a read-only memmap) stays the base block and is never
+    written; it is only replaced when tombstones outnumber live rows and the
+    index compacts into one private, person-grouped matrix.
+    """
+
+    def __init__(self, dim: int = 128):
+        self.dim = dim
+        self._base = np.empty((0, dim), dtype=np.float32)  # adopted rows, read-only
+        self._tail = np.empty((0, dim), dtype=np.float32)  # append buffer
+        self._tail_size = 0
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._person_codes = np.empty(0, dtype=np.int32)
+        self._items: List[Any] = []  # row -> reference object (e.g. FaceEncoding)
+        self._dead = 0
+
+        self._person_ids: List[Optional[str]] = []  # code -> person_id
+        self._person_codes_by_id: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}  # person_id -> live rows, in roster order
+        self._layout: Optional[Tuple[Optional[np.ndarray], Dict[str, Tuple[int, int]]]] = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        matrix: np.ndarray,
+        person_codes: np.ndarray,
+        person_ids: Sequence[str],
+        items: List[Any]
+    ) -> 'FaceEncodingIndex':
+        """Adopt an existing matrix (e.g. a read-only memmap) without copying it.
+
+        ``person_codes`` index into ``person_ids``; a person's rows need not be
+        contiguous.
+        """
+        person_codes = np.array(person_codes, dtype=np.int32)
+
+        index = cls(dim=matrix.shape[1])
+        index._base = matrix
+        index._sq_norms = np.einsum('ij,ij->i', matrix, matrix).astype(np.float32)
+        index._person_codes = person_codes
+        index._items = list(items)
+        index._person_ids = list(person_ids)
+        index._person_codes_by_id = {pid: code for code, pid in enumerate(index._person_ids)}
+        counts = np.bincount(person_codes, minlength=len(index._person_ids)).tolist()
+        index._counts = {pid: count for pid, count in zip(index._person_ids, counts) if count}
+        return index
+
+    def __len__(self) -> int:
+        return self._size - self._dead
+
+    @property
+    def _size(self) -> int:
+        return len(self._base) + self._tail_size
+
+    @property
+    def persons(self) -> List[str]:
+        return list(self._counts.keys())
+
+    def person_count(self, person_id: str) -> int:
+        return self._counts.get(person_id, 0)
+
+    def _grouped(self) -> Tuple[Optional[np.ndarray], Dict[str, Tuple[int, int]]]:
+        """Live rows grouped by person in roster order, and each person's slice of them.
+
+        Codes are handed out in roster order, so a stable sort by code groups the
+        rows; the order is ``None`` when the rows are already laid out that way.
+        """
+        if self._layout is None:
+            codes = self._person_codes[:self._size]
+            if self._dead == 0 and not np.any(np.diff(codes) < 0):
+                order = None
+            else:
+                # Tombstones sort first
+                order = np.argsort(codes, kind='stable')[self._dead:]
+
+            segments, start = {}, 0
+            for person_id, count in self._counts.items():
+                segments[person_id] = (start, start + count)
+                start += count
+            self._layout = (order, segments)
+        return self._layout
+
+    def _rows(self, person_id: str) -> np.ndarray:
+        order, segments = self._grouped()
+        start, stop = segments.get(person_id, (0, 0))
+        return np.arange(start, stop) if order is None else order[start:stop]
+
+    def _vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Gather rows from the base block and the append buffer."""
+        base_size = len(self._base)
+        if not self._tail_size:
+            return np.asarray(self._base[rows])
+        if not base_size:
+            return self._tail[rows]
+
+        vectors = np.empty((len(rows), self.dim), dtype=np.float32)
+        in_base = rows < base_size
+        vectors[in_base] = self._base[rows[in_base]]
+        vectors[~in_base] = self._tail[rows[~in_base] - base_size]
+        return vectors
+
+    def add(self, person_id: str, encodings: Sequence[np.ndarray], items: Optional[Sequence[Any]] = None):
+        """Append encodings for a person; amortized O(rows added)."""
+        if not len(encodings):
+            return
+
+        rows = np.asarray(np.vstack([np.asarray(e, dtype=np.float32).ravel() for e in encodings]))
+        if rows.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-d encodings, got {rows.shape[1]}")
+
+        items = list(items) if items is not None else [None] * rows.shape[0]
+        if len(items) != rows.shape[0]:
+            raise ValueError("items and encodings must have the same length")
+
+        code = self._person_codes_by_id.get(person_id)
+        if code is None:
+            code = len(self._person_ids)
+            self._person_ids.append(person_id)
+            self._person_codes_by_id[person_id] = code
+
+        size, count = self._size, rows.shape[0]
+        self._tail = _grown(self._tail, self._tail_size, self._tail_size + count)
+        self._sq_norms = _grown(self._sq_norms, size, size + count)
+        self._person_codes = _grown(self._person_codes, size, size + count)
+
+        self._tail[self._tail_size:self._tail_size + count] = rows
+        self._sq_norms[size:size + count] = np.einsum('ij,ij->i', rows, rows)
+        self._person_codes[size:size + count] = code
+        self._tail_size += count
+        self._items.extend(items)
+
+        self._counts[person_id] = self._counts.get(person_id, 0) + count
+        self._layout = None
+
+    def remove_person(self, person_id: str) -> int:
+        """Tombstone all of a person's rows; returns the number removed."""
+        removed = self._counts.pop(person_id, 0)
+        if not removed:
+            return 0
+
+        code = self._person_codes_by_id.pop(person_id)
+        self._person_ids[code] = None
+        live = self._person_codes[:self._size]
+        dead_rows = np.flatnonzero(live == code)
+        live[dead_rows] = _DEAD
+        for row in dead_rows.tolist():
+            self._items[row] = None
+        self._dead += removed
+        self._layout = None
+
+        if self._dead > len(self):
+            self._compact()
+        return removed
+
+    def _compact(self):
+        """Rewrite the live rows into one private matrix, grouped by person."""
+        order, _ = self._grouped()
+        rows = np.arange(self._size) if order is None else order
+        persons = self.persons
+        counts = [self._counts[person_id] for person_id in persons]
+
+        self._base = np.ascontiguousarray(self._vectors(rows), dtype=np.float32)
+        self._tail = np.empty((0, self.dim), dtype=np.float32)
+        self._tail_size = 0
+        self._sq_norms = self._sq_norms[rows]
+        self._person_codes = np.repeat(np.arange(len(persons), dtype=np.int32), counts)
+        self._items = [self._items[row] for row in rows.tolist()]
+        self._dead = 0
+
+        self._person_ids = list(persons)
+        self._person_codes_by_id = {pid: code for code, pid in enumerate(persons)}
+        self._layout = None
+
+    def clear(self):
+        self.__init__(self.dim)
+
+    def items(self, person_id: str) -> List[Any]:
+        return [self._items[row] for row in self._rows(person_id).tolist()]
+
+    def export(self) -> Tuple[np.ndarray, List[str], List[Any]]:
+        """The live rows with each row's person id and item, grouped by person."""
+        order, _ = self._grouped()
+        rows = np.arange(self._size) if order is None else order
+        matrix = self._base if order is None and not self._tail_size else self._vectors(rows)
+        row_person_ids = [
+            person_id for person_id in self.persons for _ in range(self._counts[person_id])
+        ]
+        return matrix, row_person_ids, [self._items[row] for row in rows.tolist()]
+
+    def match(
+        self,
+        face_encodings: Sequence[np.ndarray],
+        person_ids: Optional[Iterable[str]] = None
+    ) -> List[List[Tuple[str, float, Any]]]:
+        """Closest reference per person for each face.
+
+        Returns, for every query face, a list of ``(person_id, distance, item)``
+        with one entry per person that has encodings, in roster order.
+        """
+        if not len(face_encodings):
+            return []
+
+        queries = np.asarray(
+            np.vstack([np.asarray(e, dtype=np.float32).ravel() for e in face_encodings])
+        )
+
+        order, segments = self._grouped()
+        if person_ids is None:
+            ordered = list(segments.items())
+        else:
+            ordered = [(pid, segments[pid]) for pid in dict.fromkeys(person_ids) if pid in segments]
+        if not ordered:
+            return [[] for _ in range(queries.shape[0])]
+        if len(ordered) == len(segments):
+            ordered = list(segments.items())
+        lengths = [stop - start for _, (start, stop) in ordered]
+
+        # ||q - r||^2 = ||q||^2 + ||r||^2 - 2 q.r, one GEMM for every face/reference pair
+        query_sq = np.einsum('ij,ij->i', queries, queries)
+        if len(ordered) == len(segments):
+            # Full roster: score every block as is, then put the columns in person order
+            products = np.hstack([
+                queries @ block.T for block in (self._base, self._tail[:self._tail_size])
+            ])
+            sq_distances = query_sq[:, None] + self._sq_norms[None, :self._size] - 2.0 * products
+            rows = np.arange(self._size)
+            if order is not None:
+                sq_distances, rows = sq_distances[:, order], order
+        else:
+            grouped = np.arange(self._size) if order is None else order
+            rows = np.concatenate([grouped[start:stop] for _, (start, stop) in ordered])
+            matrix, sq_norms = self._vectors(rows), self._sq_norms[rows]
+            sq_distances = query_sq[:, None] + sq_norms[None, :] - 2.0 * (queries @ matrix.T)
+        distances = np.sqrt(np.maximum(sq_distances, 0.0))
+
+        # Segmented argmin: min per person, then the first column that attains it
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        mins = np.minimum.reduceat(distances, starts, axis=1)
+        positions = np.where(
+            distances == np.repeat(mins, lengths, axis=1),
+            np.arange(distances.shape[1]),
+            distances.shape[1]
+        )
+        argmins = np.minimum.reduceat(positions, starts, axis=1)
+
+        results = []
+        for face_mins, face_argmins in zip(mins, argmins):
+            face_results = []
+            for (person_id, _), best, pos in zip(ordered, face_mins.tolist(), face_argmins.tolist()):
+                face_results.append((person_id, best, self._items[rows[pos]]))
+            results.append(face_results)
+
+        return results
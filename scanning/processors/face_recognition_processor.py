@@ -20,6 +20,11 @@ from PIL import Image, ImageEnhance
 import structlog
 
 from ..config import ScannerSettings
+from ..http_transport import HttpTransport, get_http_transport
+from ..media_fetcher import MediaFetcher
+from .compute_pool import ComputePool, get_compute_pool
+from .face_index import FaceEncodingIndex
+from .face_encoding_store import FaceEncodingRows, FaceEncodingStore, StoredFaceEncodings
 
 
 logger = structlog.get_logger(__name__)
@@ -84,12 +89,170 @@ class FaceProcessingResult:
         return min(positive_matches, key=lambda x: x.distance)
 
 
+_face_cascade = None  # per-process Haar cascade, loaded on first fallback
+
+
+def _get_face_cascade():
+    global _face_cascade
+    if _face_cascade is None:
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        _face_cascade = False if cascade.empty() else cascade
+    return _face_cascade or None
+
+
+def _decode_image(image_source: Union[str, bytes, memoryview, np.ndarray]) -> Optional[np.ndarray]:
+    """Decode a payload to an RGB array."""
+    if isinstance(image_source, np.ndarray):
+        return image_source
+    
+    if isinstance(image_source, (bytes, bytearray, memoryview)):
+        nparr = np.frombuffer(image_source, np.uint8)
+        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    else:
+        image = cv2.imread(image_source)
+    
+    if image is None:
+        return None
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def _enhance_image(image: np.ndarray) -> np.ndarray:
+    """Enhance image quality for better face recognition."""
+    try:
+        # Convert to PIL for enhancement
+        pil_image = Image.fromarray(image)
+        
+        # Enhance contrast and sharpness
+        enhancer = ImageEnhance.Contrast(pil_image)
+        pil_image = enhancer.enhance(1.2)
+        
+        enhancer = ImageEnhance.Sharpness(pil_image)
+        pil_image = enhancer.enhance(1.1)
+        
+        # Convert back to numpy array
+        return np.array(pil_image)
+        
+    except Exception:
+        # Return original image if enhancement fails
+        return image
+
+
+def _detect_faces(image: np.ndarray, detection_model: str, max_faces: int) -> List[Tuple[int, int, int, int]]:
+    """Detect faces in image using face_recognition library."""
+    try:
+        # Use face_recognition's HOG or CNN model based on settings
+        model = detection_model.lower()
+        if model not in ['hog', 'cnn']:
+            model = 'hog'  # Default to HOG for speed
+        
+        # Detect face locations
+        face_locations = face_recognition.face_locations(
+            image, 
+            number_of_times_to_upsample=1,
+            model=model
+        )
+        
+        # Limit number of faces processed
+        if len(face_locations) > max_faces:
+            # Sort by face size (larger faces first)
+            face_locations = sorted(
+                face_locations,
+                key=lambda loc: (loc[2] - loc[0]) * (loc[1] - loc[3]),
+                reverse=True
+            )[:max_faces]
+        
+        return face_locations
+        
+    except Exception as e:
+        logger.error("Face detection failed", error=str(e))
+        
+        # Fallback to OpenCV if face_recognition fails
+        return _detect_faces_opencv(image, max_faces)
+
+
+def _detect_faces_opencv(image: np.ndarray, max_faces: int) -> List[Tuple[int, int, int, int]]:
+    """Fallback face detection using OpenCV Haar cascades."""
+    face_cascade = _get_face_cascade()
+    if face_cascade is None:
+        return []
+    
+    try:
+        # Convert to grayscale for detection
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        
+        # Detect faces
+        faces = face_cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(30, 30)
+        )
+        
+        # Convert from OpenCV format (x, y, w, h) to face_recognition format (top, right, bottom, left)
+        face_locations = []
+        for (x, y, w, h) in faces[:max_faces]:
+            top, right, bottom, left = y, x + w, y + h, x
+            face_locations.append((int(top), int(right), int(bottom), int(left)))
+        
+        logger.debug(f"OpenCV detected {len(face_locations)} faces")
+        return face_locations
+        
+    except Exception as e:
+        logger.error("OpenCV face detection failed", error=str(e))
+        return []
+
+
+def detect_and_encode_faces(
+    image_source: Union[str, bytes, memoryview, np.ndarray],
+    detection_model: str = "hog",
+    max_faces: int = 5,
+    enhance: bool = False
+) -> Tuple[List[Tuple[int, int, int, int]], List[np.ndarray], Optional[str]]:
+    """Decode an image, detect faces and compute their encodings (compute pool worker).
+    
+    Returns ``(face_locations, face_encodings, error)``.
+    """
+    try:
+        image_array = _decode_image(image_source)
+    except Exception as e:
+        logger.error("Failed to load image", error=str(e))
+        image_array = None
+    if image_array is None:
+        return [], [], "Failed to load image"
+    
+    if enhance:
+        image_array = _enhance_image(image_array)
+    
+    face_locations = _detect_faces(image_array, detection_model, max_faces)
+    if not face_locations:
+        return [], [], None
+    
+    face_encodings = face_recognition.face_encodings(
+        image_array, 
+        face_locations,
+        model='large'  # Use large model for better accuracy
+    )
+    
+    return list(face_locations), [np.asarray(encoding) for encoding in face_encodings], None
+
+
 class FaceRecognitionProcessor:
     """Advanced face recognition processor with OpenCV and face_recognition."""
     
-    def __init__(self, settings: ScannerSettings):
+    def __init__(
+        self,
+        settings: ScannerSettings,
+        compute_pool: Optional[ComputePool] = None,
+        http_transport: Optional[HttpTransport] = None
+    ):
         self.settings = settings
+        self.compute_pool = compute_pool or get_compute_pool(settings)
+        self.http_transport = http_transport or get_http_transport(settings)
+        self.media_fetcher = MediaFetcher.from_settings(settings)
         self.known_encodings: Dict[str, List[FaceEncoding]] = {}
+        self.encoding_index = FaceEncodingIndex()
+        self._encoding_store: Optional[FaceEncodingStore] = None  # store backing loaded rows
+        self._unsaved_encodings: List[FaceEncoding] = []  # added since the last load/save
         self.face_cascade = None
         self.session: Optional[aiohttp.ClientSession] = None
         self._lock = asyncio.Lock()
@@ -130,10 +293,8 @@ class FaceRecognitionProcessor:
     async def _setup_http_session(self):
         """Setup HTTP session for downloading images."""
         timeout = aiohttp.ClientTimeout(total=30)
-        connector = aiohttp.TCPConnector(limit=50)
         
-        self.session = aiohttp.ClientSession(
-            connector=connector,
+        self.session = self.http_transport.session(
             timeout=timeout,
             headers={
                 'User-Agent': 'AutoDMCA Face Recognition/1.0'
@@ -153,8 +314,11 @@ class FaceRecognitionProcessor:
         async with self._lock:
             if replace_existing or person_id not in self.known_encodings:
                 self.known_encodings[person_id] = []
+                self.encoding_index.remove_person(person_id)
+                self._discard_unsaved(person_id)
             
             encodings_added = 0
+            new_encodings = []
             
             for image in reference_images:
                 try:
@@ -162,12 +326,20 @@ class FaceRecognitionProcessor:
                     
                     for encoding in face_encodings:
                         self.known_encodings[person_id].append(encoding)
+                        new_encodings.append(encoding)
                         encodings_added += 1
                         
                 except Exception as e:
                     logger.error(f"Failed to process reference image for {person_id}", error=str(e))
                     continue
             
+            self.encoding_index.add(
+                person_id,
+                [encoding.encoding for encoding in new_encodings],
+                new_encodings
+            )
+            self._unsaved_encodings.extend(new_encodings)
+            
             logger.info(
                 f"Added person to face recognition database",
                 person_id=person_id,
@@ -182,6 +354,8 @@ class FaceRecognitionProcessor:
         async with self._lock:
             if person_id in self.known_encodings:
                 del self.known_encodings[person_id]
+                self.encoding_index.remove_person(person_id)
+                self._discard_unsaved(person_id)
                 logger.info(f"Removed person from database: {person_id}")
                 return True
             return False
@@ -199,63 +373,13 @@ class FaceRecognitionProcessor:
         image_url = image_source if isinstance(image_source, str) else "unknown"
         
         try:
-            # Load image
-            image_array = await self._load_image(image_source)
-            if image_array is None:
-                return FaceProcessingResult(
-                    image_url=image_url,
-                    faces_found=0,
-                    error="Failed to load image"
-                )
+            face_locations, face_encodings, error = await self._detect_and_encode(image_source)
             
-            # Detect faces
-            face_locations = await self._detect_faces(image_array)
-            
-            if not face_locations:
-                return FaceProcessingResult(
-                    image_url=image_url,
-                    faces_found=0,
-                    processing_time=asyncio.get_event_loop().time() - start_time
-                )
-            
-            # Extract face encodings
-            face_encodings = face_recognition.face_encodings(
-                image_array, 
-                face_locations,
-                model='large'  # Use large model for better accuracy
-            )
-            
-            # Match faces against known encodings
-            matches = []
+            # Match all faces against known encodings in one vectorized pass
             target_persons = person_ids or list(self.known_encodings.keys())
+            face_matches = self._match_faces(face_encodings, face_locations, target_persons, image_url)
             
-            for i, (face_encoding, face_location) in enumerate(zip(face_encodings, face_locations)):
-                best_matches = await self._find_best_matches(
-                    face_encoding, 
-                    target_persons, 
-                    face_location,
-                    image_url
-                )
-                matches.extend(best_matches)
-            
-            processing_time = asyncio.get_event_loop().time() - start_time
-            
-            result = FaceProcessingResult(
-                image_url=image_url,
-                faces_found=len(face_locations),
-                matches=matches,
-                processing_time=processing_time
-            )
-            
-            logger.debug(
-                "Face processing completed",
-                image_url=image_url,
-                faces_found=len(face_locations),
-                matches_found=len([m for m in matches if m.is_match]),
-                processing_time=processing_time
-            )
-            
-            return result
+            return self._build_result(image_url, face_locations, face_matches, error, start_time)
             
         except Exception as e:
             logger.error("Face processing failed", image_url=image_url, error=str(e))
@@ -266,124 +390,97 @@ class FaceRecognitionProcessor:
                 processing_time=asyncio.get_event_loop().time() - start_time
             )
     
-    async def _load_image(self, image_source: Union[str, bytes, np.ndarray]) -> Optional[np.ndarray]:
-        """Load image from various sources."""
-        try:
-            if isinstance(image_source, np.ndarray):
-                return image_source
-            
-            elif isinstance(image_source, bytes):
-                # Convert bytes to numpy array
-                nparr = np.frombuffer(image_source, np.uint8)
-                image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            elif isinstance(image_source, str):
-                if image_source.startswith(('http://', 'https://')):
-                    # Download from URL
-                    return await self._download_and_load_image(image_source)
-                else:
-                    # Load from file path
-                    image = cv2.imread(image_source)
-                    if image is not None:
-                        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            return None
-            
-        except Exception as e:
-            logger.error("Failed to load image", source=str(image_source)[:100], error=str(e))
-            return None
+    async def _detect_and_encode(
+        self,
+        image_source: Union[str, bytes, np.ndarray]
+    ) -> Tuple[List[Tuple[int, int, int, int]], List[np.ndarray], Optional[str]]:
+        """Load an image, detect faces and compute their encodings."""
+        return await (await self._submit_detect_and_encode(image_source))
     
-    async def _download_and_load_image(self, url: str) -> Optional[np.ndarray]:
-        """Download and load image from URL."""
-        try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
-                    logger.warning(f"Failed to download image: HTTP {response.status}", url=url)
-                    return None
-                
-                content_type = response.headers.get('content-type', '')
-                if not content_type.startswith('image/'):
-                    logger.warning(f"Invalid content type: {content_type}", url=url)
-                    return None
-                
-                image_bytes = await response.read()
-                
-                # Convert to numpy array
-                nparr = np.frombuffer(image_bytes, np.uint8)
-                image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                
-                if image is not None:
-                    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                
-                return None
-                
-        except Exception as e:
-            logger.error("Failed to download image", url=url, error=str(e))
-            return None
+    async def _submit_detect_and_encode(
+        self,
+        image_source: Union[str, bytes, np.ndarray],
+        enhance: bool = False
+    ) -> asyncio.Future:
+        """Fetch an image and queue its detection/encoding in the compute pool.
+        
+        Returns once the work is queued (waiting for pool capacity if needed);
+        the returned future resolves to ``(locations, encodings, error)``.
+        """
+        payload = await self._load_payload(image_source)
+        if payload is None:
+            future = asyncio.get_event_loop().create_future()
+            future.set_result(([], [], "Failed to load image"))
+            return future
+        
+        return await self.compute_pool.submit(
+            detect_and_encode_faces,
+            payload,
+            self.settings.face_detection_model,
+            self.settings.max_faces_per_image,
+            enhance
+        )
     
-    async def _detect_faces(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """Detect faces in image using face_recognition library."""
-        try:
-            # Use face_recognition's HOG or CNN model based on settings
-            model = self.settings.face_detection_model.lower()
-            if model not in ['hog', 'cnn']:
-                model = 'hog'  # Default to HOG for speed
-            
-            # Detect face locations
-            face_locations = face_recognition.face_locations(
-                image, 
-                number_of_times_to_upsample=1,
-                model=model
+    def _build_result(
+        self,
+        image_url: str,
+        face_locations: List[Tuple[int, int, int, int]],
+        face_matches: List[List[FaceMatch]],
+        error: Optional[str],
+        start_time: float
+    ) -> FaceProcessingResult:
+        """Assemble a processing result from per-face matches."""
+        if error:
+            return FaceProcessingResult(
+                image_url=image_url,
+                faces_found=0,
+                error=error
             )
-            
-            # Limit number of faces processed
-            max_faces = self.settings.max_faces_per_image
-            if len(face_locations) > max_faces:
-                # Sort by face size (larger faces first)
-                face_locations = sorted(
-                    face_locations,
-                    key=lambda loc: (loc[2] - loc[0]) * (loc[1] - loc[3]),
-                    reverse=True
-                )[:max_faces]
-            
-            return face_locations
-            
-        except Exception as e:
-            logger.error("Face detection failed", error=str(e))
-            
-            # Fallback to OpenCV if face_recognition fails
-            return await self._detect_faces_opencv(image)
+        
+        matches = [match for matches_for_face in face_matches for match in matches_for_face]
+        processing_time = asyncio.get_event_loop().time() - start_time
+        
+        result = FaceProcessingResult(
+            image_url=image_url,
+            faces_found=len(face_locations),
+            matches=matches,
+            processing_time=processing_time
+        )
+        
+        if face_locations:
+            logger.debug(
+                "Face processing completed",
+                image_url=image_url,
+                faces_found=len(face_locations),
+                matches_found=len([m for m in matches if m.is_match]),
+                processing_time=processing_time
+            )
+        
+        return result
     
-    async def _detect_faces_opencv(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """Fallback face detection using OpenCV Haar cascades."""
-        if not self.face_cascade:
-            return []
+    async def _load_payload(self, image_source: Union[str, bytes, np.ndarray]) -> Optional[Union[str, bytes, np.ndarray]]:
+        """Turn an image source into something a pool worker can decode.
+        
+        URLs are downloaded to bytes; file paths, encoded bytes and arrays are
+        passed through.
+        """
+        if isinstance(image_source, (bytes, np.ndarray)):
+            return image_source
         
+        elif isinstance(image_source, str):
+            if image_source.startswith(('http://', 'https://')):
+                return await self._download_image(image_source)
+            return image_source
+        
+        return None
+    
+    async def _download_image(self, url: str) -> Optional[bytearray]:
+        """Stream the encoded bytes of an image, dropping unusable ones early."""
         try:
-            # Convert to grayscale for detection
-            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-            
-            # Detect faces
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
-            
-            # Convert from OpenCV format (x, y, w, h) to face_recognition format (top, right, bottom, left)
-            face_locations = []
-            for (x, y, w, h) in faces[:self.settings.max_faces_per_image]:
-                top, right, bottom, left = y, x + w, y + h, x
-                face_locations.append((top, right, bottom, left))
-            
-            logger.debug(f"OpenCV detected {len(face_locations)} faces")
-            return face_locations
-            
+            return await self.media_fetcher.fetch_image(self.session, url)
         except Exception as e:
-            logger.error("OpenCV face detection failed", error=str(e))
-            return []
+            logger.error("Failed to download image", url=url, error=str(e))
+            return None
     
     async def _extract_face_encodings(
         self, 
@@ -391,64 +488,64 @@ class FaceRecognitionProcessor:
         person_id: str
     ) -> List[FaceEncoding]:
         """Extract face encodings from an image."""
-        image_array = await self._load_image(image_source)
-        if image_array is None:
-            return []
-        
-        # Enhance image quality for better encoding
-        image_array = await self._enhance_image(image_array)
-        
-        # Detect faces
-        face_locations = await self._detect_faces(image_array)
-        if not face_locations:
-            return []
-        
-        # Extract encodings
         try:
-            encodings = face_recognition.face_encodings(
-                image_array,
-                face_locations,
-                model='large'  # Use large model for reference images
+            # Reference images are enhanced before encoding
+            face_locations, encodings, _ = await (
+                await self._submit_detect_and_encode(image_source, enhance=True)
             )
-            
-            face_encodings = []
-            image_url = image_source if isinstance(image_source, str) else None
-            
-            for encoding, location in zip(encodings, face_locations):
-                face_enc = FaceEncoding(
-                    encoding=encoding,
-                    person_id=person_id,
-                    image_url=image_url,
-                    bbox=location,
-                    confidence=1.0  # Reference images assumed high confidence
-                )
-                face_encodings.append(face_enc)
-            
-            return face_encodings
-            
         except Exception as e:
             logger.error("Failed to extract face encodings", error=str(e))
             return []
+        
+        image_url = image_source if isinstance(image_source, str) else None
+        
+        return [
+            FaceEncoding(
+                encoding=encoding,
+                person_id=person_id,
+                image_url=image_url,
+                bbox=location,
+                confidence=1.0  # Reference images assumed high confidence
+            )
+            for encoding, location in zip(encodings, face_locations)
+        ]
     
-    async def _enhance_image(self, image: np.ndarray) -> np.ndarray:
-        """Enhance image quality for better face recognition."""
-        try:
-            # Convert to PIL for enhancement
-            pil_image = Image.fromarray(image)
-            
-            # Enhance contrast and sharpness
-            enhancer = ImageEnhance.Contrast(pil_image)
-            pil_image = enhancer.enhance(1.2)
-            
-            enhancer = ImageEnhance.Sharpness(pil_image)
-            pil_image = enhancer.enhance(1.1)
-            
-            # Convert back to numpy array
-            return np.array(pil_image)
+    def _match_faces(
+        self,
+        face_encodings: List[np.ndarray],
+        face_locations: List[Tuple[int, int, int, int]],
+        person_ids: List[str],
+        image_url: str
+    ) -> List[List[FaceMatch]]:
+        """Best match per person for each face, scored against the whole roster at once."""
+        tolerance = self.settings.face_recognition_tolerance
+        all_matches = []
+        
+        for face_location, person_results in zip(
+            face_locations, self.encoding_index.match(face_encodings, person_ids)
+        ):
+            matches = []
+            for person_id, best_distance, reference_encoding in person_results:
+                if isinstance(reference_encoding, (int, np.integer)):
+                    reference_encoding = self._stored_face_encoding(reference_encoding)
+                
+                # Calculate confidence score (inverse of distance)
+                confidence = max(0.0, 1.0 - (best_distance / tolerance))
+                
+                matches.append(FaceMatch(
+                    person_id=person_id,
+                    confidence=confidence,
+                    distance=best_distance,
+                    bbox=face_location,
+                    image_url=image_url,
+                    reference_encoding=reference_encoding
+                ))
             
-        except Exception:
-            # Return original image if enhancement fails
-            return image
+            # Sort by confidence (best matches first)
+            matches.sort(key=lambda x: x.confidence, reverse=True)
+            all_matches.append(matches)
+        
+        return all_matches
     
     async def _find_best_matches(
         self,
@@ -458,48 +555,7 @@ class FaceRecognitionProcessor:
         image_url: str
     ) -> List[FaceMatch]:
         """Find best matches for a face encoding."""
-        matches = []
-        tolerance = self.settings.face_recognition_tolerance
-        
-        for person_id in person_ids:
-            if person_id not in self.known_encodings:
-                continue
-            
-            person_encodings = self.known_encodings[person_id]
-            if not person_encodings:
-                continue
-            
-            # Compare against all encodings for this person
-            known_encodings = [enc.encoding for enc in person_encodings]
-            
-            # Calculate distances
-            distances = face_recognition.face_distance(known_encodings, face_encoding)
-            
-            if len(distances) == 0:
-                continue
-            
-            # Find best match
-            best_distance = float(np.min(distances))
-            best_match_index = int(np.argmin(distances))
-            
-            # Calculate confidence score (inverse of distance)
-            confidence = max(0.0, 1.0 - (best_distance / tolerance))
-            
-            match = FaceMatch(
-                person_id=person_id,
-                confidence=confidence,
-                distance=best_distance,
-                bbox=face_location,
-                image_url=image_url,
-                reference_encoding=person_encodings[best_match_index]
-            )
-            
-            matches.append(match)
-        
-        # Sort by confidence (best matches first)
-        matches.sort(key=lambda x: x.confidence, reverse=True)
-        
-        return matches
+        return self._match_faces([face_encoding], [face_location], person_ids, image_url)[0]
     
     async def bulk_process_images(
         self,
@@ -507,25 +563,59 @@ class FaceRecognitionProcessor:
         person_ids: Optional[List[str]] = None,
         max_concurrent: int = 5
     ) -> Dict[str, FaceProcessingResult]:
-        """Process multiple images concurrently."""
+        """Process multiple images concurrently.
+        
+        Faces from every image are matched against the roster together in a
+        single vectorized pass once detection and encoding have finished.
+        """
+        if not self._models_loaded:
+            await self.initialize()
+        
         semaphore = asyncio.Semaphore(max_concurrent)
         
-        async def process_single(url: str) -> Tuple[str, FaceProcessingResult]:
-            async with semaphore:
-                result = await self.process_image(url, person_ids)
-                return url, result
+        async def extract_single(url: str):
+            start_time = asyncio.get_event_loop().time()
+            try:
+                # Hold the download slot until the pool accepts the work, so a
+                # saturated pool stalls downloads instead of buffering images
+                async with semaphore:
+                    pending = await self._submit_detect_and_encode(url)
+                face_locations, face_encodings, error = await pending
+            except Exception as e:
+                logger.error("Face processing failed", image_url=url, error=str(e))
+                face_locations, face_encodings, error = [], [], str(e)
+            return url, face_locations, face_encodings, error, start_time
         
-        tasks = [process_single(url) for url in image_urls]
+        tasks = [extract_single(url) for url in image_urls]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        processed_results = {}
+        extracted = []
         for result in results:
             if isinstance(result, tuple):
-                url, processing_result = result
-                processed_results[url] = processing_result
+                extracted.append(result)
             elif isinstance(result, Exception):
                 logger.error("Bulk processing failed for image", error=str(result))
         
+        # One distance computation for every face in the batch
+        target_persons = person_ids or list(self.known_encodings.keys())
+        all_locations = [loc for _, locations, _, _, _ in extracted for loc in locations]
+        all_encodings = [enc for _, _, encodings, _, _ in extracted for enc in encodings]
+        all_matches = self._match_faces(all_encodings, all_locations, target_persons, "")
+        
+        processed_results = {}
+        offset = 0
+        for url, face_locations, _, error, start_time in extracted:
+            face_matches = all_matches[offset:offset + len(face_locations)]
+            offset += len(face_locations)
+            
+            for matches_for_face in face_matches:
+                for match in matches_for_face:
+                    match.image_url = url
+            
+            processed_results[url] = self._build_result(
+                url, face_locations, face_matches, error, start_time
+            )
+        
         logger.info(
             "Bulk face processing completed",
             total_images=len(image_urls),
@@ -535,48 +625,158 @@ class FaceRecognitionProcessor:
         
         return processed_results
     
+    def _discard_unsaved(self, person_id: str):
+        """Forget a person's not-yet-persisted encodings."""
+        self._unsaved_encodings = [
+            encoding for encoding in self._unsaved_encodings if encoding.person_id != person_id
+        ]
+    
+    def _stored_face_encoding(self, row: int) -> FaceEncoding:
+        """Build a FaceEncoding for a row of the loaded encoding store."""
+        return FaceEncoding(**self._encoding_store.row_fields(int(row)))
+    
+    @staticmethod
+    def _encoding_rows(encodings: List[FaceEncoding], matrix: Optional[np.ndarray] = None) -> FaceEncodingRows:
+        """Column data for a list of encodings."""
+        if matrix is None:
+            matrix = (
+                np.vstack([np.asarray(e.encoding, dtype=np.float32).ravel() for e in encodings])
+                if encodings else np.empty((0, 128), dtype=np.float32)
+            )
+        
+        return FaceEncodingRows(
+            encodings=matrix,
+            person_ids=[e.person_id for e in encodings],
+            image_urls=[e.image_url for e in encodings],
+            bboxes=[tuple(e.bbox) if e.bbox is not None else None for e in encodings],
+            created_at=[e.created_at for e in encodings],
+            confidences=[e.confidence for e in encodings]
+        )
+    
+    @staticmethod
+    def _index_from_store(store: FaceEncodingStore) -> FaceEncodingIndex:
+        """Index over a store's rows, with row numbers as the index items.
+        
+        The index adopts the memory-mapped encodings as they are, even when
+        appends interleaved persons.
+        """
+        return FaceEncodingIndex.from_arrays(
+            store.encodings, store.person_codes, store.person_ids, list(range(len(store)))
+        )
+    
+    def _bind_store(self, store: FaceEncodingStore, index: FaceEncodingIndex):
+        """Serve known encodings from a store's rows."""
+        self._encoding_store = store
+        self.encoding_index = index
+        self.known_encodings = {
+            person_id: StoredFaceEncodings(index.items(person_id), self._stored_face_encoding)
+            for person_id in index.persons
+        }
+    
     async def save_encodings(self, file_path: str) -> bool:
-        """Save known face encodings to file."""
+        """Save all known face encodings as a columnar encoding store.
+        
+        The store at ``file_path`` is replaced atomically and compacted, so
+        removed persons are dropped from it.
+        """
         try:
             async with self._lock:
-                # Convert encodings to serializable format
-                serializable_data = {}
-                for person_id, encodings in self.known_encodings.items():
-                    serializable_data[person_id] = []
-                    for encoding in encodings:
-                        serializable_data[person_id].append({
-                            'encoding': encoding.encoding.tolist(),
-                            'person_id': encoding.person_id,
-                            'image_url': encoding.image_url,
-                            'confidence': encoding.confidence,
-                            'bbox': encoding.bbox,
-                            'created_at': encoding.created_at
-                        })
+                matrix, _, items = self.encoding_index.export()
+                encodings = [
+                    self._stored_face_encoding(item) if isinstance(item, (int, np.integer)) else item
+                    for item in items
+                ]
+                rows = self._encoding_rows(encodings, np.asarray(matrix) if encodings else None)
                 
-                # Save to file
-                async with aiofiles.open(file_path, 'wb') as f:
-                    await f.write(pickle.dumps(serializable_data))
+                await asyncio.get_event_loop().run_in_executor(
+                    None, FaceEncodingStore.write, file_path, rows
+                )
+                self._unsaved_encodings = []
                 
-                logger.info(f"Face encodings saved to {file_path}")
-                return True
+                # The loaded store was replaced on disk: rebind its rows to the new one
+                if self._encoding_store is not None and os.path.realpath(
+                    self._encoding_store.path
+                ) == os.path.realpath(file_path):
+                    store = await asyncio.get_event_loop().run_in_executor(
+                        None, FaceEncodingStore, file_path
+                    )
+                    self._bind_store(store, self._index_from_store(store))
+            
+            logger.info(f"Face encodings saved to {file_path}", total_encodings=len(rows))
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to save encodings to {file_path}", error=str(e))
             return False
     
+    async def append_encodings(self, file_path: str) -> bool:
+        """Append encodings added since the last load or save to an encoding store.
+        
+        Appends never rewrite existing rows; use ``save_encodings`` to compact
+        the store after removing persons.
+        """
+        try:
+            async with self._lock:
+                if not self._unsaved_encodings:
+                    return True
+                
+                rows = self._encoding_rows(self._unsaved_encodings)
+                await asyncio.get_event_loop().run_in_executor(
+                    None, FaceEncodingStore.append, file_path, rows
+                )
+                self._unsaved_encodings = []
+            
+            logger.info(f"Face encodings appended to {file_path}", appended=len(rows))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to append encodings to {file_path}", error=str(e))
+            return False
+    
     async def load_encodings(self, file_path: str) -> bool:
-        """Load known face encodings from file."""
+        """Load known face encodings from an encoding store (or a legacy pickle).
+        
+        The store is memory-mapped, so workers on one host share its pages and
+        encodings are only materialised as FaceEncoding objects when used.
+        """
         try:
             if not os.path.exists(file_path):
                 logger.warning(f"Encodings file not found: {file_path}")
                 return False
             
+            if os.path.isfile(file_path):
+                return await self._load_legacy_encodings(file_path)
+            
+            store = await asyncio.get_event_loop().run_in_executor(None, FaceEncodingStore, file_path)
+            index = self._index_from_store(store)
+            
+            async with self._lock:
+                self._bind_store(store, index)
+                self._unsaved_encodings = []
+            
+            logger.info(
+                f"Face encodings loaded from {file_path}",
+                persons=len(self.known_encodings),
+                total_encodings=len(store)
+            )
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to load encodings from {file_path}", error=str(e))
+            return False
+    
+    async def _load_legacy_encodings(self, file_path: str) -> bool:
+        """Load encodings from the older pickle format."""
+        try:
             async with aiofiles.open(file_path, 'rb') as f:
                 data = await f.read()
                 serializable_data = pickle.loads(data)
             
             async with self._lock:
                 self.known_encodings.clear()
+                self.encoding_index = FaceEncodingIndex()
+                self._encoding_store = None
+                self._unsaved_encodings = []
                 
                 for person_id, encoding_data in serializable_data.items():
                     self.known_encodings[person_id] = []
@@ -590,6 +790,12 @@ class FaceRecognitionProcessor:
                             created_at=data.get('created_at', 0.0)
                         )
                         self.known_encodings[person_id].append(encoding)
+                    
+                    self.encoding_index.add(
+                        person_id,
+                        [encoding.encoding for encoding in self.known_encodings[person_id]],
+                        self.known_encodings[person_id]
+                    )
             
             total_encodings = sum(len(encs) for encs in self.known_encodings.values())
             logger.info(
@@ -601,4 +807,4 @@ class FaceRecognitionProcessor:
             
         except Exception as e:
             logger.error(f"Failed to load encodings from {file_path}", error=str(e))
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,157 @@
+"""
+Multi-index hashing for sub-linear Hamming radius queries over perceptual hashes.
+"""
+
+from itertools import combinations
+from math import comb
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+class HammingIndex:
+    """Multi-index hash table over fixed-width integer hashes.
+
+    Each hash is split into ``chunks`` disjoint substrings and every substring
+    is stored in its own bucket table. By the pigeonhole principle, any hash
+    within distance ``r`` of a query shares at least one substring within
+    distance ``r // chunks`` of the query's substring, so a radius query only
+    has to probe the buckets in that small neighbourhood instead of scanning
+    every stored hash.
+    """
+
+    def __init__(self, hash_bits: int = 64, chunks: Optional[int] = None):
+        if hash_bits <= 0:
+            raise ValueError("hash_bits must be positive")
+
+        self.hash_bits = hash_bits
+        self.chunks = max(1, min(chunks or hash_bits // 16, hash_bits))
+
+        # Chunk boundaries, spreading any remainder over the leading chunks
+        base, extra = divmod(hash_bits, self.chunks)
+        self._chunk_layout: List[Tuple[int, int]] = []
+        offset = 0
+        for i in range(self.chunks):
+            width = base + (1 if i < extra else 0)
+            self._chunk_layout.append((offset, width))
+            offset += width
+
+        self._tables: List[Dict[int, Set[int]]] = [{} for _ in range(self.chunks)]
+        self._entries: Dict[int, Tuple[int, Any, Optional[str]]] = {}  # id -> (value, item, owner)
+        self._owner_entries: Dict[Optional[str], Set[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _split(self, value: int) -> List[int]:
+        """Split a hash into its chunk substrings."""
+        return [(value >> offset) & ((1 << width) - 1) for offset, width in self._chunk_layout]
+
+    def add(self, value: int, item: Any, owner: Optional[str] = None) -> int:
+        """Index a hash value with an attached item; returns the entry id."""
+        if value < 0 or value.bit_length() > self.hash_bits:
+            raise ValueError(f"hash does not fit in {self.hash_bits} bits")
+
+        entry_id = self._next_id
+        self._next_id += 1
+
+        self._entries[entry_id] = (value, item, owner)
+        self._owner_entries.setdefault(owner, set()).add(entry_id)
+
+        for table, substring in zip(self._tables, self._split(value)):
+            table.setdefault(substring, set()).add(entry_id)
+
+        return entry_id
+
+    def remove(self, entry_id: int) -> bool:
+        """Remove a single entry by id."""
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return False
+
+        value, _, owner = entry
+        for table, substring in zip(self._tables, self._split(value)):
+            bucket = table.get(substring)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[substring]
+
+        owned = self._owner_entries.get(owner)
+        if owned is not None:
+            owned.discard(entry_id)
+            if not owned:
+                del self._owner_entries[owner]
+
+        return True
+
+    def remove_owner(self, owner: Optional[str]) -> int:
+        """Remove every entry belonging to an owner; returns the number removed."""
+        entry_ids = list(self._owner_entries.get(owner, ()))
+        for entry_id in entry_ids:
+            self.remove(entry_id)
+        return len(entry_ids)
+
+    def clear(self):
+        """Drop all entries."""
+        for table in self._tables:
+            table.clear()
+        self._entries.clear()
+        self._owner_entries.clear()
+
+    def owners(self) -> List[Optional[str]]:
+        """Owners that currently have indexed entries."""
+        return list(self._owner_entries.keys())
+
+    def _probe_count(self, sub_radius: int) -> int:
+        """Number of bucket lookups a query at this per-chunk radius needs."""
+        return sum(
+            sum(comb(width, d) for d in range(min(sub_radius, width) + 1))
+            for _, width in self._chunk_layout
+        )
+
+    def _candidates(self, value: int, max_distance: int) -> Iterable[int]:
+        """Entry ids that may lie within ``max_distance`` of ``value``."""
+        sub_radius = max_distance // self.chunks
+
+        # Wide radii degrade to a full scan; the probe set would be larger than the index
+        if self._probe_count(sub_radius) >= len(self._entries):
+            return list(self._entries.keys())
+
+        candidates: Set[int] = set()
+        for table, substring, (_, width) in zip(self._tables, self._split(value), self._chunk_layout):
+            for d in range(min(sub_radius, width) + 1):
+                for bits in combinations(range(width), d):
+                    probe = substring
+                    for bit in bits:
+                        probe ^= 1 << bit
+                    bucket = table.get(probe)
+                    if bucket:
+                        candidates.update(bucket)
+        return candidates
+
+    def query(
+        self,
+        value: int,
+        max_distance: int,
+        owners: Optional[Iterable[Optional[str]]] = None
+    ) -> List[Tuple[int, Any, Optional[str]]]:
+        """Return ``(distance, item, owner)`` for entries within ``max_distance``.
+
+        Results are ordered by distance, then by insertion order.
+        """
+        if max_distance < 0 or not self._entries:
+            return []
+
+        owner_filter = set(owners) if owners is not None else None
+
+        hits = []
+        for entry_id in self._candidates(value, max_distance):
+            entry_value, item, owner = self._entries[entry_id]
+            if owner_filter is not None and owner not in owner_filter:
+                continue
+            distance = (entry_value ^ value).bit_count()
+            if distance <= max_distance:
+                hits.append((distance, entry_id, item, owner))
+
+        hits.sort(key=lambda hit: (hit[0], hit[1]))
+        return [(distance, item, owner) for distance, _, item, owner in hits]
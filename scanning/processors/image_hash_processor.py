@@ -4,7 +4,6 @@ Perceptual image hashing processor for detecting similar/duplicate images.
 
 import asyncio
 import hashlib
-import io
 import time
 from typing import Dict, List, Optional, Tuple, Union, Set
 from dataclasses import dataclass, field
@@ -22,10 +21,23 @@ import aiofiles
 import structlog
 
 from ..config import ScannerSettings
+from ..http_transport import HttpTransport, get_http_transport
+from ..media_fetcher import MediaFetcher
+from .compute_pool import ComputePool, get_compute_pool
+from .hamming_index import HammingIndex
+from .multi_hash import ImageThumbnails, MultiHashEngine, decode_image
 
 
 logger = structlog.get_logger(__name__)
 
+# Hash algorithms to use
+HASH_ALGORITHMS = {
+    'ahash': imagehash.average_hash,
+    'phash': imagehash.phash,
+    'dhash': imagehash.dhash,
+    'whash': imagehash.whash
+}
+
 
 @dataclass
 class ImageHash:
@@ -118,22 +130,140 @@ class ProcessingResult:
         return not self.error and bool(self.hashes)
 
 
+COLOR_HISTOGRAM_SIZE = 768
+
+
+def _decode_image(
+    image_source: Union[str, bytes, memoryview, np.ndarray, Image.Image],
+    draft_size: int = 0
+) -> Image.Image:
+    """Decode any payload accepted by ``compute_image_hashes`` to an RGB image."""
+    if isinstance(image_source, Image.Image):
+        return image_source.convert('RGB')
+    
+    elif isinstance(image_source, np.ndarray):
+        return Image.fromarray(image_source).convert('RGB')
+    
+    image = decode_image(image_source, (draft_size, draft_size) if draft_size else None)
+    return image.convert('RGB')
+
+
+def _color_hash_value(image: Image.Image) -> str:
+    """Color histogram-based hash."""
+    # Convert to smaller size for efficiency
+    small_image = image.resize((32, 32), Image.LANCZOS)
+    
+    # Calculate color histogram
+    hist_r = small_image.getchannel(0).histogram()
+    hist_g = small_image.getchannel(1).histogram()
+    hist_b = small_image.getchannel(2).histogram()
+    
+    # Combine histograms
+    combined_hist = hist_r + hist_g + hist_b
+    
+    # Create hash from histogram
+    hist_array = np.array(combined_hist)
+    normalized = hist_array / np.sum(hist_array)
+    
+    # Quantize to create hash
+    quantized = (normalized * 255).astype(np.uint8)
+    hash_bytes = quantized.tobytes()
+    return hashlib.md5(hash_bytes).hexdigest()[:16]
+
+
+def _wavelet_hash_value(thumbnails: ImageThumbnails) -> str:
+    """Wavelet-style hash over low DCT frequencies."""
+    # 64x64 grayscale thumbnail
+    img_array = np.array(thumbnails.gray_thumbnail((64, 64)), dtype=np.float32)
+    
+    # Simple wavelet-like transform (using DCT as approximation)
+    from scipy.fft import dct
+    dct_coeffs = dct(dct(img_array.T, norm='ortho').T, norm='ortho')
+    
+    # Take low-frequency components
+    low_freq = dct_coeffs[:8, :8].flatten()
+    
+    # Create binary hash
+    median_val = np.median(low_freq)
+    binary_hash = (low_freq > median_val).astype(int)
+    
+    # Convert to hex string
+    hash_int = 0
+    for i, bit in enumerate(binary_hash):
+        hash_int |= bit << i
+    
+    return f"{hash_int:016x}"
+
+
+def compute_image_hashes(
+    image_source: Union[str, bytes, memoryview, np.ndarray],
+    hash_size: int = 8,
+    draft_size: int = 0
+) -> Optional[Tuple[Dict[str, str], Dict]]:
+    """Decode an image once and compute every hash type (compute pool worker).
+    
+    Returns ``(hash_type -> hash string, image_info)``, or None when the image
+    cannot be decoded. ``draft_size`` > 0 lets JPEGs decode at reduced size,
+    which is faster but changes the hashes slightly.
+    """
+    try:
+        pil_image = _decode_image(image_source, draft_size)
+    except Exception as e:
+        logger.error("Failed to load image", error=str(e))
+        return None
+    
+    image_info = {
+        'size': pil_image.size,
+        'mode': pil_image.mode,
+        'format': getattr(pil_image, 'format', None)
+    }
+    
+    # Grayscale conversion and thumbnails are shared by every hash below
+    thumbnails = ImageThumbnails(pil_image)
+    engine = MultiHashEngine(hash_size=hash_size)
+    hashes = {}
+    
+    # Standard hashes
+    for hash_name in HASH_ALGORITHMS:
+        try:
+            hashes.update(engine.hash_image(thumbnails, (hash_name,)))
+        except Exception as e:
+            logger.debug(f"Failed to generate {hash_name} hash", error=str(e))
+    
+    # Color histogram hash
+    try:
+        hashes['color'] = _color_hash_value(pil_image)
+    except Exception as e:
+        logger.debug("Failed to generate color hash", error=str(e))
+    
+    # Wavelet hash
+    try:
+        hashes['wavelet'] = _wavelet_hash_value(thumbnails)
+    except Exception as e:
+        logger.debug("Failed to generate wavelet hash", error=str(e))
+    
+    return hashes, image_info
+
+
 class ImageHashProcessor:
     """Advanced image hashing processor for duplicate detection."""
     
-    def __init__(self, settings: ScannerSettings):
+    def __init__(
+        self,
+        settings: ScannerSettings,
+        compute_pool: Optional[ComputePool] = None,
+        http_transport: Optional[HttpTransport] = None
+    ):
         self.settings = settings
         self.hash_database: Dict[str, List[ImageHash]] = {}  # person_id -> hashes
+        self.hash_indexes: Dict[str, HammingIndex] = {}  # hash_type -> index
         self.session: Optional[aiohttp.ClientSession] = None
+        self.compute_pool = compute_pool or get_compute_pool(settings)
+        self.http_transport = http_transport or get_http_transport(settings)
+        self.media_fetcher = MediaFetcher.from_settings(settings)
         self._lock = asyncio.Lock()
         
-        # Hash algorithms to use
-        self.hash_algorithms = {
-            'ahash': imagehash.average_hash,
-            'phash': imagehash.phash,
-            'dhash': imagehash.dhash,
-            'whash': imagehash.whash
-        }
+        self.hash_algorithms = HASH_ALGORITHMS
         
     async def initialize(self):
         """Initialize the processor."""
@@ -148,10 +278,8 @@ class ImageHashProcessor:
     async def _setup_http_session(self):
         """Setup HTTP session for downloading images."""
         timeout = aiohttp.ClientTimeout(total=30)
-        connector = aiohttp.TCPConnector(limit=50)
         
-        self.session = aiohttp.ClientSession(
-            connector=connector,
+        self.session = self.http_transport.session(
             timeout=timeout,
             headers={
                 'User-Agent': 'AutoDMCA Image Hash Processor/1.0'
@@ -168,6 +296,7 @@ class ImageHashProcessor:
         async with self._lock:
             if replace_existing or person_id not in self.hash_database:
                 self.hash_database[person_id] = []
+                self._unindex_person(person_id)
             
             hashes_added = 0
             
@@ -179,6 +308,7 @@ class ImageHashProcessor:
                         for hash_type, image_hash in result.hashes.items():
                             image_hash.person_id = person_id
                             self.hash_database[person_id].append(image_hash)
+                            self._index_hash(image_hash)
                             hashes_added += 1
                             
                 except Exception as e:
@@ -197,77 +327,28 @@ class ImageHashProcessor:
         self,
         image_source: Union[str, bytes, np.ndarray, Image.Image]
     ) -> ProcessingResult:
-        """Process an image and generate perceptual hashes."""
+        """Process an image and generate perceptual hashes.
+        
+        Downloads happen here; decoding and hashing run in the compute pool.
+        """
         start_time = time.time()
         image_url = image_source if isinstance(image_source, str) else "unknown"
         
         try:
-            # Load image
-            pil_image = await self._load_image(image_source)
-            if pil_image is None:
+            payload = await self._load_payload(image_source)
+            if payload is None:
                 return ProcessingResult(
                     image_url=image_url,
                     error="Failed to load image"
                 )
             
-            # Get image info
-            image_info = {
-                'size': pil_image.size,
-                'mode': pil_image.mode,
-                'format': getattr(pil_image, 'format', None)
-            }
-            
-            # Generate multiple hash types
-            hashes = {}
-            
-            # Standard hashes
-            for hash_name, hash_func in self.hash_algorithms.items():
-                try:
-                    hash_value = hash_func(pil_image, hash_size=self.settings.hash_size)
-                    
-                    image_hash = ImageHash(
-                        hash_value=str(hash_value),
-                        hash_type=hash_name,
-                        image_url=image_url,
-                        image_size=pil_image.size
-                    )
-                    
-                    hashes[hash_name] = image_hash
-                    
-                except Exception as e:
-                    logger.debug(f"Failed to generate {hash_name} hash", error=str(e))
-            
-            # Generate color histogram hash
-            try:
-                color_hash = await self._generate_color_hash(pil_image)
-                if color_hash:
-                    hashes['color'] = color_hash
-            except Exception as e:
-                logger.debug("Failed to generate color hash", error=str(e))
-            
-            # Generate wavelet hash if available
-            try:
-                wavelet_hash = await self._generate_wavelet_hash(pil_image)
-                if wavelet_hash:
-                    hashes['wavelet'] = wavelet_hash
-            except Exception as e:
-                logger.debug("Failed to generate wavelet hash", error=str(e))
-            
-            processing_time = time.time() - start_time
-            
-            logger.debug(
-                "Image hashing completed",
-                image_url=image_url,
-                hash_types=list(hashes.keys()),
-                processing_time=processing_time
-            )
-            
-            return ProcessingResult(
-                image_url=image_url,
-                hashes=hashes,
-                processing_time=processing_time,
-                image_info=image_info
+            computed = await self.compute_pool.run(
+                compute_image_hashes,
+                payload,
+                self.settings.hash_size,
+                self.settings.hash_draft_decode_size
             )
+            return self._build_result(image_url, computed, start_time)
             
         except Exception as e:
             logger.error("Image hashing failed", image_url=image_url, error=str(e))
@@ -277,32 +358,76 @@ class ImageHashProcessor:
                 processing_time=time.time() - start_time
             )
     
-    async def _load_image(self, image_source: Union[str, bytes, np.ndarray, Image.Image]) -> Optional[Image.Image]:
-        """Load image from various sources."""
+    def _build_result(
+        self,
+        image_url: str,
+        computed: Optional[Tuple[Dict[str, str], Dict]],
+        start_time: float
+    ) -> ProcessingResult:
+        """Wrap hash strings computed by a worker into a processing result."""
+        if computed is None:
+            return ProcessingResult(
+                image_url=image_url,
+                error="Failed to load image",
+                processing_time=time.time() - start_time
+            )
+        
+        hash_values, image_info = computed
+        hashes = {}
+        
+        for hash_name, hash_value in hash_values.items():
+            if hash_name == 'color':
+                hashes[hash_name] = ImageHash(
+                    hash_value=hash_value,
+                    hash_type='color',
+                    metadata={'histogram_size': COLOR_HISTOGRAM_SIZE}
+                )
+            elif hash_name == 'wavelet':
+                hashes[hash_name] = ImageHash(hash_value=hash_value, hash_type='wavelet')
+            else:
+                hashes[hash_name] = ImageHash(
+                    hash_value=hash_value,
+                    hash_type=hash_name,
+                    image_url=image_url,
+                    image_size=image_info['size']
+                )
+        
+        processing_time = time.time() - start_time
+        
+        logger.debug(
+            "Image hashing completed",
+            image_url=image_url,
+            hash_types=list(hashes.keys()),
+            processing_time=processing_time
+        )
+        
+        return ProcessingResult(
+            image_url=image_url,
+            hashes=hashes,
+            processing_time=processing_time,
+            image_info=image_info
+        )
+    
+    async def _load_payload(
+        self,
+        image_source: Union[str, bytes, np.ndarray, Image.Image]
+    ) -> Optional[Union[str, bytes, np.ndarray]]:
+        """Turn an image source into something a pool worker can decode.
+        
+        URLs are downloaded to bytes; PIL images become RGB arrays; file paths,
+        encoded bytes and arrays are passed through.
+        """
         try:
             if isinstance(image_source, Image.Image):
-                return image_source.convert('RGB')
-            
-            elif isinstance(image_source, np.ndarray):
-                # Convert numpy array to PIL
-                if len(image_source.shape) == 3:
-                    # Assume RGB
-                    return Image.fromarray(image_source).convert('RGB')
-                else:
-                    # Grayscale
-                    return Image.fromarray(image_source).convert('RGB')
+                return np.asarray(image_source.convert('RGB'))
             
-            elif isinstance(image_source, bytes):
-                # Load from bytes
-                return Image.open(io.BytesIO(image_source)).convert('RGB')
+            elif isinstance(image_source, (bytes, np.ndarray)):
+                return image_source
             
             elif isinstance(image_source, str):
                 if image_source.startswith(('http://', 'https://')):
-                    # Download from URL
                     return await self._download_image(image_source)
-                else:
-                    # Load from file
-                    return Image.open(image_source).convert('RGB')
+                return image_source
             
             return None
             
@@ -310,91 +435,14 @@ class ImageHashProcessor:
             logger.error("Failed to load image", source=str(image_source)[:100], error=str(e))
             return None
     
-    async def _download_image(self, url: str) -> Optional[Image.Image]:
-        """Download image from URL."""
+    async def _download_image(self, url: str) -> Optional[bytearray]:
+        """Stream the encoded bytes of an image, dropping unusable ones early."""
         try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
-                    return None
-                
-                content_type = response.headers.get('content-type', '')
-                if not content_type.startswith('image/'):
-                    return None
-                
-                image_bytes = await response.read()
-                return Image.open(io.BytesIO(image_bytes)).convert('RGB')
-                
+            return await self.media_fetcher.fetch_image(self.session, url)
         except Exception as e:
             logger.error("Failed to download image", url=url, error=str(e))
             return None
     
-    async def _generate_color_hash(self, image: Image.Image) -> Optional[ImageHash]:
-        """Generate a color histogram-based hash."""
-        try:
-            # Convert to smaller size for efficiency
-            small_image = image.resize((32, 32), Image.LANCZOS)
-            
-            # Calculate color histogram
-            hist_r = small_image.getchannel(0).histogram()
-            hist_g = small_image.getchannel(1).histogram()
-            hist_b = small_image.getchannel(2).histogram()
-            
-            # Combine histograms
-            combined_hist = hist_r + hist_g + hist_b
-            
-            # Create hash from histogram
-            hist_array = np.array(combined_hist)
-            normalized = hist_array / np.sum(hist_array)
-            
-            # Quantize to create hash
-            quantized = (normalized * 255).astype(np.uint8)
-            hash_bytes = quantized.tobytes()
-            hash_value = hashlib.md5(hash_bytes).hexdigest()[:16]
-            
-            return ImageHash(
-                hash_value=hash_value,
-                hash_type='color',
-                metadata={'histogram_size': len(combined_hist)}
-            )
-            
-        except Exception as e:
-            logger.debug("Color hash generation failed", error=str(e))
-            return None
-    
-    async def _generate_wavelet_hash(self, image: Image.Image) -> Optional[ImageHash]:
-        """Generate a wavelet-based hash."""
-        try:
-            # Convert to grayscale and resize
-            gray_image = image.convert('L').resize((64, 64), Image.LANCZOS)
-            img_array = np.array(gray_image, dtype=np.float32)
-            
-            # Simple wavelet-like transform (using DCT as approximation)
-            from scipy.fft import dct
-            dct_coeffs = dct(dct(img_array.T, norm='ortho').T, norm='ortho')
-            
-            # Take low-frequency components
-            low_freq = dct_coeffs[:8, :8].flatten()
-            
-            # Create binary hash
-            median_val = np.median(low_freq)
-            binary_hash = (low_freq > median_val).astype(int)
-            
-            # Convert to hex string
-            hash_int = 0
-            for i, bit in enumerate(binary_hash):
-                hash_int |= bit << i
-            
-            hash_value = f"{hash_int:016x}"
-            
-            return ImageHash(
-                hash_value=hash_value,
-                hash_type='wavelet'
-            )
-            
-        except Exception as e:
-            logger.debug("Wavelet hash generation failed", error=str(e))
-            return None
-    
     async def find_matches(
         self,
         candidate_image: Union[str, bytes, np.ndarray, Image.Image],
@@ -412,37 +460,34 @@ class ImageHashProcessor:
         
         matches = []
         target_persons = person_ids or list(self.hash_database.keys())
+        max_distance = self._max_distance_for(similarity_threshold)
         
         async with self._lock:
-            for person_id in target_persons:
-                if person_id not in self.hash_database:
+            for hash_type, candidate_hash in result.hashes.items():
+                index = self.hash_indexes.get(hash_type)
+                candidate_value = self._parse_hash(candidate_hash, index)
+                if index is None or candidate_value is None:
                     continue
                 
-                person_hashes = self.hash_database[person_id]
-                
-                # Compare each hash type
-                for hash_type, candidate_hash in result.hashes.items():
-                    for reference_hash in person_hashes:
-                        if reference_hash.hash_type != hash_type:
-                            continue
+                for distance, reference_hash, _ in index.query(
+                    candidate_value, max_distance, owners=target_persons
+                ):
+                    similarity = candidate_hash.similarity(reference_hash)
+                    
+                    if similarity >= similarity_threshold:
+                        match_type = "exact" if distance == 0 else "similar"
+                        if similarity >= 0.95:
+                            match_type = "near_duplicate"
                         
-                        similarity = candidate_hash.similarity(reference_hash)
-                        distance = candidate_hash.distance(reference_hash)
+                        match = ImageMatch(
+                            reference_hash=reference_hash,
+                            candidate_hash=candidate_hash,
+                            similarity_score=similarity,
+                            distance=distance,
+                            match_type=match_type
+                        )
                         
-                        if similarity >= similarity_threshold:
-                            match_type = "exact" if distance == 0 else "similar"
-                            if similarity >= 0.95:
-                                match_type = "near_duplicate"
-                            
-                            match = ImageMatch(
-                                reference_hash=reference_hash,
-                                candidate_hash=candidate_hash,
-                                similarity_score=similarity,
-                                distance=distance,
-                                match_type=match_type
-                            )
-                            
-                            matches.append(match)
+                        matches.append(match)
         
         # Sort by similarity score (best matches first)
         matches.sort(key=lambda x: x.similarity_score, reverse=True)
@@ -582,6 +627,7 @@ class ImageHashProcessor:
         async with self._lock:
             if person_id in self.hash_database:
                 del self.hash_database[person_id]
+                self._unindex_person(person_id)
                 logger.info(f"Removed hashes for person: {person_id}")
                 return True
             return False
@@ -590,4 +636,50 @@ class ImageHashProcessor:
         """Clear all hashes from database."""
         async with self._lock:
             self.hash_database.clear()
-            logger.info("Hash database cleared")
\ No newline at end of file
+            self.hash_indexes.clear()
+            logger.info("Hash database cleared")
+    
+    @staticmethod
+    def _max_distance_for(similarity_threshold: float) -> int:
+        """Largest Hamming distance that still satisfies a similarity threshold."""
+        # Mirrors ImageHash.similarity, which scores against a 64-bit hash
+        return max(0, int((1.0 - similarity_threshold) * 64 + 1e-9))
+    
+    @staticmethod
+    def _parse_hash(image_hash: ImageHash, index: Optional[HammingIndex] = None) -> Optional[int]:
+        """Parse a hex hash to an integer, checking it fits the index width."""
+        try:
+            value = int(image_hash.hash_value, 16)
+        except (TypeError, ValueError):
+            return None
+        
+        if value < 0:
+            return None
+        if index is not None and len(image_hash.hash_value) * 4 != index.hash_bits:
+            return None
+        return value
+    
+    def _index_hash(self, image_hash: ImageHash):
+        """Add a reference hash to the Hamming index for its hash type."""
+        index = self.hash_indexes.get(image_hash.hash_type)
+        if index is None:
+            if self._parse_hash(image_hash) is None:
+                return
+            index = HammingIndex(hash_bits=len(image_hash.hash_value) * 4)
+            self.hash_indexes[image_hash.hash_type] = index
+        
+        value = self._parse_hash(image_hash, index)
+        if value is None:
+            logger.debug(
+                "Skipping unindexable hash",
+                hash_type=image_hash.hash_type,
+                person_id=image_hash.person_id
+            )
+            return
+        
+        index.add(value, image_hash, owner=image_hash.person_id)
+    
+    def _unindex_person(self, person_id: str):
+        """Drop all of a person's hashes from the Hamming indexes."""
+        for index in self.hash_indexes.values():
+            index.remove_owner(person_id)
\ No newline at end of file
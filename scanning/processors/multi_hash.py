@@ -0,0 +1,413 @@
+"""
+Single-decode multi-hash engine producing the same hex strings as ``imagehash``.
+
+Computes aHash, pHash, dHash, wHash and colorhash for one or many images. The
+backend keeps an identical copy in ``app/services/ai/multi_hash.py``.
+
+Exactness notes:
+- every thumbnail is resampled from the full-size grayscale image with the
+  same filter imagehash uses;
+- the Haar transforms used by wHash are done in NumPy with the same per-element
+  operations as PyWavelets (checked against PyWavelets once per process, with
+  PyWavelets used instead if the results ever differ);
+- colorhash bins come from a 2**24-entry lookup table built by running Pillow's
+  own HSV and grayscale conversions over every RGB colour once per process.
+"""
+
+import io
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pywt
+import scipy.fftpack
+from PIL import Image
+
+# imagehash resamples with LANCZOS (its ``ANTIALIAS``)
+RESAMPLE = Image.LANCZOS
+
+HASH_TYPES = ('ahash', 'phash', 'dhash', 'whash', 'colorhash')
+
+_HAAR = 0.7071067811865476  # PyWavelets' Haar filter taps (+/-)
+
+# colorhash pixel classes: 0-5 faint hue bins, 6-11 bright hue bins
+_COLOR_GRAY = 12
+_COLOR_UNBINNED = 13  # saturation exactly 2/3 falls in neither colour band
+_COLOR_BLACK = 14
+
+_lock = threading.Lock()
+_colorhash_table: Optional[np.ndarray] = None
+_numpy_haar_exact: Optional[bool] = None
+
+
+def decode_image(
+    source: Union[str, bytes, bytearray, memoryview, Image.Image],
+    draft_size: Optional[Tuple[int, int]] = None
+) -> Image.Image:
+    """Decode an image once.
+
+    ``draft_size`` lets the JPEG decoder scale down by 1/2, 1/4 or 1/8 while
+    keeping the result at least that large. It is much faster for big JPEGs,
+    but hashes of a draft decode are no longer identical to hashes of the full
+    decode, so it is off unless asked for.
+    """
+    if isinstance(source, Image.Image):
+        return source
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        image = Image.open(io.BytesIO(source))
+    else:
+        image = Image.open(source)
+
+    if draft_size is not None and image.format == 'JPEG':
+        image.draft('RGB', draft_size)
+    image.load()
+    return image
+
+
+class ImageThumbnails:
+    """Grayscale/HSV conversions and resized thumbnails shared by every hash of one image.
+
+    Each conversion of the full-size image happens once; each thumbnail size is
+    resampled once from the full-size grayscale image, exactly as ``imagehash``
+    does for every call.
+    """
+
+    def __init__(self, image: Image.Image):
+        self.image = image
+        self._gray: Optional[Image.Image] = None
+        self._hsv: Optional[Image.Image] = None
+        self._gray_thumbnails: Dict[Tuple[int, int], np.ndarray] = {}
+        self.colorhash_counts: Optional[np.ndarray] = None
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.image.size
+
+    @property
+    def gray(self) -> Image.Image:
+        if self._gray is None:
+            self._gray = self.image.convert('L')
+        return self._gray
+
+    @property
+    def hsv(self) -> Image.Image:
+        if self._hsv is None:
+            self._hsv = self.image.convert('HSV')
+        return self._hsv
+
+    def gray_thumbnail(self, size: Tuple[int, int]) -> np.ndarray:
+        """``(height, width)`` uint8 array of the grayscale image resized to ``size``"""
+        thumbnail = self._gray_thumbnails.get(size)
+        if thumbnail is None:
+            thumbnail = np.asarray(self.gray.resize(size, RESAMPLE))
+            self._gray_thumbnails[size] = thumbnail
+        return thumbnail
+
+
+def _haar_dwt2(x: np.ndarray, details: bool = True):
+    """One 2-D Haar level over the last two axes, in PyWavelets' axis order"""
+    e, o = x[..., 0::2, :], x[..., 1::2, :]
+    a = o * _HAAR + e * _HAAR
+    ae, ao = a[..., 0::2], a[..., 1::2]
+    aa = ao * _HAAR + ae * _HAAR
+    if not details:
+        return aa, None
+
+    d = o * -_HAAR + e * _HAAR
+    de, do = d[..., 0::2], d[..., 1::2]
+    return aa, (do * _HAAR + de * _HAAR, ao * -_HAAR + ae * _HAAR, do * -_HAAR + de * _HAAR)
+
+
+def _haar_idwt_pairs(a: np.ndarray, d: np.ndarray, axis: int) -> np.ndarray:
+    shape = list(a.shape)
+    shape[axis] *= 2
+    out = np.empty(shape)
+    even = [slice(None)] * a.ndim
+    odd = [slice(None)] * a.ndim
+    even[axis], odd[axis] = slice(0, None, 2), slice(1, None, 2)
+    out[tuple(even)] = _HAAR * a + _HAAR * d
+    out[tuple(odd)] = _HAAR * a + -_HAAR * d
+    return out
+
+
+def _haar_idwt2(aa: np.ndarray, details: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+    da, ad, dd = details
+    return _haar_idwt_pairs(
+        _haar_idwt_pairs(aa, ad, -1),
+        _haar_idwt_pairs(da, dd, -1),
+        -2
+    )
+
+
+def _numpy_whash_low(pixels: np.ndarray, ll_max_level: int, dwt_level: int) -> np.ndarray:
+    """LL band used by wHash: drop the coarsest Haar LL, then decompose ``dwt_level`` times"""
+    x = pixels
+    details = []
+    for _ in range(ll_max_level):
+        x, level_details = _haar_dwt2(x)
+        details.append(level_details)
+
+    x = x * 0
+    for level_details in reversed(details):
+        x = _haar_idwt2(x, level_details)
+
+    for _ in range(dwt_level):
+        x, _ = _haar_dwt2(x, details=False)
+    return x
+
+
+def _pywt_whash_low(pixels: np.ndarray, ll_max_level: int, dwt_level: int) -> np.ndarray:
+    coeffs = list(pywt.wavedec2(pixels, 'haar', level=ll_max_level, axes=(-2, -1)))
+    coeffs[0] *= 0
+    pixels = pywt.waverec2(coeffs, 'haar', axes=(-2, -1))
+    return pywt.wavedec2(pixels, 'haar', level=dwt_level, axes=(-2, -1))[0]
+
+
+def _whash_low(pixels: np.ndarray, ll_max_level: int, dwt_level: int) -> np.ndarray:
+    global _numpy_haar_exact
+    if _numpy_haar_exact is None:
+        probe = np.random.default_rng(0).integers(0, 256, (2, 64, 64)) / 255.
+        _numpy_haar_exact = np.array_equal(
+            _numpy_whash_low(probe, 6, 3), _pywt_whash_low(probe, 6, 3)
+        )
+
+    if _numpy_haar_exact:
+        return _numpy_whash_low(pixels, ll_max_level, dwt_level)
+    return _pywt_whash_low(pixels, ll_max_level, dwt_level)
+
+
+def _get_colorhash_table() -> np.ndarray:
+    """colorhash class for every RGB colour, keyed by ``r | g << 8 | b << 16``"""
+    global _colorhash_table
+    with _lock:
+        if _colorhash_table is None:
+            keys = np.arange(1 << 24, dtype=np.uint32).reshape(4096, 4096)
+            rgb = np.empty((4096, 4096, 3), dtype=np.uint8)
+            rgb[..., 0] = keys & 0xFF
+            rgb[..., 1] = (keys >> 8) & 0xFF
+            rgb[..., 2] = keys >> 16
+            image = Image.fromarray(rgb, 'RGB')
+
+            hsv = np.asarray(image.convert('HSV')).reshape(-1, 3)
+            intensity = np.asarray(image.convert('L')).ravel()
+            hue, saturation = hsv[:, 0], hsv[:, 1]
+
+            # Same hue bins as numpy.histogram over linspace(0, 255, 7)
+            edges = np.linspace(0, 255, 6 + 1)
+            hue_bins = np.minimum(np.searchsorted(edges, np.arange(256), side='right') - 1, 5)
+            hue_bin = hue_bins.astype(np.uint8)[hue]
+
+            table = np.full(1 << 24, _COLOR_UNBINNED, dtype=np.uint8)
+            table[saturation < 256 * 2 // 3] = hue_bin[saturation < 256 * 2 // 3]
+            bright = saturation > 256 * 2 // 3
+            table[bright] = 6 + hue_bin[bright]
+            table[saturation < 256 // 3] = _COLOR_GRAY
+            table[intensity < 256 // 8] = _COLOR_BLACK
+            _colorhash_table = table
+    return _colorhash_table
+
+
+def _bits_to_hex(bits: np.ndarray) -> List[str]:
+    """Hex strings for rows of flattened hash bits, matching ``str(imagehash.ImageHash)``"""
+    count, nbits = bits.shape
+    width = -(-nbits // 4)
+    pad = (-nbits) % 8
+    if pad:
+        bits = np.concatenate([np.zeros((count, pad), dtype=bool), bits], axis=1)
+    packed = np.packbits(bits, axis=1)
+
+    if not pad and nbits % 4 == 0:
+        return [row.tobytes().hex() for row in packed]
+    return ['{:0>{width}x}'.format(int.from_bytes(row.tobytes(), 'big'), width=width) for row in packed]
+
+
+class MultiHashEngine:
+    """Vectorized perceptual hashing over batches of images.
+
+    Per image, the only work left in PIL is one grayscale conversion, one
+    resize per distinct thumbnail size and (for colorhash) one HSV conversion.
+    DCTs, wavelet transforms, medians and bit packing run once per batch on
+    stacked thumbnails.
+    """
+
+    WHASH_STACK_PIXELS = 1 << 18
+
+    def __init__(
+        self,
+        hash_size: int = 8,
+        highfreq_factor: int = 4,
+        colorhash_binbits: int = 3
+    ):
+        if hash_size < 2:
+            raise ValueError('Hash size must be greater than or equal to 2')
+
+        self.hash_size = hash_size
+        self.highfreq_factor = highfreq_factor
+        self.colorhash_binbits = colorhash_binbits
+
+    def hash_image(
+        self,
+        image: Union[Image.Image, ImageThumbnails],
+        hash_types: Iterable[str] = HASH_TYPES
+    ) -> Dict[str, str]:
+        """All requested hashes of one image"""
+        return self.hash_images([image], hash_types)[0]
+
+    def hash_images(
+        self,
+        images: Sequence[Union[Image.Image, ImageThumbnails]],
+        hash_types: Iterable[str] = HASH_TYPES
+    ) -> List[Dict[str, str]]:
+        """All requested hashes for a batch of images, one dict per image"""
+        hash_types = list(hash_types)
+        unknown = set(hash_types) - set(HASH_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown hash types: {sorted(unknown)}")
+
+        thumbnails = [
+            image if isinstance(image, ImageThumbnails) else ImageThumbnails(image)
+            for image in images
+        ]
+        results: List[Dict[str, str]] = [{} for _ in thumbnails]
+        if not thumbnails:
+            return results
+
+        # Touch each full-size image once, while it is hot in cache
+        sizes = self._thumbnail_sizes(hash_types)
+        for thumb in thumbnails:
+            for size in sizes(thumb):
+                thumb.gray_thumbnail(size)
+            if 'colorhash' in hash_types:
+                thumb.colorhash_counts = self._colorhash_counts(thumb)
+
+        for hash_type in hash_types:
+            values = getattr(self, f'_{hash_type}')(thumbnails)
+            for result, value in zip(results, values):
+                result[hash_type] = value
+
+        return results
+
+    def _thumbnail_sizes(self, hash_types: List[str]):
+        n = self.hash_size
+        fixed = []
+        if 'ahash' in hash_types:
+            fixed.append((n, n))
+        if 'phash' in hash_types:
+            fixed.append((n * self.highfreq_factor, n * self.highfreq_factor))
+        if 'dhash' in hash_types:
+            fixed.append((n + 1, n))
+
+        def sizes(thumb: ImageThumbnails) -> List[Tuple[int, int]]:
+            if 'whash' not in hash_types:
+                return fixed
+            scale = self._whash_scale(thumb)
+            return fixed + [(scale, scale)]
+        return sizes
+
+    def _stack(self, thumbnails: List[ImageThumbnails], size: Tuple[int, int]) -> np.ndarray:
+        return np.stack([thumb.gray_thumbnail(size) for thumb in thumbnails])
+
+    def _ahash(self, thumbnails: List[ImageThumbnails]) -> List[str]:
+        n = self.hash_size
+        pixels = self._stack(thumbnails, (n, n))
+        means = pixels.reshape(len(thumbnails), -1).mean(axis=1)
+        return _bits_to_hex((pixels > means[:, None, None]).reshape(len(thumbnails), -1))
+
+    def _phash(self, thumbnails: List[ImageThumbnails]) -> List[str]:
+        n = self.hash_size
+        img_size = n * self.highfreq_factor
+        pixels = self._stack(thumbnails, (img_size, img_size))
+        dct = scipy.fftpack.dct(scipy.fftpack.dct(pixels, axis=1), axis=2)
+        low = dct[:, :n, :n].reshape(len(thumbnails), -1)
+        medians = np.median(low, axis=1)
+        return _bits_to_hex(low > medians[:, None])
+
+    def _dhash(self, thumbnails: List[ImageThumbnails]) -> List[str]:
+        n = self.hash_size
+        pixels = self._stack(thumbnails, (n + 1, n))
+        return _bits_to_hex((pixels[:, :, 1:] > pixels[:, :, :-1]).reshape(len(thumbnails), -1))
+
+    def _whash_scale(self, thumbnails: ImageThumbnails) -> int:
+        natural_scale = 2 ** int(np.log2(min(thumbnails.size)))
+        return max(natural_scale, self.hash_size)
+
+    def _whash(self, thumbnails: List[ImageThumbnails]) -> List[str]:
+        n = self.hash_size
+        if n & (n - 1):
+            raise ValueError('hash_size is not power of 2')
+        level = int(np.log2(n))
+
+        # The working scale depends on each image's size; transform each scale as one stack
+        by_scale: Dict[int, List[int]] = {}
+        for i, thumb in enumerate(thumbnails):
+            by_scale.setdefault(self._whash_scale(thumb), []).append(i)
+
+        values: List[Optional[str]] = [None] * len(thumbnails)
+        for scale, scale_indexes in by_scale.items():
+            ll_max_level = int(np.log2(scale))
+            # Large working scales are transformed a few images at a time to stay cache-friendly
+            chunk = max(1, self.WHASH_STACK_PIXELS // (scale * scale))
+
+            for start in range(0, len(scale_indexes), chunk):
+                indexes = scale_indexes[start:start + chunk]
+                pixels = self._stack([thumbnails[i] for i in indexes], (scale, scale)) / 255.
+                dwt_low = _whash_low(pixels, ll_max_level, ll_max_level - level).reshape(len(indexes), -1)
+                medians = np.median(dwt_low, axis=1)
+
+                for i, value in zip(indexes, _bits_to_hex(dwt_low > medians[:, None])):
+                    values[i] = value
+
+        return values
+
+    def _colorhash(self, thumbnails: List[ImageThumbnails]) -> List[str]:
+        return [self._colorhash_one(thumb) for thumb in thumbnails]
+
+    def _colorhash_one(self, thumbnails: ImageThumbnails) -> str:
+        image = thumbnails.image
+        counts = thumbnails.colorhash_counts
+        if counts is None:
+            counts = self._colorhash_counts(thumbnails)
+
+        pixel_count = image.size[0] * image.size[1]
+        frac_black = counts[_COLOR_BLACK] / pixel_count
+        frac_gray = counts[_COLOR_GRAY] / pixel_count
+        c = max(1, pixel_count - counts[_COLOR_BLACK] - counts[_COLOR_GRAY])
+
+        binbits = self.colorhash_binbits
+        maxvalue = 2 ** binbits
+        values = [min(maxvalue - 1, int(frac_black * maxvalue)), min(maxvalue - 1, int(frac_gray * maxvalue))]
+        for hue_count in counts[:12].tolist():
+            values.append(min(maxvalue - 1, int(hue_count * maxvalue * 1. / c)))
+
+        # imagehash's per-value bit encoding (not plain binary for binbits > 2)
+        i = np.arange(binbits)
+        bits = (np.asarray(values)[:, None] // 2 ** (binbits - i - 1)) % 2 ** (binbits - i) > 0
+        return _bits_to_hex(bits.reshape(1, -1))[0]
+
+    def _colorhash_counts(self, thumbnails: ImageThumbnails) -> np.ndarray:
+        """Pixels per colorhash class"""
+        image = thumbnails.image
+        if image.mode == 'RGB':
+            keys = np.asarray(image.convert('RGBX')).view('<u4').ravel() & 0xFFFFFF
+            return np.bincount(_get_colorhash_table()[keys], minlength=_COLOR_BLACK + 1)
+
+        # Other modes go through Pillow's own conversions of the original image
+        intensity = np.asarray(thumbnails.gray).ravel()
+        hsv = np.asarray(thumbnails.hsv)
+        h = hsv[..., 0].ravel()
+        s = hsv[..., 1].ravel()
+
+        mask_black = intensity < 256 // 8
+        mask_gray = np.logical_and(~mask_black, s < 256 // 3)
+        mask_colors = np.logical_and(~mask_black, ~(s < 256 // 3))
+        mask_faint_colors = np.logical_and(mask_colors, s < 256 * 2 // 3)
+        mask_bright_colors = np.logical_and(mask_colors, s > 256 * 2 // 3)
+
+        hue_bins = np.linspace(0, 255, 6 + 1)
+        counts = np.zeros(_COLOR_BLACK + 1, dtype=np.int64)
+        counts[0:6] = np.histogram(h[mask_faint_colors], bins=hue_bins)[0]
+        counts[6:12] = np.histogram(h[mask_bright_colors], bins=hue_bins)[0]
+        counts[_COLOR_GRAY] = mask_gray.sum()
+        counts[_COLOR_BLACK] = mask_black.sum()
+        return counts
@@ -2,10 +2,11 @@
 DMCA processing queue and notification system.
 """
 
-from .dmca_queue import DMCAQueue, DMCARequest, DMCAResponse
+from .dmca_queue import ContactLookup, DMCAQueue, DMCARequest, DMCAResponse
 from .notification_sender import NotificationSender
 
 __all__ = [
+    "ContactLookup",
     "DMCAQueue",
     "DMCARequest", 
     "DMCAResponse",
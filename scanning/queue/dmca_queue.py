@@ -3,15 +3,15 @@ DMCA takedown request queue and processing system.
 """
 
 import asyncio
+import hashlib
 import json
 import time
 import uuid
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Protocol, Set, Tuple, Union, Any
 from dataclasses import dataclass, field, asdict
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
 from urllib.parse import urlparse
-import re
 
 import aioredis
 import aiohttp
@@ -19,13 +19,160 @@ from jinja2 import Environment, FileSystemLoader, Template
 import structlog
 
 from ..config import ScannerSettings
+from ..http_transport import HttpTransport, get_http_transport
 from ..processors.content_matcher import ContentMatch
 from ..crawlers.piracy_crawler import InfringingContent
 
+try:
+    from src.autodmca.services.contact_resolution_service import ContactResolutionService
+    from src.autodmca.utils.cache import CacheManager
+except ImportError:  # scanner deployed without the autodmca services
+    ContactResolutionService = None
+    CacheManager = None
+
 
 logger = structlog.get_logger(__name__)
 
 
+# Requeue expired claims, then move up to ARGV[3] requests from pending into
+# processing under a lease held by ARGV[1] for ARGV[2] seconds. A released
+# consolidation batch ('batch:<id>') is claimed whole, even past ARGV[3].
+# KEYS: pending, processing, leases, lease owners, claim scores, batches
+_CLAIM_DMCA_SCRIPT = """
+local t = redis.call('time')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local expired = redis.call('zrangebyscore', KEYS[3], '-inf', now, 'LIMIT', 0, tonumber(ARGV[3]))
+for _, id in ipairs(expired) do
+    redis.call('zadd', KEYS[1], redis.call('hget', KEYS[5], id) or 0, id)
+    redis.call('zrem', KEYS[2], id)
+    redis.call('zrem', KEYS[3], id)
+    redis.call('hdel', KEYS[4], id)
+    redis.call('hdel', KEYS[5], id)
+end
+local deadline = now + tonumber(ARGV[2])
+local claimed = {}
+local function lease(id, score)
+    redis.call('zadd', KEYS[2], deadline, id)
+    redis.call('zadd', KEYS[3], deadline, id)
+    redis.call('hset', KEYS[4], id, ARGV[1])
+    redis.call('hset', KEYS[5], id, score)
+    table.insert(claimed, id)
+end
+while #claimed < tonumber(ARGV[3]) do
+    local popped = redis.call('zpopmax', KEYS[1])
+    if #popped == 0 then
+        break
+    end
+    if string.sub(popped[1], 1, 6) == 'batch:' then
+        local batch_id = string.sub(popped[1], 7)
+        local members = redis.call('hget', KEYS[6], batch_id)
+        redis.call('hdel', KEYS[6], batch_id)
+        if members then
+            local parts = {}
+            for part in string.gmatch(members, '%S+') do
+                table.insert(parts, part)
+            end
+            for i = 1, #parts, 2 do
+                lease(parts[i], parts[i + 1])
+            end
+        end
+    else
+        lease(popped[1], popped[2])
+    end
+end
+return claimed
+"""
+
+
+# Release a consolidation bucket: its members become one batch ARGV[2] in the
+# batches hash, queued in pending at the highest member priority.
+# KEYS: pending, held, bucket, batches; ARGV[1]: bucket name
+_RELEASE_DMCA_BUCKET = """
+local members = redis.call('zrange', KEYS[3], 0, -1, 'WITHSCORES')
+redis.call('del', KEYS[3])
+redis.call('zrem', KEYS[2], ARGV[1])
+if #members > 0 then
+    redis.call('hset', KEYS[4], ARGV[2], table.concat(members, ' '))
+    redis.call('zadd', KEYS[1], members[#members], 'batch:' .. ARGV[2])
+end
+"""
+
+
+# Hold request ARGV[3] at priority ARGV[4] in its contact's bucket, opening the
+# bucket with release time ARGV[5] if needed, and release it once it holds
+# ARGV[6] requests.
+_HOLD_DMCA_SCRIPT = """
+redis.call('zadd', KEYS[3], ARGV[4], ARGV[3])
+redis.call('zadd', KEYS[2], 'NX', ARGV[5], ARGV[1])
+if redis.call('zcard', KEYS[3]) < tonumber(ARGV[6]) then
+    return 0
+end
+""" + _RELEASE_DMCA_BUCKET + """
+return 1
+"""
+
+
+# Release the bucket if its release time is at or before ARGV[3].
+_RELEASE_DMCA_SCRIPT = """
+local release_at = redis.call('zscore', KEYS[2], ARGV[1])
+if not release_at or tonumber(release_at) > tonumber(ARGV[3]) then
+    return 0
+end
+""" + _RELEASE_DMCA_BUCKET + """
+return 1
+"""
+
+
+# Extend the leases ARGV[1] still holds on the ids in ARGV[3..] to ARGV[2] seconds
+# from now and return the ids it no longer holds.
+# KEYS: processing, leases, lease owners
+_HEARTBEAT_DMCA_SCRIPT = """
+local t = redis.call('time')
+local deadline = tonumber(t[1]) + tonumber(t[2]) / 1000000 + tonumber(ARGV[2])
+local lost = {}
+for i = 3, #ARGV do
+    local id = ARGV[i]
+    if redis.call('hget', KEYS[3], id) == ARGV[1] then
+        redis.call('zadd', KEYS[1], 'XX', deadline, id)
+        redis.call('zadd', KEYS[2], 'XX', deadline, id)
+    else
+        table.insert(lost, id)
+    end
+end
+return lost
+"""
+
+
+# Settle a claim if ARGV[2] still holds it: 'sent' keeps the request in processing
+# scored by ARGV[4], 'failed' moves it to the failed queue, 'retry' returns it to
+# pending at its original priority and 'drop' forgets it. ARGV[5], when not empty,
+# replaces the stored request body.
+# KEYS: pending, processing, leases, lease owners, claim scores, failed, request hash
+_SETTLE_DMCA_SCRIPT = """
+if redis.call('hget', KEYS[4], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+local priority = redis.call('hget', KEYS[5], ARGV[1]) or 0
+redis.call('zrem', KEYS[3], ARGV[1])
+redis.call('hdel', KEYS[4], ARGV[1])
+redis.call('hdel', KEYS[5], ARGV[1])
+if ARGV[5] ~= '' then
+    redis.call('hset', KEYS[7], 'data', ARGV[5])
+end
+if ARGV[3] == 'sent' then
+    redis.call('zadd', KEYS[2], ARGV[4], ARGV[1])
+else
+    redis.call('zrem', KEYS[2], ARGV[1])
+    if ARGV[3] == 'failed' then
+        redis.call('zadd', KEYS[6], ARGV[4], ARGV[1])
+    elseif ARGV[3] == 'retry' then
+        redis.call('zadd', KEYS[1], priority, ARGV[1])
+    end
+end
+return 1
+"""
+
+
 class DMCAStatus(Enum):
     """DMCA request status states."""
     PENDING = "pending"
@@ -294,6 +441,47 @@ Infringing URL: {{ infringing_url }}
 
 Thank you for your prompt attention to this matter.
 
+Sincerely,
+{{ dmca_sender_name }}
+{{ dmca_sender_email }}
+            """)
+            
+            # Consolidated notice covering several URLs reported to the same contact
+            self.templates['consolidated'] = self.env.from_string("""
+Subject: DMCA Takedown Notice - Copyright Infringement ({{ url_count }} URLs)
+
+Dear Sir/Madam,
+
+I am writing to notify you of copyright infringement occurring on your platform. This notice is submitted under the Digital Millennium Copyright Act (DMCA), 17 U.S.C. § 512.
+
+IDENTIFICATION OF COPYRIGHTED WORK:
+The copyrighted works being infringed are original content owned by {{ copyright_owner }}.
+
+IDENTIFICATION OF INFRINGING MATERIAL:
+The infringing material is located at the following {{ url_count }} URLs:
+{% for item in infringements %}
+{{ loop.index }}. {{ item.infringing_url }}{% if item.original_work_title or item.original_work_url %}
+   Original work: {{ item.original_work_title or item.original_work_url }}{% if item.original_work_title and item.original_work_url %} ({{ item.original_work_url }}){% endif %}{% endif %}
+   Reference: {{ item.request_id }}
+{% endfor %}
+
+DESCRIPTION OF INFRINGEMENT:
+{{ infringement_description }}
+
+STATEMENT OF GOOD FAITH BELIEF:
+I have a good faith belief that the use of the copyrighted material described above is not authorized by the copyright owner, its agent, or the law.
+
+STATEMENT OF ACCURACY:
+The information in this notification is accurate, and under penalty of perjury, I am authorized to act on behalf of the copyright owner.
+
+CONTACT INFORMATION:
+{{ dmca_sender_name }}
+{{ dmca_sender_email }}
+
+Please remove or disable access to all of the infringing material listed above immediately. I request that you confirm the removal in writing, quoting the reference of each URL.
+
+Thank you for your cooperation.
+
 Sincerely,
 {{ dmca_sender_name }}
 {{ dmca_sender_email }}
@@ -333,136 +521,125 @@ Sincerely,
         except Exception as e:
             logger.error(f"Failed to render DMCA template: {template_name}", error=str(e))
             return ""
+    
+    def render_consolidated_notice(self, requests: List[DMCARequest]) -> str:
+        """Render one notice listing every infringing URL of a notice group."""
+        infringements = [
+            {
+                'request_id': request.request_id,
+                'infringing_url': request.infringing_url,
+                'original_work_title': request.original_work_title,
+                'original_work_url': request.original_work_url
+            }
+            for request in requests
+        ]
+        
+        return self.render_notice(
+            'consolidated',
+            requests[0],
+            infringements=infringements,
+            url_count=len(infringements),
+            infringement_description=(
+                f"The above URLs contain copyrighted material belonging to {requests[0].copyright_owner} "
+                f"that has been posted without authorization. This constitutes copyright infringement "
+                f"under applicable copyright laws."
+            )
+        )
+
+
+class ContactLookup(Protocol):
+    """Anything that can find a domain's published DMCA contacts.
+    
+    ``resolve_domain`` returns a dict with at least ``dmca_email`` and
+    ``form_url`` (either may be None).
+    """
+    
+    async def resolve_domain(self, domain: str) -> Dict[str, Any]:
+        ...
 
 
 class ContactInfoResolver:
-    """Resolves contact information for hosting providers."""
+    """Resolves contact information for hosting providers.
     
-    def __init__(self):
+    By default contacts come from the autodmca ``ContactResolutionService``
+    over a Redis cache, so every scanner and WHOIS worker probes a domain's
+    copyright pages once per TTL. Without the autodmca services installed
+    only the abuse@ fallback is offered.
+    """
+    
+    def __init__(
+        self,
+        http_transport: Optional[HttpTransport] = None,
+        contact_lookup: Optional[ContactLookup] = None,
+        redis_url: Optional[str] = None
+    ):
+        self.http_transport = http_transport or get_http_transport()
         self.session: Optional[aiohttp.ClientSession] = None
-        self.contact_cache = {}
+        
+        # An injected lookup (e.g. one shared by several queues) is owned by the caller
+        self._owns_lookup = contact_lookup is None and ContactResolutionService is not None
+        if self._owns_lookup:
+            contact_lookup = ContactResolutionService(CacheManager(redis_url), fetch_page=self._fetch_page)
+        elif contact_lookup is None:
+            logger.warning("Contact resolution service not available; using abuse@ addresses only")
+        self.contact_lookup: Optional[ContactLookup] = contact_lookup
     
     async def initialize(self):
         """Initialize the resolver."""
         timeout = aiohttp.ClientTimeout(total=10)
-        self.session = aiohttp.ClientSession(timeout=timeout)
+        self.session = self.http_transport.session(timeout=timeout)
     
     async def close(self):
         """Clean up resources."""
+        if self._owns_lookup:
+            await self.contact_lookup.close()
         if self.session:
             await self.session.close()
     
     async def resolve_contact_info(self, domain: str) -> Dict[str, str]:
         """Resolve contact information for a domain."""
-        if domain in self.contact_cache:
-            return self.contact_cache[domain]
-        
         contact_info = {
             'email': '',
             'form_url': '',
-            'abuse_email': '',
+            'abuse_email': f"abuse@{domain}",
             'dmca_email': ''
         }
         
+        if self.contact_lookup is None:
+            return contact_info
+        
         try:
-            # Try to find DMCA contact info
-            dmca_info = await self._find_dmca_contacts(domain)
-            contact_info.update(dmca_info)
-            
-            # Try WHOIS lookup for abuse contacts
-            abuse_info = await self._find_abuse_contacts(domain)
-            contact_info.update(abuse_info)
-            
-            # Cache the result
-            self.contact_cache[domain] = contact_info
+            contacts = await self.contact_lookup.resolve_domain(domain)
+            contact_info['dmca_email'] = contacts.get('dmca_email') or ''
+            contact_info['form_url'] = contacts.get('form_url') or ''
             
         except Exception as e:
             logger.error(f"Failed to resolve contact info for {domain}", error=str(e))
         
         return contact_info
     
-    async def _find_dmca_contacts(self, domain: str) -> Dict[str, str]:
-        """Find DMCA-specific contact information."""
-        contacts = {}
-        
-        try:
-            # Common DMCA contact URLs
-            dmca_urls = [
-                f"https://{domain}/dmca",
-                f"https://{domain}/copyright",
-                f"https://{domain}/takedown",
-                f"https://{domain}/legal"
-            ]
-            
-            for url in dmca_urls:
-                try:
-                    async with self.session.get(url) as response:
-                        if response.status == 200:
-                            text = await response.text()
-                            
-                            # Extract email addresses
-                            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-                            emails = re.findall(email_pattern, text.lower())
-                            
-                            # Look for DMCA-related emails
-                            for email in emails:
-                                if any(keyword in email for keyword in ['dmca', 'copyright', 'legal', 'abuse']):
-                                    contacts['dmca_email'] = email
-                                    break
-                            
-                            # Look for contact forms
-                            form_pattern = r'<form[^>]*action="([^"]*)"'
-                            forms = re.findall(form_pattern, text.lower())
-                            if forms:
-                                contacts['form_url'] = forms[0]
-                            
-                            if contacts:
-                                break
-                                
-                except Exception:
-                    continue
-                    
-        except Exception as e:
-            logger.debug(f"DMCA contact lookup failed for {domain}", error=str(e))
-        
-        return contacts
-    
-    async def _find_abuse_contacts(self, domain: str) -> Dict[str, str]:
-        """Find abuse contact information via WHOIS."""
-        contacts = {}
-        
-        try:
-            # This is a simplified implementation
-            # In production, you'd use a proper WHOIS library or service
-            
-            # Common abuse email patterns
-            abuse_emails = [
-                f"abuse@{domain}",
-                f"dmca@{domain}",
-                f"legal@{domain}",
-                f"support@{domain}"
-            ]
-            
-            # Test which emails might be valid (basic check)
-            for email in abuse_emails:
-                if '@' in email and '.' in email:
-                    contacts['abuse_email'] = email
-                    break
-                    
-        except Exception as e:
-            logger.debug(f"Abuse contact lookup failed for {domain}", error=str(e))
-        
-        return contacts
+    async def _fetch_page(self, url: str) -> Optional[str]:
+        """Fetch a candidate contact page through the shared transport."""
+        async with self.session.get(url) as response:
+            if response.status != 200:
+                return None
+            return await response.text()
 
 
 class DMCAQueue:
     """DMCA request queue and processing system."""
     
-    def __init__(self, settings: ScannerSettings):
+    def __init__(
+        self,
+        settings: ScannerSettings,
+        http_transport: Optional[HttpTransport] = None,
+        contact_lookup: Optional[ContactLookup] = None
+    ):
         self.settings = settings
         self.redis: Optional[aioredis.Redis] = None
         self.template_manager = DMCATemplateManager(settings)
-        self.contact_resolver = ContactInfoResolver()
+        self.http_transport = http_transport or get_http_transport(settings)
+        self.contact_resolver = ContactInfoResolver(self.http_transport, contact_lookup, settings.redis_url)
         self.session: Optional[aiohttp.ClientSession] = None
         
         # Queue keys
@@ -471,6 +648,28 @@ class DMCAQueue:
         self.completed_queue = "dmca:completed"
         self.failed_queue = "dmca:failed"
         
+        # Claim bookkeeping: lease deadlines, owners and the pending score to restore
+        self.lease_queue = "dmca:leases"
+        self.lease_owners = "dmca:lease_owners"
+        self.claim_scores = "dmca:claim_scores"
+        
+        # Consolidation: per contact and owner buckets held until their release
+        # time, then queued in pending as one batch that is claimed whole
+        self.held_queue = "dmca:held"
+        self.batches = "dmca:batches"
+        
+        # Identifies this instance's claims
+        self.node_id = uuid.uuid4().hex
+        
+        # Concurrent sends are bounded per hosting provider
+        self._provider_slots: Dict[str, asyncio.Semaphore] = {}
+        
+        # Members of each consolidated notice, kept as long as old requests
+        self._notice_ttl = 30 * 24 * 60 * 60
+        
+        # Request bodies deleted per DEL command during cleanup
+        self._cleanup_batch_size = 500
+        
     async def initialize(self):
         """Initialize the DMCA queue system."""
         # Connect to Redis
@@ -485,7 +684,7 @@ class DMCAQueue:
         
         # Setup HTTP session
         timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(timeout=timeout)
+        self.session = self.http_transport.session(timeout=timeout)
         
         logger.info("DMCA queue system initialized")
     
@@ -511,11 +710,25 @@ class DMCAQueue:
             # Use priority scoring for queue ordering
             priority_score = self._calculate_priority_score(request)
             
-            await self.redis.zadd(self.pending_queue, {request.request_id: priority_score})
-            await self.redis.hset(f"dmca:request:{request.request_id}", mapping={"data": request_data})
+            # Store the body first so a claimer never sees an id without data
+            bucket = self._bucket_name(request)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(self._request_key(request.request_id), mapping={"data": request_data})
+                if bucket is None:
+                    pipe.zadd(self.pending_queue, {request.request_id: priority_score})
+                else:
+                    # Held so later requests for the same contact share its notice
+                    keys = [self.pending_queue, self.held_queue, self._bucket_key(bucket), self.batches]
+                    pipe.eval(
+                        _HOLD_DMCA_SCRIPT, len(keys), *keys,
+                        bucket, uuid.uuid4().hex, request.request_id, priority_score,
+                        request.created_at + self.settings.dmca_consolidation_window_seconds,
+                        max(1, self.settings.dmca_consolidation_max_urls)
+                    )
+                await pipe.execute()
             
             logger.info(
-                f"DMCA request enqueued",
+                "DMCA request enqueued",
                 request_id=request.request_id,
                 url=request.infringing_url,
                 priority=request.priority
@@ -574,59 +787,128 @@ class DMCAQueue:
         
         return base_score + age_factor + content_factor + site_factor
     
+    def _request_key(self, request_id: str) -> str:
+        return f"dmca:request:{request_id}"
+    
+    def _notice_key(self, notice_id: str) -> str:
+        return f"dmca:notice:{notice_id}"
+    
+    def _contact_key(self, request: DMCARequest) -> Optional[str]:
+        """Key of the contact a request's notice goes to, or None when it has none."""
+        if request.contact_email:
+            return f"email:{request.contact_email.strip().lower()}"
+        if request.contact_form_url:
+            return f"form:{request.contact_form_url.strip()}"
+        return None
+    
+    def _bucket_name(self, request: DMCARequest) -> Optional[str]:
+        """Consolidation bucket a request is held in, or None when it is queued directly."""
+        contact = self._contact_key(request)
+        if contact is None or self.settings.dmca_consolidation_window_seconds <= 0:
+            return None
+        return hashlib.sha1(f"{contact}\n{request.copyright_owner}".encode()).hexdigest()
+    
+    def _bucket_key(self, bucket: str) -> str:
+        return f"dmca:bucket:{bucket}"
+    
+    def _build_notice_groups(self, requests: List[DMCARequest]) -> List[List[DMCARequest]]:
+        """
+        Group claimed requests that can share one notice.
+        
+        Requests sharing a contact and copyright owner are grouped, oldest
+        first, up to dmca_consolidation_max_urls per group. Requests are held
+        for the consolidation window at enqueue, so a released bucket arrives
+        here whole.
+        """
+        max_urls = max(1, self.settings.dmca_consolidation_max_urls)
+        
+        by_contact: Dict[tuple, List[DMCARequest]] = {}
+        groups = []
+        for request in requests:
+            contact = self._contact_key(request)
+            if contact is None:
+                # Nothing to consolidate with; fails on its own
+                groups.append([request])
+                continue
+            by_contact.setdefault((contact, request.copyright_owner), []).append(request)
+        
+        for members in by_contact.values():
+            members.sort(key=lambda request: request.created_at)
+            for start in range(0, len(members), max_urls):
+                groups.append(members[start:start + max_urls])
+        
+        return groups
+    
+    async def release_held_requests(self) -> int:
+        """Queue every consolidation bucket whose window has passed; returns the number released."""
+        now = time.time()
+        buckets = await self.redis.zrangebyscore(self.held_queue, '-inf', now)
+        if not buckets:
+            return 0
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for bucket in buckets:
+                keys = [self.pending_queue, self.held_queue, self._bucket_key(bucket), self.batches]
+                pipe.eval(_RELEASE_DMCA_SCRIPT, len(keys), *keys, bucket, uuid.uuid4().hex, now)
+            released = await pipe.execute()
+        
+        return sum(released)
+    
+    async def claim_requests(self, max_requests: int) -> List[str]:
+        """
+        Atomically move the highest-priority pending requests into processing under a lease.
+        
+        A released consolidation batch is never split, so more than
+        max_requests ids may be returned.
+        """
+        keys = [
+            self.pending_queue, self.processing_queue,
+            self.lease_queue, self.lease_owners, self.claim_scores, self.batches
+        ]
+        return await self.redis.eval(
+            _CLAIM_DMCA_SCRIPT, len(keys), *keys,
+            self.node_id, self.settings.dmca_claim_lease_seconds, max_requests
+        )
+    
     async def process_pending_requests(self, max_requests: int = 10) -> int:
         """Process pending DMCA requests."""
         processed_count = 0
         
         try:
-            # Get highest priority requests
-            request_ids = await self.redis.zrevrange(
-                self.pending_queue, 0, max_requests - 1
-            )
+            await self.release_held_requests()
+            request_ids = await self.claim_requests(max_requests)
+            if not request_ids:
+                return 0
             
-            for request_id in request_ids:
-                try:
-                    # Load request data
-                    request_data = await self.redis.hget(
-                        f"dmca:request:{request_id}", "data"
+            # Sends can outlast the lease (slow SMTP, provider slots), so keep renewing it
+            lost_claims = set()
+            heartbeat = asyncio.create_task(self._heartbeat_claims(request_ids, lost_claims))
+            try:
+                outcomes, notices, processed_count = await self._send_claimed(request_ids, lost_claims)
+            finally:
+                heartbeat.cancel()
+            
+            # Write every transition in one round trip
+            settled_at = time.time()
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for request_id, (outcome, request_data) in outcomes.items():
+                    keys = [
+                        self.pending_queue, self.processing_queue,
+                        self.lease_queue, self.lease_owners, self.claim_scores,
+                        self.failed_queue, self._request_key(request_id)
+                    ]
+                    pipe.eval(
+                        _SETTLE_DMCA_SCRIPT, len(keys), *keys,
+                        request_id, self.node_id, outcome, settled_at, request_data
                     )
-                    
-                    if not request_data:
-                        continue
-                    
-                    request = DMCARequest.from_dict(json.loads(request_data))
-                    
-                    # Process the request
-                    success = await self._process_single_request(request)
-                    
-                    if success:
-                        # Move to processing queue
-                        await self.redis.zrem(self.pending_queue, request_id)
-                        await self.redis.zadd(
-                            self.processing_queue,
-                            {request_id: time.time()}
-                        )
-                        processed_count += 1
-                    else:
-                        # Update attempt count and potentially move to failed
-                        request.increment_attempt()
-                        if not request.can_retry:
-                            await self.redis.zrem(self.pending_queue, request_id)
-                            await self.redis.zadd(
-                                self.failed_queue,
-                                {request_id: time.time()}
-                            )
-                        
-                        # Update stored request
-                        updated_data = json.dumps(request.to_dict())
-                        await self.redis.hset(
-                            f"dmca:request:{request_id}",
-                            mapping={"data": updated_data}
-                        )
-                    
-                except Exception as e:
-                    logger.error(f"Failed to process DMCA request: {request_id}", error=str(e))
-                    continue
+                for notice_id, member_ids in notices.items():
+                    pipe.sadd(self._notice_key(notice_id), *member_ids)
+                    pipe.expire(self._notice_key(notice_id), self._notice_ttl)
+                settled = (await pipe.execute())[:len(outcomes)]
+            
+            lost = len(settled) - sum(settled) + len(request_ids) - len(outcomes)
+            if lost:
+                logger.warning(f"{lost} DMCA claims expired before they were settled")
             
         except Exception as e:
             logger.error("Failed to process pending DMCA requests", error=str(e))
@@ -634,6 +916,112 @@ class DMCAQueue:
         logger.info(f"Processed {processed_count} DMCA requests")
         return processed_count
     
+    async def _send_claimed(
+        self,
+        request_ids: List[str],
+        lost_claims: Set[str]
+    ) -> Tuple[Dict[str, Tuple[str, str]], Dict[str, List[str]], int]:
+        """
+        Load and send claimed requests.
+        
+        Returns:
+            (settle outcome per request id, notice members per notice id, requests sent)
+        """
+        # Load every claimed body in one round trip
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for request_id in request_ids:
+                pipe.hget(self._request_key(request_id), "data")
+            payloads = await pipe.execute()
+        
+        requests = []
+        outcomes = {}
+        for request_id, payload in zip(request_ids, payloads):
+            if not payload:
+                outcomes[request_id] = ('drop', '')
+                continue
+            try:
+                requests.append(DMCARequest.from_dict(json.loads(payload)))
+            except Exception as e:
+                logger.error(f"Failed to load DMCA request: {request_id}", error=str(e))
+                outcomes[request_id] = ('failed', '')
+        
+        # One notice per contact
+        groups = self._build_notice_groups(requests)
+        
+        # Send concurrently; each hosting provider has its own bound
+        results = await asyncio.gather(
+            *(self._process_with_provider_limit(group, lost_claims) for group in groups)
+        )
+        
+        notices = {}
+        sent_count = 0
+        for group, success in zip(groups, results):
+            if success is None:
+                # A claim was lost before sending; the group goes back whole
+                for request in group:
+                    if request.request_id not in lost_claims:
+                        outcomes[request.request_id] = ('retry', '')
+                continue
+            for request in group:
+                if success:
+                    outcome = 'sent'
+                    sent_count += 1
+                    notice_id = request.metadata.get('notice', {}).get('notice_id')
+                    if notice_id:
+                        notices.setdefault(notice_id, []).append(request.request_id)
+                else:
+                    # Update attempt count and potentially move to failed
+                    request.increment_attempt()
+                    outcome = 'retry' if request.can_retry else 'failed'
+                outcomes[request.request_id] = (outcome, json.dumps(request.to_dict()))
+        
+        return outcomes, notices, sent_count
+    
+    async def _heartbeat_claims(self, request_ids: List[str], lost_claims: Set[str]):
+        """Keep extending this instance's leases on claimed requests until cancelled."""
+        keys = [self.processing_queue, self.lease_queue, self.lease_owners]
+        while True:
+            await asyncio.sleep(self.settings.dmca_heartbeat_seconds)
+            held_ids = [request_id for request_id in request_ids if request_id not in lost_claims]
+            if not held_ids:
+                return
+            try:
+                expired = await self.redis.eval(
+                    _HEARTBEAT_DMCA_SCRIPT, len(keys), *keys,
+                    self.node_id, self.settings.dmca_claim_lease_seconds, *held_ids
+                )
+            except Exception as e:
+                logger.error("DMCA lease heartbeat failed", error=str(e))
+                continue
+            
+            if expired:
+                lost_claims.update(expired)
+                logger.warning(f"{len(expired)} DMCA claims expired; they may be sent by another instance")
+    
+    async def _process_with_provider_limit(
+        self,
+        group: List[DMCARequest],
+        lost_claims: Set[str]
+    ) -> Optional[bool]:
+        """
+        Process a notice group while holding one of its hosting provider's send slots.
+        
+        Returns None without sending when a member's claim was lost while
+        the group waited for a slot.
+        """
+        provider = group[0].hosting_provider or "unknown"
+        slots = self._provider_slots.get(provider)
+        if slots is None:
+            slots = asyncio.Semaphore(self.settings.dmca_provider_concurrency)
+            self._provider_slots[provider] = slots
+        
+        async with slots:
+            if any(request.request_id in lost_claims for request in group):
+                return None
+            if len(group) == 1:
+                return await self._process_single_request(group[0])
+            return await self._process_consolidated_requests(group)
+    
     async def _process_single_request(self, request: DMCARequest) -> bool:
         """Process a single DMCA request."""
         try:
@@ -668,6 +1056,59 @@ class DMCAQueue:
             logger.error(f"DMCA request processing failed: {request.request_id}", error=str(e))
             return False
     
+    async def _process_consolidated_requests(self, requests: List[DMCARequest]) -> bool:
+        """Send one notice covering every request in a group and record it on each."""
+        lead = requests[0]
+        notice_id = uuid.uuid4().hex
+        
+        try:
+            for request in requests:
+                request.update_status(DMCAStatus.PROCESSING)
+            
+            notice_content = self.template_manager.render_consolidated_notice(requests)
+            
+            if not notice_content:
+                for request in requests:
+                    request.update_status(DMCAStatus.FAILED, "Failed to generate DMCA notice")
+                return False
+            
+            # Requests in a group share their contact, so the lead's is used
+            if lead.contact_email:
+                success = await self._send_email_notice(lead, notice_content)
+            else:
+                success = await self._send_form_notice(lead, notice_content)
+            
+            if not success:
+                for request in requests:
+                    request.update_status(DMCAStatus.FAILED, "Failed to send notice")
+                return False
+            
+            request_ids = [request.request_id for request in requests]
+            for request in requests:
+                request.metadata['notice'] = {
+                    'notice_id': notice_id,
+                    'url_count': len(requests),
+                    'request_ids': request_ids
+                }
+                request.update_status(
+                    DMCAStatus.SENT,
+                    f"Included in consolidated notice {notice_id} ({len(requests)} URLs)"
+                )
+            
+            logger.info(
+                "Consolidated DMCA notice sent",
+                notice_id=notice_id,
+                url_count=len(requests),
+                hosting_provider=lead.hosting_provider
+            )
+            return True
+            
+        except Exception as e:
+            for request in requests:
+                request.update_status(DMCAStatus.FAILED, f"Processing error: {str(e)}")
+            logger.error(f"Consolidated DMCA notice failed: {notice_id}", error=str(e))
+            return False
+    
     async def _send_email_notice(self, request: DMCARequest, content: str) -> bool:
         """Send DMCA notice via email."""
         try:
@@ -675,7 +1116,7 @@ class DMCAQueue:
             # For now, we'll just log the action
             
             logger.info(
-                f"DMCA email notice would be sent",
+                "DMCA email notice would be sent",
                 request_id=request.request_id,
                 to_email=request.contact_email,
                 hosting_provider=request.hosting_provider
@@ -700,7 +1141,7 @@ class DMCAQueue:
             # Complex implementation involving form parsing and submission
             
             logger.info(
-                f"DMCA form notice would be sent",
+                "DMCA form notice would be sent",
                 request_id=request.request_id,
                 form_url=request.contact_form_url,
                 hosting_provider=request.hosting_provider
@@ -715,13 +1156,22 @@ class DMCAQueue:
     async def get_queue_status(self) -> Dict[str, int]:
         """Get status of all queues."""
         try:
-            status = {
-                'pending': await self.redis.zcard(self.pending_queue),
-                'processing': await self.redis.zcard(self.processing_queue),
-                'completed': await self.redis.zcard(self.completed_queue),
-                'failed': await self.redis.zcard(self.failed_queue)
+            queues = {
+                'pending': self.pending_queue,
+                'processing': self.processing_queue,
+                'completed': self.completed_queue,
+                'failed': self.failed_queue,
+                'leased': self.lease_queue,
+                'held': self.held_queue  # consolidation buckets, not requests
             }
             
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in queues.values():
+                    pipe.zcard(key)
+                counts = await pipe.execute()
+            
+            status = dict(zip(queues, counts))
+            
             return status
             
         except Exception as e:
@@ -731,9 +1181,7 @@ class DMCAQueue:
     async def get_request_status(self, request_id: str) -> Optional[DMCARequest]:
         """Get status of a specific request."""
         try:
-            request_data = await self.redis.hget(
-                f"dmca:request:{request_id}", "data"
-            )
+            request_data = await self.redis.hget(self._request_key(request_id), "data")
             
             if request_data:
                 return DMCARequest.from_dict(json.loads(request_data))
@@ -744,31 +1192,50 @@ class DMCAQueue:
             logger.error(f"Failed to get request status: {request_id}", error=str(e))
             return None
     
+    async def get_notice_status(self, notice_id: str) -> Dict[str, str]:
+        """Get the current status of every URL covered by a consolidated notice."""
+        try:
+            request_ids = sorted(await self.redis.smembers(self._notice_key(notice_id)))
+            if not request_ids:
+                return {}
+            
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for request_id in request_ids:
+                    pipe.hget(self._request_key(request_id), "data")
+                payloads = await pipe.execute()
+            
+            status = {}
+            for request_id, payload in zip(request_ids, payloads):
+                if payload:
+                    request = DMCARequest.from_dict(json.loads(payload))
+                    status[request.infringing_url] = request.status.value
+            
+            return status
+            
+        except Exception as e:
+            logger.error(f"Failed to get notice status: {notice_id}", error=str(e))
+            return {}
+    
     async def cleanup_old_requests(self, days_old: int = 30) -> int:
         """Clean up old completed/failed requests."""
         try:
             cutoff_time = time.time() - (days_old * 24 * 60 * 60)
             cleaned_count = 0
             
-            # Clean completed requests
-            old_completed = await self.redis.zrangebyscore(
-                self.completed_queue, 0, cutoff_time
-            )
-            
-            for request_id in old_completed:
-                await self.redis.zrem(self.completed_queue, request_id)
-                await self.redis.delete(f"dmca:request:{request_id}")
-                cleaned_count += 1
-            
-            # Clean failed requests
-            old_failed = await self.redis.zrangebyscore(
-                self.failed_queue, 0, cutoff_time
-            )
-            
-            for request_id in old_failed:
-                await self.redis.zrem(self.failed_queue, request_id)
-                await self.redis.delete(f"dmca:request:{request_id}")
-                cleaned_count += 1
+            for queue in (self.completed_queue, self.failed_queue):
+                old_ids = await self.redis.zrangebyscore(queue, 0, cutoff_time)
+                if not old_ids:
+                    continue
+                
+                # One range removal plus batched deletes, applied together
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.zremrangebyscore(queue, 0, cutoff_time)
+                    for start in range(0, len(old_ids), self._cleanup_batch_size):
+                        batch = old_ids[start:start + self._cleanup_batch_size]
+                        pipe.delete(*(self._request_key(request_id) for request_id in batch))
+                    await pipe.execute()
+                
+                cleaned_count += len(old_ids)
             
             logger.info(f"Cleaned up {cleaned_count} old DMCA requests")
             return cleaned_count
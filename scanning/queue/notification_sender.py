@@ -15,6 +15,7 @@ from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Email, To, Content
 
 from ..config import ScannerSettings
+from ..http_transport import HttpTransport, get_http_transport
 from .dmca_queue import DMCARequest, DMCAStatus
 
 
@@ -150,13 +151,14 @@ class EmailNotificationSender:
 class WebhookNotificationSender:
     """Sends notifications via HTTP webhooks."""
     
-    def __init__(self):
+    def __init__(self, http_transport: Optional[HttpTransport] = None):
+        self.http_transport = http_transport or get_http_transport()
         self.session: Optional[aiohttp.ClientSession] = None
     
     async def initialize(self):
         """Initialize HTTP session."""
         timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(timeout=timeout)
+        self.session = self.http_transport.session(timeout=timeout)
     
     async def close(self):
         """Clean up resources."""
@@ -205,7 +207,7 @@ class WebhookNotificationSender:
 class NotificationSender:
     """Main notification sender that handles multiple channels."""
     
-    def __init__(self, settings: ScannerSettings):
+    def __init__(self, settings: ScannerSettings, http_transport: Optional[HttpTransport] = None):
         self.settings = settings
         
         # Initialize senders
@@ -217,7 +219,7 @@ class NotificationSender:
                 settings.dmca_sender_name
             )
         
-        self.webhook_sender = WebhookNotificationSender()
+        self.webhook_sender = WebhookNotificationSender(http_transport or get_http_transport(settings))
         
         # Notification queue
         self.notification_queue = []
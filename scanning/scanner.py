@@ -10,7 +10,9 @@ import structlog
 
 from .config import ScannerConfig
 from .scheduler.task_manager import TaskManager
+from .queue.dmca_queue import ContactLookup
 from .processors.content_matcher import ContentMatch
+from .processors.compute_pool import shutdown_compute_pools
 
 
 logger = structlog.get_logger(__name__)
@@ -19,9 +21,9 @@ logger = structlog.get_logger(__name__)
 class ContentScanner:
     """Main content scanning engine for AutoDMCA platform."""
     
-    def __init__(self, config: ScannerConfig = None):
+    def __init__(self, config: ScannerConfig = None, contact_lookup: Optional[ContactLookup] = None):
         self.config = config or ScannerConfig()
-        self.task_manager = TaskManager(self.config)
+        self.task_manager = TaskManager(self.config, contact_lookup)
         self._running = False
         self._shutdown_event = asyncio.Event()
         
@@ -52,6 +54,7 @@ class ContentScanner:
         
         try:
             await self.task_manager.close()
+            shutdown_compute_pools()
             logger.info("Content scanner shut down successfully")
         except Exception as e:
             logger.error("Error during scanner shutdown", error=str(e))
@@ -9,10 +9,11 @@ import structlog
 
 from .scan_scheduler import ScanScheduler, ScanTask, TaskPriority, TaskStatus
 from ..config import ScannerConfig
+from ..http_transport import get_http_transport
 from ..crawlers.search_engine_api import SearchEngineManager
 from ..crawlers.piracy_crawler import PiracySiteCrawler
 from ..processors.content_matcher import ContentMatcher, ContentMatch
-from ..queue.dmca_queue import DMCAQueue, DMCARequest
+from ..queue.dmca_queue import ContactLookup, DMCAQueue, DMCARequest
 from ..queue.notification_sender import NotificationSender, NotificationLevel
 
 
@@ -22,14 +23,16 @@ logger = structlog.get_logger(__name__)
 class TaskManager:
     """Main task manager that orchestrates all scanning operations."""
     
-    def __init__(self, config: ScannerConfig):
+    def __init__(self, config: ScannerConfig, contact_lookup: Optional[ContactLookup] = None):
         self.config = config
+        # One connection pool for every component's HTTP traffic
+        self.http_transport = get_http_transport(config.settings)
         self.scheduler = ScanScheduler(config.settings)
-        self.search_manager = SearchEngineManager(config.settings)
-        self.piracy_crawler = PiracySiteCrawler(config.settings)
-        self.content_matcher = ContentMatcher(config.settings)
-        self.dmca_queue = DMCAQueue(config.settings)
-        self.notification_sender = NotificationSender(config.settings)
+        self.search_manager = SearchEngineManager(config.settings, self.http_transport)
+        self.piracy_crawler = PiracySiteCrawler(config.settings, self.http_transport)
+        self.content_matcher = ContentMatcher(config.settings, self.http_transport)
+        self.dmca_queue = DMCAQueue(config.settings, self.http_transport, contact_lookup)
+        self.notification_sender = NotificationSender(config.settings, self.http_transport)
         
         self._initialized = False
     
@@ -58,6 +61,7 @@ class TaskManager:
         await self.content_matcher.close()
         await self.dmca_queue.close()
         await self.notification_sender.close()
+        await self.http_transport.close()
         
         logger.info("Task manager shut down")
     
@@ -637,6 +641,7 @@ class TaskManager:
                 'scheduler': scheduler_stats,
                 'dmca_queue': dmca_stats,
                 'notifications': notification_stats,
+                'http': self.http_transport.get_stats(),
                 'health': scheduler_health,
                 'timestamp': time.time()
             }
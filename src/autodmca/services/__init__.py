@@ -1,12 +1,19 @@
 """Services for the AutoDMCA system."""
 
+from .contact_resolution_service import ContactResolutionService
+from .whois_client import AsyncWHOISClient
 from .whois_service import WHOISService
+from .smtp_pool import SMTPConnectionPool, SMTPDeliveryUnknown
 from .email_service import EmailService  
 from .dmca_service import DMCAService
 from .search_delisting_service import SearchDelistingService
 
 __all__ = [
+    "ContactResolutionService",
+    "AsyncWHOISClient",
     "WHOISService",
+    "SMTPConnectionPool",
+    "SMTPDeliveryUnknown",
     "EmailService", 
     "DMCAService",
     "SearchDelistingService",
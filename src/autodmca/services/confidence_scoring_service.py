@@ -228,106 +228,150 @@ class ConfidenceScoringService:
     async def score_confidence(self, features: ConfidenceFeatures) -> ConfidenceScore:
         """Generate comprehensive confidence score"""
         
+        return (await self.score_confidence_batch([features]))[0]
+    
+    async def score_confidence_batch(self, features_list: List[ConfidenceFeatures]) -> List[ConfidenceScore]:
+        """Score many candidates with a single pass of each ensemble model"""
+        
+        if not features_list:
+            return []
+        
         try:
-            # Convert features to vector
-            feature_vector = features.to_feature_vector().reshape(1, -1)
+            # One feature matrix for the whole batch
+            feature_matrix = np.vstack([features.to_feature_vector() for features in features_list])
             
             if self.is_trained:
-                # Use trained ensemble
-                confidence_score = await self._ensemble_predict(feature_vector)
+                # Each model runs once over all rows; its probabilities feed the
+                # ensemble score, the prediction interval and the model agreement
+                loop = asyncio.get_running_loop()
+                model_probabilities = await loop.run_in_executor(
+                    None, self._predict_model_probabilities, feature_matrix
+                )
+                confidence_scores = self._ensemble_predict(model_probabilities)
             else:
                 # Use rule-based scoring as fallback
-                confidence_score = await self._rule_based_scoring(features)
-            
-            # Calculate component scores
-            similarity_confidence = self._calculate_similarity_confidence(features)
-            contextual_confidence = self._calculate_contextual_confidence(features)
-            historical_confidence = self._calculate_historical_confidence(features)
-            technical_confidence = self._calculate_technical_confidence(features)
-            
-            # Determine decision class and risk level
-            decision_class = self._classify_decision(confidence_score)
-            risk_level = self._assess_risk(confidence_score, features)
+                model_probabilities = None
+                confidence_scores = np.array([
+                    await self._rule_based_scoring(features) for features in features_list
+                ])
             
-            # Generate reasoning and key factors
-            reasoning, key_factors, uncertainty_factors = self._generate_reasoning(
-                features, confidence_score, decision_class
-            )
-            
-            # Statistical measures
-            prediction_interval = self._calculate_prediction_interval(feature_vector, confidence_score)
-            model_agreement = self._calculate_model_agreement(feature_vector)
-            calibration_score = self._calculate_calibration(confidence_score)
-            
-            # Risk assessment
-            false_positive_prob = self._estimate_false_positive_probability(
-                confidence_score, features
-            )
-            expected_cost = self._calculate_expected_cost(decision_class, false_positive_prob)
-            
-            # Feature importance
-            feature_importance = self._get_feature_importance(feature_vector)
-            
-            result = ConfidenceScore(
-                overall_confidence=confidence_score,
-                risk_level=risk_level,
-                decision_class=decision_class,
-                similarity_confidence=similarity_confidence,
-                contextual_confidence=contextual_confidence,
-                historical_confidence=historical_confidence,
-                technical_confidence=technical_confidence,
-                reasoning=reasoning,
-                key_factors=key_factors,
-                uncertainty_factors=uncertainty_factors,
-                prediction_interval=prediction_interval,
-                model_agreement=model_agreement,
-                calibration_score=calibration_score,
-                false_positive_probability=false_positive_prob,
-                expected_cost=expected_cost,
-                feature_importance=feature_importance
-            )
-            
-            # Update metrics
-            self.performance_metrics["predictions_made"] += 1
-            if decision_class == DecisionClass.AUTO_APPROVE:
-                self.performance_metrics["auto_approved"] += 1
-            elif decision_class == DecisionClass.MANUAL_REVIEW:
-                self.performance_metrics["manual_reviews"] += 1
-            else:
-                self.performance_metrics["auto_rejected"] += 1
-            
-            return result
+            prediction_intervals = self._calculate_prediction_interval(model_probabilities, confidence_scores)
+            model_agreement = self._calculate_model_agreement(model_probabilities, len(features_list))
+            feature_importance = self._get_feature_importance()
             
         except Exception as e:
-            logger.error(f"Confidence scoring failed: {str(e)}")
-            # Return conservative fallback score
-            return self._create_fallback_score()
+            logger.error(f"Batch confidence scoring failed for {len(features_list)} items: {str(e)}")
+            # Return conservative fallback scores
+            return [self._create_fallback_score() for _ in features_list]
+        
+        results = []
+        for i, features in enumerate(features_list):
+            try:
+                results.append(self._build_score(
+                    features,
+                    float(confidence_scores[i]),
+                    (float(prediction_intervals[i][0]), float(prediction_intervals[i][1])),
+                    float(model_agreement[i]),
+                    dict(feature_importance)
+                ))
+            except Exception as e:
+                logger.error(f"Confidence scoring failed: {str(e)}")
+                results.append(self._create_fallback_score())
+        
+        return results
     
-    async def _ensemble_predict(self, feature_vector: np.ndarray) -> float:
-        """Predict using ensemble of trained models"""
+    def _build_score(
+        self,
+        features: ConfidenceFeatures,
+        confidence_score: float,
+        prediction_interval: Tuple[float, float],
+        model_agreement: float,
+        feature_importance: Dict[str, float]
+    ) -> ConfidenceScore:
+        """Assemble the full score for one item from its batch-level predictions"""
+        
+        # Calculate component scores
+        similarity_confidence = self._calculate_similarity_confidence(features)
+        contextual_confidence = self._calculate_contextual_confidence(features)
+        historical_confidence = self._calculate_historical_confidence(features)
+        technical_confidence = self._calculate_technical_confidence(features)
+        
+        # Determine decision class and risk level
+        decision_class = self._classify_decision(confidence_score)
+        risk_level = self._assess_risk(confidence_score, features)
+        
+        # Generate reasoning and key factors
+        reasoning, key_factors, uncertainty_factors = self._generate_reasoning(
+            features, confidence_score, decision_class
+        )
         
-        # Scale features
-        scaled_features = self.scaler.transform(feature_vector)
+        # Statistical measures
+        calibration_score = self._calculate_calibration(confidence_score)
         
-        # Get predictions from all models
-        predictions = []
-        weights = {"random_forest": 0.4, "gradient_boosting": 0.4, "logistic_regression": 0.2}
+        # Risk assessment
+        false_positive_prob = self._estimate_false_positive_probability(
+            confidence_score, features
+        )
+        expected_cost = self._calculate_expected_cost(decision_class, false_positive_prob)
+        
+        result = ConfidenceScore(
+            overall_confidence=confidence_score,
+            risk_level=risk_level,
+            decision_class=decision_class,
+            similarity_confidence=similarity_confidence,
+            contextual_confidence=contextual_confidence,
+            historical_confidence=historical_confidence,
+            technical_confidence=technical_confidence,
+            reasoning=reasoning,
+            key_factors=key_factors,
+            uncertainty_factors=uncertainty_factors,
+            prediction_interval=prediction_interval,
+            model_agreement=model_agreement,
+            calibration_score=calibration_score,
+            false_positive_probability=false_positive_prob,
+            expected_cost=expected_cost,
+            feature_importance=feature_importance
+        )
         
-        for name, model in self.models.items():
+        # Update metrics
+        self.performance_metrics["predictions_made"] += 1
+        if decision_class == DecisionClass.AUTO_APPROVE:
+            self.performance_metrics["auto_approved"] += 1
+        elif decision_class == DecisionClass.MANUAL_REVIEW:
+            self.performance_metrics["manual_reviews"] += 1
+        else:
+            self.performance_metrics["auto_rejected"] += 1
+        
+        return result
+    
+    def _predict_model_probabilities(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Positive-class probability from every model, shape (n_models, n_rows)"""
+        
+        # Scale features once for all models
+        scaled_features = self.scaler.transform(feature_matrix)
+        
+        predictions = []
+        for model in self.models.values():
             if hasattr(model, 'predict_proba'):
                 # Get positive class probability
-                prob = model.predict_proba(scaled_features)[0][1]
-                predictions.append(prob * weights[name])
+                predictions.append(model.predict_proba(scaled_features)[:, 1])
             else:
                 # Fallback for models without predict_proba
-                pred = model.predict(scaled_features)[0]
-                predictions.append(pred * weights[name])
+                predictions.append(model.predict(scaled_features).astype(float))
+        
+        return np.vstack(predictions)
+    
+    def _ensemble_predict(self, model_probabilities: np.ndarray) -> np.ndarray:
+        """Weighted ensemble prediction from per-model probabilities"""
+        
+        weights = {"random_forest": 0.4, "gradient_boosting": 0.4, "logistic_regression": 0.2}
+        model_weights = np.array([weights[name] for name in self.models])
         
         # Weighted ensemble prediction
-        ensemble_score = sum(predictions)
+        ensemble_scores = model_weights @ model_probabilities
         
-        # Ensure score is in [0, 1] range
-        return max(0.0, min(1.0, ensemble_score))
+        # Ensure scores are in [0, 1] range
+        return np.clip(ensemble_scores, 0.0, 1.0)
     
     async def _rule_based_scoring(self, features: ConfidenceFeatures) -> float:
         """Rule-based confidence scoring when models aren't trained"""
@@ -532,69 +576,44 @@ class ConfidenceScoringService:
         
         return reasoning, key_factors, uncertainty_factors
     
-    def _calculate_prediction_interval(self, feature_vector: np.ndarray, point_estimate: float) -> Tuple[float, float]:
-        """Calculate 95% prediction interval"""
+    def _calculate_prediction_interval(
+        self,
+        model_probabilities: Optional[np.ndarray],
+        point_estimates: np.ndarray
+    ) -> np.ndarray:
+        """Calculate 95% prediction intervals, shape (n_rows, 2)"""
         
-        if not self.is_trained:
+        if model_probabilities is None:
             # Conservative interval for untrained models
             margin = 0.15
-            return (max(0.0, point_estimate - margin), min(1.0, point_estimate + margin))
-        
-        try:
+        else:
             # Use ensemble variance for interval estimation
-            predictions = []
-            scaled_features = self.scaler.transform(feature_vector)
-            
-            for model in self.models.values():
-                if hasattr(model, 'predict_proba'):
-                    pred = model.predict_proba(scaled_features)[0][1]
-                else:
-                    pred = model.predict(scaled_features)[0]
-                predictions.append(pred)
-            
-            std_dev = np.std(predictions)
+            std_dev = np.std(model_probabilities, axis=0)
             margin = 1.96 * std_dev  # 95% confidence interval
-            
-            lower = max(0.0, point_estimate - margin)
-            upper = min(1.0, point_estimate + margin)
-            
-            return (lower, upper)
-            
-        except Exception as e:
-            logger.warning(f"Prediction interval calculation failed: {str(e)}")
-            margin = 0.1
-            return (max(0.0, point_estimate - margin), min(1.0, point_estimate + margin))
+        
+        lower = np.maximum(0.0, point_estimates - margin)
+        upper = np.minimum(1.0, point_estimates + margin)
+        
+        return np.column_stack([lower, upper])
     
-    def _calculate_model_agreement(self, feature_vector: np.ndarray) -> float:
-        """Calculate agreement between ensemble models"""
+    def _calculate_model_agreement(self, model_probabilities: Optional[np.ndarray], n_rows: int) -> np.ndarray:
+        """Calculate agreement between ensemble models for each row"""
         
-        if not self.is_trained:
-            return 0.7  # Default agreement for untrained models
+        if model_probabilities is None:
+            return np.full(n_rows, 0.7)  # Default agreement for untrained models
         
-        try:
-            predictions = []
-            scaled_features = self.scaler.transform(feature_vector)
-            
-            for model in self.models.values():
-                if hasattr(model, 'predict_proba'):
-                    pred = model.predict_proba(scaled_features)[0][1]
-                else:
-                    pred = model.predict(scaled_features)[0]
-                predictions.append(pred)
-            
-            # Calculate coefficient of variation (inverse of agreement)
-            mean_pred = np.mean(predictions)
-            if mean_pred == 0:
-                return 1.0
-            
-            cv = np.std(predictions) / mean_pred
+        # Calculate coefficient of variation (inverse of agreement)
+        mean_pred = np.mean(model_probabilities, axis=0)
+        std_pred = np.std(model_probabilities, axis=0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = std_pred / mean_pred
             agreement = 1.0 / (1.0 + cv)  # Convert to agreement score
-            
-            return max(0.0, min(1.0, agreement))
-            
-        except Exception as e:
-            logger.warning(f"Model agreement calculation failed: {str(e)}")
-            return 0.7
+        
+        # Rows where every model predicts zero agree perfectly
+        agreement = np.where(mean_pred == 0, 1.0, agreement)
+        
+        return np.clip(agreement, 0.0, 1.0)
     
     def _calculate_calibration(self, confidence_score: float) -> float:
         """Calculate calibration score (how well-calibrated the prediction is)"""
@@ -652,7 +671,7 @@ class ConfidenceScoringService:
             error_cost = self.risk_params["false_positive_costs"]["auto_reject"]
             return processing_cost + (false_negative_prob * error_cost)
     
-    def _get_feature_importance(self, feature_vector: np.ndarray) -> Dict[str, float]:
+    def _get_feature_importance(self) -> Dict[str, float]:
         """Get feature importance scores"""
         
         if not self.is_trained:
@@ -0,0 +1,305 @@
+"""
+Contact Resolution Service
+
+Finds where DMCA notices for a domain should go by probing the site's own
+copyright pages, and shares the result through the cache so every worker
+(scanning queue and WHOIS lookups alike) pays the probing cost once per domain.
+"""
+
+import asyncio
+import logging
+import re
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urljoin
+
+import httpx
+
+from ..utils.cache import CacheManager
+
+logger = logging.getLogger(__name__)
+
+
+# Pages that usually carry a site's DMCA contact details
+DEFAULT_CONTACT_PATHS = ["/dmca", "/copyright", "/takedown", "/legal"]
+
+EMAIL_PATTERN = re.compile(r'\b[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}\b')
+FORM_ACTION_PATTERN = re.compile(r'<form[^>]*action="([^"]*)"')
+CONTACT_EMAIL_KEYWORDS = ('dmca', 'copyright', 'legal', 'abuse')
+
+# Release the probe lock only if it is still ours
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+PageFetcher = Callable[[str], Awaitable[Optional[str]]]
+
+
+class ContactResolutionService:
+    """
+    Resolves and caches DMCA contact details per domain.
+
+    Results are stored through the CacheManager, so with Redis configured
+    they are shared by every process; domains where nothing was found are
+    cached too, for a shorter time. Concurrent lookups for one domain wait
+    for a single probe: in-process through a shared task and across
+    processes through a short Redis lock.
+    """
+
+    def __init__(
+        self,
+        cache_manager: Optional[CacheManager] = None,
+        fetch_page: Optional[PageFetcher] = None,
+        contact_paths: Optional[List[str]] = None,
+        positive_ttl: timedelta = timedelta(days=7),
+        negative_ttl: timedelta = timedelta(hours=6),
+        probe_timeout: float = 10.0,
+        max_page_chars: int = 512 * 1024
+    ):
+        """
+        Initialize contact resolution service.
+
+        Args:
+            cache_manager: Cache shared by every resolver (Redis for fleet-wide sharing)
+            fetch_page: Coroutine returning a page's text, or None when unavailable;
+                defaults to an httpx client
+            contact_paths: Paths probed on each domain
+            positive_ttl: How long found contacts are cached
+            negative_ttl: How long a domain without contacts is cached
+            probe_timeout: Seconds allowed for probing one domain
+            max_page_chars: Characters of each page that are scanned
+        """
+        self.cache_manager = cache_manager or CacheManager()
+        self.contact_paths = contact_paths or DEFAULT_CONTACT_PATHS
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.probe_timeout = probe_timeout
+        self.max_page_chars = max_page_chars
+
+        self._fetch_page = fetch_page or self._fetch_with_httpx
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+        # Probes currently running in this process, by domain
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.stats = {
+            'cache_hits': 0,
+            'coalesced': 0,
+            'probes': 0,
+            'negative_results': 0
+        }
+
+    async def resolve_domain(self, domain: str) -> Dict[str, Any]:
+        """
+        Get contact details for a domain, probing it at most once per TTL.
+
+        Args:
+            domain: Domain name (without scheme or path)
+
+        Returns:
+            Dict with 'domain', 'found', 'dmca_email', 'form_url',
+            'policy_url' and 'resolved_at'
+        """
+        domain = self._normalize_domain(domain)
+
+        cached = await self.cache_manager.get(self._cache_key(domain))
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached
+
+        task = self._inflight.get(domain)
+        if task is None:
+            task = asyncio.create_task(self._resolve_uncached(domain))
+            self._inflight[domain] = task
+            task.add_done_callback(lambda _: self._inflight.pop(domain, None))
+        else:
+            self.stats['coalesced'] += 1
+
+        # Shielded so one caller's cancellation does not abort the shared probe
+        return await asyncio.shield(task)
+
+    async def invalidate(self, domain: str) -> bool:
+        """Forget the cached contacts for a domain."""
+        return await self.cache_manager.delete(self._cache_key(self._normalize_domain(domain)))
+
+    async def close(self) -> None:
+        """Close the default HTTP client."""
+        if self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def _resolve_uncached(self, domain: str) -> Dict[str, Any]:
+        """Probe a domain unless another process already is, then cache the result."""
+        lock_token = await self._acquire_probe_lock(domain)
+
+        if lock_token is None:
+            # Another worker is probing; use its result once it lands
+            record = await self._wait_for_record(domain)
+            if record is not None:
+                self.stats['coalesced'] += 1
+                return record
+
+        try:
+            record = await self._probe_domain(domain)
+            ttl = self.positive_ttl if record['found'] else self.negative_ttl
+            await self.cache_manager.set(self._cache_key(domain), record, ttl=ttl)
+            return record
+        finally:
+            if lock_token:
+                await self._release_probe_lock(domain, lock_token)
+
+    async def _probe_domain(self, domain: str) -> Dict[str, Any]:
+        """Probe every contact page at once and keep the first that has contacts."""
+        self.stats['probes'] += 1
+
+        record = {
+            'domain': domain,
+            'found': False,
+            'dmca_email': None,
+            'form_url': None,
+            'policy_url': None,
+            'resolved_at': datetime.utcnow().isoformat()
+        }
+
+        tasks = [
+            asyncio.create_task(self._probe_page(f"https://{domain}{path}"))
+            for path in self.contact_paths
+        ]
+
+        try:
+            for next_result in asyncio.as_completed(tasks, timeout=self.probe_timeout):
+                contacts = await next_result
+                if contacts:
+                    record.update(contacts)
+                    record['found'] = True
+                    break
+        except asyncio.TimeoutError:
+            logger.debug(f"Contact probing timed out for {domain}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if not record['found']:
+            self.stats['negative_results'] += 1
+
+        return record
+
+    async def _probe_page(self, url: str) -> Optional[Dict[str, Optional[str]]]:
+        """Extract contact details from one page, or None when it has none."""
+        try:
+            text = await self._fetch_page(url)
+        except Exception as e:
+            logger.debug(f"Contact page fetch failed for {url}: {e}")
+            return None
+
+        if not text:
+            return None
+
+        text = text[:self.max_page_chars].lower()
+
+        dmca_email = next(
+            (
+                email for email in EMAIL_PATTERN.findall(text)
+                if any(keyword in email for keyword in CONTACT_EMAIL_KEYWORDS)
+            ),
+            None
+        )
+
+        form_match = FORM_ACTION_PATTERN.search(text)
+        form_url = urljoin(url, form_match.group(1)) if form_match else None
+
+        if not dmca_email and not form_url:
+            return None
+
+        return {
+            'dmca_email': dmca_email,
+            'form_url': form_url,
+            'policy_url': url
+        }
+
+    async def _fetch_with_httpx(self, url: str) -> Optional[str]:
+        """Default page fetcher."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=self.probe_timeout,
+                follow_redirects=True
+            )
+
+        response = await self._http_client.get(url)
+        if response.status_code != 200:
+            return None
+        return response.text
+
+    async def _acquire_probe_lock(self, domain: str) -> Optional[str]:
+        """Take the fleet-wide probe lock; without Redis every process probes alone."""
+        redis_client = self.cache_manager.redis_client
+        token = uuid.uuid4().hex
+
+        if not redis_client:
+            return token
+
+        try:
+            acquired = await redis_client.set(
+                self._lock_key(domain),
+                token,
+                nx=True,
+                px=int((self.probe_timeout + 5) * 1000)
+            )
+            return token if acquired else None
+        except Exception as e:
+            logger.warning(f"Contact probe lock failed for {domain}: {e}")
+            return token
+
+    async def _release_probe_lock(self, domain: str, token: str) -> None:
+        redis_client = self.cache_manager.redis_client
+        if not redis_client:
+            return
+
+        try:
+            await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, self._lock_key(domain), token)
+        except Exception as e:
+            logger.warning(f"Contact probe lock release failed for {domain}: {e}")
+
+    async def _wait_for_record(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Poll the cache while another process holds the probe lock."""
+        redis_client = self.cache_manager.redis_client
+        deadline = asyncio.get_running_loop().time() + self.probe_timeout + 5
+
+        try:
+            while asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(0.2)
+
+                record = await self.cache_manager.get(self._cache_key(domain))
+                if record is not None:
+                    return record
+
+                # Lock released or expired without a result: probe ourselves
+                if not await redis_client.exists(self._lock_key(domain)):
+                    return None
+        except Exception as e:
+            logger.warning(f"Waiting for contact probe failed for {domain}: {e}")
+
+        return None
+
+    def _normalize_domain(self, domain: str) -> str:
+        domain = domain.strip().lower()
+        return domain[4:] if domain.startswith('www.') else domain
+
+    def _cache_key(self, domain: str) -> str:
+        return f"contacts:{domain}"
+
+    def _lock_key(self, domain: str) -> str:
+        return f"contacts:probe_lock:{domain}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get resolution counters."""
+        return {
+            **self.stats,
+            'inflight': len(self._inflight)
+        }
@@ -34,7 +34,9 @@ class DMCAServiceConfig:
         auto_search_delisting: bool = True,
         search_delisting_delay_hours: int = 72,
         batch_size: int = 10,
-        enable_anonymity: bool = True
+        enable_anonymity: bool = True,
+        consolidate_notices: bool = True,
+        max_urls_per_notice: int = 50
     ):
         """
         Initialize DMCA service configuration.
@@ -47,6 +49,8 @@ class DMCAServiceConfig:
             search_delisting_delay_hours: Hours to wait before search delisting
             batch_size: Default batch size for bulk operations
             enable_anonymity: Whether to enable anonymity protection by default
+            consolidate_notices: Whether batches send one notice per provider contact
+            max_urls_per_notice: Maximum infringing URLs listed in one consolidated notice
         """
         self.max_concurrent_requests = max_concurrent_requests
         self.followup_interval_days = followup_interval_days
@@ -55,6 +59,8 @@ class DMCAServiceConfig:
         self.search_delisting_delay_hours = search_delisting_delay_hours
         self.batch_size = batch_size
         self.enable_anonymity = enable_anonymity
+        self.consolidate_notices = consolidate_notices
+        self.max_urls_per_notice = max_urls_per_notice
 
 
 class DMCAService:
@@ -208,14 +214,19 @@ class DMCAService:
             # Create semaphore for concurrency control
             semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
             
-            async def process_single(request: TakedownRequest) -> Tuple[str, Dict[str, Any]]:
-                async with semaphore:
-                    result = await self.process_takedown_request(request, custom_agent)
-                    return str(request.id), result
-            
-            # Process all requests
-            tasks = [process_single(req) for req in takedown_batch.requests]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            if self.config.consolidate_notices:
+                results = await self._process_consolidated_batch(
+                    takedown_batch.requests, custom_agent, semaphore
+                )
+            else:
+                async def process_single(request: TakedownRequest) -> Tuple[str, Dict[str, Any]]:
+                    async with semaphore:
+                        result = await self.process_takedown_request(request, custom_agent)
+                        return str(request.id), result
+                
+                # Process all requests
+                tasks = [process_single(req) for req in takedown_batch.requests]
+                results = await asyncio.gather(*tasks, return_exceptions=True)
             
             # Categorize results
             successful = []
@@ -256,6 +267,163 @@ class DMCAService:
                 'timestamp': datetime.utcnow().isoformat()
             }
     
+    async def _process_consolidated_batch(
+        self,
+        takedown_requests: List[TakedownRequest],
+        custom_agent: Optional[DMCAAgent],
+        semaphore: asyncio.Semaphore
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Process a batch sending one notice per provider contact and creator.
+        
+        WHOIS lookups run first for the whole batch; requests whose notices go
+        to the same address on behalf of the same creator are then sent as a
+        single multi-URL notice of at most max_urls_per_notice URLs. Each
+        request still gets its own status, follow-up and delisting schedule.
+        
+        Returns:
+            (request_id, result) per request, in the shape process_single produces
+        """
+        agent = custom_agent or self.agent_contact
+        
+        for request in takedown_requests:
+            self.active_requests[request.id] = request
+            self.metrics['total_requests'] += 1
+            request.update_status(TakedownStatus.WHOIS_LOOKUP)
+        
+        # One lookup per registrable domain, however many URLs it hosts
+        try:
+            providers_by_url = await self.whois_service.lookup_domains([
+                str(request.infringement_data.infringing_url) for request in takedown_requests
+            ])
+        except Exception as e:
+            logger.error(f"Batch WHOIS lookup failed: {str(e)}")
+            providers_by_url = {}
+        
+        providers = []
+        for request in takedown_requests:
+            hosting_provider = providers_by_url.get(str(request.infringement_data.infringing_url))
+            if hosting_provider:
+                self._apply_hosting_provider(request, hosting_provider)
+            providers.append(hosting_provider)
+        
+        results: List[Tuple[str, Dict[str, Any]]] = []
+        groups: Dict[Tuple[str, str], List[TakedownRequest]] = {}
+        group_providers: Dict[Tuple[str, str], HostingProvider] = {}
+        
+        for request, hosting_provider in zip(takedown_requests, providers):
+            recipient_email = self._get_recipient_email(hosting_provider) if hosting_provider else None
+            if not recipient_email:
+                message = "WHOIS lookup failed" if not hosting_provider else "No contact email available for hosting provider"
+                logger.warning(f"{message} for {request.id}")
+                request.update_status(TakedownStatus.FAILED)
+                self.metrics['failed_takedowns'] += 1
+                self.active_requests.pop(request.id, None)
+                results.append((str(request.id), self._create_result(False, message)))
+                continue
+            
+            key = (recipient_email.lower(), str(request.creator_profile.email).lower())
+            groups.setdefault(key, []).append(request)
+            group_providers.setdefault(key, hosting_provider)
+        
+        async def send_group(
+            group: List[TakedownRequest],
+            hosting_provider: HostingProvider
+        ) -> List[Tuple[str, Dict[str, Any]]]:
+            async with semaphore:
+                return await self._send_consolidated_notice(group, hosting_provider, agent)
+        
+        max_urls = max(1, self.config.max_urls_per_notice)
+        tasks = [
+            send_group(members[start:start + max_urls], group_providers[key])
+            for key, members in groups.items()
+            for start in range(0, len(members), max_urls)
+        ]
+        
+        for group_results in await asyncio.gather(*tasks):
+            results.extend(group_results)
+        
+        logger.info(f"Sent {len(tasks)} notices for {len(takedown_requests)} takedown requests")
+        
+        return results
+    
+    async def _send_consolidated_notice(
+        self,
+        takedown_requests: List[TakedownRequest],
+        hosting_provider: HostingProvider,
+        agent: DMCAAgent
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Send one notice for a group of requests and finish each request's workflow."""
+        try:
+            for request in takedown_requests:
+                request.update_status(TakedownStatus.NOTICE_GENERATED)
+            
+            if len(takedown_requests) == 1:
+                email_result = await self._send_dmca_notice(takedown_requests[0], hosting_provider, agent)
+            else:
+                email_result = await self.email_service.send_consolidated_dmca_notice(
+                    takedown_requests,
+                    self._get_recipient_email(hosting_provider),
+                    agent,
+                    track_delivery=True
+                )
+                
+                if email_result.get('success'):
+                    self.metrics['emails_sent'] += 1
+                    hosting_provider.total_notices_sent += 1
+            
+            results = []
+            for request in takedown_requests:
+                if not email_result.get('success'):
+                    logger.error(f"Email sending failed for {request.id}")
+                    request.update_status(TakedownStatus.FAILED)
+                    self.metrics['failed_takedowns'] += 1
+                    results.append((
+                        str(request.id),
+                        self._create_result(False, "Email sending failed", email_result)
+                    ))
+                    continue
+                
+                if self.config.auto_search_delisting:
+                    await self._schedule_search_delisting(request)
+                
+                await self._schedule_followup_check(request)
+                
+                request.update_status(TakedownStatus.UNDER_REVIEW)
+                self.metrics['successful_takedowns'] += 1
+                
+                results.append((
+                    str(request.id),
+                    self._create_result(
+                        True,
+                        "Takedown request processed successfully",
+                        {
+                            'hosting_provider': hosting_provider.name,
+                            'email_sent': True,
+                            'message_id': email_result.get('message_id'),
+                            'notice_url_count': len(takedown_requests),
+                            'search_delisting_scheduled': self.config.auto_search_delisting
+                        }
+                    )
+                ))
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Consolidated takedown processing failed: {str(e)}")
+            for request in takedown_requests:
+                request.update_status(TakedownStatus.FAILED)
+                self.metrics['failed_takedowns'] += 1
+            
+            return [
+                (str(request.id), self._create_result(False, f"Processing failed: {str(e)}"))
+                for request in takedown_requests
+            ]
+        
+        finally:
+            for request in takedown_requests:
+                self.active_requests.pop(request.id, None)
+    
     async def send_followup(
         self,
         takedown_request: TakedownRequest,
@@ -434,15 +602,7 @@ class DMCAService:
             hosting_provider = await self.whois_service.lookup_domain(url)
             
             if hosting_provider:
-                # Update takedown request with hosting info
-                takedown_request.hosting_provider = hosting_provider.name
-                takedown_request.abuse_email = hosting_provider.primary_contact_email
-                takedown_request.dmca_contact_info = {
-                    'dmca_email': hosting_provider.dmca_email,
-                    'best_contact': hosting_provider.get_best_contact().model_dump() if hosting_provider.get_best_contact() else None
-                }
-                takedown_request.whois_data = hosting_provider.metadata
-                
+                self._apply_hosting_provider(takedown_request, hosting_provider)
                 logger.info(f"WHOIS lookup successful: {hosting_provider.name}")
             
             return hosting_provider
@@ -451,6 +611,24 @@ class DMCAService:
             logger.error(f"WHOIS lookup failed: {str(e)}")
             return None
     
+    def _apply_hosting_provider(self, takedown_request: TakedownRequest, hosting_provider: HostingProvider) -> None:
+        """Update takedown request with hosting info."""
+        takedown_request.hosting_provider = hosting_provider.name
+        takedown_request.abuse_email = hosting_provider.primary_contact_email
+        takedown_request.dmca_contact_info = {
+            'dmca_email': hosting_provider.dmca_email,
+            'best_contact': hosting_provider.get_best_contact().model_dump() if hosting_provider.get_best_contact() else None
+        }
+        takedown_request.whois_data = hosting_provider.metadata
+    
+    def _get_recipient_email(self, hosting_provider: HostingProvider) -> Optional[str]:
+        """Best address for a hosting provider's DMCA notices."""
+        return (
+            hosting_provider.dmca_email or 
+            hosting_provider.abuse_email or 
+            hosting_provider.primary_contact_email
+        )
+    
     async def _send_dmca_notice(
         self,
         takedown_request: TakedownRequest,
@@ -459,12 +637,7 @@ class DMCAService:
     ) -> Dict[str, Any]:
         """Send DMCA notice email."""
         try:
-            # Determine recipient email
-            recipient_email = (
-                hosting_provider.dmca_email or 
-                hosting_provider.abuse_email or 
-                hosting_provider.primary_contact_email
-            )
+            recipient_email = self._get_recipient_email(hosting_provider)
             
             if not recipient_email:
                 raise ValueError("No contact email available for hosting provider")
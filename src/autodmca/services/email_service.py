@@ -6,7 +6,6 @@ delivery tracking, and bounce handling for DMCA notices.
 """
 
 import asyncio
-import smtplib
 import logging
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
@@ -23,6 +22,7 @@ import httpx
 
 from ..models.takedown import TakedownRequest
 from ..models.hosting import ContactInfo, DMCAAgent
+from ..services.smtp_pool import SMTPConnectionPool
 from ..templates.template_renderer import TemplateRenderer
 from ..utils.cache import CacheManager
 from ..utils.rate_limiter import RateLimiter
@@ -60,13 +60,15 @@ class EmailService:
         
         Args:
             sendgrid_api_key: SendGrid API key for primary email delivery
-            smtp_config: SMTP configuration for fallback
+            smtp_config: SMTP configuration for fallback; see
+                SMTPConnectionPool.from_config for pool and rate limit keys
             template_renderer: Template renderer for email content
             cache_manager: Cache for delivery tracking
             rate_limiter: Rate limiter for email sending
         """
         self.sendgrid_client = None
         self.smtp_config = smtp_config or {}
+        self.smtp_pool: Optional[SMTPConnectionPool] = None
         self.template_renderer = template_renderer or TemplateRenderer()
         self.cache_manager = cache_manager or CacheManager()
         self.rate_limiter = rate_limiter or RateLimiter(max_calls=100, time_window=60)
@@ -157,13 +159,94 @@ class EmailService:
                 'timestamp': datetime.utcnow().isoformat()
             }
     
+    async def send_consolidated_dmca_notice(
+        self,
+        takedown_requests: List[TakedownRequest],
+        recipient_email: str,
+        agent_contact: Optional[DMCAAgent] = None,
+        attachments: Optional[List[Dict[str, Any]]] = None,
+        track_delivery: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Send one DMCA notice covering several takedown requests.
+        
+        Args:
+            takedown_requests: Requests for the same creator and recipient
+            recipient_email: Recipient email address
+            agent_contact: DMCA agent contact information
+            attachments: Optional list of attachments
+            track_delivery: Whether to track email delivery
+        
+        Returns:
+            Dict with sending results and tracking information
+        """
+        try:
+            if not takedown_requests:
+                raise ValueError("At least one takedown request is required")
+            
+            # Validate recipient email
+            if not self._validate_email(recipient_email):
+                raise ValueError(f"Invalid recipient email: {recipient_email}")
+            
+            # One rate limit slot per email, not per URL
+            await self.rate_limiter.acquire()
+            
+            email_content = self.template_renderer.render_consolidated_dmca_notice(
+                takedown_requests,
+                agent_contact
+            )
+            
+            primary_request = takedown_requests[0]
+            takedown_ids = [str(request.id) for request in takedown_requests]
+            
+            email_data = {
+                'to_email': recipient_email,
+                'subject': email_content['subject'],
+                'body': email_content['body'],
+                'from_email': agent_contact.email if agent_contact else primary_request.creator_profile.email,
+                'from_name': agent_contact.name if agent_contact else primary_request.creator_profile.public_name,
+                'reply_to': agent_contact.email if agent_contact else primary_request.creator_profile.email,
+                'attachments': attachments or [],
+                'track_delivery': track_delivery,
+                'template_type': 'consolidated',
+                'takedown_id': takedown_ids[0],
+                'takedown_ids': takedown_ids
+            }
+            
+            result = await self._send_email(email_data)
+            
+            # Every request covered by the notice records it separately
+            if result.get('success'):
+                sent_at = datetime.utcnow()
+                for request in takedown_requests:
+                    request.email_message_id = result.get('message_id')
+                    request.notice_content = email_content['body']
+                    request.notice_sent_at = sent_at
+                    request.update_status("notice_sent", {
+                        'consolidated_notice': {
+                            'message_id': result.get('message_id'),
+                            'takedown_ids': takedown_ids,
+                            'url_count': len(takedown_ids)
+                        }
+                    })
+            
+            return {**result, 'url_count': len(takedown_ids)}
+            
+        except Exception as e:
+            logger.error(f"Failed to send consolidated DMCA notice: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'timestamp': datetime.utcnow().isoformat()
+            }
+    
     async def send_batch_notices(
         self,
         takedown_requests: List[TakedownRequest],
         recipient_emails: List[str],
         agent_contact: Optional[DMCAAgent] = None,
         template_type: str = "standard",
-        max_concurrent: int = 5
+        max_concurrent: int = 20
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Send multiple DMCA notices in batch.
@@ -173,7 +256,8 @@ class EmailService:
             recipient_emails: List of recipient emails (must match requests)
             agent_contact: DMCA agent contact
             template_type: Type of DMCA notice
-            max_concurrent: Maximum concurrent sends
+            max_concurrent: Maximum concurrent sends; SMTP sends are further
+                paced by the connection pool's queue and rate limit
         
         Returns:
             Dict with successful and failed sends
@@ -381,9 +465,11 @@ class EmailService:
                 )
                 msg.attach(part)
             
-            # Send via SMTP
-            await asyncio.get_event_loop().run_in_executor(
-                None, self._smtp_send, msg, email_data['to_email']
+            # Send over a pooled connection
+            if self.smtp_pool is None:
+                self.smtp_pool = SMTPConnectionPool.from_config(self.smtp_config)
+            await self.smtp_pool.send_message(
+                msg, [email_data['to_email']], from_addr=email_data['from_email']
             )
             
             message_id = msg['Message-ID']
@@ -403,14 +489,15 @@ class EmailService:
             logger.error(f"SMTP sending failed: {e}")
             raise
     
-    def _smtp_send(self, msg: MIMEMultipart, to_email: str) -> None:
-        """Send email via SMTP (blocking)."""
-        config = self.smtp_config
-        
-        with smtplib.SMTP(config.get('host'), config.get('port', 587)) as server:
-            server.starttls()
-            server.login(config.get('username'), config.get('password'))
-            server.send_message(msg, to_addrs=[to_email])
+    def get_smtp_stats(self) -> Optional[Dict[str, Any]]:
+        """Get SMTP connection pool statistics, or None before the first SMTP send."""
+        return self.smtp_pool.get_stats() if self.smtp_pool else None
+    
+    async def close(self) -> None:
+        """Close pooled SMTP connections."""
+        if self.smtp_pool:
+            await self.smtp_pool.close()
+            self.smtp_pool = None
     
     def _get_sendgrid_tracking_settings(self) -> Dict[str, Any]:
         """Get SendGrid tracking settings."""
@@ -442,6 +529,7 @@ class EmailService:
             'status': EmailDeliveryStatus.SENT,
             'sent_at': datetime.utcnow().isoformat(),
             'takedown_id': email_data.get('takedown_id'),
+            'takedown_ids': email_data.get('takedown_ids'),
             'template_type': email_data.get('template_type')
         }
         
@@ -542,10 +630,12 @@ class EmailService:
         """Update takedown request status based on email delivery."""
         # In a full implementation, this would update the database
         # For now, just log the status change
-        takedown_id = tracking_data.get('takedown_id')
+        # Consolidated notices cover several takedowns
+        takedown_ids = tracking_data.get('takedown_ids') or [tracking_data.get('takedown_id')]
         status = tracking_data.get('status')
         
-        logger.info(f"Takedown {takedown_id} email status updated to: {status}")
+        for takedown_id in takedown_ids:
+            logger.info(f"Takedown {takedown_id} email status updated to: {status}")
     
     async def validate_email_deliverability(self, email: str) -> Dict[str, Any]:
         """
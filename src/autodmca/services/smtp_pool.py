@@ -0,0 +1,443 @@
+"""
+Pooled SMTP Transport
+
+Keeps a fixed number of authenticated SMTP connections open and feeds them
+from a bounded queue, so a wave of notices pays the TLS handshake and login
+once per connection rather than once per message. Each connection is driven
+by its own thread; the queue, rate limiting and result delivery run on the
+event loop.
+"""
+
+import asyncio
+import logging
+import re
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.message import Message
+from email.utils import getaddresses
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+# Replies telling us the server is shedding load; the pool backs off on these
+THROTTLE_CODES = {421, 451}
+
+# Recipient replies that count as accepted
+ACCEPTED_RCPT_CODES = {250, 251}
+
+
+class SMTPDeliveryUnknown(smtplib.SMTPException):
+    """The session failed after the message was handed over, so it may have been delivered."""
+
+
+@dataclass
+class SMTPConnectionStats:
+    """Counters for one pooled connection."""
+
+    messages_sent: int = 0
+    messages_failed: int = 0
+    bytes_sent: int = 0
+    connects: int = 0
+    reconnects: int = 0
+    busy_seconds: float = 0.0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class _QueuedMessage:
+    """A message waiting for a pooled connection."""
+
+    from_addr: str
+    to_addrs: List[str]
+    data: bytes
+    future: asyncio.Future = field(repr=False)
+
+
+class _PooledSMTPConnection:
+    """One persistent SMTP session, only ever used from its own thread."""
+
+    def __init__(self, index: int, pool: 'SMTPConnectionPool'):
+        self.index = index
+        self.pool = pool
+        self.server: Optional[smtplib.SMTP] = None
+        self.supports_pipelining = False
+        self.stats = SMTPConnectionStats()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"smtp-pool-{index}")
+
+    def send_batch(self, messages: List[_QueuedMessage]) -> List[Any]:
+        """Send messages back to back; returns refused recipients or the exception per message."""
+        outcomes: List[Any] = []
+        for message in messages:
+            try:
+                outcomes.append(self._deliver(message))
+                self.stats.messages_sent += 1
+                self.stats.bytes_sent += len(message.data)
+            except Exception as e:
+                self.stats.messages_failed += 1
+                self.stats.last_error = str(e)
+                outcomes.append(e)
+        return outcomes
+
+    def _deliver(self, message: _QueuedMessage) -> Dict[str, Tuple[int, bytes]]:
+        """Send one message, reconnecting once if the session turned out to be dead."""
+        last_error: Optional[Exception] = None
+
+        for attempt in range(2):
+            if self.server is None:
+                self._connect()
+
+            try:
+                return self._transmit(message)
+            except SMTPDeliveryUnknown:
+                # Resending could deliver the message twice
+                self.close()
+                raise
+            except smtplib.SMTPResponseException as e:
+                # 421: the server is closing the session
+                if e.smtp_code != 421:
+                    raise
+                last_error = e
+            except smtplib.SMTPRecipientsRefused:
+                raise
+            except OSError as e:
+                # Disconnects, socket and TLS errors (SMTPException derives from OSError)
+                last_error = e
+
+            self.close()
+            if attempt == 0:
+                self.stats.reconnects += 1
+                logger.info(f"SMTP connection {self.index} lost ({last_error}), reconnecting")
+
+        raise last_error
+
+    def _connect(self) -> None:
+        config = self.pool
+        if config.use_ssl:
+            server = smtplib.SMTP_SSL(config.host, config.port, timeout=config.timeout)
+        else:
+            server = smtplib.SMTP(config.host, config.port, timeout=config.timeout)
+
+        try:
+            if config.use_tls and not config.use_ssl:
+                server.starttls()
+            server.ehlo_or_helo_if_needed()
+            if config.username:
+                server.login(config.username, config.password)
+        except Exception:
+            server.close()
+            raise
+
+        self.server = server
+        self.supports_pipelining = server.has_extn('pipelining')
+        self.stats.connects += 1
+
+    def _transmit(self, message: _QueuedMessage) -> Dict[str, Tuple[int, bytes]]:
+        server = self.server
+
+        commands = [f"mail FROM:{smtplib.quoteaddr(message.from_addr)}"]
+        commands += [f"rcpt TO:{smtplib.quoteaddr(addr)}" for addr in message.to_addrs]
+        commands.append("data")
+
+        if self.supports_pipelining:
+            # RFC 2920: envelope and DATA go out together, replies are read afterwards
+            server.send(''.join(f"{command}\r\n" for command in commands))
+            replies = [server.getreply() for _ in commands]
+        else:
+            replies = [server.docmd(command) for command in commands]
+
+        mail_code, mail_response = replies[0]
+        data_code, data_response = replies[-1]
+        refused = {
+            addr: reply for addr, reply in zip(message.to_addrs, replies[1:-1])
+            if reply[0] not in ACCEPTED_RCPT_CODES
+        }
+
+        if mail_code != 250 or len(refused) == len(message.to_addrs) or data_code != 354:
+            if data_code == 354:
+                # Server accepted DATA anyway; end it empty so the session stays usable
+                server.send(b".\r\n")
+                server.getreply()
+            self._reset()
+
+            if mail_code != 250:
+                raise smtplib.SMTPSenderRefused(mail_code, mail_response, message.from_addr)
+            if len(refused) == len(message.to_addrs):
+                raise smtplib.SMTPRecipientsRefused(refused)
+            raise smtplib.SMTPDataError(data_code, data_response)
+
+        payload = re.sub(br'(?m)^\.', b'..', message.data)
+        if not payload.endswith(b"\r\n"):
+            payload += b"\r\n"
+        server.send(payload + b".\r\n")
+
+        # Up to here a failure is safe to retry on a new session; once the
+        # terminator is written the server may already have accepted the message
+        try:
+            code, response = server.getreply()
+        except OSError as e:
+            raise SMTPDeliveryUnknown(f"No reply after the message was sent: {e}") from e
+        if code != 250:
+            raise smtplib.SMTPDataError(code, response)
+
+        return refused
+
+    def _reset(self) -> None:
+        try:
+            self.server.rset()
+        except smtplib.SMTPServerDisconnected:
+            pass
+
+    def close(self) -> None:
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+        self.server = None
+
+
+class SMTPConnectionPool:
+    """
+    Pool of persistent, authenticated SMTP connections.
+
+    Messages queue for the first free connection. The queue is bounded and
+    drained no faster than the provider's rate limit allows, so senders wait
+    (backpressure) instead of piling up work. A free connection takes every
+    queued message the rate limit admits and sends them back to back, with
+    envelope commands pipelined when the server supports PIPELINING.
+    Connections that drop are re-established and the message retried once,
+    unless the drop came after the message was handed over; that raises
+    SMTPDeliveryUnknown instead of risking a duplicate.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        use_ssl: bool = False,
+        pool_size: int = 4,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_batch: int = 10,
+        queue_size: Optional[int] = None,
+        timeout: float = 30.0
+    ):
+        """
+        Initialize SMTP connection pool.
+
+        Args:
+            host: SMTP server host
+            port: SMTP server port
+            username: Login user; no login when omitted
+            password: Login password
+            use_tls: Upgrade plain connections with STARTTLS
+            use_ssl: Connect with implicit TLS (e.g. port 465)
+            pool_size: Number of persistent connections
+            rate_limiter: Provider's sending limit, applied per message
+            max_batch: Messages a connection takes from the queue at once
+            queue_size: Messages that may wait before senders block; defaults
+                to pool_size * max_batch
+            timeout: Socket timeout for SMTP commands in seconds
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.pool_size = max(1, pool_size)
+        self.rate_limiter = rate_limiter or RateLimiter(max_calls=100, time_window=60)
+        self.max_batch = max(1, max_batch)
+        self.queue_size = queue_size or self.pool_size * self.max_batch
+        self.timeout = timeout
+
+        self._connections = [_PooledSMTPConnection(index, self) for index in range(self.pool_size)]
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'SMTPConnectionPool':
+        """
+        Create a pool from an EmailService smtp_config dict.
+
+        Besides host, port, username and password, the optional keys
+        use_tls, use_ssl, pool_size, max_messages_per_minute, max_batch,
+        queue_size and timeout are honoured.
+        """
+        return cls(
+            host=config.get('host'),
+            port=config.get('port', 587),
+            username=config.get('username'),
+            password=config.get('password'),
+            use_tls=config.get('use_tls', True),
+            use_ssl=config.get('use_ssl', False),
+            pool_size=config.get('pool_size', 4),
+            rate_limiter=RateLimiter(
+                max_calls=config.get('max_messages_per_minute', 100),
+                time_window=60
+            ),
+            max_batch=config.get('max_batch', 10),
+            queue_size=config.get('queue_size'),
+            timeout=config.get('timeout', 30.0)
+        )
+
+    async def send_message(
+        self,
+        msg: Message,
+        to_addrs: List[str],
+        from_addr: Optional[str] = None
+    ) -> Dict[str, Tuple[int, bytes]]:
+        """
+        Send a message over a pooled connection.
+
+        Waits while the queue is full, so callers are paced by the
+        provider's throughput.
+
+        Args:
+            msg: Message to send
+            to_addrs: Envelope recipients
+            from_addr: Envelope sender; defaults to the From header
+
+        Returns:
+            Recipients the server refused, as smtplib's sendmail reports them
+
+        Raises:
+            smtplib.SMTPException: If the message could not be sent
+        """
+        if self._closed:
+            raise smtplib.SMTPServerDisconnected("SMTP pool closed")
+        self._ensure_started()
+
+        if from_addr is None:
+            from_addr = getaddresses([msg['From'] or ''])[0][1]
+
+        queued = _QueuedMessage(
+            from_addr=from_addr,
+            to_addrs=list(to_addrs),
+            data=msg.as_bytes(policy=msg.policy.clone(linesep='\r\n')),
+            future=asyncio.get_running_loop().create_future()
+        )
+        await self._queue.put(queued)
+        if self._closed:
+            # Woken by close() draining the queue; nothing will send this
+            raise smtplib.SMTPServerDisconnected("SMTP pool closed")
+        return await queued.future
+
+    def _ensure_started(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._run_connection(connection))
+            for connection in self._connections
+        ]
+
+    async def _run_connection(self, connection: _PooledSMTPConnection) -> None:
+        """Feed one connection from the queue for the life of the pool."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                await self.rate_limiter.acquire()
+                while (
+                    len(batch) < self.max_batch
+                    and not self._queue.empty()
+                    and await self.rate_limiter.try_acquire()
+                ):
+                    batch.append(self._queue.get_nowait())
+
+                # Skip messages whose senders gave up while queued
+                messages = [message for message in batch if not message.future.done()]
+                if not messages:
+                    continue
+
+                started = time.monotonic()
+                outcomes = await loop.run_in_executor(
+                    connection.executor, connection.send_batch, messages
+                )
+                connection.stats.busy_seconds += time.monotonic() - started
+
+                for message, outcome in zip(messages, outcomes):
+                    if message.future.done():
+                        continue
+                    if isinstance(outcome, Exception):
+                        if isinstance(outcome, smtplib.SMTPResponseException) and outcome.smtp_code in THROTTLE_CODES:
+                            self.rate_limiter.handle_rate_limit_error()
+                        message.future.set_exception(outcome)
+                    else:
+                        message.future.set_result(outcome)
+
+            except asyncio.CancelledError:
+                for message in batch:
+                    if not message.future.done():
+                        message.future.set_exception(smtplib.SMTPServerDisconnected("SMTP pool closed"))
+                raise
+            except Exception as e:
+                logger.error(f"SMTP connection {connection.index} worker error: {e}")
+                for message in batch:
+                    if not message.future.done():
+                        message.future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def close(self) -> None:
+        """Stop the workers, fail queued messages and close every connection."""
+        self._closed = True
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        while self._queue is not None and not self._queue.empty():
+            message = self._queue.get_nowait()
+            if not message.future.done():
+                message.future.set_exception(smtplib.SMTPServerDisconnected("SMTP pool closed"))
+
+        loop = asyncio.get_running_loop()
+        for connection in self._connections:
+            await loop.run_in_executor(connection.executor, connection.close)
+            connection.executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool and per-connection throughput statistics."""
+        connections = []
+        for connection in self._connections:
+            stats = connection.stats
+            connections.append({
+                'index': connection.index,
+                'connected': connection.server is not None,
+                'pipelining': connection.supports_pipelining,
+                'messages_sent': stats.messages_sent,
+                'messages_failed': stats.messages_failed,
+                'bytes_sent': stats.bytes_sent,
+                'connects': stats.connects,
+                'reconnects': stats.reconnects,
+                'busy_seconds': round(stats.busy_seconds, 3),
+                'messages_per_second': (
+                    stats.messages_sent / stats.busy_seconds if stats.busy_seconds else 0.0
+                ),
+                'last_error': stats.last_error
+            })
+
+        return {
+            'pool_size': self.pool_size,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'messages_sent': sum(c['messages_sent'] for c in connections),
+            'messages_failed': sum(c['messages_failed'] for c in connections),
+            'rate_limiter': self.rate_limiter.get_stats(),
+            'connections': connections
+        }
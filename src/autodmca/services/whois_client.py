@@ -0,0 +1,526 @@
+"""
+Asynchronous WHOIS/RDAP Client
+
+Queries registries without blocking threads: RDAP over a shared HTTP client
+(connections are kept alive per registry) with a fallback to classic WHOIS on
+port 43 over asyncio streams. Registry referrals and the IANA RDAP bootstrap
+are cached, queries per registry are bounded, and concurrent lookups for the
+same domain share one query.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import re
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from ..utils.cache import CacheManager
+
+try:
+    import tldextract
+    TLDEXTRACT_AVAILABLE = True
+except ImportError:
+    TLDEXTRACT_AVAILABLE = False
+    tldextract = None
+
+logger = logging.getLogger(__name__)
+
+
+IANA_RDAP_BOOTSTRAP_URL = "https://data.iana.org/rdap/dns.json"
+IANA_WHOIS_SERVER = "whois.iana.org"
+
+# Multi-label public suffixes recognised when tldextract is not installed
+COMMON_MULTI_LABEL_SUFFIXES = frozenset({
+    'co.uk', 'org.uk', 'me.uk', 'ac.uk', 'gov.uk', 'ltd.uk', 'plc.uk',
+    'com.au', 'net.au', 'org.au', 'edu.au', 'gov.au',
+    'co.nz', 'org.nz', 'net.nz',
+    'co.jp', 'ne.jp', 'or.jp', 'ac.jp',
+    'co.kr', 'or.kr',
+    'com.br', 'net.br', 'org.br',
+    'com.cn', 'net.cn', 'org.cn',
+    'com.tw', 'com.hk', 'com.sg', 'com.my', 'com.ph', 'com.vn',
+    'co.in', 'net.in', 'org.in', 'co.id', 'co.th', 'co.za',
+    'com.ar', 'com.mx', 'com.co', 'com.pe', 'com.tr', 'com.ua', 'com.pl',
+    'com.ru', 'com.es', 'com.sa', 'com.eg', 'com.ng',
+})
+
+# WHOIS text fields mapped onto the keys WHOISService extracts from
+WHOIS_FIELD_MAP = {
+    'domain name': 'domain_name',
+    'registrar': 'registrar',
+    'sponsoring registrar': 'registrar',
+    'registrar whois server': 'whois_server',
+    'whois server': 'whois_server',
+    'whois': 'whois_server',
+    'creation date': 'creation_date',
+    'created': 'creation_date',
+    'registered on': 'creation_date',
+    'registry expiry date': 'expiration_date',
+    'registrar registration expiration date': 'expiration_date',
+    'expiry date': 'expiration_date',
+    'expiration date': 'expiration_date',
+    'expires': 'expiration_date',
+    'updated date': 'updated_date',
+    'last updated': 'updated_date',
+    'last-modified': 'updated_date',
+    'changed': 'updated_date',
+    'registrar abuse contact email': 'abuse_email',
+    'abuse-mailbox': 'abuse_email',
+}
+WHOIS_LIST_FIELDS = {
+    'name server': 'name_servers',
+    'nserver': 'name_servers',
+    'domain status': 'status',
+    'status': 'status',
+}
+WHOIS_CONTACT_PREFIXES = {'registrant': '', 'admin': 'admin_', 'tech': 'tech_'}
+WHOIS_CONTACT_FIELDS = {
+    'name': 'name',
+    'organization': 'org',
+    'email': 'email',
+    'phone': 'phone',
+    'fax': 'fax',
+    'street': 'address',
+    'city': 'city',
+    'state/province': 'state',
+    'postal code': 'postal_code',
+    'country': 'country',
+}
+
+RDAP_CONTACT_PREFIXES = {'registrant': '', 'administrative': 'admin_', 'technical': 'tech_'}
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+
+class AsyncWHOISClient:
+    """
+    Asyncio-native WHOIS/RDAP client with per-registry concurrency limits.
+    """
+
+    def __init__(
+        self,
+        cache_manager: Optional[CacheManager] = None,
+        timeout: float = 10.0,
+        per_registry_limit: int = 4,
+        whois_servers: Optional[Dict[str, str]] = None,
+        max_response_bytes: int = 256 * 1024,
+        bootstrap_retry_seconds: float = 60.0
+    ):
+        """
+        Initialize WHOIS/RDAP client.
+
+        Args:
+            cache_manager: Cache for registry referrals and the RDAP bootstrap
+            timeout: Timeout per registry query in seconds
+            per_registry_limit: Concurrent queries allowed per registry server
+            whois_servers: Known TLD to WHOIS server mappings
+            max_response_bytes: Largest WHOIS response read
+            bootstrap_retry_seconds: First delay before retrying a failed RDAP
+                bootstrap load; doubles on each failure up to an hour
+        """
+        self.cache_manager = cache_manager or CacheManager()
+        self.timeout = timeout
+        self.per_registry_limit = per_registry_limit
+        self.max_response_bytes = max_response_bytes
+
+        # TLD -> WHOIS server, seeded with known servers and filled from IANA referrals
+        self._whois_referrals: Dict[str, str] = dict(whois_servers or {})
+
+        # TLD -> RDAP base URL, loaded once from the IANA bootstrap; a failed
+        # load is retried with backoff rather than remembered
+        self._rdap_servers: Optional[Dict[str, str]] = None
+        self._rdap_bootstrap_lock = asyncio.Lock()
+        self.bootstrap_retry_seconds = bootstrap_retry_seconds
+        self._rdap_bootstrap_failures = 0
+        self._rdap_bootstrap_retry_at = 0.0
+
+        self._registry_slots: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+        # Offline suffix list snapshot; never fetched at runtime
+        self._suffix_extractor = (
+            tldextract.TLDExtract(suffix_list_urls=()) if TLDEXTRACT_AVAILABLE else None
+        )
+
+        self.stats = {
+            'rdap_queries': 0,
+            'whois_queries': 0,
+            'coalesced': 0,
+            'failures': 0
+        }
+
+    def registrable_domain(self, host: str) -> Optional[str]:
+        """
+        Reduce a host name to the domain a registry knows about.
+
+        Args:
+            host: Host name, e.g. 'cdn.files.example.co.uk'
+
+        Returns:
+            Registrable domain, e.g. 'example.co.uk'; IP addresses are returned as is
+        """
+        host = (host or '').strip().lower().rstrip('.')
+        if not host:
+            return None
+
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+
+        if self._suffix_extractor:
+            parts = self._suffix_extractor(host)
+            if parts.domain and parts.suffix:
+                return f"{parts.domain}.{parts.suffix}"
+            return host
+
+        labels = host.split('.')
+        if len(labels) <= 2:
+            return host
+        if '.'.join(labels[-2:]) in COMMON_MULTI_LABEL_SUFFIXES:
+            return '.'.join(labels[-3:])
+        return '.'.join(labels[-2:])
+
+    async def lookup(self, domain: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up registration data for a registrable domain.
+
+        Args:
+            domain: Registrable domain
+
+        Returns:
+            Dictionary of WHOIS fields, or None if no registry answered
+        """
+        domain = domain.strip().lower()
+
+        task = self._inflight.get(domain)
+        if task is None:
+            task = asyncio.create_task(self._query_domain(domain))
+            self._inflight[domain] = task
+            task.add_done_callback(lambda _: self._inflight.pop(domain, None))
+        else:
+            self.stats['coalesced'] += 1
+
+        return await asyncio.shield(task)
+
+    async def lookup_many(self, hosts: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Look up many hosts, querying each registrable domain once.
+
+        Args:
+            hosts: Host names, possibly repeated or sharing a registrable domain
+
+        Returns:
+            Dict mapping each registrable domain to its WHOIS fields (or None)
+        """
+        domains = list({self.registrable_domain(host) for host in hosts} - {None})
+        results = await asyncio.gather(*(self.lookup(domain) for domain in domains))
+        return dict(zip(domains, results))
+
+    async def close(self) -> None:
+        """Close the shared HTTP client."""
+        if self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def _query_domain(self, domain: str) -> Optional[Dict[str, Any]]:
+        """RDAP first, WHOIS when the TLD has no RDAP service or it fails."""
+        tld = domain.rsplit('.', 1)[-1]
+
+        try:
+            rdap_base = await self._get_rdap_base(tld)
+            if rdap_base:
+                result = await self._rdap_lookup(domain, rdap_base)
+                if result is not None:
+                    # An empty result means the registry says the domain is not registered
+                    return result or None
+
+            return await self._whois_lookup(domain, tld)
+
+        except Exception as e:
+            self.stats['failures'] += 1
+            logger.warning(f"Registry lookup failed for {domain}: {e}")
+            return None
+
+    def _registry_slot(self, registry: str) -> asyncio.Semaphore:
+        slots = self._registry_slots.get(registry)
+        if slots is None:
+            slots = asyncio.Semaphore(self.per_registry_limit)
+            self._registry_slots[registry] = slots
+        return slots
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={'Accept': 'application/rdap+json, application/json'},
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        return self._http_client
+
+    # RDAP
+
+    async def _get_rdap_base(self, tld: str) -> Optional[str]:
+        """RDAP base URL for a TLD from the (cached) IANA bootstrap registry."""
+        if self._rdap_servers is None and time.monotonic() >= self._rdap_bootstrap_retry_at:
+            async with self._rdap_bootstrap_lock:
+                if self._rdap_servers is None and time.monotonic() >= self._rdap_bootstrap_retry_at:
+                    servers = await self._load_rdap_bootstrap()
+                    if servers:
+                        self._rdap_servers = servers
+                        self._rdap_bootstrap_failures = 0
+                    else:
+                        delay = min(self.bootstrap_retry_seconds * 2 ** self._rdap_bootstrap_failures, 3600)
+                        self._rdap_bootstrap_failures += 1
+                        self._rdap_bootstrap_retry_at = time.monotonic() + delay
+
+        if self._rdap_servers is None:
+            return None
+        return self._rdap_servers.get(tld)
+
+    async def _load_rdap_bootstrap(self) -> Dict[str, str]:
+        """TLD to RDAP base URL map; empty when the bootstrap could not be loaded."""
+        cached = await self.cache_manager.get("rdap:bootstrap")
+        if cached:
+            return cached
+
+        servers: Dict[str, str] = {}
+        try:
+            response = await self._get_http_client().get(IANA_RDAP_BOOTSTRAP_URL)
+            response.raise_for_status()
+
+            for tlds, urls in response.json().get('services', []):
+                base = next((url for url in urls if url.startswith('https://')), urls[0] if urls else None)
+                if base:
+                    for tld in tlds:
+                        servers[tld.lower()] = base
+
+            await self.cache_manager.set("rdap:bootstrap", servers, ttl=timedelta(days=1))
+
+        except Exception as e:
+            # Retried after a backoff; WHOIS covers lookups meanwhile
+            logger.warning(f"RDAP bootstrap unavailable, using WHOIS only: {e}")
+
+        return servers
+
+    async def _rdap_lookup(self, domain: str, base_url: str) -> Optional[Dict[str, Any]]:
+        url = f"{base_url.rstrip('/')}/domain/{domain}"
+
+        try:
+            async with self._registry_slot(urlparse(base_url).netloc):
+                self.stats['rdap_queries'] += 1
+                response = await self._get_http_client().get(url)
+        except httpx.HTTPError as e:
+            logger.debug(f"RDAP query failed for {domain}: {e}")
+            return None
+
+        if response.status_code == 404:
+            return {}
+        if response.status_code != 200:
+            logger.debug(f"RDAP returned {response.status_code} for {domain}")
+            return None
+
+        return self._parse_rdap(response.json())
+
+    def _parse_rdap(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten an RDAP domain object into WHOIS-style fields."""
+        result: Dict[str, Any] = {
+            'domain_name': (data.get('ldhName') or '').lower(),
+            'whois_server': data.get('port43', ''),
+            'name_servers': [
+                ns['ldhName'].lower() for ns in data.get('nameservers', []) if ns.get('ldhName')
+            ],
+            'status': list(data.get('status', [])),
+        }
+
+        for event in data.get('events', []):
+            action = event.get('eventAction')
+            if action == 'registration':
+                result['creation_date'] = event.get('eventDate')
+            elif action == 'expiration':
+                result['expiration_date'] = event.get('eventDate')
+            elif action == 'last changed':
+                result['updated_date'] = event.get('eventDate')
+
+        emails: List[str] = []
+
+        def visit(entities: List[Dict[str, Any]]) -> None:
+            for entity in entities:
+                roles = entity.get('roles', [])
+                contact = self._parse_vcard(entity.get('vcardArray'))
+                if contact.get('email'):
+                    emails.append(contact['email'])
+
+                if 'registrar' in roles and contact.get('name'):
+                    result['registrar'] = contact['name']
+                if 'abuse' in roles and contact.get('email'):
+                    result.setdefault('abuse_email', contact['email'])
+
+                for role, prefix in RDAP_CONTACT_PREFIXES.items():
+                    if role in roles:
+                        for field, value in contact.items():
+                            result.setdefault(f"{prefix}{field}", value)
+
+                visit(entity.get('entities', []))
+
+        visit(data.get('entities', []))
+        result['emails'] = list(dict.fromkeys(emails))
+
+        return result
+
+    def _parse_vcard(self, vcard_array: Optional[List[Any]]) -> Dict[str, str]:
+        contact: Dict[str, str] = {}
+        if not vcard_array or len(vcard_array) < 2:
+            return contact
+
+        for item in vcard_array[1]:
+            if len(item) < 4:
+                continue
+            name, params, _, value = item[:4]
+
+            if name == 'fn' and value:
+                contact['name'] = value
+            elif name == 'org' and value:
+                contact['org'] = value if isinstance(value, str) else ' '.join(value)
+            elif name == 'email' and value:
+                contact['email'] = value
+            elif name == 'tel' and value:
+                contact['phone'] = str(value).replace('tel:', '')
+            elif name == 'adr':
+                if isinstance(value, list) and len(value) >= 7:
+                    street = value[2] if isinstance(value[2], str) else ' '.join(value[2])
+                    contact.update({
+                        'address': street,
+                        'city': value[3],
+                        'state': value[4],
+                        'postal_code': value[5],
+                        'country': value[6]
+                    })
+                elif isinstance(params, dict) and params.get('label'):
+                    contact['address'] = params['label']
+
+        return {field: value for field, value in contact.items() if value}
+
+    # WHOIS (port 43)
+
+    async def _whois_lookup(self, domain: str, tld: str) -> Optional[Dict[str, Any]]:
+        server = await self._whois_server_for(tld)
+        if not server:
+            return None
+
+        result = self._parse_whois_text(await self._whois_query(server, domain))
+        if not result.get('domain_name') and not result.get('registrar'):
+            return None
+
+        # Thin registries refer to the registrar's server for contact details
+        referral = (result.get('whois_server') or '').lower()
+        referral = referral.replace('whois://', '').replace('http://', '').replace('https://', '').strip('/')
+        if referral and referral != server:
+            try:
+                registrar_result = self._parse_whois_text(await self._whois_query(referral, domain))
+                result = {**result, **{key: value for key, value in registrar_result.items() if value}}
+            except Exception as e:
+                logger.debug(f"Registrar WHOIS referral to {referral} failed for {domain}: {e}")
+
+        return result
+
+    async def _whois_server_for(self, tld: str) -> Optional[str]:
+        """WHOIS server for a TLD, asking IANA once and caching the referral."""
+        server = self._whois_referrals.get(tld)
+        if server:
+            return server
+
+        cache_key = f"whois:referral:{tld}"
+        server = await self.cache_manager.get(cache_key)
+
+        if not server:
+            server = self._parse_referral(await self._whois_query(IANA_WHOIS_SERVER, tld))
+            if not server:
+                return None
+            await self.cache_manager.set(cache_key, server, ttl=timedelta(days=30))
+
+        self._whois_referrals[tld] = server
+        return server
+
+    def _parse_referral(self, text: str) -> Optional[str]:
+        for line in text.splitlines():
+            key, _, value = line.partition(':')
+            if key.strip().lower() in ('refer', 'whois') and value.strip():
+                return value.strip().lower()
+        return None
+
+    async def _whois_query(self, server: str, query: str) -> str:
+        """Send one query to a WHOIS server and read the full response."""
+        async with self._registry_slot(server):
+            self.stats['whois_queries'] += 1
+            return await asyncio.wait_for(self._read_whois_response(server, query), timeout=self.timeout)
+
+    async def _read_whois_response(self, server: str, query: str) -> str:
+        reader, writer = await asyncio.open_connection(server, 43)
+        try:
+            writer.write(f"{query}\r\n".encode('utf-8'))
+            await writer.drain()
+
+            chunks = []
+            size = 0
+            while size < self.max_response_bytes:
+                chunk = await reader.read(self.max_response_bytes - size)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+
+            return b''.join(chunks).decode('utf-8', errors='replace')
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def _parse_whois_text(self, text: str) -> Dict[str, Any]:
+        """Parse 'Key: Value' WHOIS output into WHOIS-style fields."""
+        result: Dict[str, Any] = {}
+        lists: Dict[str, List[str]] = {}
+
+        for line in text.splitlines():
+            if line.startswith(('%', '#', '>>>')) or ':' not in line:
+                continue
+
+            key, _, value = line.partition(':')
+            key = key.strip().lower()
+            value = value.strip()
+            if not value:
+                continue
+
+            if key in WHOIS_LIST_FIELDS:
+                field = WHOIS_LIST_FIELDS[key]
+                # Status lines carry an explanatory URL after the code
+                item = value.split()[0] if field == 'status' else value.lower()
+                lists.setdefault(field, []).append(item)
+            elif key in WHOIS_FIELD_MAP:
+                result.setdefault(WHOIS_FIELD_MAP[key], value)
+            else:
+                role, _, field = key.partition(' ')
+                if role in WHOIS_CONTACT_PREFIXES and field in WHOIS_CONTACT_FIELDS:
+                    result.setdefault(
+                        f"{WHOIS_CONTACT_PREFIXES[role]}{WHOIS_CONTACT_FIELDS[field]}", value
+                    )
+
+        for field, values in lists.items():
+            result[field] = list(dict.fromkeys(values))
+
+        if result.get('domain_name'):
+            result['domain_name'] = result['domain_name'].lower()
+
+        result['emails'] = list(dict.fromkeys(email.lower() for email in EMAIL_PATTERN.findall(text)))
+
+        return result
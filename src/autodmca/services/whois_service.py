@@ -13,12 +13,13 @@ from urllib.parse import urlparse
 import asyncio
 import logging
 
-import whois
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from ..models.hosting import HostingProvider, ContactInfo, DMCAAgent
+from ..services.contact_resolution_service import ContactResolutionService
+from ..services.whois_client import AsyncWHOISClient
 from ..utils.cache import CacheManager
 from ..utils.rate_limiter import RateLimiter
 
@@ -34,7 +35,10 @@ class WHOISService:
         self,
         cache_manager: Optional[CacheManager] = None,
         rate_limiter: Optional[RateLimiter] = None,
-        timeout: int = 10
+        timeout: int = 10,
+        contact_resolver: Optional[ContactResolutionService] = None,
+        whois_client: Optional[AsyncWHOISClient] = None,
+        max_concurrent_lookups: int = 20
     ):
         """
         Initialize WHOIS service.
@@ -43,10 +47,15 @@ class WHOISService:
             cache_manager: Optional cache for WHOIS results
             rate_limiter: Optional rate limiter for API calls
             timeout: Timeout for WHOIS queries in seconds
+            contact_resolver: Shared resolver for site-published DMCA contacts
+            whois_client: Async WHOIS/RDAP client (one per process keeps registry connections warm)
+            max_concurrent_lookups: Registrable domains looked up at once by lookup_domains
         """
         self.cache_manager = cache_manager or CacheManager()
         self.rate_limiter = rate_limiter or RateLimiter(max_calls=60, time_window=60)
         self.timeout = timeout
+        self.contact_resolver = contact_resolver or ContactResolutionService(self.cache_manager)
+        self.max_concurrent_lookups = max_concurrent_lookups
         
         # Configure HTTP session with retries
         self.session = requests.Session()
@@ -70,6 +79,11 @@ class WHOISService:
             'info': 'whois.afilias.net',
             'biz': 'whois.neulevel.biz',
         }
+        self.whois_client = whois_client or AsyncWHOISClient(
+            cache_manager=self.cache_manager,
+            timeout=timeout,
+            whois_servers=self.whois_servers
+        )
     
     async def lookup_domain(self, url: str) -> Optional[HostingProvider]:
         """
@@ -88,41 +102,91 @@ class WHOISService:
                 logger.warning(f"Could not extract domain from URL: {url}")
                 return None
             
-            # Check cache first
-            cache_key = f"whois:{domain}"
-            cached_result = await self.cache_manager.get(cache_key)
-            if cached_result:
-                logger.debug(f"Using cached WHOIS data for {domain}")
-                return HostingProvider(**cached_result)
-            
-            # Rate limit check
-            await self.rate_limiter.acquire()
-            
-            # Perform WHOIS lookup
-            whois_data = await self._perform_whois_lookup(domain)
-            if not whois_data:
-                return None
-            
-            # Extract hosting provider information
-            hosting_provider = await self._extract_hosting_info(domain, whois_data)
-            
-            # Enhance with additional contact information
-            if hosting_provider:
-                hosting_provider = await self._enhance_contact_info(hosting_provider)
-                
-                # Cache the result
-                await self.cache_manager.set(
-                    cache_key, 
-                    hosting_provider.model_dump(),
-                    ttl=timedelta(days=7)
-                )
-            
-            return hosting_provider
+            return await self._lookup_registrable_domain(self.whois_client.registrable_domain(domain))
             
         except Exception as e:
             logger.error(f"WHOIS lookup failed for {url}: {str(e)}")
             return None
     
+    async def lookup_domains(self, urls: List[str]) -> Dict[str, Optional[HostingProvider]]:
+        """
+        Look up hosting providers for many URLs at once.
+        
+        URLs are grouped by registrable domain (public-suffix aware, so
+        'a.example.co.uk' and 'b.example.co.uk' share 'example.co.uk') before
+        any query, so each unique domain is looked up once.
+        
+        Args:
+            urls: URLs to lookup
+        
+        Returns:
+            Dict mapping each URL to its HostingProvider, or None if lookup fails
+        """
+        urls_by_domain: Dict[str, List[str]] = {}
+        results: Dict[str, Optional[HostingProvider]] = {}
+        
+        for url in urls:
+            domain = self._extract_domain(url)
+            registrable = self.whois_client.registrable_domain(domain) if domain else None
+            if registrable:
+                urls_by_domain.setdefault(registrable, []).append(url)
+            else:
+                logger.warning(f"Could not extract domain from URL: {url}")
+                results[url] = None
+        
+        semaphore = asyncio.Semaphore(self.max_concurrent_lookups)
+        
+        async def lookup(domain: str) -> Optional[HostingProvider]:
+            async with semaphore:
+                try:
+                    return await self._lookup_registrable_domain(domain)
+                except Exception as e:
+                    logger.error(f"WHOIS lookup failed for {domain}: {str(e)}")
+                    return None
+        
+        domains = list(urls_by_domain)
+        providers = await asyncio.gather(*(lookup(domain) for domain in domains))
+        
+        for domain, provider in zip(domains, providers):
+            for url in urls_by_domain[domain]:
+                results[url] = provider
+        
+        logger.info(f"Looked up {len(domains)} domains for {len(urls)} URLs")
+        return results
+    
+    async def _lookup_registrable_domain(self, domain: str) -> Optional[HostingProvider]:
+        """Cached WHOIS lookup for one registrable domain."""
+        # Check cache first
+        cache_key = f"whois:{domain}"
+        cached_result = await self.cache_manager.get(cache_key)
+        if cached_result:
+            logger.debug(f"Using cached WHOIS data for {domain}")
+            return HostingProvider(**cached_result)
+        
+        # Rate limit check
+        await self.rate_limiter.acquire()
+        
+        # Perform WHOIS lookup
+        whois_data = await self._perform_whois_lookup(domain)
+        if not whois_data:
+            return None
+        
+        # Extract hosting provider information
+        hosting_provider = await self._extract_hosting_info(domain, whois_data)
+        
+        # Enhance with additional contact information
+        if hosting_provider:
+            hosting_provider = await self._enhance_contact_info(hosting_provider)
+            
+            # Cache the result
+            await self.cache_manager.set(
+                cache_key, 
+                hosting_provider.model_dump(),
+                ttl=timedelta(days=7)
+            )
+        
+        return hosting_provider
+    
     async def lookup_ip_address(self, ip: str) -> Optional[HostingProvider]:
         """
         Perform reverse DNS and WHOIS lookup for an IP address.
@@ -186,6 +250,9 @@ class WHOISService:
         """
         Perform the actual WHOIS lookup with timeout and error handling.
         
+        Queries RDAP first and falls back to WHOIS on port 43; both run on
+        the event loop, and concurrent lookups of one domain share a query.
+        
         Args:
             domain: Domain to lookup
         
@@ -193,48 +260,12 @@ class WHOISService:
             Dictionary containing WHOIS data
         """
         try:
-            # Use asyncio to run the blocking whois call with timeout
-            loop = asyncio.get_event_loop()
-            whois_result = await asyncio.wait_for(
-                loop.run_in_executor(None, self._whois_query, domain),
-                timeout=self.timeout
-            )
-            
-            if not whois_result:
-                return None
+            return await self.whois_client.lookup(domain)
             
-            # Convert whois object to dictionary
-            whois_dict = {}
-            for key in dir(whois_result):
-                if not key.startswith('_'):
-                    value = getattr(whois_result, key)
-                    if value is not None:
-                        # Convert datetime objects to strings
-                        if isinstance(value, datetime):
-                            value = value.isoformat()
-                        elif isinstance(value, list):
-                            # Handle lists of values
-                            value = [str(v) for v in value if v is not None]
-                        else:
-                            value = str(value)
-                        whois_dict[key] = value
-            
-            return whois_dict
-            
-        except asyncio.TimeoutError:
-            logger.warning(f"WHOIS lookup timeout for {domain}")
-            return None
         except Exception as e:
             logger.error(f"WHOIS lookup error for {domain}: {str(e)}")
             return None
     
-    def _whois_query(self, domain: str) -> Optional[Any]:
-        """Blocking WHOIS query."""
-        try:
-            return whois.whois(domain)
-        except Exception:
-            return None
-    
     async def _extract_hosting_info(self, domain: str, whois_data: Dict[str, Any]) -> Optional[HostingProvider]:
         """
         Extract hosting provider information from WHOIS data.
@@ -263,6 +294,7 @@ class WHOISService:
                 name=provider_name,
                 registrar=registrar,
                 whois_server=whois_data.get('whois_server', ''),
+                abuse_email=whois_data.get('abuse_email'),
                 
                 # Contact information
                 administrative_contact=contacts.get('admin'),
@@ -410,6 +442,14 @@ class WHOISService:
                 if 'dmca_policy_url' in known_info:
                     hosting_provider.dmca_policy_url = known_info['dmca_policy_url']
             
+            # Contacts the site publishes itself, resolved once per domain fleet-wide
+            if not hosting_provider.dmca_email:
+                contacts = await self.contact_resolver.resolve_domain(hosting_provider.domain)
+                if contacts.get('dmca_email'):
+                    hosting_provider.dmca_email = contacts['dmca_email']
+                if contacts.get('policy_url') and not hosting_provider.dmca_policy_url:
+                    hosting_provider.dmca_policy_url = contacts['policy_url']
+            
             # Try to find abuse email if not already present
             if not hosting_provider.abuse_email:
                 abuse_email = await self._find_abuse_email(hosting_provider.domain)
@@ -84,6 +84,78 @@ This notice is sent in good faith and in compliance with the Digital Millennium
 """
 
 
+# Consolidated DMCA Notice Template (several infringing URLs reported to one provider)
+DMCA_CONSOLIDATED_NOTICE_TEMPLATE = """
+Subject: DMCA Takedown Notice - Copyright Infringement Claim
+
+To Whom It May Concern:
+
+This is a formal notice of copyright infringement submitted pursuant to the Digital Millennium Copyright Act (DMCA), 17 U.S.C. § 512(c)(3)(A).
+
+I am writing on behalf of the copyright owner {{ creator_name }}{% if agent_representation %}, as their authorized agent,{% endif %} to request the removal of copyrighted material that is being infringed upon at {{ url_count }} locations on your service.
+
+**IDENTIFICATION OF COPYRIGHTED WORK(S):**
+
+{% for work in original_works %}Title: {{ work.title }}
+Description: {{ work.description }}
+{% if work.copyright_registration %}Registration Number: {{ work.copyright_registration }}
+{% endif %}{% if work.urls %}Original Work Location(s):
+{% for url in work.urls %}- {{ url }}
+{% endfor %}{% endif %}
+{% endfor %}**IDENTIFICATION OF INFRINGING MATERIAL:**
+
+The infringing material is located at the following {{ url_count }} URLs:
+{% for item in infringements %}{{ loop.index }}. {{ item.infringing_url }}
+   Copyrighted work: {{ item.original_work_title }}
+{% if item.description %}   Description: {{ item.description }}
+{% endif %}{% if item.screenshot_url %}   Evidence of infringement: {{ item.screenshot_url }}
+{% endif %}{% endfor %}
+
+**STATEMENT OF GOOD FAITH BELIEF:**
+
+I have a good faith belief that the use of the copyrighted material described above is not authorized by the copyright owner, its agent, or the law.
+
+**STATEMENT OF ACCURACY:**
+
+I swear, under penalty of perjury, that the information in this notification is accurate and that I am authorized to act on behalf of the owner of an exclusive right that is allegedly infringed.
+
+**CONTACT INFORMATION:**
+
+{% if use_anonymity and agent_contact %}
+{{ agent_contact.name }}
+{{ agent_contact.title }}
+{% if agent_contact.organization %}{{ agent_contact.organization }}
+{% endif %}{{ agent_contact.get_formatted_address() }}
+Email: {{ agent_contact.email }}
+{% if agent_contact.phone %}Phone: {{ agent_contact.phone }}
+{% endif %}
+{% else %}
+{{ creator_name }}
+{% if creator_business_name %}{{ creator_business_name }}
+{% endif %}{{ creator_address }}
+Email: {{ creator_email }}
+{% if creator_phone %}Phone: {{ creator_phone }}
+{% endif %}
+{% endif %}
+
+**ELECTRONIC SIGNATURE:**
+
+{{ signature_name }}
+Date: {{ current_date }}
+
+**REQUEST FOR CONFIRMATION:**
+
+Please confirm receipt of this notice and the removal of each URL listed above. We appreciate your cooperation in this matter and look forward to the prompt removal of the infringing content.
+
+If you have any questions regarding this notice, please contact us at the email address provided above.
+
+Thank you for your attention to this matter.
+
+---
+This notice is sent in good faith and in compliance with the Digital Millennium Copyright Act (DMCA). Misuse of this process may result in liability for damages, including costs and attorney fees.
+"""
+
+
 # Follow-up Notice Template
 DMCA_FOLLOWUP_TEMPLATE = """
 Subject: Follow-up: DMCA Takedown Notice - {{ original_work_title }}
@@ -251,6 +323,11 @@ class DMCANoticeTemplate:
         """Get the standard DMCA takedown notice template."""
         return DMCA_NOTICE_TEMPLATE.strip()
     
+    @staticmethod
+    def get_consolidated_notice() -> str:
+        """Get the multi-URL DMCA takedown notice template."""
+        return DMCA_CONSOLIDATED_NOTICE_TEMPLATE.strip()
+    
     @staticmethod  
     def get_followup_notice() -> str:
         """Get the follow-up notice template."""
@@ -358,6 +435,7 @@ We prefer to resolve this matter cooperatively and avoid litigation. Please cont
 # Email subject line templates
 SUBJECT_TEMPLATES = {
     'initial': 'DMCA Takedown Notice - Copyright Infringement Claim',
+    'consolidated': 'DMCA Takedown Notice - {count} Infringing URLs',
     'followup_1': 'DMCA Follow-up: Removal Request for {title}',
     'followup_2': 'URGENT: DMCA Takedown Notice - {title}',
     'final': 'FINAL NOTICE: DMCA Takedown - Legal Action Pending',
@@ -109,6 +109,75 @@ class TemplateRenderer:
         except TemplateError as e:
             raise ValueError(f"Template rendering failed: {str(e)}")
     
+    def render_consolidated_dmca_notice(
+        self,
+        takedown_requests: List[TakedownRequest],
+        agent_contact: Optional[DMCAAgent] = None
+    ) -> Dict[str, str]:
+        """
+        Render one DMCA takedown notice covering several infringing URLs.
+        
+        Args:
+            takedown_requests: Requests for the same creator and hosting provider
+            agent_contact: DMCA agent contact information
+        
+        Returns:
+            Dict with 'subject' and 'body' keys containing rendered notice
+        """
+        if not takedown_requests:
+            raise ValueError("At least one takedown request is required")
+        
+        # Creator and agent details come from the first request
+        primary_request = takedown_requests[0]
+        variables = self._prepare_template_variables(primary_request, agent_contact)
+        
+        # Each copyrighted work is identified once, however many URLs infringe it
+        original_works = {}
+        infringements = []
+        for request in takedown_requests:
+            infringement = request.infringement_data
+            if infringement.original_work_title not in original_works:
+                original_works[infringement.original_work_title] = {
+                    'title': infringement.original_work_title,
+                    'description': infringement.original_work_description,
+                    'copyright_registration': infringement.copyright_registration_number,
+                    'urls': [str(url) for url in infringement.original_work_urls]
+                }
+            infringements.append({
+                'infringing_url': str(infringement.infringing_url),
+                'original_work_title': infringement.original_work_title,
+                'description': infringement.description,
+                'screenshot_url': str(infringement.screenshot_url) if infringement.screenshot_url else None
+            })
+        
+        variables.update({
+            'original_works': list(original_works.values()),
+            'infringements': infringements,
+            'url_count': len(infringements)
+        })
+        
+        template_content = DMCANoticeTemplate.get_consolidated_notice()
+        
+        errors = DMCANoticeTemplate.validate_template_variables(template_content, variables)
+        if errors:
+            raise ValueError(f"Template validation failed: {errors}")
+        
+        try:
+            template = Template(template_content)
+            body = template.render(**variables)
+            
+            subject = get_subject_line('consolidated', count=len(infringements))
+            
+            return {
+                'subject': subject,
+                'body': body,
+                'template_type': 'consolidated',
+                'url_count': len(infringements)
+            }
+            
+        except TemplateError as e:
+            raise ValueError(f"Consolidated template rendering failed: {str(e)}")
+    
     def render_search_delisting_request(
         self,
         takedown_requests: List[TakedownRequest],
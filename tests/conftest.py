@@ -46,6 +46,7 @@ def test_settings():
         requests_per_minute=30,
         concurrent_requests=5,
         temp_storage_path="/tmp/test_autodmca",
+        compute_workers=0,  # run compute in-process so patched libraries apply
         log_level="DEBUG"
     )
 
@@ -0,0 +1,106 @@
+"""
+Tests for the process-pool compute stage.
+"""
+
+import asyncio
+import hashlib
+import io
+import sys
+from multiprocessing import resource_tracker
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from scanning.processors.compute_pool import ComputePool, _call_with_shared_buffer
+from scanning.processors.image_hash_processor import ImageHashProcessor
+
+
+def _md5(payload):
+    return hashlib.md5(bytes(payload)).hexdigest()
+
+
+class TestComputePool:
+    """Test compute pool execution, shared memory transfer and backpressure."""
+
+    @pytest.mark.asyncio
+    async def test_shared_memory_payloads(self):
+        """Test large bytes and arrays reach workers intact through shared memory."""
+        pool = ComputePool(max_workers=1, shared_memory_min_bytes=1024)
+        array = np.arange(100_000, dtype=np.int64).reshape(1000, 100)
+        data = bytes(range(256)) * 64
+
+        try:
+            assert await pool.run(np.sum, array) == array.sum()
+            assert await pool.run(_md5, data) == hashlib.md5(data).hexdigest()
+            assert await pool.run(np.sum, np.ones(4)) == 4.0  # pickled, below threshold
+        finally:
+            pool.shutdown()
+
+        stats = pool.get_stats()
+        assert stats['completed'] == 3
+        assert stats['shared_memory_bytes'] == array.nbytes + len(data)
+
+    @pytest.mark.asyncio
+    async def test_submit_waits_for_free_slot(self):
+        """Test submitters wait once queue_depth tasks are in flight."""
+        pool = ComputePool(max_workers=0, queue_depth=1)
+
+        first = await pool.submit(np.sum, np.ones(4))
+        second = asyncio.ensure_future(pool.submit(np.sum, np.ones(4)))
+        await asyncio.sleep(0)
+        assert not second.done()
+
+        assert await first == 4.0
+        assert await (await second) == 4.0
+        assert pool.get_stats()['waited_for_slot'] == 1
+
+    @pytest.mark.asyncio
+    async def test_attach_leaves_resource_tracker_untouched(self):
+        """Test attaching in a worker does not patch the process-wide tracker."""
+        pool = ComputePool(max_workers=0, shared_memory_min_bytes=1024)
+        payload, block = pool._share(np.arange(1000, dtype=np.int64))
+        register = resource_tracker.register
+
+        try:
+            with patch.object(resource_tracker, "unregister") as unregister:
+                assert _call_with_shared_buffer(np.sum, payload, ()) == sum(range(1000))
+        finally:
+            pool._release_block(block)
+
+        assert resource_tracker.register is register
+        # Python 3.13+ attaches untracked; older versions undo only this block's registration
+        assert unregister.call_count == (0 if sys.version_info >= (3, 13) else 1)
+
+
+class TestProcessorsInComputePool:
+    """Test a processor end to end through a real process pool."""
+
+    @pytest.mark.asyncio
+    async def test_image_hashes_match_in_process_results(self, test_settings):
+        """Test hashes computed in worker processes via shared memory match in-process ones."""
+        rng = np.random.default_rng(3)
+        buffer = io.BytesIO()
+        Image.fromarray((rng.random((96, 128, 3)) * 255).astype(np.uint8)).save(buffer, format="PNG")
+        image_bytes = buffer.getvalue()
+
+        pool = ComputePool(max_workers=2, shared_memory_min_bytes=1024)
+        pooled = ImageHashProcessor(test_settings, compute_pool=pool)
+        inline = ImageHashProcessor(test_settings, compute_pool=ComputePool(max_workers=0))
+
+        try:
+            results = await asyncio.gather(*(pooled.process_image(image_bytes) for _ in range(4)))
+            expected = await inline.process_image(image_bytes)
+        finally:
+            pool.shutdown()
+
+        assert expected.is_success
+        for result in results:
+            assert result.is_success
+            assert {name: h.hash_value for name, h in result.hashes.items()} == \
+                {name: h.hash_value for name, h in expected.hashes.items()}
+
+        stats = pool.get_stats()
+        assert stats['completed'] == 4
+        assert stats['shared_memory_bytes'] == 4 * len(image_bytes)
@@ -0,0 +1,322 @@
+"""
+Tests for the DMCA request queue.
+"""
+
+import asyncio
+import json
+import time
+
+import fakeredis
+import pytest
+
+from scanning.queue.dmca_queue import (
+    _SETTLE_DMCA_SCRIPT,
+    ContactInfoResolver,
+    DMCAQueue,
+    ContactResolutionService,
+    DMCARequest
+)
+
+
+class TestContactInfoResolver:
+    """Test contact resolution with the default and an injected lookup."""
+
+    @pytest.mark.skipif(ContactResolutionService is None, reason="autodmca services not installed")
+    def test_default_lookup_is_shared_service(self, test_settings):
+        """Test the queue resolves contacts through the Redis-backed autodmca service."""
+        queue = DMCAQueue(test_settings)
+        lookup = queue.contact_resolver.contact_lookup
+
+        assert isinstance(lookup, ContactResolutionService)
+        assert lookup._fetch_page == queue.contact_resolver._fetch_page
+        assert lookup.cache_manager.redis_client is not None
+
+    @pytest.mark.asyncio
+    async def test_injected_lookup_is_used(self, test_settings):
+        """Test the queue delegates to an injected lookup and leaves it open on close."""
+        class SharedLookup:
+            def __init__(self):
+                self.domains = []
+
+            async def resolve_domain(self, domain):
+                self.domains.append(domain)
+                return {'dmca_email': f"legal@{domain}", 'form_url': None}
+
+        shared = SharedLookup()
+        queue = DMCAQueue(test_settings, contact_lookup=shared)
+
+        contact_info = await queue.contact_resolver.resolve_contact_info("host.com")
+        await queue.contact_resolver.close()
+
+        assert shared.domains == ["host.com"]
+        assert contact_info == {
+            'email': '',
+            'form_url': '',
+            'abuse_email': "abuse@host.com",
+            'dmca_email': "legal@host.com"
+        }
+
+    @pytest.mark.asyncio
+    async def test_lookup_failure_falls_back_to_abuse_address(self):
+        """Test a failing lookup still yields the abuse@ fallback."""
+        class FailingLookup:
+            async def resolve_domain(self, domain):
+                raise RuntimeError("unavailable")
+
+        resolver = ContactInfoResolver(contact_lookup=FailingLookup())
+        contact_info = await resolver.resolve_contact_info("host.com")
+
+        assert contact_info['abuse_email'] == "abuse@host.com"
+        assert contact_info['dmca_email'] == ''
+
+
+class TestDMCAQueueLeases:
+    """Test the claim, heartbeat and settle scripts behind the send loop."""
+
+    @pytest.fixture
+    def redis(self):
+        return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+    @pytest.fixture
+    def make_queue(self, test_settings, redis):
+        class StubLookup:
+            async def resolve_domain(self, domain):
+                return {'dmca_email': f"dmca@{domain}", 'form_url': None}
+
+        def make_queue(**overrides):
+            settings = test_settings.copy(update=overrides)
+            queue = DMCAQueue(settings, contact_lookup=StubLookup())
+            queue.redis = redis
+            queue.template_manager.render_notice = lambda *args, **kwargs: "notice"
+            return queue
+
+        return make_queue
+
+    async def add_pending(self, queue, request_id, score, **fields):
+        request = DMCARequest(
+            request_id=request_id,
+            infringing_url=f"https://pirate.com/{request_id}",
+            contact_email="dmca@pirate.com",
+            copyright_owner=fields.pop('copyright_owner', "Creator"),
+            **fields
+        )
+        await queue.redis.hset(queue._request_key(request_id), mapping={"data": json.dumps(request.to_dict())})
+        await queue.redis.zadd(queue.pending_queue, {request_id: score})
+        return request
+
+    async def settle(self, queue, request_id, outcome, data=''):
+        keys = [
+            queue.pending_queue, queue.processing_queue,
+            queue.lease_queue, queue.lease_owners, queue.claim_scores,
+            queue.failed_queue, queue._request_key(request_id)
+        ]
+        return await queue.redis.eval(
+            _SETTLE_DMCA_SCRIPT, len(keys), *keys, request_id, queue.node_id, outcome, 1000.0, data
+        )
+
+    @pytest.mark.asyncio
+    async def test_claim_leases_highest_priority(self, make_queue, redis):
+        """Test a claim takes the highest scores and records owner, lease and original score."""
+        queue = make_queue()
+        for request_id, score in [("low", 1), ("high", 3), ("mid", 2)]:
+            await self.add_pending(queue, request_id, score)
+
+        assert await queue.claim_requests(2) == ["high", "mid"]
+
+        assert await redis.zrange(queue.pending_queue, 0, -1) == ["low"]
+        assert sorted(await redis.zrange(queue.processing_queue, 0, -1)) == ["high", "mid"]
+        assert await redis.zcard(queue.lease_queue) == 2
+        assert await redis.hget(queue.lease_owners, "high") == queue.node_id
+        assert float(await redis.hget(queue.claim_scores, "high")) == 3
+
+    @pytest.mark.asyncio
+    async def test_expired_claim_requeued_at_original_priority(self, make_queue, redis):
+        """Test another instance's claim first returns expired leases to pending at their score."""
+        crashed = make_queue(dmca_claim_lease_seconds=0)
+        other = make_queue()
+        await self.add_pending(crashed, "first", 3)
+        await self.add_pending(crashed, "second", 2)
+        assert await crashed.claim_requests(1) == ["first"]
+
+        assert await other.claim_requests(1) == ["first"]
+        assert await redis.hget(other.lease_owners, "first") == other.node_id
+        assert float(await redis.hget(other.claim_scores, "first")) == 3
+        assert await redis.zrange(other.pending_queue, 0, -1) == ["second"]
+
+    @pytest.mark.asyncio
+    async def test_settle_outcomes(self, make_queue, redis):
+        """Test sent stays in processing, failed moves to failed and retry returns at its priority."""
+        queue = make_queue()
+        for request_id, score in [("sent", 3), ("failed", 2), ("retry", 1.5)]:
+            await self.add_pending(queue, request_id, score)
+        await queue.claim_requests(3)
+
+        assert await self.settle(queue, "sent", "sent", '{"updated": true}') == 1
+        assert await self.settle(queue, "failed", "failed") == 1
+        assert await self.settle(queue, "retry", "retry") == 1
+
+        assert await redis.zrange(queue.processing_queue, 0, -1, withscores=True) == [("sent", 1000.0)]
+        assert await redis.zrange(queue.failed_queue, 0, -1) == ["failed"]
+        assert await redis.zrange(queue.pending_queue, 0, -1, withscores=True) == [("retry", 1.5)]
+        assert await redis.hget(queue._request_key("sent"), "data") == '{"updated": true}'
+        assert await redis.zcard(queue.lease_queue) == 0
+        assert await redis.hlen(queue.lease_owners) == 0
+        assert await redis.hlen(queue.claim_scores) == 0
+
+    @pytest.mark.asyncio
+    async def test_lost_claim_is_not_settled(self, make_queue, redis):
+        """Test settling a claim another instance took over is refused and changes nothing."""
+        slow = make_queue(dmca_claim_lease_seconds=0)
+        other = make_queue()
+        request = await self.add_pending(slow, "req", 3)
+        await slow.claim_requests(1)
+        await other.claim_requests(1)
+
+        assert await self.settle(slow, "req", "sent", '{"stale": true}') == 0
+
+        assert json.loads(await redis.hget(slow._request_key("req"), "data")) == request.to_dict()
+        assert await redis.hget(other.lease_owners, "req") == other.node_id
+        assert await redis.zcard(other.lease_queue) == 1
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_keeps_slow_send_claimed(self, make_queue, redis):
+        """Test a send that outlasts the lease stays claimed and is settled once."""
+        queue = make_queue(
+            dmca_claim_lease_seconds=1, dmca_heartbeat_seconds=0.1, dmca_consolidation_window_seconds=0
+        )
+        other = make_queue()
+        await self.add_pending(queue, "req", 3)
+        sends = []
+
+        async def slow_send(request, content):
+            sends.append(request.request_id)
+            await asyncio.sleep(1.5)
+            return True
+
+        queue._send_email_notice = slow_send
+        processing = asyncio.create_task(queue.process_pending_requests())
+        await asyncio.sleep(1.2)
+        assert await other.claim_requests(1) == []
+
+        assert await processing == 1
+        assert sends == ["req"]
+        assert await redis.zrange(queue.processing_queue, 0, -1) == ["req"]
+        assert await redis.zcard(queue.lease_queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_group_with_lost_claim_is_not_sent(self, make_queue, redis):
+        """Test a group whose claim was lost while waiting for a send slot is skipped."""
+        queue = make_queue()
+        request = await self.add_pending(queue, "req", 3)
+        sends = []
+
+        async def send(request, content):
+            sends.append(request.request_id)
+            return True
+
+        queue._send_email_notice = send
+
+        assert await queue._process_with_provider_limit([request], {"req"}) is None
+        assert await queue._process_with_provider_limit([request], set()) is True
+        assert sends == ["req"]
+
+
+class TestDMCAQueueConsolidation:
+    """Test requests are held per contact outside the claim path and sent together."""
+
+    @pytest.fixture
+    def redis(self):
+        return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+    @pytest.fixture
+    def queue(self, test_settings, redis):
+        class StubLookup:
+            async def resolve_domain(self, domain):
+                return {'dmca_email': f"dmca@{domain}", 'form_url': None}
+
+        settings = test_settings.copy(update={
+            'dmca_consolidation_window_seconds': 300,
+            'dmca_consolidation_max_urls': 50
+        })
+        queue = DMCAQueue(settings, contact_lookup=StubLookup())
+        queue.redis = redis
+        queue.template_manager.render_notice = lambda *args, **kwargs: "notice"
+        return queue
+
+    @pytest.fixture
+    def notices(self, queue):
+        notices = []
+
+        async def send(request, content):
+            notices.append(request.metadata.get('notice', {}).get('url_count', 1))
+            return True
+
+        async def send_group(requests):
+            notices.append(len(requests))
+            return True
+
+        queue._send_email_notice = send
+        queue._process_consolidated_requests = send_group
+        return notices
+
+    async def enqueue(self, queue, count, age=0, priority=3, host="pirate.com"):
+        for index in range(count):
+            request = DMCARequest(
+                infringing_url=f"https://{host}/{index}",
+                copyright_owner="Creator",
+                priority=priority,
+                created_at=time.time() - age
+            )
+            assert await queue.enqueue_request(request)
+
+    @pytest.mark.asyncio
+    async def test_requests_held_until_window_passes(self, queue, redis):
+        """Test young requests wait in their contact's bucket and are released as one batch."""
+        await self.enqueue(queue, 3)
+
+        assert await redis.zcard(queue.pending_queue) == 0
+        assert await redis.zcard(queue.held_queue) == 1
+        assert await queue.release_held_requests() == 0
+        assert await queue.claim_requests(10) == []
+
+        bucket = (await redis.zrange(queue.held_queue, 0, -1))[0]
+        await redis.zadd(queue.held_queue, {bucket: time.time() - 1})
+
+        assert await queue.release_held_requests() == 1
+        assert await redis.zcard(queue.held_queue) == 0
+        assert len(await queue.claim_requests(1)) == 3
+        assert await redis.hlen(queue.batches) == 0
+
+    @pytest.mark.asyncio
+    async def test_full_bucket_sent_as_one_notice(self, queue, redis, notices):
+        """Test a full bucket is released at once and claimed whole past max_requests."""
+        await self.enqueue(queue, 50)
+        await self.enqueue(queue, 1, host="other.com")
+
+        assert await redis.zcard(queue.pending_queue) == 1
+        assert await queue.process_pending_requests(max_requests=20) == 50
+
+        assert notices == [50]
+        assert await redis.zcard(queue.processing_queue) == 50
+        assert await redis.zcard(queue.held_queue) == 1
+
+    @pytest.mark.asyncio
+    async def test_old_bucket_groups_every_request(self, queue, redis, notices):
+        """Test a bucket past its window is sent with every request that joined it."""
+        await self.enqueue(queue, 30, age=600)
+
+        assert await queue.process_pending_requests(max_requests=20) == 30
+
+        assert notices == [30]
+
+    @pytest.mark.asyncio
+    async def test_held_requests_do_not_starve_older(self, queue, redis, notices):
+        """Test an old low-priority request is claimed ahead of higher-priority held ones."""
+        await self.enqueue(queue, 1, age=600, priority=5, host="slow.com")
+        await self.enqueue(queue, 10, priority=1)
+
+        assert await queue.process_pending_requests(max_requests=1) == 1
+
+        assert notices == [1]
+        assert await redis.zcard(queue.pending_queue) == 0
+        assert await redis.zcard(queue.held_queue) == 1
@@ -0,0 +1,59 @@
+"""
+Tests for per-domain request pacing.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from scanning.crawlers.domain_scheduler import DomainBucket, DomainScheduler, parse_retry_after
+
+
+class TestDomainScheduler:
+    """Test token-bucket pacing, throttling backoff and slot handling."""
+
+    def test_reservations_are_spaced(self):
+        """Test concurrent reservations get distinct slots after the burst."""
+        bucket = DomainBucket(rate=2.0, burst=2)
+        delays = [bucket.reserve(100.0) for _ in range(4)]
+        assert delays == [0.0, 0.0, 0.5, 1.0]
+
+    def test_throttling_backs_off_and_recovers(self):
+        """Test 429 halves the rate and pauses for Retry-After; successes recover it."""
+        bucket = DomainBucket(rate=1.0, min_rate=0.1)
+        bucket.on_throttled(100.0, retry_after=30)
+        assert bucket.rate == 0.5
+        assert bucket.reserve(100.0) == 30.0
+
+        for _ in range(20):
+            bucket.on_success()
+        assert bucket.rate == 1.0
+
+    def test_parse_retry_after(self):
+        """Test delta-seconds and HTTP-date forms of Retry-After."""
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412480) == 30.0
+        assert parse_retry_after("soon") is None
+
+    @pytest.mark.asyncio
+    async def test_paced_domain_does_not_hold_slots(self):
+        """Test a paced domain waits outside the global slots so other domains proceed."""
+        scheduler = DomainScheduler(requests_per_minute=60, concurrent_requests=1)
+
+        async def fetch(url):
+            async with scheduler.slot(url):
+                await asyncio.sleep(0.01)
+            return time.monotonic()
+
+        start = time.monotonic()
+        slow_first = asyncio.ensure_future(fetch("https://slow.example/1"))
+        await asyncio.sleep(0)
+        slow_second = asyncio.ensure_future(fetch("https://slow.example/2"))
+        await asyncio.sleep(0)
+        others = await asyncio.gather(*[fetch(f"https://site{i}.example/") for i in range(5)])
+
+        assert max(others) - start < 0.5
+        assert not slow_second.done()
+        slow_second.cancel()
+        await slow_first
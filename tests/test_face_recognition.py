@@ -14,6 +14,8 @@ from scanning.processors.face_recognition_processor import (
     FaceMatch,
     FaceProcessingResult
 )
+from scanning.processors.face_index import FaceEncodingIndex
+from scanning.processors.face_encoding_store import FaceEncodingRows, FaceEncodingStore
 
 
 class TestFaceRecognitionProcessor:
@@ -87,14 +89,14 @@ class TestFaceRecognitionProcessor:
         
         # Mock face recognition
         mock_face_locations = [(0, 100, 100, 0)]
-        mock_face_encodings = [np.random.random(128)]
+        reference_encoding = np.random.random(128)
+        candidate_encoding = reference_encoding + 0.01  # Good match (distance ~0.11)
         
         with patch('scanning.processors.face_recognition_processor.face_recognition') as mock_fr, \
              patch('scanning.processors.face_recognition_processor.cv2'):
             
             mock_fr.face_locations.return_value = mock_face_locations
-            mock_fr.face_encodings.return_value = mock_face_encodings
-            mock_fr.face_distance.return_value = [0.3]  # Good match
+            mock_fr.face_encodings.side_effect = [[reference_encoding], [candidate_encoding]]
             
             await processor.initialize()
             
@@ -122,14 +124,14 @@ class TestFaceRecognitionProcessor:
         processor = FaceRecognitionProcessor(test_settings)
         
         mock_face_locations = [(0, 100, 100, 0)]
-        mock_face_encodings = [np.random.random(128)]
+        reference_encoding = np.random.random(128)
+        candidate_encoding = reference_encoding + 0.1  # Poor match (distance ~1.13)
         
         with patch('scanning.processors.face_recognition_processor.face_recognition') as mock_fr, \
              patch('scanning.processors.face_recognition_processor.cv2'):
             
             mock_fr.face_locations.return_value = mock_face_locations
-            mock_fr.face_encodings.return_value = mock_face_encodings
-            mock_fr.face_distance.return_value = [0.8]  # Poor match
+            mock_fr.face_encodings.side_effect = [[reference_encoding], [candidate_encoding]]
             
             await processor.initialize()
             
@@ -253,7 +255,7 @@ class TestFaceRecognitionProcessor:
             )
             
             # Save encodings
-            save_path = temp_dir / "encodings.pkl"
+            save_path = temp_dir / "encodings"
             success = await processor.save_encodings(str(save_path))
             assert success
             assert save_path.exists()
@@ -267,7 +269,192 @@ class TestFaceRecognitionProcessor:
             assert success
             assert "test_person" in processor.known_encodings
             assert len(processor.known_encodings["test_person"]) == 1
+    
+    @pytest.mark.asyncio
+    async def test_save_over_loaded_store_rebinds_rows(self, test_settings, temp_dir):
+        """Test compacting the loaded store in place keeps every row's URL and encoding."""
+        rng = np.random.default_rng(1)
+        path = str(temp_dir / "encodings")
+        encodings = rng.random((3, 128))
+        FaceEncodingStore.write(path, FaceEncodingRows(
+            encodings=encodings,
+            person_ids=["alice", "bob", "bob"],
+            image_urls=["https://example.com/alice-with-a-long-name.jpg", "https://b/1", "https://b/2"]
+        ))
+        
+        processor = FaceRecognitionProcessor(test_settings)
+        assert await processor.load_encodings(path)
+        assert await processor.remove_person("alice")
+        assert await processor.save_encodings(path)
+        
+        assert processor._encoding_store.person_ids == ["bob"]
+        assert [e.image_url for e in processor.known_encodings["bob"]] == ["https://b/1", "https://b/2"]
+        
+        matches = processor._match_faces([encodings[2]], [(0, 1, 1, 0)], ["bob"], "query")[0]
+        assert matches[0].reference_encoding.image_url == "https://b/2"
+        np.testing.assert_allclose(matches[0].reference_encoding.encoding, encodings[2], rtol=1e-6)
+
+
+class TestFaceEncodingIndex:
+    """Test the stacked face-encoding matrix."""
+    
+    def test_match_returns_closest_reference_per_person(self):
+        """Test per-person argmin matches a brute-force distance scan."""
+        rng = np.random.default_rng(0)
+        references = {
+            "alice": [rng.random(128) for _ in range(3)],
+            "bob": [rng.random(128) for _ in range(4)],
+        }
+        
+        index = FaceEncodingIndex()
+        for person_id, encodings in references.items():
+            index.add(person_id, encodings, [(person_id, i) for i in range(len(encodings))])
+        
+        faces = [references["bob"][2] + 0.01, rng.random(128)]
+        results = index.match(faces)
+        
+        assert len(results) == 2
+        for face, person_results in zip(faces, results):
+            for person_id, distance, item in person_results:
+                expected = np.linalg.norm(np.array(references[person_id]) - face, axis=1)
+                assert distance == pytest.approx(expected.min(), abs=1e-4)
+                assert item == (person_id, int(expected.argmin()))
+        
+        assert results[0][1][0] == "bob"
+        assert results[0][1][2] == ("bob", 2)
+    
+    def test_incremental_add_and_remove(self):
+        """Test rows stay grouped by person across adds and removals."""
+        index = FaceEncodingIndex()
+        index.add("alice", [np.zeros(128)], ["a0"])
+        index.add("bob", [np.ones(128)], ["b0"])
+        index.add("alice", [np.full(128, 0.5)], ["a1"])
+        
+        assert index.items("alice") == ["a0", "a1"]
+        assert index.person_count("bob") == 1
+        
+        assert index.remove_person("alice") == 2
+        assert index.persons == ["bob"]
+        assert len(index) == 1
+        
+        results = index.match([np.ones(128)], person_ids=["alice", "bob"])
+        assert [(person_id, item) for person_id, _, item in results[0]] == [("bob", "b0")]
+
+    def test_roster_changes_leave_adopted_matrix_in_place(self):
+        """Test adds and removals keep an adopted read-only matrix until compaction."""
+        rng = np.random.default_rng(1)
+        matrix = rng.random((6, 128)).astype(np.float32)
+        matrix.flags.writeable = False
+        index = FaceEncodingIndex.from_arrays(
+            matrix, np.array([0, 1, 0, 2, 1, 2]), ["alice", "bob", "carol"], list(range(6))
+        )
+        extra = rng.random((2, 128))
 
+        index.add("alice", extra, ["a-new0", "a-new1"])
+        index.add("dave", [extra[0] + 1], ["d0"])
+        assert index.remove_person("bob") == 2
+
+        assert index._base is matrix
+        assert index.persons == ["alice", "carol", "dave"]
+        assert index.items("alice") == [0, 2, "a-new0", "a-new1"]
+
+        references = {
+            "alice": [matrix[0], matrix[2], extra[0], extra[1]],
+            "carol": [matrix[3], matrix[5]],
+            "dave": [extra[0] + 1],
+        }
+        faces = [extra[1] + 0.01, matrix[5] + 0.05]
+        for person_ids in (None, ["dave", "alice"]):
+            results = index.match(faces, person_ids)
+            for face, person_results in zip(faces, results):
+                assert [person_id for person_id, _, _ in person_results] == (person_ids or index.persons)
+                for person_id, distance, item in person_results:
+                    expected = np.linalg.norm(np.array(references[person_id], dtype=np.float32) - face, axis=1)
+                    assert distance == pytest.approx(expected.min(), abs=1e-4)
+                    assert item == index.items(person_id)[int(expected.argmin())]
+
+        # Tombstones outnumbering live rows compact into a private, grouped matrix
+        index.remove_person("alice")
+        assert index._base is not matrix
+        assert index._dead == 0
+        exported, row_person_ids, items = index.export()
+        assert row_person_ids == ["carol", "carol", "dave"]
+        assert items == [3, 5, "d0"]
+        np.testing.assert_array_equal(exported[:2], matrix[[3, 5]])
+
+
+
+class TestFaceEncodingStore:
+    """Test the memory-mapped face encoding store."""
+    
+    def test_write_and_append_round_trip(self, temp_dir):
+        """Test rows written and appended read back column for column."""
+        rng = np.random.default_rng(0)
+        path = str(temp_dir / "encodings")
+        
+        FaceEncodingStore.write(path, FaceEncodingRows(
+            encodings=rng.random((2, 128)),
+            person_ids=["alice", "alice"],
+            image_urls=["https://example.com/a.jpg", None],
+            bboxes=[(1, 2, 3, 4), None],
+            created_at=[10.0, 11.0]
+        ))
+        appended = rng.random((1, 128))
+        FaceEncodingStore.append(path, FaceEncodingRows(
+            encodings=appended,
+            person_ids=["bob"],
+            image_urls=["https://example.com/b.jpg"],
+            confidences=[0.5]
+        ))
+        
+        store = FaceEncodingStore(path)
+        
+        assert len(store) == 3
+        assert isinstance(store.encodings, np.memmap)
+        assert store.person_ids == ["alice", "bob"]
+        assert store.is_grouped_by_person()
+        
+        first = store.row_fields(0)
+        assert first["image_url"] == "https://example.com/a.jpg"
+        assert first["bbox"] == (1, 2, 3, 4)
+        assert first["created_at"] == 10.0
+        assert store.row_fields(1)["bbox"] is None
+        assert store.row_fields(1)["image_url"] is None
+        
+        last = store.row_fields(2)
+        assert last["person_id"] == "bob"
+        assert last["confidence"] == pytest.approx(0.5)
+        np.testing.assert_array_equal(last["encoding"], appended[0].astype(np.float32))
+    
+    def test_uncommitted_rows_are_ignored(self, temp_dir):
+        """Test rows past the manifest count (an interrupted append) are not read."""
+        path = str(temp_dir / "encodings")
+        FaceEncodingStore.write(path, FaceEncodingRows(np.zeros((1, 128)), ["alice"]))
+        
+        with open(os.path.join(path, "encodings.f32"), "ab") as f:
+            f.write(np.ones(128, dtype=np.float32).tobytes())
+        
+        assert len(FaceEncodingStore(path)) == 1
+        
+        FaceEncodingStore.append(path, FaceEncodingRows(np.full((1, 128), 2.0), ["alice"]))
+        store = FaceEncodingStore(path)
+        
+        assert len(store) == 2
+        assert store.encodings[1][0] == 2.0
+    
+    def test_open_store_survives_rewrite(self, temp_dir):
+        """Test a store opened before its path is rewritten keeps reading its own rows."""
+        path = str(temp_dir / "encodings")
+        FaceEncodingStore.write(path, FaceEncodingRows(
+            np.zeros((2, 128)), ["alice", "bob"], image_urls=["https://a/long-url.jpg", "https://b/1"]
+        ))
+        store = FaceEncodingStore(path)
+        
+        FaceEncodingStore.write(path, FaceEncodingRows(np.ones((1, 128)), ["bob"], image_urls=["https://b/1"]))
+        
+        assert store.image_url(0) == "https://a/long-url.jpg"
+        assert store.image_url(1) == "https://b/1"
+        assert FaceEncodingStore(path).image_url(0) == "https://b/1"
 
 class TestFaceEncoding:
     """Test FaceEncoding dataclass."""
@@ -0,0 +1,66 @@
+"""
+Tests for the multi-index Hamming hash table.
+"""
+
+import random
+
+import pytest
+
+from scanning.processors.hamming_index import HammingIndex
+
+
+def _brute_force(values, query, radius):
+    return sorted(
+        i for i, value in enumerate(values)
+        if (value ^ query).bit_count() <= radius
+    )
+
+
+class TestHammingIndex:
+    """Test Hamming index radius queries and maintenance."""
+
+    @pytest.mark.parametrize("radius", [0, 3, 9, 20])
+    def test_query_matches_brute_force(self, radius):
+        """Test radius queries return exactly the brute-force result set."""
+        rng = random.Random(42)
+        values = [rng.getrandbits(64) for _ in range(2000)]
+
+        index = HammingIndex(hash_bits=64)
+        for i, value in enumerate(values):
+            index.add(value, i, owner=f"person_{i % 10}")
+
+        for _ in range(10):
+            query = values[rng.randrange(len(values))] ^ (1 << rng.randrange(64))
+            hits = index.query(query, radius)
+
+            assert sorted(item for _, item, _ in hits) == _brute_force(values, query, radius)
+            assert [d for d, _, _ in hits] == sorted(d for d, _, _ in hits)
+
+    def test_owner_filter(self):
+        """Test queries can be restricted to a set of owners."""
+        index = HammingIndex(hash_bits=64)
+        index.add(0xFF, "a1", owner="a")
+        index.add(0xFE, "b1", owner="b")
+
+        hits = index.query(0xFF, 4, owners=["b"])
+
+        assert [(d, item) for d, item, _ in hits] == [(1, "b1")]
+
+    def test_remove_owner(self):
+        """Test removing all entries for an owner."""
+        index = HammingIndex(hash_bits=64)
+        index.add(0x1, "a1", owner="a")
+        index.add(0x3, "a2", owner="a")
+        index.add(0x1, "b1", owner="b")
+
+        assert index.remove_owner("a") == 2
+        assert len(index) == 1
+        assert [item for _, item, _ in index.query(0x1, 64)] == ["b1"]
+        assert index.owners() == ["b"]
+
+    def test_rejects_oversized_hash(self):
+        """Test hashes wider than the index are rejected."""
+        index = HammingIndex(hash_bits=64)
+
+        with pytest.raises(ValueError):
+            index.add(1 << 64, "too_wide")
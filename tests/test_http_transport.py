@@ -0,0 +1,66 @@
+"""
+Tests for the shared HTTP transport.
+"""
+
+import pytest
+from aiohttp import web
+
+from scanning.http_transport import HttpTransport
+
+
+class TestHttpTransport:
+    """Test connection sharing and per-host metrics."""
+
+    @pytest.fixture
+    async def server_url(self):
+        async def handler(request):
+            return web.Response(body=b"x" * 1000)
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        yield f"http://127.0.0.1:{port}/"
+        await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_sessions_share_one_pool(self, server_url):
+        """Test component sessions reuse the shared connector's keep-alive connections."""
+        transport = HttpTransport(limit_per_host=1)
+        first = transport.session(headers={"User-Agent": "first"})
+        second = transport.session(headers={"User-Agent": "second"})
+
+        try:
+            for session in (first, second, first):
+                async with session.get(server_url) as response:
+                    assert await response.read() == b"x" * 1000
+            await first.close()
+            assert not transport.connector.closed  # sessions do not own the pool
+        finally:
+            await second.close()
+            await transport.close()
+
+        stats = transport.get_stats()
+        host = stats["hosts"]["127.0.0.1"]
+        assert host["requests"] == 3
+        assert host["new_connections"] == 1
+        assert host["reuse_rate"] == pytest.approx(2 / 3)
+        assert host["bytes_received"] == 3000
+
+    def test_host_stats_are_bounded(self):
+        """Test old hosts fold into one aggregate and only the busiest are listed."""
+        transport = HttpTransport(max_tracked_hosts=3, stats_top_hosts=2)
+        for host, requests in [("a.com", 5), ("b.com", 1), ("c.com", 3), ("d.com", 2), ("e.com", 4)]:
+            for _ in range(requests):
+                transport._stats_for(host).requests += 1
+
+        assert list(transport._host_stats) == ["c.com", "d.com", "e.com"]
+
+        stats = transport.get_stats()
+        assert list(stats["hosts"]) == ["e.com", "c.com"]
+        assert stats["other_hosts"]["hosts"] == 3
+        assert stats["other_hosts"]["requests"] == 8
+        assert stats["requests"] == 15
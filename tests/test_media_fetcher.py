@@ -0,0 +1,91 @@
+"""
+Tests for streaming image downloads with early rejection.
+"""
+
+import io
+
+import aiohttp
+import pytest
+from aiohttp import web
+from PIL import Image
+
+from scanning.media_fetcher import MediaFetcher, read_image_size, sniff_image_format
+
+
+def _encode(size, image_format, **options):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (120, 30, 200)).save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+class TestMediaFetcher:
+    """Test header sniffing and size/dimension limits while streaming."""
+
+    @pytest.mark.parametrize("image_format,options", [
+        ("JPEG", {"exif": b"Exif\x00\x00" + b"\x00" * 2000}),
+        ("PNG", {}),
+        ("GIF", {}),
+        ("WEBP", {}),
+        ("WEBP", {"lossless": True}),
+        ("BMP", {}),
+        ("TIFF", {}),
+        ("TIFF", {"compression": "tiff_lzw"}),
+    ])
+    def test_reads_size_from_header(self, image_format, options):
+        """Test dimensions are parsed from each format's header bytes."""
+        data = _encode((321, 123), image_format, **options)
+        detected = sniff_image_format(data[:16])
+
+        assert detected == image_format.lower()
+        assert read_image_size(data[:4096], detected) == (321, 123)
+        assert sniff_image_format(b"<!DOCTYPE html>") is None
+
+    def test_reads_largest_icon_size(self):
+        """Test ICO files are accepted and sized by their largest icon."""
+        data = _encode((256, 256), "ICO", sizes=[(32, 32), (256, 256), (64, 64)])
+
+        assert sniff_image_format(data[:16]) == "ico"
+        assert read_image_size(data[:4096], "ico") == (256, 256)
+
+    @pytest.fixture
+    async def image_server(self):
+        images = {
+            "/photo.jpg": _encode((800, 600), "JPEG"),
+            "/icon.png": _encode((16, 16), "PNG"),
+            "/huge.png": _encode((4000, 3000), "PNG"),
+            "/page.html": b"<html>" + b" " * 100 + b"</html>",
+        }
+
+        async def handler(request):
+            return web.Response(body=images[request.path], content_type="application/octet-stream")
+
+        app = web.Application()
+        app.router.add_get("/{name}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        yield f"http://127.0.0.1:{port}", images
+        await runner.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_rejects_while_streaming(self, image_server):
+        """Test unwanted bodies are dropped early and good images are returned whole."""
+        base_url, images = image_server
+        fetcher = MediaFetcher(max_bytes=100_000, max_pixels=4_000_000, chunk_size=1024)
+
+        async with aiohttp.ClientSession() as session:
+            photo = await fetcher.fetch_image(session, f"{base_url}/photo.jpg")
+            assert isinstance(photo, bytearray) and photo == images["/photo.jpg"]
+            assert await fetcher.fetch_image(session, f"{base_url}/icon.png") is None
+            assert await fetcher.fetch_image(session, f"{base_url}/page.html") is None
+
+            fetcher.max_bytes = 10_000_000
+            assert await fetcher.fetch_image(session, f"{base_url}/huge.png") is None
+
+        stats = fetcher.get_stats()
+        assert stats["fetched"] == 1
+        assert stats["rejected_dimensions"] == 2
+        assert stats["rejected_format"] == 1
+        assert stats["bytes_read"] < len(images["/photo.jpg"]) + 10 * 1024
@@ -5,17 +5,27 @@ Tests the core services including WHOIS lookup, email dispatch,
 search delisting, and DMCA orchestration.
 """
 
+import asyncio
+import smtplib
+
+import numpy as np
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime, timedelta
+from email import policy
+from email.message import EmailMessage
+from email.mime.text import MIMEText
 from uuid import uuid4
 
+from src.autodmca.services.contact_resolution_service import ContactResolutionService
 from src.autodmca.services.whois_service import WHOISService
 from src.autodmca.services.email_service import EmailService
+from src.autodmca.services.smtp_pool import SMTPConnectionPool, SMTPDeliveryUnknown, _QueuedMessage
 from src.autodmca.services.search_delisting_service import SearchDelistingService, SearchEngineType
 from src.autodmca.services.dmca_service import DMCAService, DMCAServiceConfig
 from src.autodmca.services.response_handler import ResponseHandler, ResponseType
-from src.autodmca.models.takedown import TakedownRequest, TakedownStatus, CreatorProfile, InfringementData
+from src.autodmca.services.confidence_scoring_service import ConfidenceFeatures, ConfidenceScoringService
+from src.autodmca.models.takedown import TakedownRequest, TakedownStatus, TakedownBatch, CreatorProfile, InfringementData
 from src.autodmca.models.hosting import HostingProvider, ContactInfo, DMCAAgent
 from src.autodmca.utils.cache import CacheManager
 from src.autodmca.utils.rate_limiter import RateLimiter
@@ -84,6 +94,91 @@ class TestWHOISService:
                     await whois_service.lookup_domain("https://example.com")
                     mock_acquire.assert_called_once()
 
+    def test_registrable_domain(self, whois_service):
+        """Test hosts are reduced to the domain the registry knows."""
+        client = whois_service.whois_client
+        assert client.registrable_domain("cdn.files.example.com") == "example.com"
+        assert client.registrable_domain("img.example.co.uk") == "example.co.uk"
+        assert client.registrable_domain("example.org") == "example.org"
+
+    @pytest.mark.asyncio
+    async def test_lookup_domains_queries_each_domain_once(self, whois_service):
+        """Test batch lookups dedup URLs by registrable domain before querying."""
+        urls = [f"https://cdn{i % 5}.pirate.com/leak/{i}" for i in range(100)]
+        urls += ["https://www.other.co.uk/a", "https://img.other.co.uk/b", "invalid-url"]
+
+        whois_data = {'registrar': 'Test Registrar', 'name_servers': ['ns1.testhost.com']}
+        with patch.object(whois_service.cache_manager, 'get', return_value=None), \
+             patch.object(whois_service, '_enhance_contact_info', side_effect=lambda provider: provider), \
+             patch.object(whois_service, '_perform_whois_lookup', return_value=whois_data) as mock_lookup:
+            results = await whois_service.lookup_domains(urls)
+
+        assert sorted(call.args[0] for call in mock_lookup.call_args_list) == ["other.co.uk", "pirate.com"]
+        assert len(results) == len(urls)
+        assert results["https://cdn3.pirate.com/leak/8"].domain == "pirate.com"
+        assert results["https://img.other.co.uk/b"].domain == "other.co.uk"
+        assert results["invalid-url"] is None
+
+    @pytest.mark.asyncio
+    async def test_failed_rdap_bootstrap_is_retried(self, whois_service):
+        """Test a failed RDAP bootstrap is not remembered and is retried after a backoff."""
+        client = whois_service.whois_client
+        load = AsyncMock(side_effect=[{}, {'com': 'https://rdap.verisign.com/com/v1/'}])
+
+        with patch.object(client, '_load_rdap_bootstrap', load), \
+             patch('src.autodmca.services.whois_client.time.monotonic', side_effect=[0, 0, 0, 30, 61, 61]):
+            assert await client._get_rdap_base('com') is None
+            assert await client._get_rdap_base('com') is None
+            assert await client._get_rdap_base('com') == 'https://rdap.verisign.com/com/v1/'
+            assert await client._get_rdap_base('com') == 'https://rdap.verisign.com/com/v1/'
+
+        assert load.await_count == 2
+
+
+class TestContactResolutionService:
+    """Test cases for the shared contact resolution service."""
+    
+    @pytest.fixture
+    def fetched_urls(self):
+        return []
+    
+    @pytest.fixture
+    def resolver(self, fetched_urls):
+        """Fixture for a resolver whose pages are served from memory."""
+        async def fetch_page(url):
+            fetched_urls.append(url)
+            if url.endswith("/dmca"):
+                await asyncio.sleep(5)
+            if url == "https://pirate.com/copyright":
+                return '<p>Send notices to DMCA@pirate.com</p><form action="/report">'
+            return None
+        
+        return ContactResolutionService(CacheManager(), fetch_page=fetch_page, probe_timeout=1)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_probe(self, resolver, fetched_urls):
+        """Test concurrent lookups coalesce and the first page with contacts wins."""
+        results = await asyncio.gather(*(resolver.resolve_domain("www.pirate.com") for _ in range(10)))
+        
+        assert all(result == results[0] for result in results)
+        assert results[0]['dmca_email'] == "dmca@pirate.com"
+        assert results[0]['form_url'] == "https://pirate.com/report"
+        assert resolver.stats['probes'] == 1
+        assert len(fetched_urls) == len(resolver.contact_paths)
+        
+        await resolver.resolve_domain("pirate.com")
+        assert resolver.stats['cache_hits'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_negative_results_are_cached(self, resolver, fetched_urls):
+        """Test domains without contacts are not probed again."""
+        result = await resolver.resolve_domain("nothing.com")
+        assert result['found'] is False
+        
+        await resolver.resolve_domain("nothing.com")
+        assert resolver.stats['probes'] == 1
+        assert len(fetched_urls) == len(resolver.contact_paths)
+
 
 class TestEmailService:
     """Test cases for email service."""
@@ -224,6 +319,203 @@ class TestEmailService:
         assert result['deliverable'] is False
 
 
+class TestSMTPConnectionPool:
+    """Test cases for the pooled SMTP transport."""
+    
+    @pytest.fixture
+    def pool(self):
+        """Fixture for a two-connection pool."""
+        return SMTPConnectionPool(
+            host='smtp.test.com',
+            username='test@test.com',
+            password='password',
+            pool_size=2,
+            rate_limiter=RateLimiter(max_calls=1000, time_window=60)
+        )
+    
+    @staticmethod
+    def _message(index):
+        msg = MIMEText(f"Notice {index}")
+        msg['From'] = 'agent@example.com'
+        msg['Subject'] = f"Notice {index}"
+        return msg
+    
+    @staticmethod
+    def _accepting_server(server, failures=()):
+        """Answer unpipelined commands as an accepting server, raising the given errors first."""
+        failures = iter(failures)
+        
+        def docmd(command):
+            error = next(failures, None)
+            if error:
+                raise error
+            return (354, b'go') if command == 'data' else (250, b'ok')
+        
+        server.has_extn.return_value = False
+        server.docmd.side_effect = docmd
+        server.getreply.return_value = (250, b'queued')
+    
+    @staticmethod
+    def _bodies(server):
+        return [call.args[0] for call in server.send.call_args_list]
+    
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, pool):
+        """Test a batch logs in once per pooled connection, not once per message."""
+        with patch('smtplib.SMTP') as mock_smtp:
+            self._accepting_server(mock_smtp.return_value)
+            
+            await asyncio.gather(*(
+                pool.send_message(self._message(i), ['abuse@host.com']) for i in range(20)
+            ))
+            await pool.close()
+        
+        assert mock_smtp.call_count <= 2
+        assert mock_smtp.return_value.login.call_count == mock_smtp.call_count
+        assert len(self._bodies(mock_smtp.return_value)) == 20
+        assert pool.get_stats()['messages_sent'] == 20
+    
+    @pytest.mark.asyncio
+    async def test_reconnects_after_disconnect(self, pool):
+        """Test a dropped connection is re-established and the message retried."""
+        with patch('smtplib.SMTP') as mock_smtp:
+            self._accepting_server(mock_smtp.return_value, [smtplib.SMTPServerDisconnected()])
+            
+            await pool.send_message(self._message(1), ['abuse@host.com'])
+            await pool.close()
+        
+        assert mock_smtp.call_count == 2
+        assert sum(c['reconnects'] for c in pool.get_stats()['connections']) == 1
+    
+    @pytest.mark.asyncio
+    async def test_no_retry_after_message_sent(self, pool):
+        """Test a drop after the DATA terminator is surfaced rather than resent."""
+        with patch('smtplib.SMTP') as mock_smtp:
+            self._accepting_server(mock_smtp.return_value)
+            mock_smtp.return_value.getreply.side_effect = smtplib.SMTPServerDisconnected()
+            
+            with pytest.raises(SMTPDeliveryUnknown):
+                await pool.send_message(self._message(1), ['abuse@host.com'])
+            await pool.close()
+        
+        assert mock_smtp.call_count == 1
+        assert len(self._bodies(mock_smtp.return_value)) == 1
+        stats = pool.get_stats()
+        assert stats['messages_failed'] == 1
+        assert sum(c['reconnects'] for c in stats['connections']) == 0
+    
+    @pytest.mark.asyncio
+    async def test_message_keeps_its_policy(self, pool):
+        """Test a message is serialised with its own policy and CRLF line endings."""
+        plain = self._message(1)
+        utf8 = EmailMessage(policy=policy.SMTPUTF8)
+        utf8['From'] = 'agent@example.com'
+        utf8['Subject'] = 'Avis de retrait – œuvre protégée'
+        utf8.set_content('Notice')
+        
+        with patch('smtplib.SMTP') as mock_smtp:
+            self._accepting_server(mock_smtp.return_value)
+            
+            await pool.send_message(plain, ['abuse@host.com'])
+            await pool.send_message(utf8, ['abuse@host.com'])
+            await pool.close()
+        
+        sent = self._bodies(mock_smtp.return_value)
+        assert sent[0] == plain.as_bytes().replace(b'\n', b'\r\n') + b"\r\n.\r\n"
+        assert sent[1] == utf8.as_bytes() + b".\r\n"
+        assert 'Subject: Avis de retrait – œuvre protégée\r\n'.encode() in sent[1]
+    
+    @pytest.fixture
+    def pipelined(self, pool):
+        """Fixture for a connection to a server that supports PIPELINING."""
+        connection = pool._connections[0]
+        connection.server = MagicMock()
+        connection.supports_pipelining = True
+        return connection
+    
+    @staticmethod
+    def _queued(to_addrs, data=b"Subject: Notice\r\n\r\nBody\r\n"):
+        return _QueuedMessage(
+            from_addr='agent@example.com', to_addrs=to_addrs, data=data, future=MagicMock()
+        )
+    
+    def test_pipelined_envelope(self, pipelined):
+        """Test MAIL, RCPT and DATA go out in one write and partial refusals are returned."""
+        server = pipelined.server
+        server.getreply.side_effect = [(250, b'ok'), (250, b'ok'), (550, b'no such user'), (354, b'go'), (250, b'queued')]
+        
+        refused = pipelined._transmit(self._queued(['a@host.com', 'b@host.com']))
+        
+        assert refused == {'b@host.com': (550, b'no such user')}
+        assert server.send.call_args_list[0].args[0] == (
+            "mail FROM:<agent@example.com>\r\n"
+            "rcpt TO:<a@host.com>\r\n"
+            "rcpt TO:<b@host.com>\r\n"
+            "data\r\n"
+        )
+        assert server.send.call_args_list[1].args[0] == b"Subject: Notice\r\n\r\nBody\r\n.\r\n"
+        server.rset.assert_not_called()
+    
+    def test_pipelined_sender_refused(self, pipelined):
+        """Test a refused MAIL FROM raises and resets the session without sending the body."""
+        server = pipelined.server
+        server.getreply.side_effect = [(550, b'sender rejected'), (503, b'need MAIL'), (503, b'need RCPT')]
+        
+        with pytest.raises(smtplib.SMTPSenderRefused) as exc_info:
+            pipelined._transmit(self._queued(['a@host.com']))
+        
+        assert exc_info.value.smtp_code == 550
+        assert server.send.call_count == 1
+        server.rset.assert_called_once()
+    
+    @pytest.mark.parametrize("data_reply, sends", [((354, b'go'), 2), ((554, b'no valid recipients'), 1)])
+    def test_pipelined_all_recipients_refused(self, pipelined, data_reply, sends):
+        """Test refusing every recipient raises; a DATA the server accepted anyway is ended empty."""
+        server = pipelined.server
+        server.getreply.side_effect = [(250, b'ok'), (550, b'no'), (551, b'gone'), data_reply, (250, b'ok')]
+        
+        with pytest.raises(smtplib.SMTPRecipientsRefused) as exc_info:
+            pipelined._transmit(self._queued(['a@host.com', 'b@host.com']))
+        
+        assert exc_info.value.recipients == {'a@host.com': (550, b'no'), 'b@host.com': (551, b'gone')}
+        assert server.send.call_count == sends
+        if sends == 2:
+            assert server.send.call_args.args[0] == b".\r\n"
+        server.rset.assert_called_once()
+    
+    def test_pipelined_data_refused(self, pipelined):
+        """Test a DATA reply other than 354 raises a data error without sending the body."""
+        server = pipelined.server
+        server.getreply.side_effect = [(250, b'ok'), (250, b'ok'), (451, b'try again later')]
+        
+        with pytest.raises(smtplib.SMTPDataError) as exc_info:
+            pipelined._transmit(self._queued(['a@host.com']))
+        
+        assert exc_info.value.smtp_code == 451
+        assert server.send.call_count == 1
+        server.rset.assert_called_once()
+    
+    def test_pipelined_drop_after_terminator(self, pipelined):
+        """Test losing the session after the terminator raises instead of counting as a dead session."""
+        server = pipelined.server
+        server.getreply.side_effect = [(250, b'ok'), (250, b'ok'), (354, b'go'), ConnectionResetError()]
+        
+        with pytest.raises(SMTPDeliveryUnknown):
+            pipelined._deliver(self._queued(['a@host.com']))
+        
+        assert pipelined.server is None
+        assert pipelined.stats.reconnects == 0
+    
+    def test_pipelined_dot_stuffing(self, pipelined):
+        """Test lines starting with a dot are doubled and the body is terminated once."""
+        server = pipelined.server
+        server.getreply.side_effect = [(250, b'ok'), (250, b'ok'), (354, b'go'), (250, b'queued')]
+        
+        pipelined._transmit(self._queued(['a@host.com'], data=b".first\r\nmiddle\r\n..two\r\n.\r\nlast"))
+        
+        assert server.send.call_args.args[0] == b"..first\r\nmiddle\r\n...two\r\n..\r\nlast\r\n.\r\n"
+
+
 class TestSearchDelistingService:
     """Test cases for search delisting service."""
     
@@ -523,6 +815,48 @@ class TestDMCAService:
         assert result['followup_count'] == 1
         assert result['email_sent'] is True
         assert 'next_action' in result
+    
+    @pytest.mark.asyncio
+    async def test_process_batch_takedowns_consolidates_notices(self, dmca_service, sample_takedown_request):
+        """Test batch requests for one provider share a single notice."""
+        requests = [sample_takedown_request]
+        for i in range(3):
+            requests.append(TakedownRequest(
+                creator_id=sample_takedown_request.creator_id,
+                creator_profile=sample_takedown_request.creator_profile,
+                infringement_data=InfringementData(
+                    infringing_url=f"https://pirate.com/stolen{i}.jpg",
+                    description="Unauthorized use",
+                    original_work_title="My Work",
+                    original_work_description="Original work",
+                    content_type="image"
+                )
+            ))
+        batch = TakedownBatch(creator_id=sample_takedown_request.creator_id, requests=requests)
+        
+        hosting_provider = HostingProvider(
+            name="Test Hosting",
+            domain="testhosting.com",
+            abuse_email="abuse@testhosting.com"
+        )
+        dmca_service.whois_service.lookup_domains = AsyncMock(return_value={
+            str(request.infringement_data.infringing_url): hosting_provider for request in requests
+        })
+        dmca_service.email_service.send_consolidated_dmca_notice = AsyncMock(return_value={
+            'success': True,
+            'message_id': 'test_message_123',
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        dmca_service.email_service.send_dmca_notice = AsyncMock()
+        
+        result = await dmca_service.process_batch_takedowns(batch)
+        
+        assert result['successful'] == 4
+        dmca_service.email_service.send_consolidated_dmca_notice.assert_awaited_once()
+        dmca_service.email_service.send_dmca_notice.assert_not_awaited()
+        assert dmca_service.metrics['emails_sent'] == 1
+        assert all(request.status == TakedownStatus.UNDER_REVIEW for request in requests)
+        assert all(r['notice_url_count'] == 4 for r in result['results']['successful'])
 
 
 class TestResponseHandler:
@@ -658,4 +992,54 @@ class TestResponseHandler:
             # Verify the stored data structure
             stored_data = mock_set.call_args[0][1]
             assert stored_data['request_id'] == str(request_id)
-            assert stored_data['classification'] == classification
\ No newline at end of file
+            assert stored_data['classification'] == classification
+
+
+class TestConfidenceScoringService:
+    """Test cases for batch confidence scoring."""
+    
+    @pytest.fixture
+    async def trained_service(self, tmp_path):
+        """Fixture for a scoring service trained on synthetic matches."""
+        rng = np.random.default_rng(7)
+        training_data = []
+        for _ in range(200):
+            similarity = float(rng.random())
+            training_data.append({
+                "features": {
+                    "perceptual_hash_score": similarity,
+                    "deep_features_score": float(np.clip(similarity + rng.normal(0, 0.1), 0, 1)),
+                    "source_credibility": float(rng.random())
+                },
+                "is_infringement": similarity > 0.6
+            })
+        
+        service = ConfidenceScoringService(model_path=str(tmp_path))
+        result = await service.train_models(training_data)
+        assert result["status"] == "success"
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_item_scoring(self, trained_service):
+        """Test batch scores equal per-item ensemble predictions."""
+        features_list = [
+            ConfidenceFeatures(perceptual_hash_score=s, deep_features_score=s, source_credibility=0.7)
+            for s in (0.05, 0.4, 0.65, 0.95)
+        ]
+        
+        batch = await trained_service.score_confidence_batch(features_list)
+        assert len(batch) == len(features_list)
+        
+        weights = {"random_forest": 0.4, "gradient_boosting": 0.4, "logistic_regression": 0.2}
+        for features, score in zip(features_list, batch):
+            scaled = trained_service.scaler.transform(features.to_feature_vector().reshape(1, -1))
+            probabilities = [model.predict_proba(scaled)[0][1] for model in trained_service.models.values()]
+            expected = sum(p * weights[name] for p, name in zip(probabilities, trained_service.models))
+            
+            assert score.overall_confidence == pytest.approx(expected)
+            assert score.prediction_interval[0] == pytest.approx(max(0.0, expected - 1.96 * np.std(probabilities)))
+            assert 0.0 <= score.model_agreement <= 1.0
+            assert (await trained_service.score_confidence(features)).overall_confidence == pytest.approx(expected)
+        
+        assert batch[0].overall_confidence < batch[-1].overall_confidence
+        assert await trained_service.score_confidence_batch([]) == []